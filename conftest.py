@@ -3,6 +3,10 @@ import sys
 
 import pytest
 
+# Recompute memoized derived stats (armor class, speed, ...) on every cache
+# hit and fail loudly when a mutation forgot to call invalidate_stats.
+os.environ.setdefault("N20_VERIFY_STAT_CACHE", "1")
+
 # Submodule layout: n20-webapp on sys.path for engine tests that import webapp.*
 _REPO_ROOT = os.path.abspath(os.path.dirname(__file__))
 _WEBAPP_SUBMODULE = os.path.join(_REPO_ROOT, "n20-webapp")
@@ -6,10 +6,12 @@ from natural20.utils.target_validation import (
 )
 import inflect
 import i18n
+import os
+import time
 import uuid
 
 # Cache the list of Action subclasses to avoid repeated runtime introspection.
-# battle.commit() and commit_and_update iterate this for every result item.
+# get_result_handlers() indexes it by result type for battle.commit().
 _ACTION_SUBCLASSES = None
 
 
@@ -23,6 +25,89 @@ def get_action_subclasses():
         except Exception:
             _ACTION_SUBCLASSES = []
     return _ACTION_SUBCLASSES
+
+
+def result_types_of(klass):
+    """Result ``type``s the ``apply`` used by ``klass`` handles (None: it looks at every result).
+
+    The declaration is read from the class that defines ``apply``, so a
+    subclass overriding ``apply`` without declaring its types is treated
+    as a catch-all rather than inheriting its parent's list.
+    """
+    for owner in klass.__mro__:
+        if 'apply' in owner.__dict__:
+            return owner.__dict__.get('RESULT_TYPES')
+    return ()
+
+
+def handlers_for(classes, result_type):
+    """The ``classes`` whose ``apply`` must see a result of ``result_type``, in order."""
+    handlers = []
+    for klass in classes:
+        types = result_types_of(klass)
+        if types is None or result_type in types:
+            handlers.append(klass)
+    return tuple(handlers)
+
+
+# result type -> Action subclasses handling it (see Action.RESULT_TYPES)
+_RESULT_HANDLERS = {}
+
+
+def get_result_handlers(result_type):
+    """Action subclasses to ``apply`` a result of ``result_type`` with, in ``get_action_subclasses`` order."""
+    handlers = _RESULT_HANDLERS.get(result_type)
+    if handlers is None:
+        handlers = handlers_for(get_action_subclasses(), result_type)
+        _RESULT_HANDLERS[result_type] = handlers
+    return handlers
+
+
+# Opt-in commit profiling — set N20_RESULT_TIMING=1 (or call
+# enable_result_timing) to count the time Battle.commit spends per result
+# type and handler.
+_RESULT_TIMING = bool(int(os.environ.get('N20_RESULT_TIMING', '0')))
+_RESULT_TIMINGS = {}  # result type -> {'count': n, 'seconds': s, 'handlers': {name: s}}
+
+
+def enable_result_timing(enabled=True):
+    global _RESULT_TIMING
+    _RESULT_TIMING = bool(enabled)
+
+
+def result_timing_enabled():
+    return _RESULT_TIMING
+
+
+def reset_result_timing():
+    _RESULT_TIMINGS.clear()
+
+
+def apply_result(klass, battle, item, session):
+    """``klass.apply`` for one result, timed per type and handler when profiling is on."""
+    if not _RESULT_TIMING:
+        return klass.apply(battle, item, session)
+    start = time.perf_counter()
+    try:
+        return klass.apply(battle, item, session)
+    finally:
+        elapsed = time.perf_counter() - start
+        stats = _RESULT_TIMINGS.setdefault(item.get('type'), {'count': 0, 'seconds': 0.0, 'handlers': {}})
+        stats['seconds'] += elapsed
+        stats['handlers'][klass.__name__] = stats['handlers'].get(klass.__name__, 0.0) + elapsed
+
+
+def count_result(result_type):
+    if _RESULT_TIMING:
+        stats = _RESULT_TIMINGS.setdefault(result_type, {'count': 0, 'seconds': 0.0, 'handlers': {}})
+        stats['count'] += 1
+
+
+def result_timing_stats():
+    """``[(type, count, seconds, {handler: seconds})]``, slowest result type first."""
+    return sorted(((result_type, stats['count'], stats['seconds'], dict(stats['handlers']))
+                   for result_type, stats in _RESULT_TIMINGS.items()),
+                  key=lambda row: row[2], reverse=True)
 # typed: true
 class AsyncReactionHandler(Exception):
     def __init__(self, source, generator, action, reaction_type):
@@ -69,6 +154,10 @@ class BardicInspirationPrompt(Exception):
         return None
 
 class Action:
+    # Result ``type``s this class's ``apply`` acts on; Battle.commit only
+    # hands it those. None means every result (see result_types_of).
+    RESULT_TYPES = None
+
     def __init__(self, session, source, action_type, opts=None):
         self.uid = uuid.uuid4()
         self.source = source
@@ -36,6 +36,8 @@ class ActionSurgeAction(Action):
         }]
         return self
 
+    RESULT_TYPES = ('action_surge',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item['type'] == 'action_surge':
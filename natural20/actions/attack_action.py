@@ -7,6 +7,7 @@ from natural20.item_library.common import Ground
 from natural20.weapons import damage_modifier, target_advantage_condition
 from natural20.utils.attack_util import after_attack_roll_hook, damage_event
 from natural20.utils.ac_utils import effective_ac
+from natural20.utils.dice_distribution import distribution
 from natural20.spell.effects.life_drain_effect import LifeDrainEffect
 from natural20.spell.effects.strength_drain_effect import StrengthDrainEffect
 from natural20.spell.effects.engulf_effect import EngulfEffect
@@ -201,6 +202,9 @@ class AttackAction(Action):
         action = AttackAction(session, source, 'attack')
         return action.build_map()
 
+    # Flavor text can ride on any result.
+    RESULT_TYPES = None
+
     @staticmethod
     def apply(battle, item, session=None):
         if session is None:
@@ -375,7 +379,7 @@ class AttackAction(Action):
         advantage_mod, adv_info, attack_mod = self.compute_advantage_info(battle, opts)
         target_ac, _cover_ac = effective_ac(battle, self.source, self.target)
 
-        return DieRoll.roll(f"1d20+{attack_mod}", advantage=advantage_mod > 0, disadvantage=advantage_mod < 0).prob(target_ac)
+        return distribution(f"1d20+{attack_mod}", advantage=advantage_mod > 0, disadvantage=advantage_mod < 0).prob(target_ac)
 
     def compute_advantage_info(self, battle, opts=None):
         if opts is None:
@@ -387,10 +391,26 @@ class AttackAction(Action):
 
 
     def avg_damage(self, battle, opts=None):
+        if opts is None:
+            opts = {}
+        return self.damage_distribution(opts).expected()
+
+    def damage_distribution(self, opts=None):
         if opts is None:
             opts = {}
         _, _, _, damage_roll, _ = self.get_weapon_info(opts)
-        return DieRoll.roll(damage_roll).expected()
+        return distribution(damage_roll)
+
+    def kill_probability(self, battle, opts=None, hit_probability=None):
+        """Chance that this attack hits and drops the target from its current hit points.
+
+        Pass ``hit_probability`` when ``compute_hit_probability`` was already called for this attack.
+        """
+        if not isinstance(self.target, Entity) or not self.target.conscious() or self.target.hp() is None:
+            return 0.0
+        if hit_probability is None:
+            hit_probability = self.compute_hit_probability(battle, opts)
+        return hit_probability * self.damage_distribution(opts).prob(self.target.hp())
 
     def resolve(self, session, map, opts=None):
         if opts is None:
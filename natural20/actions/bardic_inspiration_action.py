@@ -96,6 +96,8 @@ class BardicInspirationAction(Action):
         }]
         return self
 
+    RESULT_TYPES = ('bardic_inspiration',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item.get('type') != 'bardic_inspiration':
@@ -32,6 +32,8 @@ class DashAction(Action):
         }]
         return self
 
+    RESULT_TYPES = ('dash',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item['type'] == 'dash':
@@ -36,6 +36,8 @@ class DisengageAction(Action):
         }]
         return self
 
+    RESULT_TYPES = ('disengage',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item['type'] == 'disengage':
@@ -123,6 +123,9 @@ class DivineSmiteAction(Action):
             return True
         return 'fiend' in race_tags or 'undead' in race_tags
 
+    # Proxies every result to SpellAction.apply.
+    RESULT_TYPES = None
+
     @staticmethod
     def apply(battle, item, session=None):
         return SpellAction.apply(battle, item, session)
@@ -39,6 +39,8 @@ class DodgeAction(Action):
         }]
         return self
 
+    RESULT_TYPES = ('dodge',)
+
     @staticmethod
     def apply(battle, item, session=None):
         item_type = item.get('type')
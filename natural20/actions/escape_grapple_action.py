@@ -76,6 +76,8 @@ class EscapeGrappleAction(Action):
 
         self.result = result
 
+    RESULT_TYPES = ('grapple_escape',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item["type"] == "grapple_escape":
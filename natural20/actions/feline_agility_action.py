@@ -45,6 +45,8 @@ class FelineAgilityAction(Action):
         }]
         return self
 
+    RESULT_TYPES = ('feline_agility',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item.get('type') != 'feline_agility':
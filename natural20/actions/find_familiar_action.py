@@ -81,6 +81,8 @@ class FindFamiliarAction(Action):
 
         return self
 
+    RESULT_TYPES = ('dismiss_familiar_permanent', 'dismiss_familiar_temporary')
+
     @staticmethod
     def apply(battle, item, session=None):
         if battle and session is None:
@@ -92,6 +92,8 @@ class FirstAidAction(Action):
                 'roll': medicine_check
             }]
 
+    RESULT_TYPES = ('first_aid',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item['type'] == 'first_aid':
@@ -94,6 +94,8 @@ class FlurryOfBlowsAction(Action):
         self.result = results
         return self
 
+    RESULT_TYPES = ('flurry_of_blows',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if session is None:
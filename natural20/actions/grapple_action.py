@@ -58,6 +58,7 @@ class GrappleAction(Action):
         acrobatics_stats = (self.target.acrobatics_proficient() * self.target.proficiency_bonus()) + self.target.dex_mod()
 
         grapple_success = False
+        contested_roll = None  # uncontested against incapacitated or non-hostile targets
         if self.target.incapacitated() or (battle and not battle.opposing(self.source, target)):
             grapple_success = True
         else:
@@ -74,6 +75,8 @@ class GrappleAction(Action):
             'target_roll': contested_roll
         }]
 
+    RESULT_TYPES = ('grapple',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if not session:
@@ -125,6 +128,8 @@ class DropGrappleAction(Action):
             'type': 'drop_grapple'
         }]
 
+    RESULT_TYPES = ('drop_grapple',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item['type'] == 'drop_grapple':
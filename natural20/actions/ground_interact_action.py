@@ -59,6 +59,8 @@ class GroundInteractAction(Action):
 
         return self
 
+    RESULT_TYPES = ('pickup',)
+
     @staticmethod
     def apply(battle, item, session=None):
         entity = item['source']
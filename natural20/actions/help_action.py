@@ -49,6 +49,8 @@ class HelpAction(Action):
         }]
         return self
 
+    RESULT_TYPES = ('help',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item['type'] != 'help':
@@ -81,6 +81,8 @@ class HideAction(Action):
             }]
         return self
 
+    RESULT_TYPES = ('hide',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item['type'] == 'hide':
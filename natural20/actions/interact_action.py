@@ -142,6 +142,8 @@ class InteractAction(Action):
         self.result = [result_payload]
         return self
 
+    RESULT_TYPES = ('interact',)
+
     @staticmethod
     def apply(battle, item, session=None):
         results = []
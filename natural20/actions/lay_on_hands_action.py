@@ -255,6 +255,8 @@ class LayOnHandsAction(Action):
 
         return len(self.errors) == 0
 
+    RESULT_TYPES = ('lay_on_hands',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item.get('type') != 'lay_on_hands':
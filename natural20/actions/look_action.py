@@ -47,6 +47,8 @@ class LookAction(Action):
         }]
         return self
 
+    RESULT_TYPES = ('look',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if session is None:
@@ -175,6 +175,8 @@ class MageHandAction(Action):
 
         return self
 
+    RESULT_TYPES = ('mage_hand_command',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if battle and session is None:
@@ -1,5 +1,5 @@
 from typing import List, Tuple
-from natural20.action import Action
+from natural20.action import Action, get_result_handlers
 from natural20.utils.movement import compute_actual_moves, retrieve_opportunity_attacks
 from natural20.map_renderer import MapRenderer
 from natural20.action import AsyncReactionHandler
@@ -274,6 +274,8 @@ class MoveAction(Action):
 
         return move_list
 
+    RESULT_TYPES = ('acrobatics', 'athletics', 'drop_grapple', 'move', 'stack_descent', 'state')
+
     @staticmethod
     def apply(battle, item, session=None):
         if session is None:
@@ -288,7 +290,7 @@ class MoveAction(Action):
 
             if results:
                 for sub_item in results:
-                    for klass in Action.__subclasses__():
+                    for klass in get_result_handlers(sub_item.get('type')):
                         klass.apply(battle, sub_item, session)
 
         elif item_type in ['acrobatics', 'athletics']:
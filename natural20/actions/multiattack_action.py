@@ -24,6 +24,8 @@ class MultiattackAction(Action):
         }]
         return self
 
+    RESULT_TYPES = ('multiattack',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item['type'] == 'multiattack':
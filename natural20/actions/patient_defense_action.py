@@ -38,6 +38,8 @@ class PatientDefenseAction(Action):
         }]
         return self
 
+    RESULT_TYPES = ('patient_defense',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item.get('type') != 'patient_defense':
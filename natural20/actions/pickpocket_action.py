@@ -439,6 +439,8 @@ class PickpocketAction(Action):
 
         return self
 
+    RESULT_TYPES = ('pickpocket',)
+
     @staticmethod
     def apply(battle, item, session=None):
         """Apply the pickpocket result."""
@@ -26,6 +26,8 @@ class ProneAction(Action):
         }]
         return self
 
+    RESULT_TYPES = ('prone',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item["type"] == "prone":
@@ -50,6 +50,8 @@ class RageAction(Action):
         }]
         return self
 
+    RESULT_TYPES = ('rage_start',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if session is None and battle is not None:
@@ -120,6 +122,8 @@ class RecklessAttackAction(Action):
         }]
         return self
 
+    RESULT_TYPES = ('reckless_attack',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if session is None and battle is not None:
@@ -171,6 +175,8 @@ class EndRageAction(Action):
         }]
         return self
 
+    RESULT_TYPES = ('rage_end',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if session is None and battle is not None:
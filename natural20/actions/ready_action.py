@@ -94,6 +94,8 @@ class ReadyAction(Action):
         }]
         return self
 
+    RESULT_TYPES = ('ready_action',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if not isinstance(item, dict) or item.get('type') != 'ready_action':
@@ -41,6 +41,8 @@ class SecondWindAction(Action):
         }]
         return self
 
+    RESULT_TYPES = ('second_wind',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if session is None:
@@ -45,6 +45,8 @@ class ShellDefenseAction(Action):
         }]
         return self
 
+    RESULT_TYPES = ('shell_defense',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item.get('type') != 'shell_defense':
@@ -54,6 +56,7 @@ class ShellDefenseAction(Action):
         source = item['source']
         # Enter shell state
         source._in_shell = True
+        source.invalidate_stats()
         # Mark prone
         source._prone = True
         if battle:
@@ -103,6 +106,8 @@ class EmergenceAction(Action):
         }]
         return self
 
+    RESULT_TYPES = ('shell_emerge',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item.get('type') != 'shell_emerge':
@@ -112,6 +117,7 @@ class EmergenceAction(Action):
         source = item['source']
         # Exit shell state
         source._in_shell = False
+        source.invalidate_stats()
         # Remove prone (tortle stands when emerging)
         source._prone = False
         if battle:
@@ -128,6 +128,8 @@ class ShoveAction(Action):
             }]
         return self
 
+    RESULT_TYPES = ('shove',)
+
     @staticmethod
     def apply(battle, item, session=None):
         event_manager = battle.event_manager if battle else session.event_manager
@@ -57,6 +57,8 @@ class SpeakAction(Action):
         }]
         return self
 
+    RESULT_TYPES = ('speak',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if session is None and battle is not None:
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 import inspect
 from natural20.utils.attack_util import damage_event
-from natural20.action import Action
+from natural20.action import Action, handlers_for
 from natural20.utils.spell_loader import load_spell_class
 from natural20.utils.string_utils import classify
 from natural20.spell.spell import Spell
@@ -338,6 +338,25 @@ class SpellAction(Action):
             else:
                 yield klass
 
+    # result type -> spell classes to apply it with, for Spell.subclass_generation
+    _spell_result_handlers = {}
+    _spell_result_handlers_generation = None
+
+    @staticmethod
+    def spell_result_handlers(result_type):
+        """Spell classes whose ``apply`` must see a result of ``result_type`` (see Spell.RESULT_TYPES)."""
+        if SpellAction._spell_result_handlers_generation != Spell.subclass_generation:
+            SpellAction._spell_result_handlers = {}
+            SpellAction._spell_result_handlers_generation = Spell.subclass_generation
+        handlers = SpellAction._spell_result_handlers.get(result_type)
+        if handlers is None:
+            handlers = handlers_for(SpellAction._all_spell_descendants(), result_type)
+            SpellAction._spell_result_handlers[result_type] = handlers
+        return handlers
+
+    # Spell results of any type are routed to the spells below.
+    RESULT_TYPES = None
+
     @staticmethod
     def apply(battle, item, session=None):
         # Guard against double processing when other action types proxy to SpellAction.apply
@@ -352,7 +371,7 @@ class SpellAction(Action):
         if isinstance(effect, Spell):
             spell_apply_result = type(effect).apply(battle, item, session)
         else:
-            for klass in SpellAction._all_spell_descendants():
+            for klass in SpellAction.spell_result_handlers(item.get('type')):
                 result = klass.apply(battle, item, session)
                 if result is not None:
                     spell_apply_result = result
@@ -34,6 +34,8 @@ class StandAction(Action):
         }]
         return self
 
+    RESULT_TYPES = ('stand',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item["type"] == "stand":
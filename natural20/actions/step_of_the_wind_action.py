@@ -47,6 +47,8 @@ class StepOfTheWindAction(Action):
         }]
         return self
 
+    RESULT_TYPES = ('step_of_the_wind',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item.get('type') != 'step_of_the_wind':
@@ -86,6 +86,8 @@ class SummonFamiliarAction(Action):
 
         return self
 
+    RESULT_TYPES = ('resummon_familiar',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if battle and session is None:
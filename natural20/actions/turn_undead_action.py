@@ -105,6 +105,8 @@ class TurnUndeadAction(Action):
         self.result = results
         return self
 
+    RESULT_TYPES = ('turn_undead', 'turn_undead_no_targets')
+
     @staticmethod
     def apply(battle, item, session=None):
         if session is None and battle is not None:
@@ -146,6 +146,8 @@ class UseItemAction(Action):
                 self.result.append(item)
         return self
 
+    RESULT_TYPES = ('use_item',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item["type"] == "use_item":
@@ -95,6 +95,8 @@ class WildShapeAction(Action):
         }]
         return self
 
+    RESULT_TYPES = ('wild_shape',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item.get('type') != 'wild_shape':
@@ -149,6 +151,8 @@ class RevertWildShapeAction(Action):
         }]
         return self
 
+    RESULT_TYPES = ('wild_shape_revert',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item.get('type') != 'wild_shape_revert':
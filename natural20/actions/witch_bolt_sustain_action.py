@@ -87,6 +87,8 @@ class WitchBoltSustainAction(Action):
 
         return self
 
+    RESULT_TYPES = ('witch_bolt_sustain',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item.get('type') != 'witch_bolt_sustain':
@@ -0,0 +1,280 @@
+"""Hierarchical (HPA*) routing over the navigation cache.
+
+The map is cut into square clusters. Where two neighbouring clusters touch,
+every run of tiles a creature can step across becomes an *entrance*: a pair
+of border tiles, one on each side (long runs get one at each end, short ones
+one in the middle). Entrance tiles are the nodes of an abstract graph whose
+edges are the steps across the border and, inside each cluster, the cost of
+the cheapest walk between two of its entrance tiles.
+
+A long query then searches the abstract graph (a few nodes per cluster)
+instead of every tile, and ``PathCompute`` refines the resulting waypoints
+into tiles with short ordinary A* hops, under the real movement rules
+(creatures, hazards, squeezing costs). The graph is built from the terrain
+masks of ``NavigationCache``, so it is shared by every creature of the same
+footprint, and a tile change only rebuilds the clusters around it.
+"""
+import heapq
+import os
+
+from natural20.utils.navigation_cache import DIR_BITS, DIR_OFFSETS
+from natural20.utils.terrain_grid import DIFFICULT
+
+# Side of the square clusters the map is cut into (N20_PATH_CLUSTER_SIZE).
+_CLUSTER_SIZE_ENV = os.environ.get('N20_PATH_CLUSTER_SIZE', '')
+if _CLUSTER_SIZE_ENV:
+    try:
+        CLUSTER_SIZE = max(int(_CLUSTER_SIZE_ENV), 2)
+    except ValueError:
+        CLUSTER_SIZE = 10
+else:
+    CLUSTER_SIZE = 10
+
+# Entrance runs at least this long get a transition at both ends
+_LONG_ENTRANCE = 6
+
+_STEP_RIGHT = DIR_BITS[(1, 0)]
+_STEP_DOWN = DIR_BITS[(0, 1)]
+
+
+class ClusterGraph:
+    """Abstract entrance graph of one ``NavigationLayer``."""
+
+    def __init__(self, layer, cluster_size=CLUSTER_SIZE):
+        self.layer = layer
+        self.map = layer.map
+        self.cluster_size = cluster_size
+        self.width = layer.width
+        self.height = layer.height
+        self.columns = -(-self.width // cluster_size)
+        self.rows = -(-self.height // cluster_size)
+        # (cluster, 'x' | 'y') -> [(tile_a, tile_b, cost_ab, cost_ba)] across the
+        # border between ``cluster`` and its right ('x') or lower ('y') neighbour
+        self.borders = {}
+        # cluster -> {node: {other node of the cluster: cost}}
+        self.intra = {}
+        # node -> {node across a border: cost}
+        self.inter = {}
+        self._dirty = {(cx, cy) for cx in range(self.columns) for cy in range(self.rows)}
+
+    def cluster_of(self, pos_x, pos_y):
+        return pos_x // self.cluster_size, pos_y // self.cluster_size
+
+    def _cluster_bounds(self, cluster):
+        size = self.cluster_size
+        cx, cy = cluster
+        return cx * size, cy * size, min((cx + 1) * size, self.width), min((cy + 1) * size, self.height)
+
+    def invalidate(self, min_x, min_y, max_x, max_y):
+        """Tile masks in the box changed: rebuild the clusters holding them on next use."""
+        first_x, first_y = self.cluster_of(max(min_x, 0), max(min_y, 0))
+        last_x, last_y = self.cluster_of(min(max_x, self.width - 1), min(max_y, self.height - 1))
+        for cx in range(first_x, last_x + 1):
+            for cy in range(first_y, last_y + 1):
+                self._dirty.add((cx, cy))
+
+    @property
+    def dirty(self):
+        return frozenset(self._dirty)
+
+    # -- building --------------------------------------------------------
+
+    def _tile_cost(self, pos_x, pos_y, diagonal):
+        cost = 2 if self.map.terrain_grid.flags[pos_x, pos_y] & DIFFICULT else 1
+        return cost + 0.1 if diagonal else cost
+
+    def _steps(self, entity, squeeze, pos_x, pos_y):
+        """``(x, y, dx, dy)`` of the steps out of a tile, with PathCompute's diagonal rule."""
+        mask = self.layer.mask(entity, squeeze, pos_x, pos_y)
+        for dx, dy in DIR_OFFSETS:
+            if not mask & DIR_BITS[(dx, dy)]:
+                continue
+            if dx and dy and not (mask & DIR_BITS[(dx, 0)] or mask & DIR_BITS[(0, dy)]):
+                continue
+            yield pos_x + dx, pos_y + dy, dx, dy
+
+    def refresh(self, entity, squeeze):
+        """Rebuild the entrances and edges of the dirty clusters."""
+        if not self._dirty:
+            return
+        dirty = self._dirty
+        self._dirty = set()
+        borders = set()
+        for cx, cy in dirty:
+            borders.update([((cx, cy), 'x'), ((cx, cy), 'y'), ((cx - 1, cy), 'x'), ((cx, cy - 1), 'y')])
+        touched = set(dirty)
+        for cluster, axis in borders:
+            if not (0 <= cluster[0] < self.columns and 0 <= cluster[1] < self.rows):
+                continue
+            other = (cluster[0] + 1, cluster[1]) if axis == 'x' else (cluster[0], cluster[1] + 1)
+            if not (other[0] < self.columns and other[1] < self.rows):
+                continue
+            for tile_a, tile_b, _, _ in self.borders.get((cluster, axis), ()):
+                self.inter.get(tile_a, {}).pop(tile_b, None)
+                self.inter.get(tile_b, {}).pop(tile_a, None)
+            entrances = self._find_entrances(entity, squeeze, cluster, axis)
+            self.borders[(cluster, axis)] = entrances
+            for tile_a, tile_b, cost_ab, cost_ba in entrances:
+                self.inter.setdefault(tile_a, {})[tile_b] = cost_ab
+                self.inter.setdefault(tile_b, {})[tile_a] = cost_ba
+            touched.update([cluster, other])
+        for cluster in touched:
+            if 0 <= cluster[0] < self.columns and 0 <= cluster[1] < self.rows:
+                self._link_cluster(entity, squeeze, cluster)
+
+    def _find_entrances(self, entity, squeeze, cluster, axis):
+        min_x, min_y, max_x, max_y = self._cluster_bounds(cluster)
+        if axis == 'x':
+            # column max_x - 1 faces column max_x
+            pairs = [((max_x - 1, y), (max_x, y)) for y in range(min_y, max_y)]
+            straight = _STEP_RIGHT
+        else:
+            pairs = [((x, max_y - 1), (x, max_y)) for x in range(min_x, max_x)]
+            straight = _STEP_DOWN
+        layer = self.layer
+        crossings = [bool(layer.mask(entity, squeeze, *tile_a) & straight) for tile_a, _ in pairs]
+
+        entrances = []
+        run_start = None
+        for index in range(len(pairs) + 1):
+            open_step = index < len(pairs) and crossings[index]
+            if open_step and run_start is None:
+                run_start = index
+            elif not open_step and run_start is not None:
+                run = range(run_start, index)
+                picks = [run[0], run[-1]] if len(run) >= _LONG_ENTRANCE else [run[len(run) // 2]]
+                for pick in picks:
+                    tile_a, tile_b = pairs[pick]
+                    entrances.append((tile_a, tile_b, self._tile_cost(*tile_b, False),
+                                      self._tile_cost(*tile_a, False)))
+                run_start = None
+
+        # Gaps only crossable diagonally still connect the clusters
+        other = self.cluster_of(*pairs[0][1])
+        for index, (tile_a, _) in enumerate(pairs):
+            if crossings[index]:
+                continue
+            for nx, ny, dx, dy in self._steps(entity, squeeze, *tile_a):
+                if dx and dy and self.cluster_of(nx, ny) == other and \
+                        (axis == 'x' and dx == 1 or axis == 'y' and dy == 1):
+                    entrances.append((tile_a, (nx, ny), self._tile_cost(nx, ny, True),
+                                      self._tile_cost(*tile_a, True)))
+                    break
+        return entrances
+
+    def _nodes_of(self, cluster):
+        nodes = []
+        cx, cy = cluster
+        # entrances on the right/bottom borders (side 0) and the left/top ones (side 1)
+        for border_cluster, axis, side in (((cx, cy), 'x', 0), ((cx, cy), 'y', 0),
+                                           ((cx - 1, cy), 'x', 1), ((cx, cy - 1), 'y', 1)):
+            for entrance in self.borders.get((border_cluster, axis), ()):
+                node = entrance[side]
+                if node not in nodes:
+                    nodes.append(node)
+        return nodes
+
+    def _link_cluster(self, entity, squeeze, cluster):
+        nodes = self._nodes_of(cluster)
+        links = {}
+        node_set = set(nodes)
+        for node in nodes:
+            costs = self.costs_within(entity, squeeze, cluster, node, node_set)
+            links[node] = {other: cost for other, cost in costs.items() if other != node}
+        self.intra[cluster] = links
+
+    def costs_within(self, entity, squeeze, cluster, source, targets):
+        """Dijkstra costs from ``source`` to the ``targets`` it can reach without leaving ``cluster``."""
+        min_x, min_y, max_x, max_y = self._cluster_bounds(cluster)
+        found = {}
+        best = {source: 0}
+        frontier = [(0, source)]
+        remaining = len(targets)
+        while frontier and remaining:
+            cost, tile = heapq.heappop(frontier)
+            if cost > best[tile]:
+                continue
+            if tile in targets and tile not in found:
+                found[tile] = cost
+                remaining -= 1
+            for nx, ny, dx, dy in self._steps(entity, squeeze, *tile):
+                if not (min_x <= nx < max_x and min_y <= ny < max_y):
+                    continue
+                new_cost = cost + self._tile_cost(nx, ny, dx and dy)
+                if new_cost < best.get((nx, ny), float('inf')):
+                    best[(nx, ny)] = new_cost
+                    heapq.heappush(frontier, (new_cost, (nx, ny)))
+        return found
+
+    # -- queries ---------------------------------------------------------
+
+    def route(self, entity, squeeze, source, destination):
+        """``(cost, [source, entrance, ..., destination])`` through the abstract graph, or None.
+
+        ``cost`` is in PathCompute units (1 per tile, 2 on difficult terrain,
+        +0.1 per diagonal) and ignores creatures.
+
+        None means the abstract graph holds no route, which is not a proof
+        that none exists (e.g. a route only open to squeezing creatures).
+        """
+        self.refresh(entity, squeeze)
+        source_cluster = self.cluster_of(*source)
+        goal_cluster = self.cluster_of(*destination)
+        source_nodes = self._nodes_of(source_cluster)
+        goal_nodes = self._nodes_of(goal_cluster)
+        starts = self.costs_within(entity, squeeze, source_cluster, source, set(source_nodes))
+        goals = self.costs_within(entity, squeeze, goal_cluster, destination, set(goal_nodes))
+        if not starts or not goals:
+            return None
+
+        goal_x, goal_y = destination
+
+        def heuristic(node):
+            return max(abs(node[0] - goal_x), abs(node[1] - goal_y))
+
+        best = {}
+        parents = {}
+        frontier = []
+        for node, cost in starts.items():
+            best[node] = cost
+            parents[node] = source
+            heapq.heappush(frontier, (cost + heuristic(node), cost, node))
+        best_goal = None
+        while frontier:
+            _, cost, node = heapq.heappop(frontier)
+            if cost > best.get(node, float('inf')):
+                continue
+            if best_goal is not None and cost >= best_goal[0]:
+                break
+            if node in goals and (best_goal is None or cost + goals[node] < best_goal[0]):
+                best_goal = (cost + goals[node], node)
+            cluster = self.cluster_of(*node)
+            neighbors = list(self.intra.get(cluster, {}).get(node, {}).items())
+            neighbors.extend(self.inter.get(node, {}).items())
+            for other, step_cost in neighbors:
+                new_cost = cost + step_cost
+                if new_cost < best.get(other, float('inf')):
+                    best[other] = new_cost
+                    parents[other] = node
+                    heapq.heappush(frontier, (new_cost + heuristic(other), new_cost, other))
+        if best_goal is None:
+            return None
+
+        waypoints = [destination]
+        node = best_goal[1]
+        while node != source:
+            if node != waypoints[-1]:
+                waypoints.append(node)
+            node = parents[node]
+        waypoints.append(source)
+        waypoints.reverse()
+        return best_goal[0], waypoints
+
+
+def cluster_graph(layer):
+    """The ``ClusterGraph`` of a navigation layer, created on first use."""
+    graph = layer.clusters
+    if graph is None:
+        graph = ClusterGraph(layer)
+        layer.clusters = graph
+    return graph
@@ -0,0 +1,235 @@
+"""Lookahead search for ``GenericController``.
+
+The controller's heuristics (``_sort_actions_with_scores``) score every
+available action without playing it out. ``LookaheadSearch`` re-ranks the
+heuristic's best ``top_k`` candidates by simulating them: each candidate is
+applied to the live battle inside a snapshot (``Battle.snapshot``), the
+creature finishes its turn with the heuristic controller, the resulting
+position is scored with ``evaluate`` and the battle is restored. With
+``replies`` the creatures acting next play their turns (heuristically)
+before the position is scored, so exposure to a counter-attack counts. Every
+candidate is played ``rollouts`` times with re-seeded dice, and rollout
+``n`` uses the same seeds for every candidate, so candidates are compared
+on the same luck::
+
+    controller = GenericController(session, search=LookaheadSearch(budget=0.5, top_k=4, rollouts=3))
+
+Searching runs within a wall-clock ``budget`` per turn (seconds, shared by
+all decisions a creature makes in one turn). When the budget is spent,
+or runs out before every candidate has been played once, the heuristic
+ranking is used unchanged. Rollouts run inside
+``EventManager.simulation()``: game-logic listeners still react, but log
+output, sinks and statistics never see simulated events. Controllers
+used during a rollout (the searching creature's own follow-up actions and
+anybody's reactions) play heuristically and their per-battle memory is
+restored afterwards.
+
+``N20_AI_LOOKAHEAD=1`` turns the search on for every ``GenericController``
+created without an explicit ``search``; ``N20_AI_LOOKAHEAD_BUDGET``,
+``N20_AI_LOOKAHEAD_TOP_K``, ``N20_AI_LOOKAHEAD_ROLLOUTS`` and
+``N20_AI_LOOKAHEAD_REPLIES`` set its defaults.
+"""
+import copy
+import os
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+from natural20.battle_snapshot import copy_state
+from natural20.utils.rng_stream import RngStream, derive_seed
+
+ENABLED = os.environ.get('N20_AI_LOOKAHEAD', '0') not in ('', '0', 'false', 'no', 'off')
+
+DEFAULT_BUDGET = float(os.environ.get('N20_AI_LOOKAHEAD_BUDGET', '0.5'))
+DEFAULT_TOP_K = int(os.environ.get('N20_AI_LOOKAHEAD_TOP_K', '4'))
+DEFAULT_ROLLOUTS = int(os.environ.get('N20_AI_LOOKAHEAD_ROLLOUTS', '3'))
+DEFAULT_REPLIES = int(os.environ.get('N20_AI_LOOKAHEAD_REPLIES', '0'))
+
+# heuristic actions a rollout plays after the candidate to finish the turn
+# (same cap idea as encounter_simulator.MAX_ACTIONS_PER_TURN)
+MAX_FOLLOW_UP_ACTIONS = 6
+
+# evaluation weights, in units of one creature's full hit points
+DOWNED_WEIGHT = 0.5
+DEAD_WEIGHT = 1.0
+
+_local = threading.local()
+
+
+def searching():
+    """Whether a rollout is being played on this thread (nested searches are not started)."""
+    return getattr(_local, 'depth', 0) > 0
+
+
+@contextmanager
+def _rollout_scope():
+    _local.depth = getattr(_local, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _local.depth -= 1
+
+
+def evaluate(battle, entity):
+    """Score of the battle from ``entity``'s side: its side's health and standing minus its opponents'."""
+    value = 0.0
+    for other in list(battle.entities.keys()):
+        if other is entity or battle.allies(entity, other):
+            sign = 1.0
+        elif battle.opposing(entity, other):
+            sign = -1.0
+        else:
+            continue
+        max_hp = other.max_hp() or 1
+        value += sign * max(0, other.hp()) / max_hp
+        if other.dead():
+            value -= sign * DEAD_WEIGHT
+        elif other.unconscious():
+            value -= sign * DOWNED_WEIGHT
+    return value
+
+
+def _streams(stream, streams):
+    if isinstance(stream, RngStream):
+        streams.append(stream)
+        for child in list(stream.children.values()):
+            _streams(child, streams)
+    return streams
+
+
+def _reseed(battle, seed):
+    """Point every dice stream of the battle (and the global ``random``) at rollout ``seed``."""
+    random.seed(seed)
+    streams = _streams(getattr(battle.session, 'rng', None), [])
+    if battle.rng is not None and not any(stream is battle.rng for stream in streams):
+        _streams(battle.rng, streams)
+    for stream in streams:
+        stream.random.seed(derive_seed(stream.seed, f"lookahead/{seed}"))
+
+
+class LookaheadSearch:
+    def __init__(self, budget=None, top_k=None, rollouts=None, replies=None, seed=0, evaluator=evaluate,
+                 follow_up=MAX_FOLLOW_UP_ACTIONS):
+        self.budget = DEFAULT_BUDGET if budget is None else budget
+        self.top_k = DEFAULT_TOP_K if top_k is None else top_k
+        self.rollouts = DEFAULT_ROLLOUTS if rollouts is None else rollouts
+        self.replies = DEFAULT_REPLIES if replies is None else replies
+        self.follow_up = follow_up
+        self.seed = seed
+        self.evaluator = evaluator
+        # searches, fallbacks, rollouts, errors and seconds spent
+        self.stats = Counter()
+
+    def __repr__(self):
+        return (f"LookaheadSearch(budget={self.budget}, top_k={self.top_k}, rollouts={self.rollouts}, "
+                f"replies={self.replies})")
+
+    def _turn_budget(self, controller, battle, entity):
+        battle_data = controller._battle_data(battle, entity)
+        turn = (battle.round, battle.current_turn_index)
+        budget = battle_data.get('lookahead')
+        if budget is None or budget['turn'] != turn:
+            budget = battle_data['lookahead'] = {'turn': turn, 'spent': 0.0}
+        return budget
+
+    def rerank(self, controller, entity, battle, scored):
+        """Re-rank ``scored`` (``(action, heuristic score)`` pairs, best first) by simulated outcome."""
+        if len(scored) < 2 or self.top_k < 2 or self.rollouts < 1 or searching():
+            return scored
+        budget = self._turn_budget(controller, battle, entity)
+        remaining = self.budget - budget['spent']
+        if remaining <= 0:
+            self.stats['fallbacks'] += 1
+            return scored
+
+        start = time.perf_counter()
+        candidates = scored[:self.top_k]
+        values = self.simulate(controller, entity, battle, [action for action, _ in candidates], start + remaining)
+        elapsed = time.perf_counter() - start
+        # the controllers' memory was restored, so the budget entry is looked up again
+        self._turn_budget(controller, battle, entity)['spent'] += elapsed
+        self.stats['seconds'] += elapsed
+        if values is None:
+            self.stats['fallbacks'] += 1
+            return scored
+
+        self.stats['searches'] += 1
+        order = sorted(range(len(candidates)), key=lambda index: (-values[index], index))
+        return [candidates[index] for index in order] + list(scored[self.top_k:])
+
+    def simulate(self, controller, entity, battle, actions, deadline):
+        """Mean evaluation of each action over the rollouts.
+
+        ``None`` if ``deadline`` passes before every action was played once
+        or a rollout fails. Rollouts are played round-robin over the
+        actions, so whenever the deadline hits every action has the same
+        number of samples.
+        """
+        controllers = {id(c): c for c in [controller] + [battle.controller_for(e) for e in battle.entities]
+                       if hasattr(c, 'battle_data')}
+        memories = {key: copy_state(c.battle_data) for key, c in controllers.items()}
+        event_manager = battle.session.event_manager
+        simulation = getattr(event_manager, 'simulation', None)
+        snapshot = battle.snapshot()
+        totals = [0.0] * len(actions)
+        completed = 0
+        try:
+            with simulation() if simulation else nullcontext(), _rollout_scope():
+                for rollout in range(self.rollouts):
+                    for index, action in enumerate(actions):
+                        if time.perf_counter() > deadline:
+                            return [total / completed for total in totals] if completed else None
+                        _reseed(battle, derive_seed(self.seed, f"{battle.round}/{rollout}"))
+                        try:
+                            totals[index] += self.rollout(controller, entity, battle, action)
+                        except Exception:  # pylint: disable=broad-except
+                            # an action that cannot be played out is left to the heuristic
+                            self.stats['errors'] += 1
+                            return None
+                        finally:
+                            snapshot.restore()
+                        self.stats['rollouts'] += 1
+                    completed += 1
+        finally:
+            for key, c in controllers.items():
+                c.battle_data = memories[key]
+        return [total / completed for total in totals]
+
+    def _play_turn(self, controller, entity, battle):
+        for _ in range(self.follow_up):
+            if not entity.conscious() or battle.battle_ends():
+                break
+            action = controller.move_for(entity, battle)
+            if not action:
+                break
+            battle.action(action)
+            battle.commit(action)
+
+    def _play_replies(self, battle):
+        """Advance through the next ``replies`` turns the way ``Battle.while_active`` does."""
+        for _ in range(self.replies):
+            if battle.battle_ends():
+                return
+            battle.current_turn().resolve_trigger('end_of_turn')
+            if battle.next_turn():
+                return
+            battle.start_turn()
+            current = battle.current_turn()
+            if not current.conscious() or current.incapacitated() or not battle.has_controller_for(current):
+                continue
+            current.reset_turn(battle)
+            self._play_turn(battle.controller_for(current), current, battle)
+
+    def rollout(self, controller, entity, battle, action):
+        """Play ``action``, the rest of ``entity``'s turn and the ``replies``, then evaluate."""
+        if hasattr(action, 'send'):
+            return self.evaluator(battle, entity)
+        # the candidate itself is returned to the real game uncommitted
+        action = copy.copy(action)
+        battle.action(action)
+        battle.commit(action)
+        self._play_turn(controller, entity, battle)
+        self._play_replies(battle)
+        return self.evaluator(battle, entity)
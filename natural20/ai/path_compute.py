@@ -3,8 +3,12 @@ import math
 import os
 import copy
 import time
+from array import array
 from natural20.item_library.door_object import DoorObject, DoorObjectWall
 from natural20.item_library.chasm import Chasm
+from natural20.utils.navigation_cache import DIR_BITS
+from natural20.utils.navigation_components import component_labels
+from natural20.ai.hierarchical_path import cluster_graph
 MAX_DISTANCE = 4_000_000
 
 # Timing instrumentation — set N20_DEBUG_TIMING=1 to log per-query timings.
@@ -47,6 +51,18 @@ if _PATH_MAX_MS_DOOR_ENV:
 else:
     MAX_MS_DOOR = 2000
 
+# Chebyshev distance from which compute_path plans over the hierarchical
+# cluster graph (natural20.ai.hierarchical_path) before falling back to a
+# flat A* pass. Long queries then stay well under MAX_NODES. 0 disables it.
+_PATH_HPA_DISTANCE_ENV = os.environ.get('N20_PATH_HPA_DISTANCE', '')
+if _PATH_HPA_DISTANCE_ENV:
+    try:
+        HPA_DISTANCE = int(_PATH_HPA_DISTANCE_ENV)
+    except ValueError:
+        HPA_DISTANCE = 24
+else:
+    HPA_DISTANCE = 24
+
 
 def _path_timing_log(msg):
     """Emit a pathfinding timing log when N20_DEBUG_TIMING=1."""
@@ -58,6 +74,180 @@ def _path_timing_log(msg):
             pass
 
 
+# Neighbor offsets in the order get_neighbors has always expanded them.
+_NEIGHBOR_OFFSETS = tuple((dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy)
+
+
+class SearchWorkspace:
+    """Reusable A* buffers for every map of one size.
+
+    Tiles are addressed by ``x * height + y`` (so heap ties still break in
+    ``(x, y)`` order). ``cost``/``parent`` are only meaningful for tiles whose
+    ``stamp`` matches the current ``generation``; ``reset`` starts a new
+    search by bumping the generation instead of clearing the buffers.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        size = width * height
+        self.costs = array('d', [MAX_DISTANCE]) * size
+        self.parents = array('i', [-1]) * size
+        self.stamps = array('i', [0]) * size
+        self.generation = 0
+
+    def reset(self):
+        self.generation += 1
+        if self.generation >= 2 ** 31 - 1:
+            self.stamps = array('i', [0]) * (self.width * self.height)
+            self.generation = 1
+
+    def cost(self, index):
+        """g-cost of a tile in the current search (``MAX_DISTANCE`` if unseen)."""
+        if self.stamps[index] != self.generation:
+            return MAX_DISTANCE
+        return self.costs[index]
+
+    def visit(self, index, cost, parent):
+        self.costs[index] = cost
+        self.parents[index] = parent
+        self.stamps[index] = self.generation
+
+    def path_to(self, index):
+        """Tiles from the search source to ``index`` as ``[(x, y), ...]``."""
+        height = self.height
+        path = []
+        while index != -1:
+            path.append(divmod(index, height))
+            index = self.parents[index]
+        path.reverse()
+        return path
+
+
+_WORKSPACE_POOL = {}  # (width, height) -> idle SearchWorkspace list
+_WORKSPACE_POOL_LIMIT = 4
+
+
+def acquire_workspace(width, height):
+    """Reset workspace for a ``width x height`` map, reusing an idle one when possible."""
+    idle = _WORKSPACE_POOL.get((width, height))
+    try:
+        workspace = idle.pop() if idle else None
+    except IndexError:  # taken by another thread in between
+        workspace = None
+    if workspace is None:
+        workspace = SearchWorkspace(width, height)
+    workspace.reset()
+    return workspace
+
+
+def release_workspace(workspace):
+    idle = _WORKSPACE_POOL.setdefault((workspace.width, workspace.height), [])
+    if len(idle) < _WORKSPACE_POOL_LIMIT:
+        idle.append(workspace)
+
+
+class Reachability:
+    """Single-source Dijkstra field built by ``PathCompute.reachability``.
+
+    Tiles are settled lazily, only as far out as the queries so far needed,
+    so a turn's worth of "how far / which way to X" questions costs one
+    flood plus an O(path length) walk per answer. Costs are in grid-move
+    units (the same ``g`` the A* searches use, including the 0.1 diagonal
+    tie-breaker). Hazard tiles can be reached but are never walked through,
+    mirroring how ``compute_path`` only accepts a hazard as its destination.
+
+    The field is a snapshot: build a new one once the map has changed.
+    """
+
+    def __init__(self, path_compute, source_x, source_y, budget_units=None):
+        self.path_compute = path_compute
+        self.source = (source_x, source_y)
+        self.budget_units = budget_units
+        self.width = path_compute.max_x
+        self.height = path_compute.max_y
+        self.workspace = SearchWorkspace(self.width, self.height)
+        self.workspace.reset()
+        self._settled = bytearray(self.width * self.height)
+        self._order = []  # settled tile indices, cheapest first
+        self._source = source_x * self.height + source_y
+        self.workspace.visit(self._source, 0, -1)
+        self._frontier = [(0, self._source)]
+
+    def _index(self, x, y):
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        return x * self.height + y
+
+    def _settle(self, target=None):
+        """Expand the frontier until ``target`` is settled (or everything is)."""
+        path_compute = self.path_compute
+        settled = self._settled
+        frontier = self._frontier
+        cost_of = self.workspace.cost
+        visit = self.workspace.visit
+        budget = self.budget_units
+        height = self.height
+        while frontier:
+            if target is not None and settled[target]:
+                return
+            g, current = heapq.heappop(frontier)
+            if settled[current] or g > cost_of(current):
+                continue
+            settled[current] = 1
+            self._order.append(current)
+            cx, cy = divmod(current, height)
+            if current != self._source and path_compute._is_avoidable_hazard(cx, cy):
+                continue
+            for neighbor, move_cost in path_compute._expand(cx, cy, allow_hazards=True):
+                if settled[neighbor]:
+                    continue
+                new_g = g + move_cost
+                if budget is not None and new_g > budget + 1e-9:
+                    continue
+                if new_g < cost_of(neighbor):
+                    visit(neighbor, new_g, current)
+                    heapq.heappush(frontier, (new_g, neighbor))
+
+    def cost(self, x, y):
+        """Cheapest g-cost from the source to ``(x, y)``, or None if unreachable."""
+        index = self._index(x, y)
+        if index is None:
+            return None
+        self._settle(index)
+        if not self._settled[index]:
+            return None
+        return self.workspace.cost(index)
+
+    def reachable(self, x, y):
+        return self.cost(x, y) is not None
+
+    def path_to(self, x, y):
+        """Cheapest path ``[(x, y), ...]`` from the source, or None if unreachable."""
+        if self.cost(x, y) is None:
+            return None
+        return self.workspace.path_to(x * self.height + y)
+
+    def movement_cost(self, x, y):
+        """Feet of movement spent walking ``path_to(x, y)``, or None if unreachable.
+
+        The 0.1 diagonal tie-breaker is taken back out, so this matches the
+        whole-grid costs ``Map.movement_cost`` charges.
+        """
+        cost = self.cost(x, y)
+        if cost is None:
+            return None
+        path = self.workspace.path_to(x * self.height + y)
+        diagonals = sum(1 for (ax, ay), (bx, by) in zip(path, path[1:]) if ax != bx and ay != by)
+        return int(round(cost - 0.1 * diagonals)) * self.path_compute.map.feet_per_grid
+
+    def positions(self):
+        """Every reachable tile (source included), cheapest first."""
+        self._settle()
+        height = self.height
+        return [divmod(index, height) for index in self._order]
+
+
 class PathCompute:
     def __init__(self, battle, map_, entity, ignore_opposing=False):
         self.entity = entity
@@ -73,18 +263,60 @@ class PathCompute:
         self._objects_cache = {}          # (x, y, reveal_concealed) -> list
         self._difficult_cache = {}        # (x, y) -> bool
         self._passable_cache = {}         # (x, y, allow_squeeze, origin_tuple) -> bool
+        # Shared terrain passability of the map (None: ask the map per edge)
+        self._navigation = self._navigation_cache()
+        # occupant -> whether it stops this entity, per query
+        self._creature_blocked = {}
         # Per-query timing stats.
         self._timing_stats = {}
         # Track whether the last compute_path was interrupted by cap/timeout.
         self._last_interrupted = False
+        # ...or proved that no path exists at all (as opposed to within budget).
+        self._last_unreachable = False
    
     def _clear_caches(self):
         """Reset per-query caches."""
         self._objects_cache.clear()
         self._difficult_cache.clear()
         self._passable_cache.clear()
+        self._navigation = self._navigation_cache()
+        self._creature_blocked.clear()
         self._timing_stats.clear()
         self._last_interrupted = False
+        self._last_unreachable = False
+
+    def _navigation_cache(self):
+        navigation = getattr(self.map, 'navigation', None)
+        if navigation is None or self.entity is None or not navigation.usable():
+            return None
+        return navigation
+
+    def _disconnected(self, source, destination, door_navigation=False):
+        """True when the map's component labels prove no walk joins the two tiles."""
+        if self._navigation is None:
+            return False
+        labels = component_labels(self._navigation, self.entity, door_soft=door_navigation)
+        return not labels.connected(self.entity, source, destination)
+
+    def _creature_blocks(self, tile_x, tile_y):
+        """Whether the creature standing on the tile stops this entity (``Map.passable`` rules)."""
+        token = self.map.tokens[tile_x][tile_y]
+        if not token:
+            return False
+        occupant = token['entity']
+        blocks = self._creature_blocked.get(occupant)
+        if blocks is None:
+            entity = self.entity
+            blocks = not (
+                occupant == entity
+                or not self.battle.opposing(occupant, entity)
+                or occupant.incapacitated()
+                or (entity.class_feature('halfling_nimbleness') and
+                    (occupant.size_identifier() - entity.size_identifier()) >= 1)
+                or abs(occupant.size_identifier() - entity.size_identifier()) >= 2
+            )
+            self._creature_blocked[occupant] = blocks
+        return blocks
 
     def _cached_objects_at(self, x, y, reveal_concealed=False):
         """Return cached result of ``map.objects_at`` for the given tile."""
@@ -169,13 +401,6 @@ class PathCompute:
                 )
                 return None
 
-        # Initialize arrays
-        distances = [[MAX_DISTANCE] * self.max_y for _ in range(self.max_x)]  # g-cost
-        parents   = [[None]         * self.max_y for _ in range(self.max_x)]  # store parents to reconstruct path
-
-        # Priority queue items: (f_cost, g_cost, (x, y))
-        pq = []
-
         # Calculate initial cost from accumulated path if provided
         initial_cost = 0
         if accumulated_path:
@@ -207,15 +432,91 @@ class PathCompute:
         # an entity already standing on a chasm can plan a path off of it.
         self._allowed_hazard_tiles = {(source_x, source_y), (destination_x, destination_y)}
 
+        if self._disconnected((source_x, source_y), (destination_x, destination_y), door_navigation):
+            self._last_unreachable = True
+            _path_timing_log(
+                f"compute_path:early_exit entity={entity_name} map={map_name} "
+                f"reason=disconnected dest=({destination_x},{destination_y})"
+            )
+            return None
+
+        # Long unbudgeted queries go through the cluster graph first; a flat
+        # pass that hits the node cap or timeout gets the same second chance.
+        hierarchical = (budget_units is None and not door_navigation and HPA_DISTANCE > 0 and
+                        self._navigation is not None)
+        if hierarchical and max(abs(destination_x - source_x), abs(destination_y - source_y)) >= HPA_DISTANCE:
+            hierarchical = False
+            path = self._hierarchical_path(source_x, source_y, destination_x, destination_y, _t0, _t1)
+            if path is not None:
+                return path
+
+        workspace = acquire_workspace(self.max_x, self.max_y)
+        try:
+            path = self._search(workspace, source_x, source_y, destination_x, destination_y,
+                                available_movement_cost, budget_units, door_navigation, _t0, _t1)
+        finally:
+            release_workspace(workspace)
+        if path is None and hierarchical and self._last_interrupted:
+            path = self._hierarchical_path(source_x, source_y, destination_x, destination_y, _t0, _t1)
+        return path
+
+    def _hierarchical_path(self, source_x, source_y, destination_x, destination_y, _t0, _t1):
+        """Plan over the map's cluster graph, then refine each abstract hop with a short A* pass.
+
+        Returns None when the graph holds no route or a hop cannot be walked
+        under the full movement rules (e.g. a creature blocks an entrance);
+        the caller then falls back to a flat search.
+        """
+        layer = self._navigation.layer(self.entity, False)
+        route = cluster_graph(layer).route(self.entity, False, (source_x, source_y),
+                                           (destination_x, destination_y))
+        if route is None:
+            return None
+        _, waypoints = route
+        interrupted, unreachable = self._last_interrupted, self._last_unreachable
+        path = [waypoints[0]]
+        workspace = acquire_workspace(self.max_x, self.max_y)
+        try:
+            for (from_x, from_y), (to_x, to_y) in zip(waypoints, waypoints[1:]):
+                workspace.reset()
+                hop = self._search(workspace, from_x, from_y, to_x, to_y, None, None, False, _t0, _t1)
+                if hop is None:
+                    _path_timing_log(
+                        f"compute_path:hpa_hop_failed entity={getattr(self.entity, 'name', '?')} "
+                        f"hop=({from_x},{from_y})->({to_x},{to_y})"
+                    )
+                    self._last_interrupted, self._last_unreachable = interrupted, unreachable
+                    return None
+                path.extend(hop[1:])
+        finally:
+            release_workspace(workspace)
+        self._last_interrupted = False
+        return path
+
+    def _search(self, workspace, source_x, source_y, destination_x, destination_y,
+                available_movement_cost, budget_units, door_navigation, _t0, _t1):
+        """A* main loop of ``compute_path`` over a reset ``workspace``."""
+        entity_name = getattr(self.entity, 'name', '?')
+        map_name = getattr(self.map, 'name', '?')
+        height = self.max_y
+        cost_of = workspace.cost
+        visit = workspace.visit
+        source = source_x * height + source_y
+        destination = destination_x * height + destination_y
+
+        # Priority queue items: (f_cost, g_cost, tile index)
+        pq = []
+
         # Initialize start node
-        distances[source_x][source_y] = 0
+        visit(source, 0, -1)
         start_heuristic = self.heuristic(source_x, source_y, destination_x, destination_y)
-        heapq.heappush(pq, (start_heuristic, 0, (source_x, source_y)))
+        heapq.heappush(pq, (start_heuristic, 0, source))
 
         # A* main loop — track stats
         nodes_explored = 0
         neighbors_checked = 0
         pq_pushes = 0
+        current = -1
         _t_astart = time.perf_counter()
         # Use a tighter timeout for door-navigation pass since the entity
         # is already close to the target after the first pass.
@@ -241,17 +542,19 @@ class PathCompute:
                 )
                 break
 
-            current_f, current_g, (cx, cy) = heapq.heappop(pq)
+            current_f, current_g, current = heapq.heappop(pq)
             nodes_explored += 1
 
             # If this is stale data (we already found a better route), skip
-            if current_g > distances[cx][cy]:
+            if current_g > cost_of(current):
                 continue
 
             # Hard prune: do not expand nodes that already exceed movement budget.
             if budget_units is not None and current_g > budget_units + 1e-9:
                 continue
 
+            cx, cy = divmod(current, height)
+
             # Destination-aware prune: even with perfect straight-line travel,
             # this node cannot reach the destination within remaining budget.
             if budget_units is not None:
@@ -260,45 +563,45 @@ class PathCompute:
                     continue
 
             # If we've reached destination, we can stop
-            if (cx, cy) == (destination_x, destination_y):
+            if current == destination:
                 break
 
             # Explore neighbors
-            for (nx, ny), move_cost in self.get_neighbors(cx, cy, door_navigation=door_navigation):
+            for neighbor, move_cost in self._expand(cx, cy, door_navigation):
                 neighbors_checked += 1
                 new_g = current_g + move_cost
 
                 if budget_units is not None and new_g > budget_units + 1e-9:
                     continue
 
+                nx, ny = divmod(neighbor, height)
                 if budget_units is not None:
                     optimistic_remaining = self.heuristic(nx, ny, destination_x, destination_y)
                     if (new_g + optimistic_remaining) > budget_units + 1e-9:
                         continue
 
-                if new_g < distances[nx][ny]:
-                    distances[nx][ny] = new_g
-                    parents[nx][ny] = (cx, cy)
+                if new_g < cost_of(neighbor):
+                    visit(neighbor, new_g, current)
 
                     # f = g + h
                     h = self.heuristic(nx, ny, destination_x, destination_y)
                     f = new_g + h
-                    heapq.heappush(pq, (f, new_g, (nx, ny)))
+                    heapq.heappush(pq, (f, new_g, neighbor))
                     pq_pushes += 1
 
         _t_astart_done = time.perf_counter()
 
         # Determine why we stopped: cap/timeout, unreachable, or found.
-        reached_dest = (cx, cy) == (destination_x, destination_y) if nodes_explored > 0 else False
+        reached_dest = current == destination if nodes_explored > 0 else False
         elapsed = (_t_astart_done - _t0) * 1000
         hit_cap_or_timeout = not reached_dest and (
-            distances[destination_x][destination_y] == MAX_DISTANCE and
+            cost_of(destination) == MAX_DISTANCE and
             (nodes_explored >= MAX_NODES or
              (MAX_MS > 0 and elapsed > MAX_MS))
         )
         
         # If destination is unreachable or we hit a safety cap
-        if distances[destination_x][destination_y] == MAX_DISTANCE:
+        if cost_of(destination) == MAX_DISTANCE:
             if hit_cap_or_timeout:
                 self._last_interrupted = True
                 _path_timing_log(
@@ -308,6 +611,8 @@ class PathCompute:
                     f"total_ms={elapsed:.1f}"
                 )
             else:
+                # an exhausted search without budget is a proof too
+                self._last_unreachable = budget_units is None
                 _path_timing_log(
                     f"compute_path:unreachable entity={entity_name} map={map_name} "
                     f"size={self.max_x}x{self.max_y} explored={nodes_explored} "
@@ -316,18 +621,12 @@ class PathCompute:
                 )
             return None
 
-        # Reconstruct path
-        path = []
-        node = (destination_x, destination_y)
-        while node is not None:
-            path.append(node)
-            node = parents[node[0]][node[1]]
-
-        path.reverse()  # get source -> destination
+        # Reconstruct path (source -> destination)
+        path = workspace.path_to(destination)
 
         # If we have a movement budget, trim
         if available_movement_cost is not None:
-            path = self.trim_path_by_movement(path, distances, available_movement_cost)
+            path = self.trim_path_by_movement(path, workspace, available_movement_cost)
 
         total_elapsed = (time.perf_counter() - _t0) * 1000
         astart_elapsed = (_t_astart_done - _t_astart) * 1000
@@ -398,16 +697,18 @@ class PathCompute:
         if not in_bounds:
             return {dest: None for dest in destinations}
 
-        # Initialize arrays
-        distances = [[MAX_DISTANCE] * self.max_y for _ in range(self.max_x)]  # g-cost
-        parents   = [[None]         * self.max_y for _ in range(self.max_x)]  # store parents to reconstruct path
-
         # Track which destinations we've found paths for
         destinations_set = set(in_bounds)
         found_destinations = set()
 
-        # Priority queue items: (f_cost, g_cost, (x, y))
-        pq = []
+        # Stop once every destination that can be reached at all is found,
+        # instead of flooding the whole component for the others.
+        target_count = len(destinations)
+        if self._navigation is not None:
+            target_count = sum(1 for dest in destinations_set
+                               if not self._disconnected((source_x, source_y), dest, door_navigation))
+            if not target_count:
+                return {dest: None for dest in destinations}
 
         # Calculate initial cost from accumulated path if provided
         initial_cost = 0
@@ -423,39 +724,59 @@ class PathCompute:
         # exceptions (intentional jumps); all other visible chasms are avoided.
         self._allowed_hazard_tiles = {(source_x, source_y)} | set(destinations_set)
 
+        workspace = acquire_workspace(self.max_x, self.max_y)
+        try:
+            return self._search_many(workspace, source_x, source_y, destinations, destinations_set,
+                                     found_destinations, available_movement_cost, door_navigation,
+                                     target_count)
+        finally:
+            release_workspace(workspace)
+
+    def _search_many(self, workspace, source_x, source_y, destinations, destinations_set,
+                     found_destinations, available_movement_cost, door_navigation, target_count):
+        """Search loop of ``compute_paths_to_multiple_destinations`` over a reset ``workspace``."""
+        height = self.max_y
+        cost_of = workspace.cost
+        visit = workspace.visit
+
+        # Priority queue items: (f_cost, g_cost, tile index)
+        pq = []
+
         # Initialize start node
-        distances[source_x][source_y] = 0
+        visit(source_x * height + source_y, 0, -1)
 
         # For multiple destinations, we need a heuristic that considers all destinations
         # We'll use the minimum heuristic to any destination
         min_heuristic = min(self.heuristic(source_x, source_y, dx, dy) for dx, dy in destinations_set)
-        heapq.heappush(pq, (min_heuristic, 0, (source_x, source_y)))
+        heapq.heappush(pq, (min_heuristic, 0, source_x * height + source_y))
 
         # A* main loop
-        while pq and len(found_destinations) < len(destinations):
-            current_f, current_g, (cx, cy) = heapq.heappop(pq)
+        while pq and len(found_destinations) < target_count:
+            current_f, current_g, current = heapq.heappop(pq)
 
             # If this is stale data (we already found a better route), skip
-            if current_g > distances[cx][cy]:
+            if current_g > cost_of(current):
                 continue
 
+            cx, cy = divmod(current, height)
+
             # Check if we've reached a destination
             if (cx, cy) in destinations_set and (cx, cy) not in found_destinations:
                 found_destinations.add((cx, cy))
 
             # Explore neighbors
-            for (nx, ny), move_cost in self.get_neighbors(cx, cy, door_navigation=door_navigation):
+            for neighbor, move_cost in self._expand(cx, cy, door_navigation):
                 new_g = current_g + move_cost
-                if new_g < distances[nx][ny]:
-                    distances[nx][ny] = new_g
-                    parents[nx][ny] = (cx, cy)
+                if new_g < cost_of(neighbor):
+                    visit(neighbor, new_g, current)
 
                     # For multiple destinations, use the minimum heuristic to any remaining destination
                     remaining_destinations = destinations_set - found_destinations
                     if remaining_destinations:
+                        nx, ny = divmod(neighbor, height)
                         min_h = min(self.heuristic(nx, ny, dx, dy) for dx, dy in remaining_destinations)
                         f = new_g + min_h
-                        heapq.heappush(pq, (f, new_g, (nx, ny)))
+                        heapq.heappush(pq, (f, new_g, neighbor))
                     else:
                         # If all destinations have been found, we can stop
                         break
@@ -463,23 +784,18 @@ class PathCompute:
         # Reconstruct paths for all destinations
         result = {dest: None for dest in destinations}
         for dest_x, dest_y in destinations_set:
+            destination = dest_x * height + dest_y
             # If destination is unreachable
-            if distances[dest_x][dest_y] == MAX_DISTANCE:
+            if cost_of(destination) == MAX_DISTANCE:
                 result[(dest_x, dest_y)] = None
                 continue
 
-            # Reconstruct path
-            path = []
-            node = (dest_x, dest_y)
-            while node is not None:
-                path.append(node)
-                node = parents[node[0]][node[1]]
-
-            path.reverse()  # get source -> destination
+            # Reconstruct path (source -> destination)
+            path = workspace.path_to(destination)
 
             # If we have a movement budget, trim
             if available_movement_cost is not None:
-                path = self.trim_path_by_movement(path, distances, available_movement_cost)
+                path = self.trim_path_by_movement(path, workspace, available_movement_cost)
 
             if door_navigation and len(path) > 1:
                 for i in range(1, len(path)):
@@ -502,6 +818,28 @@ class PathCompute:
 
         return result
 
+    def reachability(self, source_x, source_y, available_movement_cost=None):
+        """
+        Dijkstra field from (source_x, source_y) for answering many path queries.
+
+        Args:
+            source_x, source_y: Starting coordinates
+            available_movement_cost: Optional movement budget in feet; tiles
+                costing more are left out of the field.
+
+        Returns:
+            A ``Reachability`` (expanded lazily on first use), or None if the
+            source is off the map.
+        """
+        self._clear_caches()
+        if not (0 <= source_x < self.max_x and 0 <= source_y < self.max_y):
+            return None
+        self._allowed_hazard_tiles = {(source_x, source_y)}
+        budget_units = None
+        if available_movement_cost is not None:
+            budget_units = max(0.0, available_movement_cost / float(self.map.feet_per_grid))
+        return Reachability(self, source_x, source_y, budget_units)
+
     def _is_door_tile(self, x, y) -> bool:
         try:
             objs = self._cached_objects_at(x, y)
@@ -544,6 +882,22 @@ class PathCompute:
     def _cached_passable(self, nx, ny, origin, allow_squeeze):
         """Return cached result of ``map.bidirectionally_passable`` for neighbor checks."""
         origin_tuple = (origin[0], origin[1]) if isinstance(origin, (list, tuple)) else origin
+        navigation = self._navigation
+        if navigation is not None:
+            ox, oy = origin_tuple
+            step = DIR_BITS.get((nx - ox, ny - oy))
+            if step is not None and 0 <= ox < self.max_x and 0 <= oy < self.max_y:
+                layer = navigation.layer(self.entity, allow_squeeze)
+                if not layer.mask(self.entity, allow_squeeze, ox, oy) & step:
+                    return False
+                if self.battle and not self.ignore_opposing:
+                    footprint = layer.footprint
+                    for ofs_x in range(footprint):
+                        for ofs_y in range(footprint):
+                            if self._creature_blocks(nx + ofs_x, ny + ofs_y) or \
+                                    self._creature_blocks(ox + ofs_x, oy + ofs_y):
+                                return False
+                return True
         key = (nx, ny, allow_squeeze, origin_tuple, self.ignore_opposing)
         cached = self._passable_cache.get(key)
         if cached is not None:
@@ -560,7 +914,19 @@ class PathCompute:
         Similar to Dijkstra code, but we don't need separate 'squeeze' vs. normal
         calls; we can decide the cost or if passable inside here.
         """
+        height = self.max_y
+        return [(divmod(neighbor, height), move_cost)
+                for neighbor, move_cost in self._expand(x, y, door_navigation)]
+
+    def _expand(self, x, y, door_navigation=False, allow_hazards=False):
+        """``get_neighbors`` keyed by tile index (``nx * height + ny``) for the search loops.
+
+        ``allow_hazards`` lets every hazard tile through as a neighbor; the
+        caller is then responsible for not expanding past it.
+        """
         neighbors = []
+        height = self.max_y
+        index = x * height + y
 
         def diagonal_clear(dx, dy, allow_squeeze: bool) -> bool:
             """
@@ -582,35 +948,33 @@ class PathCompute:
                     adj2_ok = True
             return adj1_ok or adj2_ok
 
-        for dx in (-1, 0, 1):
-            for dy in (-1, 0, 1):
-                if dx == 0 and dy == 0:
-                    continue
-                nx = x + dx
-                ny = y + dy
-                if not (0 <= nx < self.max_x and 0 <= ny < self.max_y):
-                    continue
+        for dx, dy in _NEIGHBOR_OFFSETS:
+            nx = x + dx
+            ny = y + dy
+            if not (0 <= nx < self.max_x and 0 <= ny < height):
+                continue
 
-                # Avoid stepping into known hazards (e.g. visible chasms)
-                # unless the caller marked this tile as an intentional target.
-                if self._is_avoidable_hazard(nx, ny) and (nx, ny) not in self._allowed_hazard_tiles:
-                    continue
+            # Avoid stepping into known hazards (e.g. visible chasms)
+            # unless the caller marked this tile as an intentional target.
+            if not allow_hazards and self._is_avoidable_hazard(nx, ny) and \
+                    (nx, ny) not in self._allowed_hazard_tiles:
+                continue
 
-                # Try normal passable
-                if diagonal_clear(dx, dy, allow_squeeze=False) and \
-                   (self._cached_passable(nx, ny, (x, y), False) or
-                    (door_navigation and self._is_door_tile(nx, ny))):
-                    move_cost = self.base_move_cost(nx, ny, src=(x, y))
-                    neighbors.append(((nx, ny), move_cost))
-                # Otherwise, if not normal passable, check if passable with squeeze
-                elif diagonal_clear(dx, dy, allow_squeeze=True) and \
-                     (self._cached_passable(nx, ny, (x, y), True) or
-                      (door_navigation and self._is_door_tile(nx, ny))):
-                    # e.g., let's define squeeze cost = 2
-                    move_cost = self.base_move_cost(nx, ny, src = (x, y)) + 1
-                    if self.entity.prone():
-                        move_cost += 1
-                    neighbors.append(((nx, ny), move_cost))
+            # Try normal passable
+            if diagonal_clear(dx, dy, allow_squeeze=False) and \
+               (self._cached_passable(nx, ny, (x, y), False) or
+                (door_navigation and self._is_door_tile(nx, ny))):
+                move_cost = self.base_move_cost(nx, ny, src=(x, y))
+                neighbors.append((index + dx * height + dy, move_cost))
+            # Otherwise, if not normal passable, check if passable with squeeze
+            elif diagonal_clear(dx, dy, allow_squeeze=True) and \
+                 (self._cached_passable(nx, ny, (x, y), True) or
+                  (door_navigation and self._is_door_tile(nx, ny))):
+                # e.g., let's define squeeze cost = 2
+                move_cost = self.base_move_cost(nx, ny, src = (x, y)) + 1
+                if self.entity.prone():
+                    move_cost += 1
+                neighbors.append((index + dx * height + dy, move_cost))
 
         return neighbors
 
@@ -639,14 +1003,15 @@ class PathCompute:
         # Euclidean distance
         return math.sqrt((cx - dx)**2 + (cy - dy)**2)
 
-    def trim_path_by_movement(self, path, distances, available_movement_cost):
+    def trim_path_by_movement(self, path, workspace, available_movement_cost):
         """
         After building the path, remove nodes beyond a certain movement cost (in feet).
+        ``workspace`` is the ``SearchWorkspace`` the path was searched in.
         """
         trimmed = []
         for (px, py) in path:
             # Convert grid cost to feet
-            g_cost_in_feet = distances[px][py] * self.map.feet_per_grid
+            g_cost_in_feet = workspace.cost(px * workspace.height + py) * self.map.feet_per_grid
             if g_cost_in_feet <= available_movement_cost:
                 trimmed.append((px, py))
             else:
@@ -734,10 +1099,27 @@ class PathCompute:
         pq = []
         seq = 0
 
-        def push(state, cost, parent, path, tport, cur_map):
+        def push(state, cost, parent, path, tport, cur_map, pending=None):
             nonlocal seq
             seq += 1
-            heapq.heappush(pq, (cost, seq, state, parent, path, tport, cur_map))
+            heapq.heappush(pq, (cost, seq, state, parent, path, tport, cur_map, pending))
+
+        def push_walk(state, cost, parent, cur_map, sx, sy, tx, ty, tport):
+            """Push the walk to a portal tile: priced from the cluster graph and
+            only searched tile by tile once popped, or searched now when the
+            map has no cluster graph. Returns False if the walk is impossible."""
+            if (sx, sy) == (tx, ty):
+                push(state, cost + 1, parent, [(sx, sy)], tport, cur_map)
+                return True
+            estimate = self._abstract_cost_on(cur_map, sx, sy, tx, ty)
+            if estimate is not None:
+                push(state, cost + estimate + 1, parent, None, tport, cur_map, pending=(cost, sx, sy, tx, ty))
+                return True
+            seg = self._compute_path_on(cur_map, sx, sy, tx, ty, door_navigation=door_navigation)
+            if seg is None:
+                return False
+            push(state, cost + len(seg), parent, seg, tport, cur_map)
+            return True
 
         start_state = (id(source_map), source_x, source_y)
         push(start_state, 0.0, None, None, None, source_map)
@@ -760,9 +1142,21 @@ class PathCompute:
 
         while pq and pops < max_pops:
             pops += 1
-            cost, _, state, parent, seg_path, tport_in, seg_map = heapq.heappop(pq)
+            cost, _, state, parent, seg_path, tport_in, seg_map, pending = heapq.heappop(pq)
             if state in visited:
                 continue
+            if pending is not None:
+                # Abstract edge: walk it for real, and queue it again if it
+                # turns out dearer than the cluster graph estimated.
+                base_cost, sx, sy, tx, ty = pending
+                seg_path = self._compute_path_on(seg_map, sx, sy, tx, ty, door_navigation=door_navigation)
+                if seg_path is None:
+                    continue
+                walked = base_cost + len(seg_path)
+                if walked > cost + 1e-9:
+                    push(state, walked, parent, seg_path, tport_in, seg_map)
+                    continue
+                cost = walked
             visited.add(state)
             if parent is not None:
                 parents[state] = (parent, seg_path, tport_in, seg_map)
@@ -790,31 +1184,19 @@ class PathCompute:
                         continue
                     maps_by_id.setdefault(id(next_map), next_map)
                     if (x, y) == (nx, ny):
-                        seg = [(x, y)]
-                    else:
-                        seg = self._compute_path_on(current_map, x, y, nx, ny,
-                                                    door_navigation=door_navigation)
-                        if seg is None:
-                            continue
-                        nxt_state = (id(next_map), int(nx), int(ny))
-                        if nxt_state in visited:
-                            continue
-                        # Infinite loop detection: skip pushes that exceed the threshold.
-                        cnt = push_counts.get(nxt_state, 0) + 1
-                        push_counts[nxt_state] = cnt
-                        if cnt > max_pushes_per_state:
-                            continue
-                        push(nxt_state, cost + len(seg), state, seg, None, current_map)
+                        continue
+                    nxt_state = (id(next_map), int(nx), int(ny))
+                    if nxt_state in visited:
+                        continue
+                    # Infinite loop detection: skip pushes that exceed the threshold.
+                    cnt = push_counts.get(nxt_state, 0) + 1
+                    push_counts[nxt_state] = cnt
+                    if cnt > max_pushes_per_state:
+                        continue
+                    push_walk(nxt_state, cost, state, current_map, x, y, nx, ny, None)
     
             # Expand via teleporters independently of map-stack support.
             for tport, tx, ty in self._iter_teleporters_on(current_map):
-                if (x, y) == (tx, ty):
-                    seg = [(x, y)]
-                else:
-                    seg = self._compute_path_on(current_map, x, y, tx, ty,
-                                                door_navigation=door_navigation)
-                    if seg is None:
-                        continue
                 next_map = current_map.linked_maps.get(tport.target_map)
                 if next_map is None:
                         continue
@@ -832,10 +1214,27 @@ class PathCompute:
                 if cnt > max_pushes_per_state:
                     continue
                 # Cost = current segment length (in tiles); teleport hop free.
-                push(nxt_state, cost + len(seg), state, seg, tport, current_map)
+                push_walk(nxt_state, cost, state, current_map, x, y, tx, ty, tport)
 
         return None
 
+    def _abstract_cost_on(self, map_, sx, sy, tx, ty):
+        """Cluster-graph cost (in tiles) of walking ``(sx, sy) -> (tx, ty)`` on
+        ``map_``, or ``None`` when the map has no usable graph or the graph
+        holds no route (the caller then searches the tiles directly)."""
+        helper = PathCompute(self.battle, map_, self.entity,
+                             ignore_opposing=self.ignore_opposing)
+        if helper._navigation is None or HPA_DISTANCE <= 0:
+            return None
+        if not (0 <= sx < helper.max_x and 0 <= sy < helper.max_y and
+                0 <= tx < helper.max_x and 0 <= ty < helper.max_y):
+            return None
+        layer = helper._navigation.layer(self.entity, False)
+        route = cluster_graph(layer).route(self.entity, False, (sx, sy), (tx, ty))
+        if route is None:
+            return None
+        return route[0]
+
     def _compute_path_on(self, map_, sx, sy, tx, ty, door_navigation=False):
         """Compute a single-map path on ``map_`` while preserving the
         configured ``ignore_opposing`` and entity context. Returns the raw
@@ -6,14 +6,10 @@ import heapq
 import math
 from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from natural20.ai.path_compute import MAX_DISTANCE, PathCompute
-
-# Outgoing edge order: same nested loops as PathCompute.get_neighbors
-DIR_OFFSETS: Tuple[Tuple[int, int], ...] = (
-    (-1, -1), (-1, 0), (-1, 1),
-    (0, -1), (0, 1),
-    (1, -1), (1, 0), (1, 1),
-)
+from natural20.ai.path_compute import MAX_DISTANCE, PathCompute, acquire_workspace, release_workspace
+# Outgoing edge order: same nested loops as PathCompute.get_neighbors. The
+# server-side NavigationCache stores its passability masks with the same bits.
+from natural20.utils.navigation_cache import DIR_OFFSETS
 
 
 def _dir_index(dx: int, dy: int) -> Optional[int]:
@@ -258,9 +254,7 @@ class SnapshotPathCompute:
         destination_x = max(0, min(destination_x, self.width - 1))
         destination_y = max(0, min(destination_y, self.height - 1))
 
-        distances = [[MAX_DISTANCE] * self.height for _ in range(self.width)]
-        parents = [[None] * self.height for _ in range(self.width)]
-        pq: List[Tuple[float, float, Tuple[int, int]]] = []
+        pq: List[Tuple[float, float, int]] = []
 
         initial_cost = 0.0
         if accumulated_path:
@@ -271,44 +265,50 @@ class SnapshotPathCompute:
             available_movement_cost -= initial_cost
 
         self._allowed_hazard = {(source_x, source_y), (destination_x, destination_y)}
-        distances[source_x][source_y] = 0
-        heapq.heappush(
-            pq,
-            (self._heuristic(source_x, source_y, destination_x, destination_y), 0.0, (source_x, source_y)),
-        )
-
-        while pq:
-            _f, current_g, (cx, cy) = heapq.heappop(pq)
-            if current_g > distances[cx][cy]:
-                continue
-            if (cx, cy) == (destination_x, destination_y):
-                break
-            for (nx, ny), move_cost in self._get_neighbors(cx, cy, door_navigation=door_navigation):
-                new_g = current_g + move_cost
-                if new_g < distances[nx][ny]:
-                    distances[nx][ny] = new_g
-                    parents[nx][ny] = (cx, cy)
-                    h = self._heuristic(nx, ny, destination_x, destination_y)
-                    heapq.heappush(pq, (new_g + h, new_g, (nx, ny)))
-
-        if distances[destination_x][destination_y] == MAX_DISTANCE:
-            return None
-
-        path: List[Tuple[int, int]] = []
-        node: Optional[Tuple[int, int]] = (destination_x, destination_y)
-        while node is not None:
-            path.append(node)
-            node = parents[node[0]][node[1]]
-        path.reverse()
-
-        if available_movement_cost is not None:
-            trimmed: List[Tuple[int, int]] = []
-            for px, py in path:
-                if distances[px][py] * self.feet_per_grid <= available_movement_cost:
-                    trimmed.append((px, py))
-                else:
+        # Same tile indexing as PathCompute (x * height + y) so ties break identically.
+        height = self.height
+        destination = destination_x * height + destination_y
+        workspace = acquire_workspace(self.width, self.height)
+        try:
+            cost_of = workspace.cost
+            visit = workspace.visit
+            visit(source_x * height + source_y, 0, -1)
+            heapq.heappush(
+                pq,
+                (self._heuristic(source_x, source_y, destination_x, destination_y), 0.0,
+                 source_x * height + source_y),
+            )
+
+            while pq:
+                _f, current_g, current = heapq.heappop(pq)
+                if current_g > cost_of(current):
+                    continue
+                if current == destination:
                     break
-            path = trimmed
+                cx, cy = divmod(current, height)
+                for (nx, ny), move_cost in self._get_neighbors(cx, cy, door_navigation=door_navigation):
+                    new_g = current_g + move_cost
+                    neighbor = nx * height + ny
+                    if new_g < cost_of(neighbor):
+                        visit(neighbor, new_g, current)
+                        h = self._heuristic(nx, ny, destination_x, destination_y)
+                        heapq.heappush(pq, (new_g + h, new_g, neighbor))
+
+            if cost_of(destination) == MAX_DISTANCE:
+                return None
+
+            path: List[Tuple[int, int]] = workspace.path_to(destination)
+
+            if available_movement_cost is not None:
+                trimmed: List[Tuple[int, int]] = []
+                for px, py in path:
+                    if cost_of(px * height + py) * self.feet_per_grid <= available_movement_cost:
+                        trimmed.append((px, py))
+                    else:
+                        break
+                path = trimmed
+        finally:
+            release_workspace(workspace)
 
         if door_navigation and len(path) > 1:
             for i in range(1, len(path)):
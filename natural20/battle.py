@@ -12,6 +12,7 @@ from natural20.die_roll import DieRoll, Rollable
 from natural20.spell.effects.stench_effect import StenchEffect
 import pdb
 from natural20.uid_containers import EntitiesUIDMap
+from natural20.utils.visibility_matrix import VisibilityMatrix
 
 
 def build_opposing_groups(session):
@@ -326,7 +327,7 @@ def action_animator(action, battle=None):
         }
 
 class Battle():
-    def __init__(self, session: Session, maps: Map, standard_controller=None, animation_log_enabled=False):
+    def __init__(self, session: Session, maps: Map, standard_controller=None, animation_log_enabled=False, rng_key=None):
         if isinstance(maps, list):
             self.maps = maps
         elif isinstance(maps, dict):
@@ -337,6 +338,21 @@ class Battle():
             self.maps = None
 
         self.session = session
+        # Seeded dice stream of this battle (None: rolls use the global random);
+        # each combatant rolls from its own child stream, see rng_for. A
+        # restored battle (rng_key) reattaches its stream without spawning one.
+        session_rng = getattr(session, 'rng', None)
+        if session_rng is None:
+            self.rng = None
+        elif rng_key:
+            self.rng = session_rng.child(rng_key)
+        else:
+            self.rng = session_rng.spawn('battle')
+        # Creature-to-creature sight answers shared by every caller of
+        # Map.can_see on this battle's maps; dropped each turn and commit.
+        self.visibility_matrix = VisibilityMatrix(self)
+        for battle_map in self.maps or []:
+            battle_map.visibility_matrix = self.visibility_matrix
         self._ensure_stack_maps()
 
         self.combat_order = []
@@ -438,6 +454,9 @@ class Battle():
             'controller': controller,
             'help_with': {}
         }
+        if self.rng is not None:
+            # keyed by join order, so a seeded battle replays with fresh entity uids
+            state['rng_key'] = self.rng.spawn('entity').key
 
         self.entities[entity] = state
         # Ensure entity is registered for UID-based operations
@@ -518,7 +537,25 @@ class Battle():
                                            "players" : self.entities })
 
     def roll_for(self, entity, die_type, number_of_times, description, advantage=False, disadvantage=False, controller=None):
-        return DieRoll.roll_for(die_type, number_of_times, advantage, disadvantage)
+        return DieRoll.roll_for(die_type, number_of_times, advantage, disadvantage, stream=self.rng_for(entity))
+
+    def rng_for(self, entity):
+        """The dice stream ``entity`` rolls from in this battle (None when the battle is unseeded)."""
+        if self.rng is None:
+            return None
+        state = self.entities.get(entity) if entity is not None else None
+        key = state.get('rng_key') if state else None
+        return self.rng.child(key) if key else self.rng
+
+    def snapshot(self):
+        """In-memory snapshot of the battle, its maps, creatures and dice (see natural20.battle_snapshot)."""
+        from natural20.battle_snapshot import BattleSnapshot
+        return BattleSnapshot.capture(self)
+
+    def fork(self):
+        """Context manager for what-if play: everything changed inside the block is rewound on exit."""
+        from natural20.battle_snapshot import fork
+        return fork(self)
 
     def controller_for(self, entity):
         if entity not in self.entities:
@@ -697,6 +734,7 @@ class Battle():
         return self.map_for(entity).entity_or_object_pos(entity)
 
     def start_turn(self):
+        self.visibility_matrix.invalidate()
         entity = self.current_turn()
         entity_pos = self.entity_or_object_pos(entity)
 
@@ -719,6 +757,7 @@ class Battle():
     def end_turn(self):
         self.current_turn().resolve_trigger('end_of_turn', {'battle': self})
         self.trigger_event('end_of_turn', self,  { "target" : self.current_turn()})
+        self.visibility_matrix.invalidate()
 
         # reset legendary actions
         self.eval_legendary_action()
@@ -886,6 +925,7 @@ class Battle():
     def register_map(self, map):
         if map not in self.maps:
             self.maps.append(map)
+        map.visibility_matrix = self.visibility_matrix
 
     def _ensure_stack_maps(self):
         if not self.maps or not self.session:
@@ -907,6 +947,8 @@ class Battle():
             for entity in map.entities.keys():
                 self.remove(entity, from_map=False)
             self.maps.remove(map)
+            if map.visibility_matrix is self.visibility_matrix:
+                map.visibility_matrix = None
 
     def entity_state_for(self, entity):
         entity_state = self.entities.get(entity, None)
@@ -965,9 +1007,15 @@ class Battle():
 
     def enemy_in_melee_range(self, source, exclude=None, source_pos=None):
         map_for_source = self.map_for(source)
-        objects_around_me = map_for_source.look(source)
         exclude = exclude or []
-        for object in objects_around_me:
+        if map_for_source.feet_per_grid <= 0:
+            return False
+        opponents = [k for k in self.entities if k not in exclude and self.opposing(source, k)]
+        reach = self._max_melee_distance(opponents)
+        if reach is None:
+            return False
+        # range first, so only the opponents close enough pay for line of sight
+        for object in map_for_source.entities_near(source, reach, entity_pos=source_pos):
             if object in exclude:
                 continue
 
@@ -978,14 +1026,24 @@ class Battle():
                 continue
 
             melee_distance = object.melee_distance() if hasattr(object, 'melee_distance') else None
-            if melee_distance is None or melee_distance <= 0 or map_for_source.feet_per_grid <= 0:
+            if melee_distance is None or melee_distance <= 0:
                 continue
 
-            if self.opposing(source, object) and (map_for_source.distance(source, object, entity_1_pos=source_pos) <= (melee_distance / map_for_source.feet_per_grid)):
+            if not self.opposing(source, object):
+                continue
+            if map_for_source.distance(source, object, entity_1_pos=source_pos) > (melee_distance / map_for_source.feet_per_grid):
+                continue
+            if map_for_source.can_see(source, object):
                 return True
 
         return False
 
+    @staticmethod
+    def _max_melee_distance(entities):
+        """Longest melee reach in feet among ``entities`` (None when none can melee)."""
+        reaches = [reach for reach in (k.melee_distance() for k in entities if hasattr(k, 'melee_distance')) if reach]
+        return max(reaches) if reaches else None
+
     def action(self, action):
         opts = {
             'battle': self
@@ -1016,20 +1074,31 @@ class Battle():
             return
 
         action.committed = True
+        # log output and sinks see this action's events once it is fully applied
+        batch = getattr(self.session.event_manager, 'batch', None) if self.session else None
+        if batch is None:
+            return self._commit_results(action)
+        with batch():
+            return self._commit_results(action)
+
+    def _commit_results(self, action):
         # check_action_serialization(action)
         other_results = []
         index = 0
-        # Use cached subclass list to avoid repeated runtime introspection.
-        from natural20.action import get_action_subclasses
-        _action_subclasses = get_action_subclasses()
+        # Only the Action subclasses declaring the result's type see it
+        # (see Action.RESULT_TYPES); N20_RESULT_TIMING=1 profiles them.
+        from natural20.action import apply_result, count_result, get_result_handlers
         while index < len(action.result):
             item = action.result[index]
-            for klass in _action_subclasses:
-                other_results = klass.apply(self, item, self.session)
+            count_result(item.get('type'))
+            for klass in get_result_handlers(item.get('type')):
+                other_results = apply_result(klass, self, item, self.session)
                 if isinstance(other_results, list):
                     for result in other_results:
                         if result not in action.result:
                             action.result.append(result)
+            # results apply conditions and effects that change who sees whom
+            self.visibility_matrix.invalidate()
             if self.animation_log_enabled:
                 if item.get('perception_targets'):
                     perception_targets = item['perception_targets']
@@ -1783,6 +1852,11 @@ class Battle():
         if attack_range is None:
             raise Exception('attack range cannot be None')
 
+        caster_map = self.map_for(entity)
+        # range is checked before line of sight: on the caster's map only the
+        # tokens the spatial index finds in range are candidates
+        in_range = set(caster_map.entities_near(entity, attack_range, include_self=True)) if caster_map is not None else set()
+
         targets = []
         for k, prop in self.entities.items():
             if not k.allow_targeting():
@@ -1797,22 +1871,25 @@ class Battle():
                 continue
             if k.hp() is None:
                 continue
-            if 'ignore_los' not in target_types and not entity==k and not self.can_see(entity, k, active_perception=active_perception):
-                continue
             target_map = self.map_for(k)
-            caster_map = self.map_for(entity)
             if target_map is None or caster_map is None:
                 continue
-            stack = getattr(caster_map, 'map_stack', None)
-            if stack is not None and target_map is not caster_map:
-                from natural20.map_stack_targeting import stack_entity_distance_ft
-                distance_ft = stack_entity_distance_ft(
-                    stack, entity, caster_map, k, target_map,
-                    feet_per_grid=caster_map.feet_per_grid,
-                )
+            if target_map is caster_map:
+                if k not in in_range:
+                    continue
             else:
-                distance_ft = target_map.distance(k, entity) * target_map.feet_per_grid
-            if distance_ft > attack_range:
+                stack = getattr(caster_map, 'map_stack', None)
+                if stack is None:
+                    distance_ft = target_map.distance(k, entity) * target_map.feet_per_grid
+                else:
+                    from natural20.map_stack_targeting import stack_entity_distance_ft
+                    distance_ft = stack_entity_distance_ft(
+                        stack, entity, caster_map, k, target_map,
+                        feet_per_grid=caster_map.feet_per_grid,
+                    )
+                if distance_ft > attack_range:
+                    continue
+            if 'ignore_los' not in target_types and not entity==k and not self.can_see(entity, k, active_perception=active_perception):
                 continue
             if filter and not k.eval_if(filter):
                 continue
@@ -1844,12 +1921,19 @@ class Battle():
         # @return [Boolean]
     def ally_within_enemy_melee_range(self, source, target, exclude=None, source_pos=None):
         _map = self.map_for(source)
-        objects_around_me = _map.look(target)
 
         if exclude is None:
             exclude = []
 
-        for object, _ in objects_around_me.items():
+        if _map.feet_per_grid <= 0:
+            return False
+        allies = [k for k in self.entities if k not in exclude and k != source and self.allies(source, k)]
+        reach = self._max_melee_distance(allies)
+        if reach is None:
+            return False
+
+        # range first, so only the allies close enough pay for line of sight
+        for object in _map.entities_near(target, reach, entity_pos=source_pos):
             if object in exclude:
                 continue
             if object == source:
@@ -1864,10 +1948,14 @@ class Battle():
                 continue
 
             melee_distance = object.melee_distance() if hasattr(object, 'melee_distance') else None
-            if melee_distance is None or melee_distance <= 0 or _map.feet_per_grid <= 0:
+            if melee_distance is None or melee_distance <= 0:
                 continue
 
-            if self.allies(source, object) and (_map.distance(target, object, entity_1_pos=source_pos) <= (melee_distance / _map.feet_per_grid)):
+            if not self.allies(source, object):
+                continue
+            if _map.distance(target, object, entity_1_pos=source_pos) > (melee_distance / _map.feet_per_grid):
+                continue
+            if _map.can_see(target, object):
                 return True
 
         return False
@@ -1931,10 +2019,12 @@ class Battle():
                 uid: state.to_dict() if hasattr(state, 'to_dict') else dict(state)
                 for uid, state in (self.readied_actions or {}).items()
             },
+            # the stream itself is saved with the session's (Session.to_dict)
+            'rng_key': self.rng.key if self.rng is not None else None,
         }
 
     def from_dict(data):
-        battle = Battle(data['session'], data['maps'])
+        battle = Battle(data['session'], data['maps'], rng_key=data.get('rng_key'))
         # Restore combat order (prefer UID-based if present)
         combat_order_uid = data.get('combat_order_uid')
         if combat_order_uid:
@@ -0,0 +1,281 @@
+"""In-memory battle snapshots.
+
+``BattleSnapshot.capture(battle)`` records everything a round of combat can
+change: the battle's own bookkeeping (turn order, per-combatant action
+budgets, zones, readied actions, logs), the token/object grids and
+placement tables of its maps, the instance state of every creature and
+map object (hit points, conditions, effects, resources, inventory, death
+saves, ...), the game clock and the dice streams (``Session.rng`` and the
+battle's ``RngStream`` trees plus the global ``random`` state).
+``restore()`` writes that state back into the same live objects, so
+controllers, maps and caches keep their references::
+
+    snapshot = battle.snapshot()
+    battle.action(candidate)
+    battle.commit(candidate)
+    score = evaluate(battle)
+    snapshot.restore()
+
+    with battle.fork():
+        ...  # what-if play; everything is rewound on exit
+
+State is copied structurally: dicts, lists, sets, tuples, NumPy arrays,
+``EffectStore`` and the UID grids/maps are copied level by level, anything
+else (entities, sessions, controllers, items) is kept by reference.
+``CopyOnWriteDict``/``CopyOnWriteList`` containers (map objects keep their
+properties, attributes and statuses in them) are not copied at all: the
+snapshot and the live object share the underlying data and the live side
+detaches on its next write. Restoring hands out the same kind of shared
+views, so one snapshot can be restored any number of times.
+
+Both directions skip what did not change: ``restore`` leaves objects whose
+state still equals the snapshot alone (and only re-derives the terrain of
+map objects that changed or moved), and ``capture`` reuses the states of
+the battle's previous snapshot for objects that have not changed since.
+A map full of walls and floor tiles therefore costs a dict comparison per
+object rather than a copy.
+
+Creatures and objects created after the snapshot (summons, dropped items)
+disappear from the battle and maps on restore; they stay in the session
+registry like any other removed entity.
+"""
+import random
+import weakref
+from contextlib import contextmanager
+
+import numpy as np
+
+from natural20.uid_containers import EntitiesUIDMap, ObjectsGrid, TokensGrid
+from natural20.utils.cow import CopyOnWriteDict, CopyOnWriteList
+from natural20.utils.effect_store import EffectStore
+from natural20.utils.rng_stream import RngStream
+
+# Battle attributes that are wiring rather than state
+_BATTLE_SKIP = frozenset(['maps', 'session', 'event_manager', 'visibility_matrix', 'standard_controller', 'rng'])
+
+# Map attributes a battle changes (the rest is terrain, lighting and caches)
+_MAP_STATE = ('entities', 'interactable_objects', 'tokens', 'objects', 'unaware_npcs', 'area_triggers',
+              '_triggered_area_narrations', '_shared_ground_inventory', '_shared_water_inventory',
+              'environment_zones')
+
+# battle -> object states of its latest snapshot; states are never written
+# to, so objects that have not changed since share theirs
+_last_states = weakref.WeakKeyDictionary()
+
+
+def _copy_dict(value):
+    copied = dict(value)
+    get = _COPIERS.get
+    for key, item in copied.items():
+        copier = get(type(item))
+        if copier is not None:
+            copied[key] = copier(item)
+    return copied
+
+
+def _copy_list(value):
+    copied = list(value)
+    get = _COPIERS.get
+    for index, item in enumerate(copied):
+        copier = get(type(item))
+        if copier is not None:
+            copied[index] = copier(item)
+    return copied
+
+
+def _copy_tuple(value):
+    return tuple(_copy_list(value))
+
+
+def _shared(value):
+    return value
+
+
+def _copy_cow(value):
+    # share the data; whoever writes first detaches
+    value._shared = True
+    return type(value)(value.data)
+
+
+def _copy_effects(value):
+    # the expiry index is rebuilt on the next query
+    return EffectStore(_copy_dict(value))
+
+
+def _copy_uid_map(value):
+    copied = EntitiesUIDMap.__new__(EntitiesUIDMap)
+    copied._session = value._session
+    copied._uid_to_value = _copy_dict(value._uid_to_value)
+    return copied
+
+
+def _copy_grid(value):
+    copied = type(value).__new__(type(value))
+    copied._session, copied._w, copied._h = value._session, value._w, value._h
+    copied._grid = _copy_list(value._grid)
+    return copied
+
+
+_COPIERS = {
+    dict: _copy_dict,
+    list: _copy_list,
+    tuple: _copy_tuple,
+    set: set,
+    CopyOnWriteDict: _copy_cow,
+    CopyOnWriteList: _copy_cow,
+    EffectStore: _copy_effects,
+    EntitiesUIDMap: _copy_uid_map,
+    ObjectsGrid: _copy_grid,
+    TokensGrid: _copy_grid,
+    np.ndarray: np.copy,
+}
+
+
+def copy_state(value):
+    """Structural copy of ``value`` (see the module docstring)."""
+    copier = _COPIERS.get(type(value))
+    return copier(value) if copier is not None else value
+
+
+def _same(live, saved):
+    """Whether live state still equals its snapshot (unknown counts as changed)."""
+    try:
+        return bool(live == saved)
+    except Exception:  # NumPy arrays and other values without a plain truth value
+        return False
+
+
+def _rng_states(stream, states):
+    """Append ``(stream, state)`` for ``stream`` and all of its children."""
+    if stream is None or not isinstance(stream, RngStream):
+        return states
+    states.append((stream, stream.random.getstate(), dict(stream.fudges), dict(stream._spawned),
+                   dict(stream.children)))
+    for child in stream.children.values():
+        _rng_states(child, states)
+    return states
+
+
+class BattleSnapshot:
+    __slots__ = ('battle', 'battle_state', 'map_states', 'object_states', 'rng_states', 'random_state',
+                 'game_time')
+
+    def __init__(self, battle, battle_state, map_states, object_states, rng_states, random_state, game_time):
+        self.battle = battle
+        self.battle_state = battle_state
+        self.map_states = map_states          # [(map, {attribute: state})]
+        self.object_states = object_states    # {id: (object, vars state)}
+        self.rng_states = rng_states
+        self.random_state = random_state
+        self.game_time = game_time
+
+    def __repr__(self):
+        return f"BattleSnapshot(objects={len(self.object_states)}, maps={len(self.map_states)})"
+
+    @staticmethod
+    def _tracked_objects(battle):
+        tracked = {}
+        for entity in battle.entities:
+            tracked[id(entity)] = entity
+        for battle_map in battle.maps or []:
+            for entity in battle_map.entities:
+                tracked[id(entity)] = entity
+            for obj in battle_map.interactable_objects:
+                tracked[id(obj)] = obj
+        return tracked
+
+    @classmethod
+    def capture(cls, battle):
+        battle_state = _copy_dict({key: value for key, value in vars(battle).items() if key not in _BATTLE_SKIP})
+        map_states = [(battle_map, {key: copy_state(getattr(battle_map, key)) for key in _MAP_STATE
+                                    if hasattr(battle_map, key)})
+                      for battle_map in battle.maps or []]
+        previous = _last_states.get(battle, {})
+        object_states = {}
+        for key, obj in cls._tracked_objects(battle).items():
+            state = previous.get(key)
+            if state is None or state[0] is not obj or not _same(vars(obj), state[1]):
+                state = (obj, _copy_dict(vars(obj)))
+            object_states[key] = state
+        _last_states[battle] = object_states
+        session = battle.session
+        rng_states = _rng_states(getattr(session, 'rng', None), [])
+        if battle.rng is not None and not any(state[0] is battle.rng for state in rng_states):
+            _rng_states(battle.rng, rng_states)
+        return cls(battle, battle_state, map_states, object_states, rng_states, random.getstate(),
+                   session.game_time)
+
+    @staticmethod
+    def _restore_object(obj, state):
+        """Write ``state`` back into ``obj``; report whether anything differed."""
+        current = vars(obj)
+        if _same(current, state):
+            return False
+        for name in [name for name in current if name not in state]:
+            del current[name]
+        current.update(_copy_dict(state))
+        return True
+
+    def restore(self):
+        """Rewind the battle, its maps, creatures, objects, clock and dice to this snapshot."""
+        battle = self.battle
+        battle_vars = vars(battle)
+        for name in [name for name in battle_vars if name not in self.battle_state and name not in _BATTLE_SKIP]:
+            del battle_vars[name]
+        for name, value in self.battle_state.items():
+            battle_vars[name] = copy_state(value)
+
+        placed_before = [(battle_map, dict(battle_map.entities.items()), dict(battle_map.interactable_objects.items()))
+                         for battle_map, _ in self.map_states]
+        changed_objects = {key for key, (obj, state) in self.object_states.items()
+                           if self._restore_object(obj, state)}
+
+        for (battle_map, state), (_, entities_before, objects_before) in zip(self.map_states, placed_before):
+            for name, value in state.items():
+                setattr(battle_map, name, copy_state(value))
+            objects_after = dict(battle_map.interactable_objects.items())
+            stale = [(obj, position) for obj, position in objects_before.items()
+                     if id(obj) in changed_objects or objects_after.get(obj) != position]
+            stale += [(obj, position) for obj, position in objects_after.items()
+                      if id(obj) in changed_objects or objects_before.get(obj) != position]
+            for obj, (pos_x, pos_y) in stale:
+                # doors, walls, dropped items and bodies: re-derive the tiles they cover
+                for tile_x, tile_y in battle_map._object_footprint(obj, pos_x, pos_y):
+                    if 0 <= tile_x < battle_map.size[0] and 0 <= tile_y < battle_map.size[1]:
+                        battle_map.refresh_terrain_at(tile_x, tile_y)
+            if stale or dict(battle_map.entities.items()) != entities_before:
+                # creatures may carry light; the spatial index is rebuilt on demand
+                battle_map._spatial_index = None
+                battle_map._light_builder.invalidate()
+            battle_map.sight_epoch += 1
+
+        for stream, state, fudges, spawned, children in self.rng_states:
+            stream.random.setstate(state)
+            stream.fudges = dict(fudges)
+            stream._spawned = dict(spawned)
+            stream.children = dict(children)
+        random.setstate(self.random_state)
+        battle.session.game_time = self.game_time
+        battle.visibility_matrix.invalidate()
+        # light sources changed in place (a torch equipped or doused) move nothing
+        battle.session.invalidate_lighting()
+        return battle
+
+    @contextmanager
+    def fork(self):
+        """Restore this snapshot, run the block, then rewind to the snapshot again."""
+        self.restore()
+        try:
+            yield self.battle
+        finally:
+            self.restore()
+
+
+@contextmanager
+def fork(battle):
+    """Run a what-if block on ``battle`` and rewind everything it changed on exit."""
+    snapshot = BattleSnapshot.capture(battle)
+    try:
+        yield snapshot
+    finally:
+        snapshot.restore()
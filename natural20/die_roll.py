@@ -1,12 +1,14 @@
 from typing import Optional
-import random
 import i18n
 import copy
 import pdb
 import re
 from collections import deque
+from natural20.utils.rng_stream import active_stream, stream_for
+from natural20.utils.dice_distribution import distribution_for
 
-# Global dictionary used for "fudged" rolls.
+# Global dictionary used for "fudged" rolls of the unseeded (global) stream;
+# seeded streams keep their own (see natural20.utils.rng_stream).
 FUDGE_HASH = {}
 DIE_ROLL = {}
 DIE_ROLLS = deque(maxlen=100)
@@ -25,7 +27,8 @@ class Rollable:
 
 class Roller:
     def __init__(self, roll_str, crit=False, disadvantage=False, advantage=False,
-                 description=None, entity=None, battle=None, controller=None, advantage_str=None, disadvantage_str=None):
+                 description=None, entity=None, battle=None, controller=None, advantage_str=None, disadvantage_str=None,
+                 stream=None):
         self.roll_str = roll_str
         self.crit = crit
         self.advantage = advantage
@@ -36,6 +39,13 @@ class Roller:
         self.controller = controller
         self.advantage_str = advantage_str
         self.disadvantage_str = disadvantage_str
+        self.stream = stream
+
+    def rng_stream(self):
+        """The RngStream this roller draws from (explicit, else the battle's/session's, else the thread's)."""
+        if self.stream is not None:
+            return self.stream
+        return stream_for(self.battle, self.entity)
 
     # support >= and <=
     def __ge__(self, other):
@@ -89,15 +99,17 @@ class Roller:
                                              advantage=self.advantage, disadvantage=self.disadvantage,
                                              controller=self.controller)
             else:
+                stream = self.rng_stream()
                 rolls = [
-                    (DieRoll.generate_number(die_sides), DieRoll.generate_number(die_sides))
+                    (stream.generate_number(die_sides), stream.generate_number(die_sides))
                     for _ in range(number_of_die)
                 ]
         elif self.battle:
             rolls = self.battle.roll_for(self.entity, die_sides, number_of_die, roll_desc,
                                          controller=self.controller)
         else:
-            rolls = [DieRoll.generate_number(die_sides) for _ in range(number_of_die)]
+            stream = self.rng_stream()
+            rolls = [stream.generate_number(die_sides) for _ in range(number_of_die)]
 
         # Handle the modifier operation
         if modifier_op in ['*', '/']:
@@ -143,6 +155,13 @@ class DieRolls(Rollable):
     def expected(self):
         return sum(roll.expected() if isinstance(roll, DieRoll) else roll for roll in self.rolls)
 
+    def distribution(self):
+        return sum((roll.distribution() if isinstance(roll, DieRoll) else roll for roll in self.rolls),
+                   distribution_for(0, 0))
+
+    def prob(self, x):
+        return self.distribution().prob(x)
+
     def nat_20(self):
         return any(roll.nat_20() for roll in self.rolls)
 
@@ -341,6 +360,7 @@ class DieRoll(Rollable):
         return 1 in self.rolls
 
     def reroll(self, lucky=False):
+        stream = self.roller.rng_stream() if isinstance(self.roller, Roller) else active_stream()
         new_rolls = copy.deepcopy(self.rolls)
         if lucky:
             for index, roll in enumerate(self.rolls):
@@ -348,18 +368,18 @@ class DieRoll(Rollable):
                     new_vals = list(roll)
                     for i, value in enumerate(new_vals):
                         if value == 1:
-                            new_vals[i] = DieRoll.generate_number(self.die_sides)
+                            new_vals[i] = stream.generate_number(self.die_sides)
                     new_rolls[index] = tuple(new_vals)
                 elif roll == 1:
-                    new_rolls[index] = DieRoll.generate_number(self.die_sides)
+                    new_rolls[index] = stream.generate_number(self.die_sides)
         else:
             # Use enumerate to update each roll.
             for index, roll in enumerate(self.rolls):
                 if isinstance(roll, (tuple, list)):
                     if min(roll) == 1 or max(roll) == self.die_sides:
-                        new_rolls[index] = DieRoll.generate_number(self.die_sides)
+                        new_rolls[index] = stream.generate_number(self.die_sides)
                 elif roll == 1 or roll == self.die_sides:
-                    new_rolls[index] = DieRoll.generate_number(self.die_sides)
+                    new_rolls[index] = stream.generate_number(self.die_sides)
         desc = f"(lucky) {self.description} {self.rolls} -> {new_rolls}" if lucky else self.description
         rerolled = DieRoll(new_rolls, self.modifier, self.die_sides,
                            advantage=self.advantage, disadvantage=self.disadvantage,
@@ -492,8 +512,7 @@ class DieRoll(Rollable):
         if effect_type not in entity.effects:
             return None
 
-        active = [effect for effect in entity.effects[effect_type]
-                  if not effect.get('expiration') or effect['expiration'] > entity.session.game_time]
+        active = entity._effect_store().active(effect_type, entity.session.game_time)
         return active[-1] if active else None
 
     def half(self):
@@ -501,54 +520,23 @@ class DieRoll(Rollable):
         _roll.halved = True
         return _roll
 
-    def expected(self):
+    def distribution(self):
+        """Exact distribution of this roll's total (see natural20.utils.dice_distribution)."""
         if self.die_sides == 0:
-            return sum(self.rolls) + self.modifier
-
-        if self.advantage:
-            expected_value = sum(
-                i * ((1.0 / self.die_sides * (i * 1.0 / self.die_sides))
-                     + ((i - 1) * (1.0 / self.die_sides) * (1.0 / self.die_sides)))
-                for i in range(1, self.die_sides + 1)
-            )
-        elif self.disadvantage:
-            expected_value = sum(
-                i * ((1.0 / self.die_sides * ((self.die_sides - i + 1) * 1.0 / self.die_sides))
-                     + (((self.die_sides - i) * (1.0 / self.die_sides)) * (1.0 / self.die_sides)))
-                for i in range(1, self.die_sides + 1)
-            )
-        else:
-            expected_value = sum(i * (1.0 / self.die_sides) for i in range(1, self.die_sides + 1))
+            return distribution_for(sum(self.rolls), 0, self.modifier, self.modifier_op, self.modifier_val,
+                                    halved=self.halved)
+        return distribution_for(len(self.rolls), self.die_sides, self.modifier, self.modifier_op, self.modifier_val,
+                                advantage=self.advantage, disadvantage=self.disadvantage, halved=self.halved)
 
-        return len(self.rolls) * expected_value + self.modifier
+    def expected(self):
+        return self.distribution().expected()
 
     def prob(self, x):
         # Returns the probability that the roll will be at least x.
-        if x > self.die_sides + self.modifier:
-            return 0.0
-        if x < 1 + self.modifier:
-            return 1.0
-
-        x_adjusted = x - self.modifier
-        sum_prob = 0.0
-
-        if self.advantage:
-            for i in range(x_adjusted, self.die_sides + 1):
-                p = 1.0 / self.die_sides
-                p2 = i * (1.0 / self.die_sides)
-                p3 = (i - 1) * (1.0 / self.die_sides)
-                sum_prob += p * p2 + p3 * p
-        elif self.disadvantage:
-            for i in range(x_adjusted, self.die_sides + 1):
-                p = 1.0 / self.die_sides
-                p2 = (self.die_sides - i + 1) * (1.0 / self.die_sides)
-                p3 = (self.die_sides - i) * (1.0 / self.die_sides)
-                sum_prob += p * p2 + p3 * p
-        else:
-            # For a normal roll, the probability is the count of numbers >= x_adjusted.
-            sum_prob = (self.die_sides - x_adjusted + 1) / self.die_sides
+        return self.distribution().prob(x)
 
-        return sum_prob
+    def percentile(self, q):
+        return self.distribution().percentile(q)
 
     def color_roll(self, roll):
         # In this simple refactoring the color formatting is a pass‐through.
@@ -694,40 +682,35 @@ class DieRoll(Rollable):
 
     @staticmethod
     def roll(roll_str, crit=False, disadvantage=False, advantage=False,
-             description=None, entity=None, battle=None, controller=None, advantage_str=None, disadvantage_str=None):
+             description=None, entity=None, battle=None, controller=None, advantage_str=None, disadvantage_str=None,
+             stream=None):
         roller = Roller(roll_str, crit=crit, disadvantage=disadvantage, advantage=advantage,
-                        description=description, entity=entity, battle=battle, controller=controller, advantage_str=advantage_str, disadvantage_str=disadvantage_str)
+                        description=description, entity=entity, battle=battle, controller=controller, advantage_str=advantage_str, disadvantage_str=disadvantage_str,
+                        stream=stream)
         return roller.roll()
 
+    # Fudges are scoped to a stream: the one given (e.g. ``battle.rng_for(entity)``)
+    # or the thread's active stream, which is the global FUDGE_HASH unless
+    # natural20.utils.rng_stream.use_stream is in effect.
     @staticmethod
-    def fudge(fixed_roll, die_sides=20):
-        global FUDGE_HASH
-        FUDGE_HASH[die_sides] = fixed_roll
+    def fudge(fixed_roll, die_sides=20, stream=None):
+        (stream or active_stream()).fudge(fixed_roll, die_sides)
 
     @staticmethod
-    def unfudge(die_sides=20):
-        global FUDGE_HASH
-        FUDGE_HASH.pop(die_sides, None)
+    def unfudge(die_sides=20, stream=None):
+        (stream or active_stream()).unfudge(die_sides)
 
     @staticmethod
-    def roll_for(die_type, number_of_times, advantage=False, disadvantage=False, advantage_str=None, disadvantage_str=None):
+    def roll_for(die_type, number_of_times, advantage=False, disadvantage=False, advantage_str=None, disadvantage_str=None,
+                 stream=None):
         if advantage or disadvantage:
-            return [DieRoll.generate_number(die_type, advantage=advantage, disadvantage=disadvantage)
+            return [DieRoll.generate_number(die_type, advantage=advantage, disadvantage=disadvantage, stream=stream)
                     for _ in range(number_of_times)]
-        return [DieRoll.generate_number(die_type) for _ in range(number_of_times)]
+        return [DieRoll.generate_number(die_type, stream=stream) for _ in range(number_of_times)]
 
     @staticmethod
-    def generate_number(die_sides, advantage=False, disadvantage=False):
-        global FUDGE_HASH
-        if die_sides in FUDGE_HASH:
-            fudge_val = FUDGE_HASH.pop(die_sides)
-            if advantage or disadvantage:
-                return [fudge_val, fudge_val]
-            return fudge_val
-
-        if advantage or disadvantage:
-            return random.sample(range(1, die_sides + 1), 2)
-        return random.randint(1, die_sides)
+    def generate_number(die_sides, advantage=False, disadvantage=False, stream=None):
+        return (stream or active_stream()).generate_number(die_sides, advantage=advantage, disadvantage=disadvantage)
 
     @staticmethod
     def roll_with_lucky(entity, roll_str, crit=False, disadvantage=False, advantage=False,
@@ -0,0 +1,340 @@
+"""Monte Carlo encounter simulation.
+
+Runs many seeded, headless battles of a party against a group of monsters
+with ``GenericController`` driving every creature, and aggregates the
+outcomes (win rate, rounds, damage and knock-outs) so encounter
+difficulty can be checked empirically against the CR-based estimate from
+``natural20.progression``::
+
+    spec = EncounterSpec('templates', 'maps/game_map',
+                         party=['characters/high_elf_fighter@spawn_point_1'],
+                         monsters=['goblin@spawn_point_2', 'goblin@spawn_point_3'])
+    report = simulate_encounter(spec, runs=2000, workers=4)
+    print(report.summary())
+
+Each worker process builds its ``Session`` once (campaign data, weapon and
+spell tables stay loaded) and then plays chunks of seeds; chunk results
+are merged as they arrive, so ``progress`` sees a running report. Battle
+``n`` is seeded with ``seed + n`` (``Session.seed_rng`` and ``random.seed``),
+so a report is reproducible regardless of the number of workers. No event
+output is produced: the worker's ``EventManager`` only carries the
+listener that collects statistics.
+
+``EncounterSpec.party_search`` gives the party ``LookaheadSearch``
+controllers (see ``natural20.ai.lookahead``) instead of the plain
+heuristic; the report counts the party's decisions and the time spent
+making them either way, so both can be compared (``scripts/benchmark_lookahead.py``).
+"""
+from __future__ import annotations
+
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Sequence
+
+from natural20.ai.lookahead import LookaheadSearch
+from natural20.battle import Battle
+from natural20.event_manager import EventManager
+from natural20.generic_controller import GenericController
+from natural20.map import Map
+from natural20.player_character import PlayerCharacter
+from natural20.progression import adjusted_encounter_xp, empirical_encounter_difficulty, encounter_difficulty
+from natural20.session import Session
+
+PARTY_GROUP = 'a'
+MONSTER_GROUP = 'b'
+
+# safety stop for a controller that keeps returning actions in one turn
+MAX_ACTIONS_PER_TURN = 20
+
+
+@dataclass
+class EncounterSpec:
+    """What to simulate.
+
+    ``party`` entries are character sheet paths (relative to ``root_path``)
+    and ``monsters`` entries NPC types, each optionally followed by
+    ``@<spawn point>`` or ``@<x>,<y>`` to place it on the map.
+    ``party_search`` holds ``LookaheadSearch`` arguments for the party's
+    controllers (``None`` plays the party heuristically).
+    """
+    root_path: str
+    map_path: str
+    party: Sequence[str]
+    monsters: Sequence[str]
+    max_rounds: int = 50
+    party_search: Optional[dict] = None
+
+
+@dataclass
+class BattleOutcome:
+    seed: int
+    winner: str  # 'party', 'monsters' or 'draw' (no winner after max_rounds)
+    rounds: int
+    damage_dealt: dict
+    downed: dict
+    deaths: dict
+    party_hp_lost: float  # fraction of the party's maximum hit points
+    party_decisions: int = 0
+    party_decision_time: float = 0.0  # seconds spent choosing the party's actions
+
+
+@dataclass
+class SimulationReport:
+    spec: EncounterSpec
+    battles: int = 0
+    wins: Counter = field(default_factory=Counter)
+    total_rounds: int = 0
+    damage_dealt: Counter = field(default_factory=Counter)
+    downed: Counter = field(default_factory=Counter)
+    deaths: Counter = field(default_factory=Counter)
+    party_hp_lost: float = 0.0
+    battles_with_party_downed: int = 0
+    party_decisions: int = 0
+    party_decision_time: float = 0.0
+    predicted_difficulty: Optional[str] = None
+    adjusted_xp: int = 0
+
+    def add(self, outcome: BattleOutcome):
+        self.battles += 1
+        self.wins[outcome.winner] += 1
+        self.total_rounds += outcome.rounds
+        self.damage_dealt.update(outcome.damage_dealt)
+        self.downed.update(outcome.downed)
+        self.deaths.update(outcome.deaths)
+        self.party_hp_lost += outcome.party_hp_lost
+        if outcome.downed.get('party'):
+            self.battles_with_party_downed += 1
+        self.party_decisions += outcome.party_decisions
+        self.party_decision_time += outcome.party_decision_time
+
+    def merge(self, other: 'SimulationReport'):
+        self.battles += other.battles
+        self.wins.update(other.wins)
+        self.total_rounds += other.total_rounds
+        self.damage_dealt.update(other.damage_dealt)
+        self.downed.update(other.downed)
+        self.deaths.update(other.deaths)
+        self.party_hp_lost += other.party_hp_lost
+        self.battles_with_party_downed += other.battles_with_party_downed
+        self.party_decisions += other.party_decisions
+        self.party_decision_time += other.party_decision_time
+
+    def _mean(self, total):
+        return total / self.battles if self.battles else 0.0
+
+    def win_rate(self):
+        return self._mean(self.wins['party'])
+
+    def average_rounds(self):
+        return self._mean(self.total_rounds)
+
+    def average_damage_dealt(self, side='party'):
+        return self._mean(self.damage_dealt[side])
+
+    def party_decisions_per_second(self):
+        return self.party_decisions / self.party_decision_time if self.party_decision_time else 0.0
+
+    def party_death_rate(self):
+        """Average fraction of the party killed per battle."""
+        return self._mean(self.deaths['party']) / max(1, len(self.spec.party))
+
+    def empirical_difficulty(self):
+        return empirical_encounter_difficulty(
+            self.win_rate(),
+            party_hp_lost=self._mean(self.party_hp_lost),
+            party_downed_rate=self._mean(self.battles_with_party_downed),
+            party_death_rate=self.party_death_rate())
+
+    def summary(self):
+        return {
+            'battles': self.battles,
+            'win_rate': round(self.win_rate(), 4),
+            'draw_rate': round(self._mean(self.wins['draw']), 4),
+            'average_rounds': round(self.average_rounds(), 2),
+            'average_damage_dealt': {side: round(self.average_damage_dealt(side), 2)
+                                     for side in ('party', 'monsters')},
+            'average_downed': {side: round(self._mean(self.downed[side]), 3) for side in ('party', 'monsters')},
+            'average_deaths': {side: round(self._mean(self.deaths[side]), 3) for side in ('party', 'monsters')},
+            'party_hp_lost': round(self._mean(self.party_hp_lost), 3),
+            'adjusted_xp': self.adjusted_xp,
+            'predicted_difficulty': self.predicted_difficulty,
+            'empirical_difficulty': self.empirical_difficulty(),
+        }
+
+    def timing(self):
+        """Wall-clock cost of the party's decisions (kept out of ``summary``, which replays exactly)."""
+        return {
+            'party_decisions': self.party_decisions,
+            'party_decision_time': round(self.party_decision_time, 3),
+            'party_decisions_per_second': round(self.party_decisions_per_second(), 2),
+        }
+
+
+def _parse_entry(entry):
+    name, _, position = str(entry).partition('@')
+    if not position:
+        return name, None
+    if ',' in position:
+        return name, [int(value) for value in position.split(',')]
+    return name, position
+
+
+class _EncounterRunner:
+    """Plays battles of one spec against a session that is loaded once."""
+
+    def __init__(self, spec: EncounterSpec):
+        self.spec = spec
+        self.session = Session(spec.root_path, event_manager=EventManager())
+        self.session.render_for_text = True
+        self._sides = {}
+        self._stats = None
+        # deferred: statistics only observe, and never see a controller's simulated play
+        self.session.event_manager.register_event_listener(['damage', 'unconscious'], self._on_event, deferred=True)
+
+    def _on_event(self, event):
+        side = self._sides.get(event.get('source'))
+        if side is None or self._stats is None:
+            return
+        if event['event'] == 'damage':
+            # damage dealt by a side is the damage its opponents took
+            dealer = 'monsters' if side == 'party' else 'party'
+            self._stats['damage_dealt'][dealer] += event.get('value') or 0
+        elif event['event'] == 'unconscious':
+            self._stats['downed'][side] += 1
+
+    def _spawn(self, battle, entity, group, position):
+        search = None
+        if group == PARTY_GROUP and self.spec.party_search is not None:
+            search = LookaheadSearch(**self.spec.party_search)
+        controller = GenericController(self.session, search=search)
+        controller.register_handlers_on(entity)
+        token = entity.name[0] if getattr(entity, 'name', None) else None
+        battle.add(entity, group, controller=controller, position=position, token=token)
+
+    def party_and_monsters(self):
+        party = [PlayerCharacter.load(self.session, _parse_entry(entry)[0]) for entry in self.spec.party]
+        monsters = [self.session.npc(_parse_entry(entry)[0]) for entry in self.spec.monsters]
+        return party, monsters
+
+    def run(self, seed) -> BattleOutcome:
+        spec = self.spec
+        random.seed(seed)
+        self.session.seed_rng(seed)
+        self.session.game_time = 0
+
+        battle_map = Map(self.session, spec.map_path)
+        battle = Battle(self.session, battle_map)
+        party, monsters = self.party_and_monsters()
+        self._sides = {entity: 'party' for entity in party}
+        self._sides.update({entity: 'monsters' for entity in monsters})
+        self._stats = {'damage_dealt': Counter(), 'downed': Counter(), 'decisions': 0, 'decision_time': 0.0}
+
+        for entity, entry in zip(party, spec.party):
+            self._spawn(battle, entity, PARTY_GROUP, _parse_entry(entry)[1])
+        for entity, entry in zip(monsters, spec.monsters):
+            self._spawn(battle, entity, MONSTER_GROUP, _parse_entry(entry)[1])
+
+        party_max_hp = sum(entity.max_hp() for entity in party) or 1
+        party_start_hp = sum(entity.hp() for entity in party)
+        battle.start()
+        result = battle.while_active(spec.max_rounds, lambda entity: self._take_turn(battle, entity))
+
+        if result == 'tpk':
+            winners = battle.winning_groups()
+            winner = 'party' if PARTY_GROUP in winners else 'monsters' if MONSTER_GROUP in winners else 'draw'
+        else:
+            winner = 'draw'
+
+        stats, self._stats = self._stats, None
+        return BattleOutcome(
+            seed=seed,
+            winner=winner,
+            rounds=battle.round + 1,
+            damage_dealt=dict(stats['damage_dealt']),
+            downed=dict(stats['downed']),
+            deaths={'party': sum(1 for e in party if e.dead()),
+                    'monsters': sum(1 for e in monsters if e.dead())},
+            party_hp_lost=max(0, party_start_hp - sum(max(0, entity.hp()) for entity in party)) / party_max_hp,
+            party_decisions=stats['decisions'],
+            party_decision_time=stats['decision_time'],
+        )
+
+    def _take_turn(self, battle, entity):
+        for _ in range(MAX_ACTIONS_PER_TURN):
+            start = time.perf_counter()
+            action = battle.move_for(entity)
+            if self._sides.get(entity) == 'party':
+                self._stats['decisions'] += 1
+                self._stats['decision_time'] += time.perf_counter() - start
+            if not action:
+                break
+            battle.action(action)
+            battle.commit(action)
+            if not entity.conscious() or battle.battle_ends():
+                break
+        return False
+
+    def run_many(self, seeds) -> SimulationReport:
+        report = SimulationReport(self.spec)
+        for seed in seeds:
+            report.add(self.run(seed))
+        return report
+
+
+# one runner per worker process, built by the pool initializer
+_worker_runner = None
+
+
+def _init_worker(spec):
+    global _worker_runner
+    # workers run headless; map and character loading still print progress
+    sys.stdout = open(os.devnull, 'w')
+    _worker_runner = _EncounterRunner(spec)
+
+
+def _run_chunk(seeds):
+    return _worker_runner.run_many(seeds)
+
+
+def _predict(runner: _EncounterRunner, report: SimulationReport):
+    party, monsters = runner.party_and_monsters()
+    report.adjusted_xp = adjusted_encounter_xp(monsters, party_size=len(party))
+    report.predicted_difficulty = encounter_difficulty(report.adjusted_xp, [pc.level() for pc in party])
+
+
+def simulate_encounter(spec: EncounterSpec, runs=100, workers=None, seed=0, chunk_size=None,
+                       progress: Optional[Callable[[SimulationReport], None]] = None) -> SimulationReport:
+    """Play ``runs`` battles of ``spec`` and return the aggregated report.
+
+    ``workers`` defaults to the CPU count; ``workers=0`` runs everything in
+    this process. ``progress`` is called with the running report each time
+    a chunk of battles completes.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    seeds = list(range(seed, seed + runs))
+    report = SimulationReport(spec)
+
+    if workers <= 0 or runs <= 1:
+        runner = _EncounterRunner(spec)
+        _predict(runner, report)
+        for battle_seed in seeds:
+            report.add(runner.run(battle_seed))
+            if progress:
+                progress(report)
+        return report
+
+    _predict(_EncounterRunner(spec), report)
+    chunk_size = chunk_size or max(1, min(50, runs // (workers * 4) or 1))
+    chunks = [seeds[i:i + chunk_size] for i in range(0, len(seeds), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(spec,)) as pool:
+        for future in as_completed([pool.submit(_run_chunk, chunk) for chunk in chunks]):
+            report.merge(future.result())
+            if progress:
+                progress(report)
+    return report
@@ -7,6 +7,8 @@ from typing import List, Tuple
 from natural20.concern.notable import Notable
 from natural20.concern.generic_event_handler import GenericEventHandler
 from natural20.spell.effects.protection_effect import ProtectionEffect
+from natural20.utils.effect_store import EffectStore
+from natural20.utils.stat_cache import derived_stat, weapon_key
 import uuid
 from natural20.utils.conversation import delivered_conversations
 from natural20.utils.gibberish import gibberish
@@ -46,7 +48,7 @@ class Entity(EntityStateEvaluator, Notable):
         self.statuses = []
         self.ability_scores = {}
         self.entity_event_hooks = {}
-        self.effects = {}
+        self.effects = EffectStore()
         self.grapples = []
         self.grappling = []
         self.flying = False
@@ -91,6 +93,9 @@ class Entity(EntityStateEvaluator, Notable):
         # ``condition``. ``value`` may be an int, a dice string, or a
         # callable ``(entity, context) -> int | str | None``.
         self._modifiers = []
+        self._modifier_index = None
+        # bumped by invalidate_stats; part of the derived stat cache stamp
+        self._stat_version = 0
         # Phase 4: opt-in resource pools keyed by name. Existing
         # per-attribute counters (second_wind_count, wild_shape_count,
         # rage_count, …) keep working untouched; this dict is purely
@@ -264,12 +269,16 @@ class Entity(EntityStateEvaluator, Notable):
             'disadvantage': bool(disadvantage),
             'condition': condition,
         })
+        self._modifier_index = None
+        self.invalidate_stats()
 
     def remove_modifier(self, source):
         """Remove every modifier registered under ``source`` (==)."""
         if not getattr(self, '_modifiers', None):
             return
         self._modifiers = [m for m in self._modifiers if m.get('source') is not source]
+        self._modifier_index = None
+        self.invalidate_stats()
 
     def collect_modifiers(self, kind, context=None):
         """Return all matching modifier entries for ``kind``.
@@ -279,10 +288,7 @@ class Entity(EntityStateEvaluator, Notable):
         and the original ``source`` for stacking checks.
         """
         out = []
-        mods = getattr(self, '_modifiers', None) or []
-        for m in mods:
-            if m.get('kind') != kind:
-                continue
+        for m in self._modifiers_of_kind(kind):
             cond = m.get('condition')
             if cond is not None:
                 try:
@@ -306,6 +312,37 @@ class Entity(EntityStateEvaluator, Notable):
             })
         return out
 
+    def _modifiers_of_kind(self, kind):
+        """Registered modifier entries of ``kind``, in registration order."""
+        mods = getattr(self, '_modifiers', None) or []
+        index = getattr(self, '_modifier_index', None)
+        # keyed on the list too, for loaders that assign ``_modifiers`` directly
+        if index is None or index[0] is not mods or index[1] != len(mods):
+            by_kind = {}
+            for m in mods:
+                by_kind.setdefault(m.get('kind'), []).append(m)
+            index = (mods, len(mods), by_kind)
+            self._modifier_index = index
+        return index[2].get(kind, ())
+
+    # --- Derived stat cache (see natural20.utils.stat_cache) ------------
+
+    def invalidate_stats(self):
+        """Forget every memoized derived stat (armor class, speed, ...) of this entity."""
+        self._stat_version = getattr(self, '_stat_version', 0) + 1
+
+    def _stat_stamp(self):
+        # the explicit version plus cheap guards for state that callers edit in place
+        session = getattr(self, 'session', None)
+        properties = getattr(self, 'properties', None) or {}
+        return (getattr(self, '_stat_version', 0),
+                getattr(session, 'game_time', None),
+                tuple(self.statuses),
+                tuple(properties.get('equipped') or ()),
+                self.flying,
+                self.effects,
+                self.ability_scores)
+
     # --- Phase 4 resource pool helpers ---------------------------------
 
     def _resources_dict(self):
@@ -1024,6 +1061,7 @@ class Entity(EntityStateEvaluator, Notable):
             return 0
         return self.strength()
 
+    @derived_stat
     def passive_perception(self):
         stored = self.properties.get('passive_perception')
         if stored is not None:
@@ -1091,15 +1129,40 @@ class Entity(EntityStateEvaluator, Notable):
         return False
 
     def has_spell_effect(self, spell):
-        active_effects = [effect for effects in self.effects.values() for effect in effects if not effect.get('expiration') or effect.get('expiration') > self.session.game_time]
+        active_effects = self._effect_store().all_active(self.session.game_time)
         return any(effect['effect'].id == spell for effect in active_effects)
 
+    def _effect_store(self):
+        """``self.effects`` as an ``EffectStore`` (plain dicts assigned by loaders are wrapped on first use)."""
+        effects = self.effects
+        if not isinstance(effects, EffectStore):
+            effects = EffectStore(effects)
+            self.effects = effects
+        return effects
+
+    def _equipment_effects(self):
+        """(effect name, ProtectionEffect or None) for the effects of the equipped items.
+
+        Rebuilt only when the equipped list changes (equip/unequip).
+        """
+        equipped = tuple(self.properties.get('equipped', []) or [])
+        cached = getattr(self, '_equipment_effects_cache', None)
+        if cached is None or cached[0] != equipped:
+            effects = []
+            for item in self.equipped_items():
+                names = item.get('effect', [])
+                if isinstance(names, str):
+                    names = [names]
+                for name in names:
+                    effect_obj = ProtectionEffect(self) if name in ('protection', 'cloak_of_protection') else None
+                    effects.append((name, effect_obj))
+            cached = (equipped, effects)
+            self._equipment_effects_cache = cached
+        return cached[1]
 
     def register_effect(self, effect_type, handler, method_name=None, effect=None, source=None, duration=None):
         if effect and isinstance(effect, dict):
             raise Exception(f"Effect {effect} is a dict")
-        if effect_type not in self.effects:
-            self.effects[effect_type] = []
         effect_descriptor = {
             'handler': handler,
             'method': method_name if method_name is not None else effect_type,
@@ -1108,7 +1171,16 @@ class Entity(EntityStateEvaluator, Notable):
         }
         if duration is not None:
             effect_descriptor['expiration'] = self.session.game_time + int(duration)
-        self.effects[effect_type].append(effect_descriptor)
+        self._effect_store().add(effect_type, effect_descriptor, self.session.game_time)
+        self.invalidate_stats()
+        if effect_type == 'light_override':
+            self.lighting_changed()
+
+    def lighting_changed(self):
+        """Tell the maps that the light this entity carries may have changed."""
+        session = getattr(self, 'session', None)
+        if session is not None and hasattr(session, 'invalidate_lighting'):
+            session.invalidate_lighting()
 
     def register_event_hook(self, event_type, handler, method_name=None, source=None, effect=None, duration=None):
         if event_type not in self.entity_event_hooks:
@@ -1160,6 +1232,8 @@ class Entity(EntityStateEvaluator, Notable):
     # @param item_name [String,Symbol]
     def equip(self, item_name, ignore_inventory=False):
         equipped = self.properties.setdefault('equipped', [])
+        self.lighting_changed()
+        self.invalidate_stats()
         item_name_str = str(item_name)
         if ignore_inventory:
             equipped.append(item_name_str)
@@ -2158,7 +2232,10 @@ class Entity(EntityStateEvaluator, Notable):
                     dismiss_count += 1
 
             new_effects[key] = [f for f in value if f['effect'].id not in removed_effects]
-        self.effects = new_effects
+        self.effects = EffectStore(new_effects)
+        if removed_effects:
+            self.lighting_changed()
+            self.invalidate_stats()
 
         new_entity_event_hooks = {}
         for key, value in self.entity_event_hooks.items():
@@ -2443,6 +2520,7 @@ class Entity(EntityStateEvaluator, Notable):
     def familiar(self):
       return self.properties.get('familiar', False)
 
+    @derived_stat
     def speed(self):
         if self.restrained():
             return 0
@@ -2615,28 +2693,12 @@ class Entity(EntityStateEvaluator, Notable):
         return False
 
     def has_effect(self, effect_type):
-        for item in self.equipped_items():
-            effects = item.get('effect', [])
-            if isinstance(effects, str):
-                effects = [effects]
-            for effect in effects:
-                if effect == 'protection' or (
-                    effect == 'cloak_of_protection'
-                    and effect_type == 'saving_throw_override'
-                ):
-                    effect_obj = ProtectionEffect(self)
-                    if hasattr(effect_obj, effect_type):
-                        return True
-
-        if effect_type not in self.effects:
-            return False
-
-        if not self.effects[effect_type]:
-            return False
-
-        active_effects = [effect for effect in self.effects[effect_type] if not effect.get('expiration') or effect['expiration'] > self.session.game_time]
+        for effect, effect_obj in self._equipment_effects():
+            if effect_obj is not None and (effect == 'protection' or effect_type == 'saving_throw_override'):
+                if hasattr(effect_obj, effect_type):
+                    return True
 
-        return bool(active_effects)
+        return bool(self._effect_store().active(effect_type, self.session.game_time))
 
     # @param map [Natural20::BattleMap]
     # @param target_position [Array<Integer,Integer>]
@@ -2745,6 +2807,7 @@ class Entity(EntityStateEvaluator, Notable):
 
         return modifier
 
+    @derived_stat(key=weapon_key)
     def proficient_with_weapon(self, weapon):
         if isinstance(weapon, str):
             weapon = self.session.load_thing(weapon)
@@ -2773,6 +2836,7 @@ class Entity(EntityStateEvaluator, Notable):
 
         return weapon_attacks
 
+    @derived_stat
     def equipped_items(self):
         equipped_arr = self.properties.get('equipped', [])
         equipped_list = []
@@ -3105,6 +3169,8 @@ class Entity(EntityStateEvaluator, Notable):
     def unequip(self, item_name, transfer_inventory=True):
         if item_name in self.properties['equipped']:
             self.properties['equipped'].remove(item_name)
+            self.lighting_changed()
+            self.invalidate_stats()
             if transfer_inventory:
                 self.add_item(item_name)
 
@@ -3399,12 +3465,7 @@ class Entity(EntityStateEvaluator, Notable):
             controller.attack_listener(battle, self)
 
     def current_effects(self):
-        active_effects = []
-        for _, value in self.effects.items():
-            for effect in value:
-                if not effect.get('expiration') or effect['expiration'] > self.session.game_time:
-                    active_effects.append(effect)
-        return active_effects
+        return self._effect_store().all_active(self.session.game_time)
 
     def eval_effect(self, effect_type, opts=None):
         if not opts:
@@ -3413,10 +3474,7 @@ class Entity(EntityStateEvaluator, Notable):
         if not self.has_effect(effect_type):
             return None
 
-        if effect_type in self.effects:
-            active_effects = [effect for effect in self.effects[effect_type] if not effect.get('expiration') or effect['expiration'] > self.session.game_time]
-        else:
-            active_effects = []
+        active_effects = list(self._effect_store().active(effect_type, self.session.game_time))
 
         if not opts.get('stacked'):
             active_effects = [active_effects[-1]] if active_effects else []
@@ -3428,19 +3486,11 @@ class Entity(EntityStateEvaluator, Notable):
                 opts.update( { "effect": active_effect['effect'], "value" : result })
                 result = getattr(active_effect['handler'], active_effect['method'])(self, opts)
 
-        for item in self.equipped_items():
-            effects = item.get('effect', [])
-            if isinstance(effects, str):
-                effects = [effects]
-            for effect in effects:
-                effect_obj = None
-                if effect == 'protection' or (
-                    effect == 'cloak_of_protection'
-                    and effect_type == 'saving_throw_override'
-                ):
-                    effect_obj = ProtectionEffect(self)
-                if effect_obj is not None and hasattr(effect_obj, effect_type):
-                    result = getattr(effect_obj, effect_type)(self, opts)
+        for effect, effect_obj in self._equipment_effects():
+            if effect_obj is None or not (effect == 'protection' or effect_type == 'saving_throw_override'):
+                continue
+            if hasattr(effect_obj, effect_type):
+                result = getattr(effect_obj, effect_type)(self, opts)
 
         return result
     
@@ -3783,6 +3833,8 @@ class Entity(EntityStateEvaluator, Notable):
     # removes all equipped. Used for tests
     def unequip_all(self):
         self.properties['equipped'].clear()
+        self.lighting_changed()
+        self.invalidate_stats()
 
     # Checks if item can be equipped
     # @param item_name [String,Symbol]
@@ -3812,7 +3864,7 @@ class Entity(EntityStateEvaluator, Notable):
             'properties': self.properties,
             'attributes': self.attributes,
             'inventory': self.inventory,
-            'effects': self.effects,
+            'effects': dict(self.effects),
             'status': self.statuses,
             'death_saves': self.death_saves,
             'death_fails': self.death_fails,
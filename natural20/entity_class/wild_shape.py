@@ -135,6 +135,7 @@ def transform(druid, beast_id):
     'duration_rounds_left': _wild_shape_duration_rounds(
       getattr(druid, 'druid_level', 2) or 2),
   }
+  druid.invalidate_stats()
 
 
 def scrub_properties_for_serialization(properties, state):
@@ -236,6 +237,7 @@ def revert(druid, overflow_damage=0, battle=None):
 
   druid.npc_actions = []
   druid._wild_shape_state = None
+  druid.invalidate_stats()
 
   # Falling to 0 in beast form leaves the druid at 0 if overflow exceeds
   # the saved HP — humanoid form drops unconscious.
@@ -1,4 +1,8 @@
 import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from typing import List, Union
 import i18n
 from collections import deque
@@ -40,6 +44,9 @@ def format_pickpocket_roll_text(event):
     text += ')'
     return text
 
+# N20_EVENT_PROFILE=1 turns on per-listener call counts and timings.
+_EVENT_PROFILE_ENV = os.environ.get('N20_EVENT_PROFILE', '0') not in ('', '0', 'false', 'no', 'off')
+
 class EventLogger:
     """
     A simple logger for engine related events that logs to stdout
@@ -85,12 +92,98 @@ class FileOutputLogger:
             f.write(f"{event_msg}\n")
             f.flush()
 
+class AsyncEventSink:
+    """
+    Delivers events to a slow consumer (file logging, the campaign log
+    database, websocket fan-out) on a background thread so it never blocks
+    the game loop.
+
+    ``transform`` runs on the game thread and should turn the live event
+    (which references mutable entities) into a snapshot the consumer can
+    safely read later, e.g. a formatted string or a plain dict; returning
+    None skips the event. When the queue is full new events are dropped and
+    counted in ``dropped`` rather than stalling the caller.
+    """
+    def __init__(self, consumer, transform=None, maxsize=10000, name=None):
+        self.consumer = consumer
+        self.transform = transform
+        self.name = name or getattr(consumer, '__qualname__', None) or type(consumer).__name__
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self.errors = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"event-sink-{self.name}", daemon=True)
+        self._thread.start()
+
+    def __call__(self, event):
+        if self._closed:
+            return
+        item = self.transform(event) if self.transform else event
+        if item is None:
+            return
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is _SINK_STOP:
+                    return
+                self.consumer(item)
+            except Exception:
+                self.errors += 1
+            finally:
+                self.queue.task_done()
+
+    def flush(self):
+        """Block until everything queued so far has been consumed."""
+        self.queue.join()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self.queue.put(_SINK_STOP)
+        self._thread.join()
+
+
+_SINK_STOP = object()
+
+
 class EventManager:
+    """
+    Dispatches engine events (plain dicts with an ``'event'`` name) to the
+    listeners registered for them.
+
+    * A listener can subscribe to an exact name, to a prefix (``'spell_*'``)
+      or to every event (``'*'``).
+    * Listeners registered with ``deferred=True`` (log output, sinks) only
+      observe events: inside ``batch()`` (``Battle.commit`` opens one) their
+      events are queued and delivered in order when the outermost batch
+      ends, while regular listeners, which may react with game logic
+      (readied actions, concentration, mage hand), still run immediately.
+    * Inside ``simulation()`` (what-if play on a forked battle) only regular
+      listeners run; deferred listeners never see the events and they are
+      not kept in ``event_buffer``.
+    * ``N20_EVENT_PROFILE=1`` (or ``enable_profiling()``) counts calls and
+      time per listener, see ``listener_stats()``.
+    """
     def __init__(self, output_logger=None, output_file=None, movement_consolidation=False):
         self.event_listeners = {}
         self.battle = None
         self.event_buffer = deque(maxlen=1000)
         self.movement_consolidation = movement_consolidation
+        self.profiling = _EVENT_PROFILE_ENV
+        self._deferred_listeners = set()
+        self._resolved_listeners = {}
+        self._batch_depth = 0
+        self._batched_events = []
+        self._simulation_depth = 0
+        self._listener_stats = {}
+        self.sinks = []
 
         if output_file:
             self.output_logger = FileOutputLogger(output_file)
@@ -102,8 +195,14 @@ class EventManager:
 
     def clear(self):
         self.event_listeners = {}
-
-    def register_event_listener(self, events: Union[str, List[str]], callable):
+        self._deferred_listeners = set()
+        self._resolved_listeners = {}
+
+    def register_event_listener(self, events: Union[str, List[str]], callable, deferred=False):
+        """
+        Subscribe ``callable`` to ``events``: exact names, ``'prefix*'`` or ``'*'``.
+        ``deferred`` listeners only observe and are delivered after the current batch.
+        """
         if isinstance(events, str):
             events = [events]
         for event in events:
@@ -111,49 +210,174 @@ class EventManager:
                 self.event_listeners[event] = []
             if callable not in self.event_listeners[event]:
                 self.event_listeners[event].append(callable)
+        if deferred:
+            self._deferred_listeners.add(callable)
+        self._resolved_listeners = {}
 
-    def received_event(self, event):
-        def process_event(event):
-            set_context = getattr(self.output_logger, 'set_event_context', None)
-            clear_context = getattr(self.output_logger, 'clear_event_context', None)
-            if callable(set_context):
-                set_context(event)
-            try:
-                for handler in self.event_listeners.get(event['event'], []):
-                    handler(event)
-            finally:
-                if callable(clear_context):
-                    clear_context()
+    def unregister_event_listener(self, events: Union[str, List[str]], callable):
+        if isinstance(events, str):
+            events = [events]
+        for event in events:
+            listeners = self.event_listeners.get(event)
+            if listeners and callable in listeners:
+                listeners.remove(callable)
+                if not listeners:
+                    del self.event_listeners[event]
+        if not any(callable in listeners for listeners in self.event_listeners.values()):
+            self._deferred_listeners.discard(callable)
+        self._resolved_listeners = {}
+
+    def add_sink(self, sink, events: Union[str, List[str]] = '*'):
+        """Feed ``events`` to ``sink`` (e.g. an ``AsyncEventSink``) as a deferred listener."""
+        self.sinks.append(sink)
+        self.register_event_listener(events, sink, deferred=True)
+        return sink
+
+    def flush_sinks(self):
+        for sink in self.sinks:
+            if hasattr(sink, 'flush'):
+                sink.flush()
+
+    def close_sinks(self):
+        for sink in self.sinks:
+            self.unregister_event_listener(list(self.event_listeners.keys()), sink)
+            if hasattr(sink, 'close'):
+                sink.close()
+        self.sinks = []
+
+    def listeners_for(self, event_name):
+        """(immediate, deferred) listeners of ``event_name``: exact ones first, then prefixes, then ``'*'``."""
+        resolved = self._resolved_listeners.get(event_name)
+        if resolved is None:
+            handlers = list(self.event_listeners.get(event_name, []))
+            for pattern, listeners in self.event_listeners.items():
+                if not pattern.endswith('*') or pattern == '*':
+                    continue
+                if event_name is not None and event_name.startswith(pattern[:-1]):
+                    handlers.extend(h for h in listeners if h not in handlers)
+            handlers.extend(h for h in self.event_listeners.get('*', []) if h not in handlers)
+            deferred = self._deferred_listeners
+            resolved = (tuple(h for h in handlers if h not in deferred),
+                        tuple(h for h in handlers if h in deferred))
+            self._resolved_listeners[event_name] = resolved
+        return resolved
+
+    @contextmanager
+    def batch(self):
+        """Hold deferred listeners' events until the outermost batch ends, then deliver them in order."""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.flush()
+
+    def flush(self):
+        """Deliver the events queued for deferred listeners."""
+        while self._batched_events:
+            events, self._batched_events = self._batched_events, []
+            for event, handlers in events:
+                self._dispatch(event, handlers)
+
+    @contextmanager
+    def simulation(self):
+        """Keep the events of simulated play away from observers (deferred listeners and the event buffer)."""
+        self._simulation_depth += 1
+        try:
+            yield self
+        finally:
+            self._simulation_depth -= 1
 
+    def received_event(self, event):
         if not self.event_listeners:
             return
 
-        if self.movement_consolidation and event.get('event') == 'move':
-            prev = getattr(self, 'previous_move_event', None)
+        if self._simulation_depth:
+            immediate, _ = self.listeners_for(event.get('event'))
+            if immediate:
+                self._dispatch(event, immediate)
+            return
 
-            if prev and prev['source'] == event['source']:
-                prev['position'].append(event['position'])
-                prev['move_cost'] += event['move_cost']
+        if self.movement_consolidation and event.get('event') == 'move':
+            event = self._consolidate_move(event)
+            if event is None:
                 return
-            else:
-                if prev:
-                    self.event_buffer.append(prev)
-                    process_event(prev)
-
-            # Initialize move event positions as a list
-            event['position'] = event['path']
-            self.previous_move_event = event
+            self.event_buffer.append(event)
+            self._process_event(event)
             return
 
         if getattr(self, 'previous_move_event', None):
             self.event_buffer.append(self.previous_move_event)
-            process_event(self.previous_move_event)
+            self._process_event(self.previous_move_event)
             self.previous_move_event = None
 
         self.event_buffer.append(event)
-        process_event(event)
+        self._process_event(event)
+
+    def _consolidate_move(self, event):
+        """
+        Merge consecutive moves of the same source into one event. Returns the
+        previous move event once it is complete (to be processed now), or None.
+        """
+        prev = getattr(self, 'previous_move_event', None)
+
+        if prev and prev['source'] == event['source']:
+            prev['position'].append(event['position'])
+            prev['move_cost'] += event['move_cost']
+            return None
+
+        # Initialize move event positions as a list
+        event['position'] = event['path']
+        self.previous_move_event = event
+        return prev
+
+    def _process_event(self, event):
+        immediate, deferred = self.listeners_for(event.get('event'))
+        if immediate:
+            self._dispatch(event, immediate)
+        if deferred:
+            if self._batch_depth:
+                self._batched_events.append((event, deferred))
+            else:
+                self._dispatch(event, deferred)
+
+    def _dispatch(self, event, handlers):
+        set_context = getattr(self.output_logger, 'set_event_context', None)
+        clear_context = getattr(self.output_logger, 'clear_event_context', None)
+        if callable(set_context):
+            set_context(event)
+        try:
+            if self.profiling:
+                for handler in handlers:
+                    start = time.perf_counter()
+                    try:
+                        handler(event)
+                    finally:
+                        self._record_listener(handler, time.perf_counter() - start)
+            else:
+                for handler in handlers:
+                    handler(event)
+        finally:
+            if callable(clear_context):
+                clear_context()
+
+    def enable_profiling(self, enabled=True):
+        self.profiling = bool(enabled)
+
+    def _record_listener(self, handler, elapsed):
+        name = getattr(handler, '__qualname__', None) or getattr(handler, 'name', None) or repr(handler)
+        stats = self._listener_stats.setdefault(name, [0, 0.0])
+        stats[0] += 1
+        stats[1] += elapsed
 
+    def listener_stats(self):
+        """``[(listener, calls, seconds)]``, slowest listener first."""
+        return sorted(((name, calls, seconds) for name, (calls, seconds) in self._listener_stats.items()),
+                      key=lambda row: row[2], reverse=True)
 
+    def reset_listener_stats(self):
+        self._listener_stats = {}
 
     def set_context(self, battle, entities=None):
         if entities is None:
@@ -654,7 +878,7 @@ class EventManager:
         }
 
         for event, handler in event_handlers.items():
-            self.register_event_listener(event, handler)
+            self.register_event_listener(event, handler, deferred=True)
 
     def show_name(self, event):
         return self.decorate_name(event['source'])
@@ -17,6 +17,7 @@ from natural20.entity import Entity
 from natural20.action import Action
 from natural20.controller import Controller
 from natural20.ai.path_compute import PathCompute
+from natural20.ai import lookahead
 from natural20.utils.movement import retrieve_opportunity_attacks, simplify_path
 from natural20.utils.action_builder import autobuild
 from natural20.item_library.door_object import DoorObject
@@ -52,11 +53,15 @@ class GenericController(Controller):
         "look"
     ]
 
-    def __init__(self, session, valid_move_types=None):
+    def __init__(self, session, valid_move_types=None, search=None):
         self.state = {}
         self.session = session
         self.battle_data = {}
         self.valid_moves_types = valid_move_types or self.VALID_AI_MOVE_TYPES
+        # optional natural20.ai.lookahead.LookaheadSearch that re-ranks the heuristic's best actions
+        if search is None and lookahead.ENABLED:
+            search = lookahead.LookaheadSearch()
+        self.search = search
 
     def to_dict(self):
         return {
@@ -143,6 +148,9 @@ class GenericController(Controller):
         scored = self._sort_actions_with_scores(entity, battle, available_actions)
         if not scored:
             return None
+        search = getattr(self, 'search', None)
+        if search is not None:
+            scored = search.rerank(self, entity, battle, scored)
         selected_action, selected_score = scored[0]
         if isinstance(selected_action, MoveAction):
             # If the best available move actively makes the situation worse
@@ -204,6 +212,8 @@ class GenericController(Controller):
         objects_around_me = current_map.look(entity)
 
         entity_x, entity_y = current_map.position_of(entity)
+        # one Dijkstra field answers the path to every enemy in sight
+        reachability = None
 
         for object, location in objects_around_me.items():
             group = battle.entity_group_for(object)
@@ -214,9 +224,10 @@ class GenericController(Controller):
             if not object.conscious():
                 continue
             if battle.opposing(entity, object):
-                path = PathCompute(battle, current_map, entity, ignore_opposing=True).compute_path(
-                    entity_x, entity_y, location[0], location[1]
-                )
+                if reachability is None:
+                    reachability = PathCompute(battle, current_map, entity, ignore_opposing=True) \
+                        .reachability(entity_x, entity_y)
+                path = reachability.path_to(location[0], location[1]) if reachability else None
                 enemy_positions[object] = (location, path)
 
         # Update memory: track last known enemy locations and investigation targets
@@ -537,6 +548,9 @@ class GenericController(Controller):
                     base_score += 0.35
             return base_score
 
+        # Paths from the current position to the movement targets
+        current_paths = {}
+
         # Build target-driven movement scores
         def build_move_scores():
             # Guard: if the entity has no map loaded in this battle, skip movement scoring
@@ -600,6 +614,7 @@ class GenericController(Controller):
             path_compute = PathCompute(battle, current_map, entity, ignore_opposing=True)
             # Compute to multiple destinations
             paths = path_compute.compute_paths_to_multiple_destinations(ex, ey, targets)
+            current_paths.update(paths)
             for dest, path in paths.items():
                 if not path or len(path) < 2:
                     continue
@@ -618,16 +633,15 @@ class GenericController(Controller):
 
         move_square_score, move_targets, move_target_kind = build_move_scores()
 
+        current_lengths = [len(path) - 1 for path in current_paths.values() if path]
+
         def progress_score_for(position_key):
             if not move_targets:
                 return 0
 
-            ex, ey = current_map.position_of(entity)
             path_compute = PathCompute(battle, current_map, entity, ignore_opposing=True)
-            current_paths = path_compute.compute_paths_to_multiple_destinations(ex, ey, move_targets)
             destination_paths = path_compute.compute_paths_to_multiple_destinations(position_key[0], position_key[1], move_targets)
 
-            current_lengths = [len(path) - 1 for path in current_paths.values() if path]
             destination_lengths = [len(path) - 1 for path in destination_paths.values() if path]
             if not current_lengths or not destination_lengths:
                 return 0
@@ -670,7 +684,11 @@ class GenericController(Controller):
                     if support_score != 0:
                         sorted_actions.append((action, support_score))
                         continue
-                base_score = action.compute_hit_probability(battle) * action.avg_damage(battle)
+                hit_probability = action.compute_hit_probability(battle)
+                base_score = hit_probability * action.avg_damage(battle)
+                # prefer attacks that are likely to finish the target off
+                if isinstance(action, AttackAction):
+                    base_score += action.kill_probability(battle, hit_probability=hit_probability)
                 sorted_actions.append((action, base_score))
             elif isinstance(action, MoveAction):
                 if not action.move_path or len(action.move_path) < 2:
@@ -12,6 +12,7 @@ from natural20.entity import Entity
 from natural20.gym.dndenv_controller import DndenvController
 from natural20.controller import Controller
 from natural20.event_manager import EventManager
+from natural20.gym.observation_layers import viewport_reach
 from natural20.gym.tools import (
     dndenv_action_to_nat20action,
     build_observation,
@@ -231,6 +232,8 @@ class dndenv(gym.Env):
         pos_x, pos_y = self.map.position_of(current_player)
         view_w, view_h = self.view_port_size
         map_w, map_h = self.map.size
+        visible = self.map.visible_tiles(current_player,
+                                         reach=viewport_reach(current_player, self.view_port_size))
         for y in range(-view_w//2, view_w//2):
             col_arr = []
             for x in range(-view_h//2, view_h//2):
@@ -243,7 +246,7 @@ class dndenv(gym.Env):
 
                     terrain = render_object_token(self.map, abs_x, abs_y)
                     entity = self.map.entity_at(abs_x, abs_y)
-                    if self.map.can_see_square(current_player, (abs_x, abs_y)):
+                    if (abs_x, abs_y) in visible:
                         if entity is None:
                             if terrain is None:
                                 render_char = "."
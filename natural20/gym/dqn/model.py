@@ -145,16 +145,42 @@ class QNetwork(nn.Module):
                torch.stack(action2s).to(device), torch.stack(action3s).to(device), torch.stack(action4s).to(device), \
                torch.stack(action5s).to(device)
 
+    def convert_columns(self, states, actions):
+        """Same features as ``convert_batch`` for already batched tensors.
+
+        ``states`` maps each observation field to a tensor with a leading
+        batch dimension and ``actions`` holds the five batched action
+        components, as ``ReplayBuffer.sample`` returns them.
+        """
+        map_input = states['map'].long()
+        batch_size = map_input.size(0)
+        map_input_entity = self.entity_type_embedding(map_input[..., 0])
+        map_input_terrain = self.terrain_type_embedding(map_input[..., 1])
+        left_over_channels = map_input[..., 2:].float() / 255.0
+        map_input = torch.cat((map_input_entity, map_input_terrain, left_over_channels), dim=3)
+        equiped = self.weapon_type_embedding(states['player_equipped'].long()).view(batch_size, -1)
+
+        action1, action2, action3, action4, action5 = actions
+        return map_input, states['player_type'].long(), states['enemy_type'].long(), states['player_ac'], \
+            equiped, states['conditions'], states['enemy_conditions'], states['health_enemy'], \
+            states['health_pct'], states['enemy_reactions'], states['ability_info'], states['is_reaction'], \
+            states['movement'], states['turn_info'], \
+            action1.long(), action2.float(), action3.float(), action4.long(), action5.long()
+
+    def forward_batch(self, states, actions):
+        """Q-values for batched states and actions (see ``convert_columns``)."""
+        return self._q_values(*self.convert_columns(states, actions))
+
     def forward(self, x, action, pre_converted=False, pre_converted_action=False):
         if isinstance(x, dict):
-            map_input, player_type, enemy_type, player_ac, equiped, condition, condition_enemy, \
-                health_enemy, health_pct, enemy_reaction, is_reaction, ability_info, movement, turn_info, \
-                action1, action2, action3, action4, action5 = self.convert_batch([x], [action], self.device, pre_converted=pre_converted, pre_converted_action=pre_converted_action)
+            features = self.convert_batch([x], [action], self.device, pre_converted=pre_converted, pre_converted_action=pre_converted_action)
         else:
-            map_input, player_type, enemy_type, player_ac, equiped, condition, condition_enemy, \
-                health_enemy, health_pct, enemy_reaction, is_reaction, ability_info, movement, turn_info, \
-                action1, action2, action3, action4, action5 = self.convert_batch(x, action, self.device, pre_converted=pre_converted, pre_converted_action=pre_converted_action)
+            features = self.convert_batch(x, action, self.device, pre_converted=pre_converted, pre_converted_action=pre_converted_action)
+        return self._q_values(*features)
 
+    def _q_values(self, map_input, player_type, enemy_type, player_ac, equiped, condition, condition_enemy,
+                  health_enemy, health_pct, enemy_reaction, is_reaction, ability_info, movement, turn_info,
+                  action1, action2, action3, action4, action5):
         # Pass map through CNN
         x = F.relu(self.conv1(map_input))
         x = F.relu(self.conv2(x))
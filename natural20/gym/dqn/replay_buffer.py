@@ -1,74 +1,244 @@
-import collections
-import torch
+"""Columnar replay buffer for the DQN trainer.
+
+Transitions are stored column by column in preallocated ring arrays: one
+array per observation field (``state.map``, ``state.health_pct``, ...) and
+its ``next_state`` twin, one per action component (``action.0`` ..
+``action.4``) and its ``next_action`` twin, plus ``reward`` and ``done``.
+``push`` writes a whole trajectory into the rings, and ``sample`` gathers
+a batch with one fancy index per column and hands the result to torch
+without any per-transition Python objects::
+
+    buffer = ReplayBuffer(100000, device, storage_path='runs/replay')
+    buffer.push(states, actions, rewards, infos, dones)
+    batch = buffer.sample(64)
+    q = model.forward_batch(batch.states, batch.actions)
+
+``next_action`` is the action taken in the next state, which is what the
+SARSA-style TD target of ``scripts/trainer.py`` evaluates. With
+``max_moves`` the next state's ``available_moves`` (up to ``max_moves``
+of them) are kept as well, for max-over-moves targets.
+
+With ``storage_path`` every column is a ``.npy`` file memory-mapped from
+that directory and the ring position is kept in ``meta.json``, so the
+buffer may be larger than RAM and is picked up again by the next training
+run that opens the same directory. The files are synced every
+``flush_every`` trajectories and by ``flush()``; call it before stopping.
+torch is only needed for ``sample`` and ``action_tensors``.
+"""
+import json
+import os
+from collections import namedtuple
 import numpy as np
-import sys
+
+# action component shapes/dtypes of a move (type, (x, y), (x, y), p3, p4)
+ACTION_COLUMNS = (((), np.int64), ((2,), np.float32), ((2,), np.float32), ((), np.int64), ((), np.int64))
+
+# a move flattened for the next_moves column
+MOVE_WIDTH = 7
+
+Transitions = namedtuple('Transitions', ['states', 'actions', 'rewards', 'next_states', 'next_actions',
+                                         'dones', 'next_moves'])
+
+
+def observation_columns(view_port_size=(12, 12)):
+    """Shape and dtype of every stored observation field (one transition)."""
+    width, height = view_port_size
+    return {
+        'map': ((width, height, 5), np.int16),
+        'conditions': ((8,), np.float32),
+        'enemy_conditions': ((8,), np.float32),
+        'health_enemy': ((1,), np.float32),
+        'health_pct': ((1,), np.float32),
+        'enemy_reactions': ((1,), np.float32),
+        'movement': ((1,), np.float32),  # scaled to [0, 1] on push
+        'turn_info': ((3,), np.float32),
+        'ability_info': ((8,), np.float32),
+        'player_type': ((), np.int64),
+        'enemy_type': ((), np.int64),
+        'player_ac': ((1,), np.float32),
+        'enemy_ac': ((1,), np.float32),
+        'is_reaction': ((1,), np.float32),
+        'player_equipped': ((5,), np.int64),
+    }
+
+
+def _flatten_move(move):
+    action_type, param1, param2, param3, param4 = move
+    return [int(np.asarray(action_type).reshape(-1)[0]), *np.asarray(param1).reshape(2).tolist(),
+            *np.asarray(param2).reshape(2).tolist(), int(param3), int(param4)]
+
+
+def _unflatten_move(row):
+    row = [int(v) for v in row]
+    return (row[0], (row[1], row[2]), (row[3], row[4]), row[5], row[6])
+
 
 class ReplayBuffer:
-    def __init__(self, capacity, device):
-        self.buffer = collections.deque(maxlen=capacity)
+    def __init__(self, capacity, device, view_port_size=(12, 12), storage_path=None, max_moves=0, flush_every=64):
+        self.capacity = capacity
         self.device = device
- 
+        self.storage_path = storage_path
+        self.flush_every = flush_every
+        self._unflushed = 0  # trajectories pushed since the last flush
+        self.max_moves = max_moves
+        self.observation_layout = observation_columns(view_port_size)
+        self.position = 0  # next slot to write
+        self.size = 0
+
+        layout = {}
+        for prefix in ('state', 'next_state'):
+            for name, spec in self.observation_layout.items():
+                layout[f"{prefix}.{name}"] = spec
+        for prefix in ('action', 'next_action'):
+            for index, spec in enumerate(ACTION_COLUMNS):
+                layout[f"{prefix}.{index}"] = spec
+        layout['reward'] = ((), np.float32)
+        layout['done'] = ((), np.float32)
+        if max_moves:
+            layout['next_moves'] = ((max_moves, MOVE_WIDTH), np.int16)
+            layout['next_move_count'] = ((), np.int16)
+
+        if storage_path:
+            self.columns = self._open_storage(layout)
+        else:
+            self.columns = {name: np.zeros((capacity,) + shape, dtype=dtype)
+                            for name, (shape, dtype) in layout.items()}
+
+    def _meta_path(self):
+        return os.path.join(self.storage_path, 'meta.json')
+
+    def _open_storage(self, layout):
+        os.makedirs(self.storage_path, exist_ok=True)
+        if os.path.exists(self._meta_path()):
+            with open(self._meta_path(), encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta['capacity'] != self.capacity:
+                raise ValueError(f"replay buffer at {self.storage_path} has capacity {meta['capacity']}, "
+                                 f"not {self.capacity}")
+            self.position, self.size = meta['position'], meta['size']
+
+        columns = {}
+        for name, (shape, dtype) in layout.items():
+            path = os.path.join(self.storage_path, f"{name}.npy")
+            shape = (self.capacity,) + shape
+            if os.path.exists(path):
+                column = np.lib.format.open_memmap(path, mode='r+')
+                if column.shape != shape or column.dtype != dtype:
+                    raise ValueError(f"{path} holds {column.dtype}{column.shape}, expected {np.dtype(dtype)}{shape}")
+            else:
+                column = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape)
+            columns[name] = column
+        return columns
+
+    def flush(self):
+        """Write memory-mapped columns and the ring position to disk."""
+        self._unflushed = 0
+        if not self.storage_path:
+            return
+        for column in self.columns.values():
+            column.flush()
+        with open(self._meta_path(), 'w', encoding='utf-8') as f:
+            json.dump({'capacity': self.capacity, 'position': self.position, 'size': self.size}, f)
+
+    def _write_state(self, prefix, slot, state):
+        for name, (shape, _) in self.observation_layout.items():
+            column = self.columns[f"{prefix}.{name}"]
+            if state is None:
+                # the environment ended the episode without a final observation
+                column[slot] = 0
+            else:
+                column[slot] = np.asarray(state[name]).reshape(shape)
+        if state is not None:
+            self.columns[f"{prefix}.movement"][slot] /= 255.0
+
+    def _write_action(self, prefix, slot, action):
+        for index, (shape, _) in enumerate(ACTION_COLUMNS):
+            self.columns[f"{prefix}.{index}"][slot] = np.asarray(action[index]).reshape(shape)
+
     def push(self, states, actions, rewards, infos, is_terminal):
-        converted_states = []
-        converted_actions = []
-        for x in states:
-            health_enemy, health_pct, condition, enemy_condition, enemy_reaction, map_input, movement, \
-                    turn_info, ability_info, player_type, enemy_type, player_ac, enemy_ac, player_equipped, \
-                    is_reaction = \
-                    x['health_enemy'], x['health_pct'], x['conditions'], x['enemy_conditions'], \
-                    x['enemy_reactions'], x['map'], x['movement'], \
-                    x['turn_info'], x['ability_info'], x['player_type'], x['enemy_type'], \
-                    x['player_ac'], x['enemy_ac'], x['player_equipped'], x['is_reaction']
-            state = {}
-            state['map'] = torch.tensor(map_input, dtype=torch.int).to(self.device)
-            state['conditions'] = torch.tensor(condition, dtype=torch.float32)
-            state['enemy_conditions'] = torch.tensor(enemy_condition, dtype=torch.float32)
-            state['health_enemy'] = torch.tensor(health_enemy, dtype=torch.float32)
-            state['health_pct'] = torch.tensor(health_pct, dtype=torch.float32)
-            state['enemy_reactions'] = torch.tensor(enemy_reaction, dtype=torch.float32)
-            state['movement'] = torch.tensor(movement / 255.0, dtype=torch.float32)
-            state['turn_info'] = torch.tensor(turn_info, dtype=torch.float32)
-            state['ability_info'] = torch.tensor(ability_info, dtype=torch.float32)
-            state['player_type'] = torch.tensor(player_type[0], dtype=torch.long)
-            state['enemy_type'] = torch.tensor(enemy_type[0], dtype=torch.long)
-            state['player_ac'] = torch.tensor(player_ac, dtype=torch.float32)
-            state['enemy_ac'] = torch.tensor(enemy_ac, dtype=torch.float32)
-            state['is_reaction'] = torch.tensor(is_reaction, dtype=torch.float32)
-            state['player_equipped'] = torch.tensor(player_equipped, dtype=torch.long).to(self.device).unsqueeze(1)
-            converted_states.append(state)
-
-        for a in actions:
-            action1, action2, action3, action4, action5 = a
-            converted_actions.append((torch.tensor(action1, dtype=torch.long),
-                                        torch.tensor(action2, dtype=torch.float32),
-                                        torch.tensor(action3, dtype=torch.float32),
-                                        torch.tensor(action4, dtype=torch.long),
-                                        torch.tensor(action5, dtype=torch.long)))
-
-        self.buffer.append((converted_states, converted_actions, rewards, infos, is_terminal))
+        """Store a trajectory as ``len(rewards)`` transitions.
+
+        ``states``, ``actions`` and ``infos`` have one more entry than
+        ``rewards`` (the final state with a placeholder action), as
+        produced by ``generate_trajectory``; ``is_terminal`` holds the done
+        flag of every step.
+        """
+        count = len(rewards)
+        # a trajectory longer than the buffer only keeps its tail
+        start = max(0, count - self.capacity)
+        for step in range(start, count):
+            slot = self.position
+            self._write_state('state', slot, states[step])
+            self._write_state('next_state', slot, states[step + 1])
+            self._write_action('action', slot, actions[step])
+            self._write_action('next_action', slot, actions[step + 1])
+            self.columns['reward'][slot] = rewards[step]
+            self.columns['done'][slot] = float(is_terminal[step])
+            if self.max_moves:
+                info = infos[step + 1] if infos is not None and step + 1 < len(infos) else None
+                moves = (info or {}).get('available_moves') or []
+                moves = moves[:self.max_moves]
+                self.columns['next_move_count'][slot] = len(moves)
+                if moves:
+                    self.columns['next_moves'][slot, :len(moves)] = [_flatten_move(move) for move in moves]
+            self.position = (self.position + 1) % self.capacity
+            self.size = min(self.size + 1, self.capacity)
+        self._unflushed += 1
+        if self._unflushed >= self.flush_every:
+            self.flush()
+
+    def _tensor(self, array, dtype=None):
+        """``array`` as a tensor on the buffer's device (``dtype``: name of a torch dtype)."""
+        import torch
+
+        tensor = torch.from_numpy(np.ascontiguousarray(array))
+        if dtype is not None:
+            tensor = tensor.to(getattr(torch, dtype))
+        return tensor.to(self.device)
+
+    def _states(self, prefix, indices):
+        states = {}
+        for name in self.observation_layout:
+            column = self.columns[f"{prefix}.{name}"][indices]
+            states[name] = self._tensor(column, 'long' if name == 'map' else None)
+        return states
+
+    def _actions(self, prefix, indices):
+        return tuple(self._tensor(self.columns[f"{prefix}.{index}"][indices]) for index in range(len(ACTION_COLUMNS)))
 
     def sample(self, batch_size):
-        indices = np.random.choice(len(self.buffer), batch_size)
-        states, actions, rewards, infos, is_terminals = zip(*[self.buffer[idx] for idx in indices])
-        return states, actions, rewards, infos, is_terminals
+        """A uniform batch of transitions as batched tensors (see ``Transitions``)."""
+        indices = np.random.randint(0, self.size, size=batch_size)
+        next_moves = None
+        if self.max_moves:
+            counts = self.columns['next_move_count'][indices]
+            rows = self.columns['next_moves'][indices]
+            next_moves = [[_unflatten_move(row) for row in rows[i, :counts[i]]] for i in range(batch_size)]
+        return Transitions(
+            states=self._states('state', indices),
+            actions=self._actions('action', indices),
+            rewards=self._tensor(self.columns['reward'][indices]).unsqueeze(1),
+            next_states=self._states('next_state', indices),
+            next_actions=self._actions('next_action', indices),
+            dones=self._tensor(self.columns['done'][indices]).unsqueeze(1),
+            next_moves=next_moves,
+        )
+
+    def action_tensors(self, moves):
+        """Batched action tensors for a list of moves, as ``sample`` returns them."""
+        flat = np.array([_flatten_move(move) for move in moves], dtype=np.int64).reshape(len(moves), MOVE_WIDTH)
+        return (self._tensor(flat[:, 0]), self._tensor(flat[:, 1:3], 'float32'),
+                self._tensor(flat[:, 3:5], 'float32'), self._tensor(flat[:, 5]), self._tensor(flat[:, 6]))
 
     def __len__(self):
-        return len(self.buffer)
-    
+        return self.size
+
     def print_stats(self):
-        print(f"Buffer size: {len(self.buffer)}")
+        print(f"Buffer size: {self.size}/{self.capacity}")
         print(f"Memory usage: {self.memory_usage()} bytes")
-    
+        if self.storage_path:
+            print(f"Backing store: {self.storage_path}")
+
     # memory usage of the buffer in bytes
     def memory_usage(self):
-        total_size = 0
-        for item in self.buffer:
-            states, actions, rewards, infos, is_terminals = item
-            for s in states:
-                total_size += sys.getsizeof(s)
-            total_size += sys.getsizeof(actions)
-            total_size += sys.getsizeof(rewards)
-            total_size += sys.getsizeof(infos)
-            total_size += sys.getsizeof(is_terminals)
-
-        return total_size
\ No newline at end of file
+        return sum(column.nbytes for column in self.columns.values())
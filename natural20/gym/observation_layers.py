@@ -0,0 +1,293 @@
+"""Persistent NumPy layers behind the gym viewport observation.
+
+``render_terrain`` used to build its viewport tile by tile, asking the map
+for the object token, the occupying creature and that creature's
+allegiance, hit points and conditions for every square. ``ObservationLayers``
+keeps those facts as per-map arrays instead:
+
+* ``terrain``: the observation terrain code of every tile, derived once
+  when the layers are built and re-derived only for tiles the map's
+  ``TerrainGrid`` reports as refreshed since (doors, walls, dropped
+  objects, revealed secrets);
+* ``occupant``: the slot of the creature standing on each tile, restamped
+  only for creatures whose square or footprint changed since the last
+  encode (checked when the map's sight epoch moves);
+* per-slot ``entity_type``, ``health`` and ``status`` vectors, refreshed
+  for the creatures named by game events (damage, healing, conditions,
+  movement, ...) and for everybody when the battle epoch moves (turn
+  starts and committed actions, where effects are applied).
+
+A viewport is then a fancy-index slice of those layers, plus the current
+creature's allegiance to each slot and a visibility mask built from one
+``Map.visible_tiles`` pass bounded to the viewport's reach, so encoding
+costs a handful of array operations however large the viewport is.
+
+Layers are cached per map (``layers_for``) and go away with it.
+``N20_OBSERVATION_LAYERS=0`` makes ``render_terrain`` fall back to the
+tile-by-tile encoder.
+"""
+import os
+import weakref
+import numpy as np
+from natural20.utils.terrain_grid import HAS_OBJECTS, VOLATILE
+
+ENABLED = os.environ.get('N20_OBSERVATION_LAYERS', '1') not in ('0', 'false', 'no', 'off')
+
+# terrain code of a tile whose object token has no observation code
+UNKNOWN_TERRAIN = -1
+
+TERRAIN_CODES = {None: 1, '~': 3, 'o': 4, 'A': 5, '#': 2, '·': 1}
+
+SELF, OPPONENT, ALLY, NEUTRAL = 1, 2, 3, 4
+
+STATUS_PRONE = 1
+STATUS_DODGE = 2
+STATUS_UNCONSCIOUS = 16
+STATUS_DEAD = 32
+
+
+def object_token(battle_map, pos_x, pos_y):
+    """Token of the first visible object on a tile (``None`` if there is none)."""
+    object_meta = battle_map.object_at(pos_x, pos_y)
+    if not object_meta:
+        return None
+
+    m_x, m_y = battle_map.interactable_objects[object_meta]
+
+    if not object_meta.token():
+        return None
+    if object_meta.token() == 'inherit':
+        return 'inherit'
+
+    if isinstance(object_meta.token(), list):
+        return object_meta.token()[pos_y - m_y][pos_x - m_x]
+    return object_meta.token()
+
+
+def terrain_code(battle_map, pos_x, pos_y):
+    return TERRAIN_CODES.get(object_token(battle_map, pos_x, pos_y), UNKNOWN_TERRAIN)
+
+
+def entity_status(entity, battle):
+    """8-bit condition mask of the viewport's status channel."""
+    status = 0
+    if entity.prone():
+        status |= STATUS_PRONE
+    if entity.dodge(battle):
+        status |= STATUS_DODGE
+    if entity.unconscious():
+        status |= STATUS_UNCONSCIOUS
+    if entity.dead():
+        status |= STATUS_DEAD
+    return status
+
+
+def _footprint(entity):
+    size = entity.token_size() if hasattr(entity, 'token_size') else 1
+    if 'squeezed' in (getattr(entity, 'statuses', None) or ()):
+        size = max(1, size - 1)
+    return size
+
+
+def viewport_reach(viewer, view_port_size):
+    """Steps from any square of ``viewer`` a ``view_port_size`` viewport around it extends (``visible_tiles`` reach)."""
+    view_w, view_h = view_port_size
+    return (max(view_w, view_h) + 1) // 2 + _footprint(viewer)
+
+
+class _EventForwarder:
+    """Event listener that only holds its layers weakly and unsubscribes once they are gone."""
+
+    def __init__(self, layers, event_manager):
+        self.layers = weakref.ref(layers)
+        self.event_manager = event_manager
+
+    def __call__(self, event):
+        layers = self.layers()
+        if layers is None:
+            self.event_manager.unregister_event_listener('*', self)
+            return
+        layers.entity_changed(event.get('source'))
+        layers.entity_changed(event.get('target'))
+
+
+class ObservationLayers:
+    def __init__(self, battle_map, entity_type_mappings):
+        self._map = weakref.ref(battle_map)
+        self.entity_type_mappings = entity_type_mappings
+        width, height = battle_map.size
+        self.size = (width, height)
+
+        grid = battle_map.terrain_grid
+        self.terrain = np.ones((width, height), dtype=np.int16)
+        self._terrain_revision = grid.revision
+        for pos_x, pos_y in zip(*np.nonzero(grid.mask(HAS_OBJECTS))):
+            self.terrain[pos_x, pos_y] = terrain_code(battle_map, int(pos_x), int(pos_y))
+
+        self.occupant = np.full((width, height), -1, dtype=np.int32)
+        self.entities = []  # slot -> entity
+        self._slots = {}
+        self._stamped = {}  # slot -> (pos_x, pos_y, size)
+        self._sight_epoch = None
+        # slot vectors carry one spare trailing entry that empty tiles (occupant -1) index into
+        self.entity_type = np.zeros(1, dtype=np.int64)
+        self.health = np.zeros(1, dtype=np.int64)
+        self.status = np.zeros(1, dtype=np.int64)
+        self._stale = set()
+        self._battle_epoch = None
+
+        self._event_manager = battle_map.session.event_manager
+        self._listener = _EventForwarder(self, self._event_manager)
+        self._event_manager.register_event_listener('*', self._listener)
+
+    def close(self):
+        self._event_manager.unregister_event_listener('*', self._listener)
+
+    @property
+    def map(self):
+        return self._map()
+
+    def entity_changed(self, entity):
+        slot = self._slots.get(entity)
+        if slot is not None:
+            self._stale.add(slot)
+
+    def _slot_for(self, entity):
+        slot = self._slots.get(entity)
+        if slot is None:
+            slot = len(self.entities)
+            self.entities.append(entity)
+            self._slots[entity] = slot
+            for name in ('entity_type', 'health', 'status'):
+                vector = getattr(self, name)
+                if len(vector) <= slot + 1:
+                    grown = np.zeros(max(8, 2 * len(vector)), dtype=vector.dtype)
+                    grown[:len(vector) - 1] = vector[:-1]
+                    setattr(self, name, grown)
+            self.entity_type[slot] = self.entity_type_mappings.get(entity.class_descriptor(), 0)
+            self._stale.add(slot)
+        return slot
+
+    def _stamp(self, slot, placement):
+        stamped = self._stamped.get(slot)
+        if stamped == placement:
+            return
+        if stamped is not None:
+            pos_x, pos_y, size = stamped
+            tiles = self.occupant[pos_x:pos_x + size, pos_y:pos_y + size]
+            tiles[tiles == slot] = -1
+        if placement is None:
+            self._stamped.pop(slot, None)
+            return
+        pos_x, pos_y, size = placement
+        self.occupant[pos_x:pos_x + size, pos_y:pos_y + size] = slot
+        self._stamped[slot] = placement
+
+    def _sync_terrain(self, battle_map):
+        grid = battle_map.terrain_grid
+        if grid.revision == self._terrain_revision:
+            return
+        for pos_x, pos_y in zip(*grid.changed_since(self._terrain_revision)):
+            self.terrain[pos_x, pos_y] = terrain_code(battle_map, int(pos_x), int(pos_y))
+        self._terrain_revision = grid.revision
+
+    def _sync_occupants(self, battle_map):
+        if battle_map.sight_epoch == self._sight_epoch:
+            return
+        present = set()
+        for entity, (pos_x, pos_y) in battle_map.entities.items():
+            slot = self._slot_for(entity)
+            present.add(slot)
+            self._stamp(slot, (pos_x, pos_y, _footprint(entity)))
+        for slot in [slot for slot in self._stamped if slot not in present]:
+            self._stamp(slot, None)
+        self._sight_epoch = battle_map.sight_epoch
+
+    def _sync_entities(self, battle):
+        matrix = getattr(battle, 'visibility_matrix', None)
+        epoch = matrix.epoch if matrix is not None else None
+        if epoch is None or epoch != self._battle_epoch:
+            self._stale.update(self._stamped)
+            self._battle_epoch = epoch
+        for slot in self._stale:
+            entity = self.entities[slot]
+            self.health[slot] = int((entity.hp() / (entity.max_hp() + 0.00001)) * 255)
+            self.status[slot] = entity_status(entity, battle)
+        self._stale.clear()
+
+    def sync(self, battle):
+        battle_map = self.map
+        self._sync_terrain(battle_map)
+        self._sync_occupants(battle_map)
+        self._sync_entities(battle)
+
+    def allegiance(self, battle, viewer):
+        """Viewport allegiance code of every slot as seen by ``viewer`` (0 for the spare slot)."""
+        codes = np.zeros(len(self.entity_type), dtype=np.int64)
+        for slot in self._stamped:
+            entity = self.entities[slot]
+            if entity == viewer:
+                codes[slot] = SELF
+            elif battle.opposing(viewer, entity):
+                codes[slot] = OPPONENT
+            elif battle.allies(viewer, entity):
+                codes[slot] = ALLY
+            else:
+                codes[slot] = NEUTRAL
+        return codes
+
+    def viewport(self, battle, viewer, view_port_size=(12, 12)):
+        """``(rows, cols, 5)`` observation centered on ``viewer``, as ``render_terrain`` returns it."""
+        battle_map = self.map
+        self.sync(battle)
+        pos_x, pos_y = battle_map.position_of(viewer)
+        view_w, view_h = view_port_size
+        map_w, map_h = self.size
+        ys = pos_y + np.arange(-view_w//2, view_w//2)
+        xs = pos_x + np.arange(-view_h//2, view_h//2)
+        grid_x, grid_y = np.meshgrid(xs, ys)  # [row, col] -> (x, y)
+        in_bounds = (grid_x >= 0) & (grid_x < map_w) & (grid_y >= 0) & (grid_y < map_h)
+        tile_x = np.clip(grid_x, 0, map_w - 1)
+        tile_y = np.clip(grid_y, 0, map_h - 1)
+
+        visible_mask = np.zeros(self.size, dtype=bool)
+        # only sweep as far as the viewport reaches from any square of the viewer
+        visible = battle_map.visible_tiles(viewer, reach=viewport_reach(viewer, view_port_size))
+        if visible:
+            coords = np.array(list(visible), dtype=np.int64).reshape(-1, 2)
+            visible_mask[coords[:, 0], coords[:, 1]] = True
+        shown = in_bounds & visible_mask[tile_x, tile_y]
+
+        terrain = self.terrain[tile_x, tile_y]
+        volatile = shown & ((battle_map.terrain_grid.flags[tile_x, tile_y] & VOLATILE) != 0)
+        if volatile.any():
+            # objects that change without telling the map are read live
+            terrain = terrain.copy()
+            for row, col in zip(*np.nonzero(volatile)):
+                terrain[row, col] = terrain_code(battle_map, int(tile_x[row, col]), int(tile_y[row, col]))
+        unknown = shown & (terrain == UNKNOWN_TERRAIN)
+        if unknown.any():
+            row, col = (int(v[0]) for v in np.nonzero(unknown))
+            token = object_token(battle_map, int(tile_x[row, col]), int(tile_y[row, col]))
+            raise ValueError(f"Unknown terrain {token}")
+
+        slots = self.occupant[tile_x, tile_y]  # -1 picks the spare all-zero entry
+        result = np.stack([self.entity_type[slots], terrain.astype(np.int64), self.allegiance(battle, viewer)[slots],
+                           self.health[slots], self.status[slots]], axis=-1)
+        result[~shown] = 255
+        result[~in_bounds] = 0
+        return result
+
+
+_layers = weakref.WeakKeyDictionary()
+
+
+def layers_for(battle_map, entity_type_mappings):
+    """The ``ObservationLayers`` of ``battle_map``, built on first use."""
+    layers = _layers.get(battle_map)
+    if layers is None or layers.entity_type_mappings is not entity_type_mappings:
+        if layers is not None:
+            layers.close()
+        layers = ObservationLayers(battle_map, entity_type_mappings)
+        _layers[battle_map] = layers
+    return layers
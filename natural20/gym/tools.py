@@ -1,6 +1,8 @@
 import numpy as np
 from natural20.entity import Entity
 from natural20.player_character import PlayerCharacter
+from natural20.gym import observation_layers
+from natural20.gym.observation_layers import object_token as render_object_token
 # from natural20.actions.look_action import LookAction
 # from natural20.actions.stand_action import StandAction
 
@@ -187,36 +189,33 @@ def dndenv_action_to_nat20action(entity, battle, map, available_actions, gym_act
     # blocking in an interactive debugger or crashing the episode.
     return None
 
-def render_object_token(map, pos_x, pos_y):
-    object_meta = map.object_at(pos_x, pos_y)
-    if not object_meta:
-        return None
-
-    m_x, m_y = map.interactable_objects[object_meta]
-
-    if not object_meta.token():
-        return None
-    if object_meta.token() == 'inherit':
-        return 'inherit'
-
-    if isinstance(object_meta.token(), list):
-        return object_meta.token()[pos_y - m_y][pos_x - m_x]
-    else:
-        return object_meta.token()
-
 def render_terrain(battle, map, entity_type_mappings, view_port_size=(12, 12)):
+    """
+    Viewport observation around the creature whose turn it is (see natural20.gym.observation_layers)
+    """
+    if observation_layers.ENABLED:
+        layers = observation_layers.layers_for(map, entity_type_mappings)
+        return layers.viewport(battle, battle.current_turn(), view_port_size)
+    return render_terrain_tiles(battle, map, entity_type_mappings, view_port_size)
+
+def render_terrain_tiles(battle, map, entity_type_mappings, view_port_size=(12, 12)):
+    """
+    Tile-by-tile reference encoder behind render_terrain
+    """
     result = []
     current_player = battle.current_turn()
     pos_x, pos_y = map.position_of(current_player)
     view_w, view_h = view_port_size
     map_w, map_h = map.size
+    visible = map.visible_tiles(current_player,
+                                reach=observation_layers.viewport_reach(current_player, view_port_size))
     for y in range(-view_w//2, view_w//2):
         col_arr = []
         for x in range(-view_h//2, view_h//2):
             if pos_x + x < 0 or pos_x + x >= map_w or pos_y + y < 0 or pos_y + y >= map_h:
                 col_arr.append([0, 0, 0, 0, 0])
             else:
-                if not map.can_see_square(current_player,(pos_x + x, pos_y + y)):
+                if (pos_x + x, pos_y + y) not in visible:
                     col_arr.append([255, 255, 255, 255, 255])
                 else:
                     terrain = render_object_token(map, pos_x + x, pos_y + y)
@@ -0,0 +1,128 @@
+"""Vectorized ``dndenv`` for batched rollouts.
+
+``make_vector_env(num_envs, asynchronous=False, **dndenv_kwargs)`` returns
+a ``gymnasium.vector`` environment that steps ``num_envs`` independent
+battles:
+
+* synchronous (``SyncVectorEnv``): all environments in this process, the
+  simplest way to batch policy evaluation;
+* asynchronous (``AsyncVectorEnv`` with shared memory): one subprocess per
+  environment, stepping in parallel. Workers write their observations
+  straight into the shared observation buffers, so nothing but actions,
+  rewards and infos crosses the pipes (infos name entities by uid, see
+  ``VectorSlotEnv``).
+
+In both cases the batched observation is a dict of preallocated arrays
+shaped ``(num_envs, ...)`` that each step is written into in place (pass
+``copy=False`` to receive the buffers themselves instead of copies).
+
+Each environment owns one ``Session`` for its whole life, so campaign
+data (weapons, spells, NPC sheets, embedding tables) is loaded once per
+environment instead of once per episode.
+
+Actions are the per-environment moves from ``infos['available_moves']``,
+packed with ``batch_moves``::
+
+    envs = make_vector_env(8, asynchronous=True, root_path='templates')
+    obs, infos = envs.reset(seed=42)
+    moves = [random.choice(infos['available_moves'][i]) for i in range(envs.num_envs)]
+    obs, rewards, dones, truncateds, infos = envs.step(batch_moves(moves))
+
+Finished episodes reset on the following ``step`` (gymnasium's default
+next-step autoreset); the action given for that environment is ignored.
+"""
+import random
+import gymnasium as gym
+import numpy as np
+from gymnasium.vector import AsyncVectorEnv, SyncVectorEnv
+from natural20.event_manager import EventManager
+from natural20.gym.dndenv import dndenv
+from natural20.session import Session
+
+
+def batch_moves(moves):
+    """Pack per-environment moves ``(type, (x, y), (x, y), p3, p4)`` into a batched action."""
+    return (
+        np.array([[move[0]] for move in moves], dtype=np.int64),
+        np.array([move[1] for move in moves], dtype=np.int64).reshape(len(moves), 2),
+        np.array([move[2] for move in moves], dtype=np.int64).reshape(len(moves), 2),
+        np.array([move[3] for move in moves], dtype=np.int64),
+        np.array([move[4] for move in moves], dtype=np.int64),
+    )
+
+
+def unbatch_move(action):
+    """Inverse of ``batch_moves`` for one environment's slice of the action."""
+    action_type, param1, param2, param3, param4 = action
+    return (int(np.asarray(action_type).reshape(-1)[0]),
+            tuple(int(v) for v in np.asarray(param1).reshape(-1)),
+            tuple(int(v) for v in np.asarray(param2).reshape(-1)),
+            int(param3), int(param4))
+
+
+class VectorSlotEnv(gym.Wrapper):
+    """Adapts one ``dndenv`` to the vector API.
+
+    Converts batched action slices back to move tuples, casts observation
+    fields to the observation space dtypes (the batch buffers are typed by
+    the space), and draws episode seeds from its own generator so forked
+    workers do not replay the same battles. With ``portable_info`` the
+    ``players``/``enemies`` entries of the info dict hold entity uids
+    instead of entities, so infos can be sent between processes.
+    """
+
+    def __init__(self, env, portable_info=False):
+        super().__init__(env)
+        self.portable_info = portable_info
+        self._episode_seeds = random.Random()
+
+    def _cast(self, observation):
+        spaces = self.observation_space.spaces
+        return {key: np.asarray(value, dtype=spaces[key].dtype) for key, value in observation.items()}
+
+    def _info(self, info):
+        if not self.portable_info or not info:
+            return info
+        info = dict(info)
+        for key in ('players', 'enemies'):
+            if key in info:
+                info[key] = [entity.entity_uid for entity in info[key]]
+        return info
+
+    def reset(self, *, seed=None, options=None):
+        if seed is None:
+            seed = self._episode_seeds.randint(0, 1000000)
+        observation, info = self.env.reset(seed=seed, **(options or {}))
+        return self._cast(observation), self._info(info)
+
+    def step(self, action):
+        observation, reward, done, truncated, info = self.env.step(unbatch_move(action))
+        if observation is None:
+            # dndenv stops at max_rounds without building an observation
+            observation, info = self.env.unwrapped._terminal_observation()
+        return self._cast(observation), reward, done, truncated, self._info(info)
+
+
+def _env_factory(env_kwargs, portable_info=False):
+    def make():
+        kwargs = dict(env_kwargs)
+        if 'custom_session' not in kwargs:
+            event_manager = kwargs.get('event_manager') or EventManager()
+            if kwargs.get('show_logs'):
+                event_manager.standard_cli()
+            # one session per environment, reused by every reset
+            kwargs['custom_session'] = Session(kwargs.get('root_path', 'templates'), event_manager=event_manager)
+        return VectorSlotEnv(dndenv(**kwargs), portable_info=portable_info)
+    return make
+
+
+def make_vector_env(num_envs, asynchronous=False, copy=True, context=None, **env_kwargs):
+    """``num_envs`` copies of ``dndenv(**env_kwargs)`` behind a gymnasium vector env.
+
+    ``context`` selects the multiprocessing start method of the
+    asynchronous variant (default: the platform default).
+    """
+    env_fns = [_env_factory(env_kwargs, portable_info=asynchronous) for _ in range(num_envs)]
+    if asynchronous:
+        return AsyncVectorEnv(env_fns, shared_memory=True, copy=copy, context=context)
+    return SyncVectorEnv(env_fns, copy=copy)
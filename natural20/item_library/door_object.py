@@ -102,10 +102,12 @@ class DoorObject(Object):
 
     def open(self):
         self.state = "opened"
+        self.refresh_map_terrain()
         return self.resolve_trigger("open")
 
     def close(self):
         self.state = "closed"
+        self.refresh_map_terrain()
         return self.resolve_trigger("close")
 
     def token(self):
@@ -439,6 +441,7 @@ class DoorObject(Object):
             self.activated = False
         else:
             raise ValueError("Invalid state for door object: %s" % state)
+        self.refresh_map_terrain()
 
     def to_dict(self):
         hash = super().to_dict()
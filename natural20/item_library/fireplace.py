@@ -72,6 +72,7 @@ class Fireplace(Object):
             action = result.get('action')
             if action == 'light':
                 self.lit = True
+                self.lighting_changed()
                 if self.session:
                     self.session.event_manager.received_event({
                         'source': entity,
@@ -83,6 +84,7 @@ class Fireplace(Object):
                     })
             elif action == 'put_out':
                 self.lit = False
+                self.lighting_changed()
                 if self.session:
                     self.session.event_manager.received_event({
                         'source': entity,
@@ -97,6 +99,7 @@ class Fireplace(Object):
     def take_damage(self, dmg, battle=None, damage_type='piercing', **kwargs):
         if damage_type == 'fire' and not self.lit and not self.dead():
             self.lit = True
+            self.lighting_changed()
             if self.session:
                 self.session.event_manager.received_event({
                     'source': self,
@@ -109,6 +112,7 @@ class Fireplace(Object):
         super().take_damage(dmg, battle=battle, damage_type=damage_type, **kwargs)
         if self.dead() and self.lit:
             self.lit = False
+            self.lighting_changed()
 
     def light_properties(self):
         if self.lit and not self.dead():
@@ -106,8 +106,19 @@ class Object(Entity, Container, EventLoader, Annotatable):
 
     def reveal(self):
         self.is_concealed = False
+        self.refresh_map_terrain()
         self.trigger_event('reveal', None, self.session, self.map, None)
 
+    def refresh_map_terrain(self):
+        """Tell the owning map that how this object blocks sight or movement changed."""
+        refresh = getattr(self.map, 'refresh_object_terrain', None)
+        if refresh is not None:
+            refresh(self)
+
+    def make_dead(self, battle=None):
+        super().make_dead(battle=battle)
+        self.refresh_map_terrain()
+
     def name(self) -> str:
         return self._name
 
@@ -495,6 +506,7 @@ class Object(Entity, Container, EventLoader, Annotatable):
             self.activated = True
         if state == 'deactivated':
             self.activated = False
+        self.refresh_map_terrain()
 
     def to_dict(self):
         _inventory = None
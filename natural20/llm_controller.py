@@ -2,6 +2,9 @@ import json
 import os
 import random
 import re
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Tuple, Any
 
 from natural20.generic_controller import GenericController
@@ -12,6 +15,7 @@ from natural20.actions.spell_action import SpellAction
 from natural20.actions.look_action import LookAction
 from natural20.map_renderer import MapRenderer
 from natural20.ai.path_compute import PathCompute
+from natural20.battle_snapshot import copy_state
 
 # Optional import of webapp LLM provider abstraction; keep controller decoupled if unavailable
 try:
@@ -23,6 +27,49 @@ except Exception:
 	AnthropicProvider = None  # type: ignore
 	LlamaCppProvider = None  # type: ignore
 
+# Speculative decisions for upcoming turns (see LlmMcpController.prefetch_upcoming):
+# how many LLM-controlled creatures ahead in initiative order to ask for, and
+# how many of those requests may be in flight at once
+PREFETCH_DEPTH = int(os.getenv("N20_LLM_PREFETCH_DEPTH", "2"))
+PREFETCH_CONCURRENCY = int(os.getenv("N20_LLM_PREFETCH_CONCURRENCY", "2"))
+
+_prefetch_pools: dict = {}
+_prefetch_pools_lock = threading.Lock()
+
+
+def _prefetch_pool(concurrency: int) -> ThreadPoolExecutor:
+	"""Shared worker pool (one per size) the prefetch requests run on."""
+	with _prefetch_pools_lock:
+		pool = _prefetch_pools.get(concurrency)
+		if pool is None:
+			pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="n20-llm-prefetch")
+			_prefetch_pools[concurrency] = pool
+		return pool
+
+
+class PrefetchedDecision:
+	"""An LLM choice requested ahead of a creature's turn.
+
+	``fingerprint`` is the state the prompt was built from and ``signatures``
+	identify the actions it offered; the choice is only used while the
+	fingerprint still matches.
+	"""
+
+	def __init__(self, fingerprint, signatures, future):
+		self.fingerprint = fingerprint
+		self.signatures = signatures
+		self.future = future
+
+	def choice(self):
+		"""Signature of the chosen action (waits for the reply), or None."""
+		try:
+			idx = self.future.result()
+		except Exception:
+			return None
+		if idx is None or not 0 <= idx < len(self.signatures):
+			return None
+		return self.signatures[idx]
+
 
 class LlmMcpController(GenericController):
 	"""
@@ -39,6 +86,10 @@ class LlmMcpController(GenericController):
 	- Includes received conversations from entity's memory buffer
 	- Allows LLM to record short-term and long-term goals in session-persistent context
 	- Allows LLM to communicate with other NPCs and players
+	- While a turn resolves, asks ahead (concurrently) for the next ``prefetch_depth`` LLM-controlled
+	  creatures in initiative order; a prefetched choice is used when the creature's turn starts only
+	  if positions, hit points and visible creatures are unchanged (N20_LLM_PREFETCH_DEPTH,
+	  N20_LLM_PREFETCH_CONCURRENCY)
 	"""
 
 	# Tool definitions for goal management and communication
@@ -337,7 +388,13 @@ class LlmMcpController(GenericController):
 		},
 	]
 
-	def __init__(self, session, valid_move_types=None, llm_client=None, model: Optional[str] = None, use_tools: bool = True, llm_provider=None):
+	CHOICE_INSTRUCTIONS = (
+		"You are a tactical assistant. Given a list of actions indexed from 0, choose the single best index. "
+		"Respond with ONLY the integer index (no text)."
+	)
+
+	def __init__(self, session, valid_move_types=None, llm_client=None, model: Optional[str] = None, use_tools: bool = True, llm_provider=None,
+		prefetch_depth: Optional[int] = None, prefetch_concurrency: Optional[int] = None):
 		super().__init__(session, valid_move_types)
 		self.client = llm_client  # expected to be OpenAI-like client; optional
 		self.model = model or os.getenv("N20_LLM_MODEL", "gpt-4o-mini")
@@ -347,6 +404,14 @@ class LlmMcpController(GenericController):
 		# Session-persistent context for each entity (keyed by entity UID)
 		# Stores: short_term_goal, long_term_goal, memory_notes, action_history_summary
 		self._entity_context: dict[str, dict] = {}
+		# Dijkstra fields shared by the pathfinding tools of one tool-call batch
+		# (None outside of _process_goal_tool_calls)
+		self._reachability_cache: Optional[dict] = None
+		# Speculative decisions for creatures whose turn has not started (keyed by entity UID)
+		self.prefetch_depth = PREFETCH_DEPTH if prefetch_depth is None else prefetch_depth
+		self.prefetch_concurrency = max(1, PREFETCH_CONCURRENCY if prefetch_concurrency is None else prefetch_concurrency)
+		self._prefetched: dict[str, PrefetchedDecision] = {}
+		self.prefetch_stats = Counter()  # requested, reused, discarded
 
 	def _default_provider(self):
 		"""
@@ -648,6 +713,7 @@ class LlmMcpController(GenericController):
 		Returns a list of results for informational tools (perception/pathfinding).
 		"""
 		results = []
+		self._reachability_cache = {}
 		for call in tool_calls:
 			try:
 				func_name = call.get('function', {}).get('name', '')
@@ -696,6 +762,7 @@ class LlmMcpController(GenericController):
 					results.append({'tool': func_name, 'result': result})
 			except Exception:
 				pass  # Silently ignore malformed tool calls
+		self._reachability_cache = None
 		return results
 
 	def _handle_speak(self, entity, battle, args: dict) -> None:
@@ -1122,6 +1189,19 @@ class LlmMcpController(GenericController):
 		except Exception as e:
 			return {'error': str(e)}
 
+	def _reachability(self, entity, battle, current_map, movement_left=None):
+		"""Dijkstra field from the entity's tile, reused across the tool calls of one batch."""
+		source = tuple(current_map.position_of(entity))
+		key = (id(battle), id(entity), id(current_map), source, movement_left)
+		cache = self._reachability_cache
+		field = cache.get(key) if cache is not None else None
+		if field is None:
+			field = PathCompute(battle, current_map, entity).reachability(
+				source[0], source[1], available_movement_cost=movement_left)
+			if cache is not None:
+				cache[key] = field
+		return field
+
 	def _handle_compute_path_to_entity(self, entity, battle, args: dict) -> dict:
 		"""
 		Compute the shortest path to get adjacent to a named entity.
@@ -1165,12 +1245,12 @@ class LlmMcpController(GenericController):
 				return {'error': f'No reachable positions adjacent to {entity_name}'}
 			
 			# Find the shortest path to any adjacent position
-			path_compute = PathCompute(battle, current_map, entity)
+			reachability = self._reachability(entity, battle, current_map)
 			best_path = None
 			best_dest = None
 			
 			for adj_pos in adjacent_positions:
-				path = path_compute.compute_path(source_x, source_y, adj_pos[0], adj_pos[1])
+				path = reachability.path_to(adj_pos[0], adj_pos[1]) if reachability else None
 				if path:
 					if best_path is None or len(path) < len(best_path):
 						best_path = path
@@ -1238,58 +1318,21 @@ class LlmMcpController(GenericController):
 					'count': 0
 				}
 			
-			# BFS to find reachable positions
-			from collections import deque
-			visited = {(source_x, source_y): 0}
-			queue = deque([(source_x, source_y, 0)])
+			# One Dijkstra flood over the movement budget; positions come out cheapest first
+			reachability = self._reachability(entity, battle, current_map, movement_left)
 			reachable = []
-			
-			while queue and len(reachable) < max_positions * 2:  # Gather more, then trim
-				cx, cy, cost = queue.popleft()
-				
-				if cost > 0:  # Don't include starting position
-					triggers_oa, oa_foe = self._move_oa_info(battle, entity, [(source_x, source_y), (cx, cy)])
-					reachable.append({
-						'position': [cx, cy],
-						'movement_cost_ft': cost * feet_per,
-						'triggers_oa': triggers_oa,
-						'oa_from': oa_foe
-					})
-				
-				# Explore neighbors
-				for dx in [-1, 0, 1]:
-					for dy in [-1, 0, 1]:
-						if dx == 0 and dy == 0:
-							continue
-						nx, ny = cx + dx, cy + dy
-						
-						# Skip if out of bounds
-						if not (0 <= nx < current_map.size[0] and 0 <= ny < current_map.size[1]):
-							continue
-						
-						# Calculate move cost (diagonal = 1.5 rounded, or use map's method)
-						move_cost = 1 if dx == 0 or dy == 0 else 1
-						if hasattr(current_map, 'difficult_terrain') and current_map.difficult_terrain(entity, nx, ny, battle):
-							move_cost = 2
-						
-						new_cost = cost + move_cost
-						
-						# Skip if already visited with lower cost or exceeds budget
-						if (nx, ny) in visited and visited[(nx, ny)] <= new_cost:
-							continue
-						if new_cost > movement_grids:
-							continue
-						
-						# Skip if not passable
-						if not current_map.passable(entity, nx, ny, battle, allow_squeeze=True):
-							continue
-						
-						visited[(nx, ny)] = new_cost
-						queue.append((nx, ny, new_cost))
-			
-			# Sort by cost and limit
-			reachable.sort(key=lambda x: x['movement_cost_ft'])
-			reachable = reachable[:max_positions]
+			for cx, cy in (reachability.positions() if reachability else []):
+				if (cx, cy) == (source_x, source_y):  # Don't include starting position
+					continue
+				if len(reachable) >= max_positions:
+					break
+				triggers_oa, oa_foe = self._move_oa_info(battle, entity, reachability.path_to(cx, cy))
+				reachable.append({
+					'position': [cx, cy],
+					'movement_cost_ft': reachability.movement_cost(cx, cy),
+					'triggers_oa': triggers_oa,
+					'oa_from': oa_foe
+				})
 			
 			return {
 				'my_position': list(my_pos),
@@ -1419,10 +1462,22 @@ class LlmMcpController(GenericController):
 		if not available_actions:
 			return None
 
+		# Ask ahead for the creatures acting after this one while this turn resolves
+		if battle is not None:
+			try:
+				self.prefetch_upcoming(battle, entity)
+			except Exception:
+				pass
+
 		# If only one action, just take it
 		if len(available_actions) == 1:
 			return available_actions[0]
 
+		if battle is not None:
+			prefetched = self._take_prefetched(battle, entity, available_actions)
+			if prefetched is not None:
+				return self._maybe_enrich_action_targets(battle, entity, prefetched)
+
 		# Try LLM path first, then fallback to heuristic ranking
 		try:
 			idx = self._ask_llm_for_choice(battle, entity, available_actions)
@@ -1450,16 +1505,8 @@ class LlmMcpController(GenericController):
 		prov = getattr(self, "llm_provider", None)
 		if prov is not None and hasattr(prov, "send_message"):
 			try:
-				instructions = (
-					"You are a tactical assistant. Given a list of actions indexed from 0, choose the single best index. "
-					"Respond with ONLY the integer index (no text)."
-				)
-				messages = [
-					{"role": "system", "content": instructions},
-					{"role": "user", "content": prompt},
-				]
 				from natural20.concurrency import run_blocking
-				text = run_blocking(prov.send_message, messages)  # type: ignore[attr-defined]
+				text = run_blocking(prov.send_message, self._choice_messages(prompt))  # type: ignore[attr-defined]
 				idx = self._local_parse_choice_from_text(text, len(available_actions))
 				if idx is not None:
 					return idx
@@ -1549,6 +1596,166 @@ class LlmMcpController(GenericController):
 		text = resp.choices[0].message.content or ""
 		return self._local_parse_choice_from_text(text, len(available_actions))
 
+	def _choice_messages(self, prompt: str) -> List[dict]:
+		return [
+			{"role": "system", "content": self.CHOICE_INSTRUCTIONS},
+			{"role": "user", "content": prompt},
+		]
+
+	# --- Speculative decisions for upcoming turns ---
+	def _prefetch_provider(self):
+		"""Provider prefetch requests go to; None when decisions come from an MCP endpoint or nowhere."""
+		if os.getenv("N20_MCP_URL"):
+			return None
+		prov = getattr(self, "llm_provider", None)
+		if prov is None or not hasattr(prov, "send_message"):
+			return None
+		return prov
+
+	def _action_signature(self, action: Action) -> tuple:
+		"""Identity of an action across separately built action lists."""
+		def ref(value):
+			if isinstance(value, (list, tuple)):
+				return tuple(ref(v) for v in value)
+			return getattr(value, 'entity_uid', None) or str(value)
+
+		path = getattr(action, 'move_path', None)
+		return (
+			type(action).__name__,
+			getattr(action, 'action_type', None),
+			self._action_short_desc(action),
+			ref(getattr(action, 'target', None)),
+			ref(path) if path else None,
+			bool(getattr(action, 'as_reaction', False)),
+		)
+
+	def _decision_fingerprint(self, battle, entity) -> tuple:
+		"""What a decision for ``entity`` depends on: its own and every visible creature's position,
+		hit points and standing, plus the goals and notes that go into its prompt."""
+		current_map = battle.map_for(entity)
+
+		def creature(other, pos):
+			return (other.entity_uid, tuple(pos) if pos else None, other.hp(),
+				other.prone(), other.unconscious(), other.dead())
+
+		visible = current_map.look(entity) if current_map else {}
+		ctx = self._get_entity_context(entity)
+		return (
+			creature(entity, current_map.position_of(entity) if current_map else None),
+			tuple(sorted(creature(other, pos) for other, pos in visible.items() if other is not entity)),
+			ctx.get('short_term_goal'),
+			ctx.get('long_term_goal'),
+			tuple(ctx.get('memory_notes') or ()),
+		)
+
+	def prefetch_upcoming(self, battle, entity=None) -> list:
+		"""
+		Request decisions for the next ``prefetch_depth`` LLM-controlled creatures after
+		``entity`` (default: whoever's turn it is) in initiative order. Returns the
+		creatures that have a pending decision.
+		"""
+		if battle is None or self.prefetch_depth <= 0:
+			return []
+		order = list(getattr(battle, 'combat_order', None) or [])
+		if not order:
+			return []
+		anchor = entity if entity is not None else battle.current_turn()
+		start = order.index(anchor) if anchor in order else battle.current_turn_index
+		considered = 0
+		pending = []
+		for offset in range(1, len(order)):
+			if considered >= self.prefetch_depth:
+				break
+			other = order[(start + offset) % len(order)]
+			if other is anchor or other.dead() or other.unconscious():
+				continue
+			controller = battle.controller_for(other)
+			if not isinstance(controller, LlmMcpController) or controller._prefetch_provider() is None:
+				continue
+			considered += 1
+			if controller.prefetch(battle, other) is not None:
+				pending.append(other)
+		return pending
+
+	def prefetch(self, battle, entity) -> Optional[PrefetchedDecision]:
+		"""Start (or keep, if the state has not changed) a speculative decision for ``entity``'s next turn."""
+		prov = self._prefetch_provider()
+		if prov is None:
+			return None
+		ctx = self._get_entity_context(entity)
+		if any(ctx.get(key) for key in ('pending_requests', 'pending_warnings', 'pending_directives', 'received_taunts')):
+			# begin_turn folds these into the prompt; ask once it has
+			return None
+
+		fingerprint = self._decision_fingerprint(battle, entity)
+		key = entity.entity_uid
+		current = self._prefetched.get(key)
+		if current is not None:
+			if current.fingerprint == fingerprint:
+				return current
+			if not current.future.done():
+				# a request already under way is paid for; ask again once it is answered
+				# (a stale answer is dropped when the turn starts)
+				return current
+			del self._prefetched[key]
+			self.prefetch_stats['discarded'] += 1
+
+		# Build the prompt as the creature will see it when its turn starts; the
+		# fork rewinds the turn change and the controller memory is put back
+		memory = copy_state(self.battle_data)
+		simulation = getattr(battle.session.event_manager, 'simulation', None)
+		try:
+			with battle.fork():
+				if simulation:
+					with simulation():
+						actions, prompt = self._prefetch_prompt(battle, entity)
+				else:
+					actions, prompt = self._prefetch_prompt(battle, entity)
+		finally:
+			self.battle_data = memory
+		if prompt is None:
+			return None
+
+		signatures = [self._action_signature(action) for action in actions]
+		future = _prefetch_pool(self.prefetch_concurrency).submit(
+			self._request_choice, prov, self._choice_messages(prompt), len(actions))
+		decision = PrefetchedDecision(fingerprint, signatures, future)
+		self._prefetched[key] = decision
+		self.prefetch_stats['requested'] += 1
+		return decision
+
+	def _prefetch_prompt(self, battle, entity):
+		battle.set_current_turn(entity)
+		entity.reset_turn(battle)
+		actions = [action for action in self._compute_available_moves(entity, battle)
+			if action is not None and not getattr(action, 'disabled', False)]
+		if len(actions) < 2:
+			return actions, None
+		return actions, self._build_prompt(battle, entity, actions)
+
+	def _request_choice(self, prov, messages: List[dict], n_actions: int) -> Optional[int]:
+		return self._local_parse_choice_from_text(prov.send_message(messages), n_actions)
+
+	def _take_prefetched(self, battle, entity, available_actions: List[Action]) -> Optional[Action]:
+		"""The prefetched choice for ``entity``'s turn if the state it was made in still holds."""
+		uid = getattr(entity, 'entity_uid', None)
+		if uid not in self._prefetched or battle.current_turn() is not entity:
+			# reactions and out-of-turn choices leave the decision for the turn itself
+			return None
+		decision = self._prefetched.pop(uid)
+		if decision.fingerprint != self._decision_fingerprint(battle, entity):
+			decision.future.cancel()
+			self.prefetch_stats['discarded'] += 1
+			return None
+		signature = decision.choice()
+		if signature is not None:
+			for action in available_actions:
+				if self._action_signature(action) == signature:
+					self.prefetch_stats['reused'] += 1
+					return action
+		self.prefetch_stats['discarded'] += 1
+		return None
+
 	def _build_prompt(self, battle, entity, available_actions: List[Action]) -> str:
 		# Render a small text map around the entity for context
 		current_map = battle.map_for(entity)
@@ -2,6 +2,12 @@ import yaml
 from natural20.yaml_loader import load_yaml
 from natural20.item_library.object import Object
 from natural20.utils.static_light_builder import StaticLightBuilder
+from natural20.utils.terrain_grid import (
+    TerrainGrid, BLOCKED, WALL, OPAQUE, IMPASSABLE, DIFFICULT, SWIMMABLE, LIVE, COVER_NAMES,
+)
+from natural20.utils.visibility_cache import VisibilityCache, SIGHT_BLOCKED
+from natural20.utils.navigation_cache import NavigationCache
+from natural20.utils.spatial_index import SpatialIndex
 from natural20.entity import Entity
 from natural20.utils.movement import requires_squeeze
 from natural20.item_library.common import StoneWall, Ground, StoneWallDirectional
@@ -85,24 +91,6 @@ class Map(SerializableObject):
         self.linked_maps = {}
         self.image_offset_px = self.properties.get('image_offset_px', [0, 0])
 
-        for _ in range(self.size[0]):
-            row = []
-            for _ in range(self.size[1]):
-                row.append(None)
-            self.base_map.append(row)
-
-        for _ in range(self.size[0]):
-            row = []
-            for _ in range(self.size[1]):
-                row.append(None)
-            self.base_map_1.append(row)
-
-        for _ in range(self.size[0]):
-            row = []
-            for _ in range(self.size[1]):
-                row.append(None)
-            self.base_map_2.append(row)
-
         # Objects and tokens as UID-backed grids
         self.objects = ObjectsGrid(self.session, self.size[0], self.size[1])
         self.tokens = TokensGrid(self.session, self.size[0], self.size[1])
@@ -111,27 +99,13 @@ class Map(SerializableObject):
         self._shared_ground_inventory = {}
         self._shared_water_inventory = {}
 
-        for cur_y, lines in enumerate(self.properties.get('map', {}).get('base', [])):
-            for cur_x, c in enumerate(lines):
-                if not c == '_':
-                    self.base_map[cur_x][cur_y] = c
-
-        for cur_y, lines in enumerate(self.properties.get('map', {}).get('base_1', [])):
-            for cur_x, c in enumerate(lines):
-                if not c == '.':
-                    self.base_map_1[cur_x][cur_y] = c
+        map_block = self.properties.get('map', {})
+        self.base_map = self._layer_grid(map_block.get('base', []), '_')
+        self.base_map_1 = self._layer_grid(map_block.get('base_1', []), '.')
+        self.base_map_2 = self._layer_grid(map_block.get('base_2', []), '.')
 
-        for cur_y, lines in enumerate(self.properties.get('map', {}).get('base_2', [])):
-            for cur_x, c in enumerate(lines):
-                if not c == '.':
-                    self.base_map_2[cur_x][cur_y] = c
-
-        if self.properties.get('map', {}).get('meta'):
-            self.meta_map = [[None for _ in range(self.size[1])] for _ in range(self.size[0])]
-
-            for cur_y, lines in enumerate(self.properties.get('map', {}).get('meta')):
-                for cur_x, c in enumerate(lines):
-                    self.meta_map[cur_x][cur_y] = c
+        if map_block.get('meta'):
+            self.meta_map = self._layer_grid(map_block.get('meta'), None)
         else:
             self.meta_map = None
 
@@ -139,6 +113,14 @@ class Map(SerializableObject):
         self.triggers = self.properties.get('triggers', {})
         self._triggered_area_narrations = set()
         self._materialize_layer_placements_from_yaml()
+        self._terrain_grid = TerrainGrid(self)
+        self._terrain_grid.rebuild()
+        self._visibility = VisibilityCache(self)
+        self._navigation = NavigationCache(self)
+        self._spatial_index = None
+        # bumped whenever what creatures can see may have changed (see VisibilityMatrix)
+        self.sight_epoch = 0
+        self.visibility_matrix = None
 
         if not skip_setup:
             self._setup_objects()
@@ -147,6 +129,15 @@ class Map(SerializableObject):
             self._trigger_after_setup()
         self._compute_lights()
 
+    def _layer_grid(self, rows, filler):
+        """Column-major ``[x][y]`` grid of the non-filler characters in ``rows``."""
+        grid = [[None] * self.size[1] for _ in range(self.size[0])]
+        for cur_y, line in enumerate(rows):
+            for cur_x, c in enumerate(line):
+                if c != filler:
+                    grid[cur_x][cur_y] = c
+        return grid
+
     def _materialize_layer_placements_from_yaml(self) -> None:
         """Apply map.layer_placements onto grid strings and in-memory layer grids."""
         from natural20.map_editor import materialize_all_layer_placements
@@ -196,8 +187,12 @@ class Map(SerializableObject):
         return resolve_map_background_image(self.properties, state)
 
     def apply_outdoor_ambient_illumination(self, illumination: float) -> None:
-        self._light_builder.outdoor_ambient_illumination = float(illumination)
-        self._compute_lights()
+        self.sight_epoch += 1
+        if getattr(self, '_light_map', None) is None:
+            self._light_builder.outdoor_ambient_illumination = float(illumination)
+            self._compute_lights()
+        else:
+            self._light_builder.apply_outdoor_ambient(self._light_map, illumination)
 
     def narration(self):
         """Return the narration config dict from the map YAML, or None."""
@@ -601,8 +596,12 @@ class Map(SerializableObject):
 
     def remove(self, entity, battle=None, move_to_object_layer=False):
         pos_x, pos_y = self.position_of(entity)
+        self._light_builder.invalidate()
+        self.sight_epoch += 1
         if entity in self.entities:
+            spatial_index = self.spatial_index
             self.entities.pop(entity)
+            spatial_index.remove(entity)
             if move_to_object_layer:
                 self.interactable_objects[entity] = [pos_x, pos_y]
                 self.objects[pos_x][pos_y].append(entity)
@@ -613,8 +612,15 @@ class Map(SerializableObject):
                 for ofs_y in range(source_token_size):
                     self.tokens[pos_x + ofs_x][pos_y + ofs_y] = None
         elif entity in self.interactable_objects:
+            footprint = self._object_footprint(entity, pos_x, pos_y)
             self.interactable_objects.pop(entity)
             self.objects[pos_x][pos_y].remove(entity)
+            for tile_x, tile_y in footprint:
+                self.refresh_terrain_at(tile_x, tile_y)
+            self._invalidate_spell_area(entity)
+            return
+        if move_to_object_layer:
+            self.refresh_terrain_at(pos_x, pos_y)
         # Keep registry entry; entities may still be referenced by UID in logs/saves
         
 
@@ -658,6 +664,9 @@ class Map(SerializableObject):
                     self.tokens[pos_x + ofs_x][pos_y + ofs_y] = entity_data
 
             self.entities[entity] = [pos_x, pos_y]
+            self.spatial_index.move(entity, pos_x, pos_y)
+            self._light_builder.invalidate()
+            self.sight_epoch += 1
 
             for obj in self.objects_at(pos_x, pos_y):
                 if obj != entity:
@@ -771,9 +780,13 @@ class Map(SerializableObject):
 
         entity_data = {'entity': entity, 'token': token or entity.name}
 
+        spatial_index = self.spatial_index
         self.entities[entity] = [pos_x, pos_y]
+        self._light_builder.invalidate()
+        self.sight_epoch += 1
         # Ensure entity is in the registry
         self.session.register_entity(entity)
+        spatial_index.insert(entity, pos_x, pos_y)
 
         source_token_size = entity.token_size()
         self.tokens[pos_x][pos_y] = entity_data
@@ -857,22 +870,91 @@ class Map(SerializableObject):
             self.area_triggers[obj] = {}
 
         self.interactable_objects[obj] = [pos_x, pos_y]
+        self._light_builder.invalidate()
+        self.sight_epoch += 1
         # Register and pin interactable object for UID-based lookups (kept strongly by map)
         self.session.entity_registry.pin(obj)
 
-        if isinstance(obj.token, list):
-            for y, line in enumerate(obj.token):
-                for x, t in enumerate(line):
-                    if t == '.':
-                        continue
-                    self.session.entity_registry.pin(obj)
-                    self.objects[pos_x + x][pos_y + y].append(obj)
-        else:
-            self.session.entity_registry.pin(obj)
-            self.objects[pos_x][pos_y].append(obj)
+        for tile_x, tile_y in self._object_footprint(obj, pos_x, pos_y):
+            self.objects[tile_x][tile_y].append(obj)
+            self.refresh_terrain_at(tile_x, tile_y)
+        self._invalidate_spell_area(obj)
 
         return obj
 
+    @staticmethod
+    def _object_footprint(obj, pos_x, pos_y):
+        """Tiles covered by ``obj`` when anchored at (pos_x, pos_y)."""
+        if isinstance(obj.token, list):
+            return [
+                (pos_x + x, pos_y + y)
+                for y, line in enumerate(obj.token)
+                for x, t in enumerate(line)
+                if t != '.'
+            ]
+        return [(pos_x, pos_y)]
+
+    def refresh_terrain_at(self, pos_x, pos_y):
+        """Re-derive the cached terrain facts (walls, opacity, cover, ...) of one tile."""
+        self._terrain_grid.refresh(pos_x, pos_y)
+        self._visibility.invalidate(pos_x, pos_y)
+        self._navigation.invalidate(pos_x, pos_y)
+        self._light_builder.opacity_changed(pos_x, pos_y)
+        self.sight_epoch += 1
+
+    def rebuild_terrain(self):
+        """Re-derive every cached terrain fact, e.g. after replacing the base layers wholesale."""
+        self._terrain_grid.rebuild()
+        self._visibility.clear()
+        self._navigation.clear()
+        self._light_builder.invalidate(footprints=True)
+        self.sight_epoch += 1
+
+    def _invalidate_spell_area(self, obj):
+        # a tiny hut dome blocks sight across its whole boundary, not just at its anchor
+        from natural20.spell.objects.tiny_hut import TinyHutDome
+        if isinstance(obj, TinyHutDome):
+            self._visibility.domes_changed(obj.interior_squares)
+
+    def refresh_object_terrain(self, obj):
+        """Re-derive the cached terrain facts of every tile ``obj`` covers.
+
+        Objects call this when a state change affects how they block movement
+        or sight (a door opening, a wall being destroyed, a trap revealed).
+        """
+        pos = self.interactable_objects.get(obj)
+        if pos is None:
+            return
+        for tile_x, tile_y in self._object_footprint(obj, pos[0], pos[1]):
+            self.refresh_terrain_at(tile_x, tile_y)
+
+    @property
+    def terrain_grid(self) -> TerrainGrid:
+        return self._terrain_grid
+
+    @property
+    def visibility(self) -> VisibilityCache:
+        return self._visibility
+
+    @property
+    def navigation(self) -> NavigationCache:
+        return self._navigation
+
+    @property
+    def spatial_index(self) -> SpatialIndex:
+        index = getattr(self, '_spatial_index', None)
+        # rebuilt when the entity table was replaced or edited behind place/move_to/remove
+        if index is None or index.source is not self.entities or len(index) != len(self.entities):
+            index = SpatialIndex(self.entities, key_of=self._entity_key, resolve=self.session.entity_registry.get)
+            self._spatial_index = index
+        return index
+
+    def _entity_key(self, entity):
+        uid = getattr(entity, 'entity_uid', None)
+        if uid is None:
+            uid = self.session.uid_for(entity)
+        return str(uid)
+
     def is_heavily_obscured(self, entity, pos_override=None):
         return self.light_at_entity(entity, pos_override) < 0.5
 
@@ -955,7 +1037,7 @@ class Map(SerializableObject):
         if attack_range is None:
             attack_range = 5
 
-        targets = [k for k, pos in self.entities.items() if not k.dead() and k.hp() is not None and self.distance(k, entity) * self.feet_per_grid <= attack_range and (filter is None or k.eval_if(filter))]
+        targets = [k for k in self.entities_near(entity, attack_range, include_self=True) if not k.dead() and k.hp() is not None and (filter is None or k.eval_if(filter))]
 
         if include_objects:
             targets += [obj for obj, _position in self.interactable_objects.items() if not obj.dead() and ('ignore_los' in target_types or self.can_see(entity, obj, active_perception=active_perception)) and self.distance(obj, entity) * self.feet_per_grid <= attack_range and (filter is None or obj.eval_if(filter))]
@@ -971,7 +1053,16 @@ class Map(SerializableObject):
         - There are objects with movement cost > 1 (unless entity can swim through them)
         """
         # Helper function to check if objects at a position cause difficult terrain
+        flags = self._terrain_grid.flags
+
         def is_difficult_due_to_objects(x, y, entity=None):
+            if 0 <= x < self.size[0] and 0 <= y < self.size[1]:
+                tile_flags = flags[x, y]
+                if not tile_flags & LIVE:
+                    if not tile_flags & DIFFICULT:
+                        return False
+                    return not (entity and tile_flags & SWIMMABLE and entity.swim_speed() > 0)
+
             objects_at_pos = self.objects_at(x, y)
             if not objects_at_pos:
                 return False
@@ -1018,6 +1109,9 @@ class Map(SerializableObject):
             return True
         if pos_x >= self.size[0] or pos_y >= self.size[1]:
             return True
+        tile_flags = self._terrain_grid.flags[pos_x, pos_y]
+        if not tile_flags & LIVE:
+            return bool(tile_flags & WALL)
         if self.object_at(pos_x, pos_y) and self.object_at(pos_x, pos_y).wall():
             return True
         return False
@@ -1041,10 +1135,15 @@ class Map(SerializableObject):
 
     # Natural20::Entity to look around
     # @param entity [Natural20::Entity] The entity to look around his line of sight
+    # @param range [Integer] only look at entities within this many feet
     # @return [Hash] entities in line of sight
-    def look(self, entity, distance=None):
+    def look(self, entity, distance=None, range=None):
         visible_entities = {}
-        for k, v in self.entities.items():
+        if range is None:
+            candidates = self.entities.items()
+        else:
+            candidates = [(k, self.entities[k]) for k in self.entities_near(entity, range)]
+        for k, v in candidates:
             if k == entity:
                 continue
 
@@ -1468,6 +1567,47 @@ class Map(SerializableObject):
 
         return has_line_of_sight
 
+    def visible_tiles(self, entity, allow_dark_vision=True, force_dark_vision=False, inclusive=None, reach=None):
+        """Every square ``entity`` can see, computed with one sweep per occupied square.
+
+        Holds exactly the squares for which ``can_see_square`` answers True with
+        the same arguments and maps each of them to ``(distance, cover)``:
+        ``distance`` in squares (as used for darkvision) and ``cover`` the best
+        cover along the sight line ('none', 'half', 'three_quarter', 'total').
+        With ``reach`` only squares at most that many steps (Chebyshev) from an
+        occupied square are swept.
+        """
+        if inclusive is None:
+            inclusive = not self.session.render_for_text
+
+        sighted = {}
+        entity_squares = [tuple(pos) for pos in self.entity_squares(entity)]
+        for pos1_x, pos1_y in entity_squares:
+            for pos2, cover in self._visibility.sweep((pos1_x, pos1_y), inclusive=inclusive, reach=reach).items():
+                sighting_distance = math.floor(math.sqrt((pos1_x - pos2[0])**2 + (pos1_y - pos2[1])**2))
+                previous = sighted.get(pos2)
+                if previous is not None:
+                    cover = min(cover, previous[1])
+                sighted[pos2] = (sighting_distance, cover)
+
+        darkvision = {}
+        result = {}
+        for pos2, (sighting_distance, cover) in sighted.items():
+            if pos2 not in entity_squares and self.light_at(*pos2) < 0.5:
+                # Magical darkness can't be seen through, even with darkvision.
+                if not allow_dark_vision or self.magical_darkness_at(*pos2):
+                    continue
+                if not force_dark_vision:
+                    if sighting_distance not in darkvision:
+                        darkvision[sighting_distance] = entity.darkvision(sighting_distance * self.feet_per_grid)
+                    if not darkvision[sighting_distance]:
+                        continue
+            result[pos2] = (sighting_distance, COVER_NAMES[cover])
+
+        for pos in entity_squares:
+            result[pos] = (0, 'none')
+        return result
+
     def can_see(self, entity, entity2, distance=None, entity_1_pos=None, entity_2_pos=None, \
                 allow_dark_vision=True, active_perception=0, active_perception_disadvantage=0,\
                 ignore_concealment=False,
@@ -1476,6 +1616,27 @@ class Map(SerializableObject):
         Check if entity can see entity2
         """
         active_perception = active_perception or 0
+        matrix = self.visibility_matrix
+        if matrix is not None and matrix.enabled and distance is None and not active_perception_disadvantage \
+                and not ignore_concealment and creature_size_min is None and not heavy_cover \
+                and isinstance(entity, Entity) and isinstance(entity2, Entity) \
+                and entity is not entity2 and not entity.is_admin:
+            # creature pairs are shared through the battle's VisibilityMatrix
+            return matrix.can_see(self, entity, entity2, entity_1_pos, entity_2_pos, allow_dark_vision, active_perception,
+                                  lambda: self._can_see(entity, entity2, entity_1_pos=entity_1_pos, entity_2_pos=entity_2_pos,
+                                                        allow_dark_vision=allow_dark_vision,
+                                                        active_perception=active_perception))
+        return self._can_see(entity, entity2, distance=distance, entity_1_pos=entity_1_pos, entity_2_pos=entity_2_pos,
+                             allow_dark_vision=allow_dark_vision, active_perception=active_perception,
+                             active_perception_disadvantage=active_perception_disadvantage,
+                             ignore_concealment=ignore_concealment, creature_size_min=creature_size_min,
+                             heavy_cover=heavy_cover)
+
+    def _can_see(self, entity, entity2, distance=None, entity_1_pos=None, entity_2_pos=None, \
+                 allow_dark_vision=True, active_perception=0, active_perception_disadvantage=0,\
+                 ignore_concealment=False,
+                 creature_size_min=None, heavy_cover=False):
+        active_perception = active_perception or 0
         if entity.is_admin:
             return True
         if isinstance(entity, str):
@@ -1721,7 +1882,15 @@ class Map(SerializableObject):
 
     def passable(self, entity, pos_x, pos_y, battle=None, allow_squeeze=True, origin=None, ignore_opposing=False,
                  incorporeal=False):
+        flags = self._terrain_grid.flags
+
         def all_passable_objects(relative_x, relative_y, origin):
+            if incorporeal:
+                return True
+            if 0 <= relative_x < self.size[0] and 0 <= relative_y < self.size[1]:
+                tile_flags = flags[relative_x, relative_y]
+                if not tile_flags & LIVE:
+                    return not tile_flags & IMPASSABLE
             for object in self.objects_at(relative_x, relative_y, reveal_concealed=True):
                 if not object.passable(origin) and not incorporeal:
                     return False
@@ -1743,7 +1912,7 @@ class Map(SerializableObject):
                     return False
                 if relative_y >= self.size[1]:
                     return False
-                if self.base_map[relative_x][relative_y] == '#':
+                if flags[relative_x, relative_y] & BLOCKED:
                     return False
 
                 if not all_passable_objects(relative_x, relative_y, origin):
@@ -1840,10 +2009,8 @@ class Map(SerializableObject):
                     if not object.passable(s):
                         return None
             else:
-                if self.opaque(*s, origin=prev_square) or self.opaque(*prev_square, origin=s):
-                    return None
-
-                if self.cover_at(*s) == 'total':
+                # opacity (both directions), total cover and tiny hut domes
+                if self._visibility.step(prev_square, s):
                     return None
 
                 if heavy_cover and self.cover_at(*s) == 'three_quarter':
@@ -1852,13 +2019,6 @@ class Map(SerializableObject):
                 if creature_size_min and self.entity_at(*s) and self.entity_at(*s).size_identifier() >= creature_size_min:
                     return None
 
-                try:
-                    from natural20.spell.objects.tiny_hut import force_dome_blocks_outside_vision
-                    if force_dome_blocks_outside_vision(self, tuple(prev_square), tuple(s)):
-                        return None
-                except Exception:
-                    pass
-
             prev_square = s
 
             squares_results.append([self.cover_at(*s, entity), s])
@@ -1874,9 +2034,7 @@ class Map(SerializableObject):
                 min_distance_reached = False
             if distance and index > distance:
                 return [False, False]
-            if self.opaque(*s, prev) or self.opaque(*prev, s):
-                return [False, False]
-            if self.cover_at(*s) == 'total':
+            if self._visibility.step(prev, s) & SIGHT_BLOCKED:
                 return [False, False]
             prev = s
 
@@ -1887,21 +2045,33 @@ class Map(SerializableObject):
             # Out-of-bounds positions are treated as opaque (blocking line of sight)
             return True
 
-        if self.base_map[pos_x][pos_y] == '#':
+        flags = self._terrain_grid.flags
+        tile_flags = flags[pos_x, pos_y]
+        if tile_flags & BLOCKED:
             return True
-        else:
-            if self.object_at(pos_x, pos_y):
-                for object in self.objects_at(pos_x, pos_y, reveal_concealed=True):
-                    if object.opaque(origin):
+        if not tile_flags & LIVE:
+            if tile_flags & OPAQUE:
+                return True
+            if origin is None:
+                return False
+            origin_x, origin_y = origin[0], origin[1]
+            if 0 <= origin_x < self.size[0] and 0 <= origin_y < self.size[1]:
+                origin_flags = flags[origin_x, origin_y]
+                if not origin_flags & LIVE:
+                    return bool(origin_flags & OPAQUE)
+
+        if self.object_at(pos_x, pos_y):
+            for object in self.objects_at(pos_x, pos_y, reveal_concealed=True):
+                if object.opaque(origin):
+                    return True
+
+        if origin:
+            if self.object_at(*origin):
+                for object in self.objects_at(*origin, reveal_concealed=True):
+                    if object.opaque((pos_x, pos_y)):
                         return True
 
-            if origin:
-                if self.object_at(*origin):
-                    for object in self.objects_at(*origin, reveal_concealed=True):
-                        if object.opaque((pos_x, pos_y)):
-                            return True
-
-            return False
+        return False
 
     def squares_in_path(self, pos1_x, pos1_y, pos2_x, pos2_y, distance=None, inclusive=True):
         if [pos1_x, pos1_y] == [pos2_x, pos2_y]:
@@ -1918,6 +2088,14 @@ class Map(SerializableObject):
         return remove_duplicates(arrs)
 
     def cover_at(self, pos_x, pos_y, entity=False):
+        grid = self._terrain_grid
+        if 0 <= pos_x < self.size[0] and 0 <= pos_y < self.size[1] and not grid.flags[pos_x, pos_y] & LIVE:
+            cover = grid.cover[pos_x, pos_y]
+            if cover:
+                return COVER_NAMES[cover]
+            if entity and self.entity_at(pos_x, pos_y):
+                return self.entity_at(pos_x, pos_y).size_identifier()
+            return 'none'
         if self.object_at(pos_x, pos_y) and self.object_at(pos_x, pos_y).half_cover():
             return 'half'
         elif self.object_at(pos_x, pos_y) and self.object_at(pos_x, pos_y).three_quarter_cover():
@@ -1938,15 +2116,7 @@ class Map(SerializableObject):
         if self._light_builder.magical_darkness_at(pos_x, pos_y):
             return 0.0
 
-        try:
-            from natural20.spell.objects.tiny_hut import iter_tiny_hut_domes
-            interior_override = None
-            for dome in iter_tiny_hut_domes(self):
-                if dome.contains((pos_x, pos_y)):
-                    interior_override = dome.interior_light_value()
-                    break
-        except Exception:
-            interior_override = None
+        interior_override = self._light_builder.interior_light_override(pos_x, pos_y)
 
         if self._light_map is not None:
             intensity = self._light_map[pos_x][pos_y] + self._light_builder.light_at(pos_x, pos_y)
@@ -1983,15 +2153,41 @@ class Map(SerializableObject):
         @param range: The range to check in feet
         @return: A list of entities within the range
         """
-        entities = []
-        for entity2, _position in self.entities.items():
-            if entity == entity2:
-                continue
-            if entity.dead():
+        if entity.dead():
+            return []
+        return self.entities_near(entity, range)
+
+    def entities_near(self, entity, range, entity_pos=None, include_self=False):
+        """
+        Entities within ``range`` feet of ``entity`` (as measured by ``distance``),
+        in placement order. Only tokens in the spatial index buckets around the
+        entity are measured.
+        @param entity: The entity (or object) to measure from
+        @param range: The range in feet
+        @param entity_pos: Measure as if ``entity`` stood here
+        @param include_self: Also return ``entity`` itself when it is a token on this map
+        """
+        if entity_pos is None:
+            entity_pos = self.entity_or_object_pos(entity)
+            if entity_pos is None:
+                return []
+        if self.feet_per_grid <= 0:
+            candidates = list(self.entities.keys())
+        else:
+            pos_x, pos_y = entity_pos
+            extent = entity.token_size() - 1 if hasattr(entity, 'token_size') else 0
+            radius = int(range // self.feet_per_grid)
+            candidates = self.spatial_index.near_box(pos_x, pos_y, pos_x + extent, pos_y + extent, radius)
+        key = self._entity_key(entity)
+        nearby = []
+        for other in candidates:
+            if self._entity_key(other) == key:
+                if include_self:
+                    nearby.append(other)
                 continue
-            if self.distance(entity, entity2) * self.feet_per_grid <= range:
-                entities.append(entity2)
-        return entities
+            if self.distance(entity, other, entity_1_pos=entity_pos) * self.feet_per_grid <= range:
+                nearby.append(other)
+        return nearby
 
     def distance(self, entity1, entity2, entity_1_pos=None, entity_2_pos=None):
         if isinstance(entity1, str):
@@ -2119,6 +2315,7 @@ class Map(SerializableObject):
                 pass
         battle_map.interactable_objects = EntitiesUIDMap(session, interactable_objects)
         battle_map.meta_map = data['meta_map']
+        battle_map.rebuild_terrain()
         battle_map._compute_lights()
 
         # Restore player spawn slots (allocations survive save/load).
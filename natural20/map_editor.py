@@ -1579,12 +1579,17 @@ def _sync_layer_from_yaml(battle_map, map_block: dict[str, Any], layer: str) ->
     if not grid_attr:
         return
     grid = getattr(battle_map, grid_attr)
+    refresh = getattr(battle_map, "refresh_terrain_at", None) if grid_attr == "base_map" else None
     rows = map_block.get(layer) or []
     for y, row in enumerate(rows):
         for x, ch in enumerate(row):
             if x >= len(grid) or y >= len(grid[x]):
                 continue
-            grid[x][y] = _yaml_char_to_grid_cell(layer, ch)
+            cell = _yaml_char_to_grid_cell(layer, ch)
+            if grid[x][y] != cell:
+                grid[x][y] = cell
+                if refresh is not None:
+                    refresh(x, y)
 
 
 def _is_removable_map_fixture(obj) -> bool:
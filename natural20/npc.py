@@ -28,6 +28,7 @@ from natural20.actions.shove_action import ShoveAction
 from natural20.actions.pickpocket_action import PickpocketAction
 from natural20.utils.multiattack import Multiattack
 from natural20.utils.npc_random_name_generator import generate_goblinoid_name, generate_ogre_name
+from natural20.utils.stat_cache import derived_stat
 from natural20.concern.lootable import Lootable
 from natural20.concern.inventory import Inventory
 from natural20.concern.event_loader import EventLoader
@@ -312,6 +313,7 @@ class Npc(Entity, Multiattack, Lootable, Inventory, EventLoader, Mimic):
     def npc(self):
         return True
 
+    @derived_stat
     def armor_class(self):
         current_ac = self.properties["default_ac"]
         if self.has_effect('ac_bonus'):
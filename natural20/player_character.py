@@ -22,6 +22,7 @@ from natural20.actions.feline_agility_action import FelineAgilityAction
 from natural20.actions.bardic_inspiration_action import BardicInspirationAction
 from natural20.actions.wild_shape_action import WildShapeAction, RevertWildShapeAction, WildShapeAttackAction
 from natural20.entity_class import wild_shape as _wild_shape
+from natural20.utils.stat_cache import derived_stat, weapon_key
 from natural20.actions.attack_action import AttackAction, TwoWeaponAttackAction
 from natural20.actions.look_action import LookAction
 from natural20.actions.move_action import MoveAction
@@ -284,6 +285,7 @@ class PlayerCharacter(Entity, Fighter, Rogue, Wizard, Cleric, Paladin, Warlock,
     old_spell_slots = old_spell_slots or {}
     old_max_spell_slots = old_max_spell_slots or {}
     old_current_hit_die = old_current_hit_die or {}
+    self.invalidate_stats()
     self.spell_slots = {}
     self._initialize_class_state()
 
@@ -498,6 +500,7 @@ class PlayerCharacter(Entity, Fighter, Rogue, Wizard, Cleric, Paladin, Warlock,
       class_map[class_name] = new_class_level
       self.properties['level'] = new_total_level
       setattr(self, f"{class_name}_level", new_class_level)
+      self.invalidate_stats()
       try:
         new_slots = {level: self.max_spell_slots(level, class_name) for level in range(1, 10)}
       finally:
@@ -510,6 +513,7 @@ class PlayerCharacter(Entity, Fighter, Rogue, Wizard, Cleric, Paladin, Warlock,
           setattr(self, f"{class_name}_level", old_class_level)
         elif hasattr(self, f"{class_name}_level"):
           delattr(self, f"{class_name}_level")
+        self.invalidate_stats()
 
       slot_changes = {
         level: {'old': old_slots[level], 'new': new_slots[level]}
@@ -595,6 +599,7 @@ class PlayerCharacter(Entity, Fighter, Rogue, Wizard, Cleric, Paladin, Warlock,
   def subrace(self):
       return self.properties.get('subrace')
   
+  @derived_stat
   def speed(self):
     if _wild_shape.is_wild_shaped(self):
       beast = self._wild_shape_state.get('beast_props', {})
@@ -676,6 +681,7 @@ class PlayerCharacter(Entity, Fighter, Rogue, Wizard, Cleric, Paladin, Warlock,
   def conversable(self):
     return True
 
+  @derived_stat
   def armor_class(self):
     if _wild_shape.is_wild_shaped(self):
       beast = self._wild_shape_state.get('beast_props', {})
@@ -1192,6 +1198,7 @@ class PlayerCharacter(Entity, Fighter, Rogue, Wizard, Cleric, Paladin, Warlock,
 
     return False
 
+  @derived_stat(key=weapon_key)
   def proficient_with_weapon(self, weapon):
     if isinstance(weapon, str):
       weapon = self.session.load_thing(weapon)
@@ -1402,6 +1409,7 @@ class PlayerCharacter(Entity, Fighter, Rogue, Wizard, Cleric, Paladin, Warlock,
   def passive_insight(self):
     return 10 + self.wis_mod() + self.insight_proficiency()
   
+  @derived_stat
   def passive_perception(self):
     return 10 + self.wis_mod() + self.perception_proficiency()
   
@@ -1726,4 +1734,5 @@ class PlayerCharacter(Entity, Fighter, Rogue, Wizard, Cleric, Paladin, Warlock,
     player_character.seed_initial_journal_from_properties()
     # Tortle shell state
     player_character._in_shell = data.get('_in_shell', False)
+    player_character.invalidate_stats()
     return player_character
\ No newline at end of file
@@ -310,6 +310,26 @@ def encounter_difficulty(adjusted_xp: int, levels: Iterable[int]) -> str:
     return "trivial"
 
 
+def empirical_encounter_difficulty(win_rate: float, party_hp_lost: float = 0.0,
+                                   party_downed_rate: float = 0.0, party_death_rate: float = 0.0) -> str:
+    """Difficulty label implied by simulated outcomes (see natural20.encounter_simulator).
+
+    Mirrors the DMG descriptions behind ``encounter_difficulty``: deadly
+    encounters can be lost or kill characters, hard ones usually knock
+    someone out, medium ones cost a noticeable share of the party's hit
+    points and easy ones only a little.
+    """
+    if win_rate < 0.75 or party_death_rate >= 0.1:
+        return "deadly"
+    if party_downed_rate >= 0.5 or party_hp_lost >= 0.5:
+        return "hard"
+    if party_hp_lost >= 0.25:
+        return "medium"
+    if party_hp_lost >= 0.05:
+        return "easy"
+    return "trivial"
+
+
 def award_xp_to_character(character, amount: int, source: str = "manual",
                           reason: str | None = None) -> XPAward:
     old_xp = character.experience()
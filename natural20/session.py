@@ -45,6 +45,10 @@ class Session:
             'manual_dice_roll': False
         }
         self.game_time = 0
+        # seeded dice stream (see seed_rng); None rolls from the global random
+        self.rng = None
+        # bumped whenever a light source may have toggled (see invalidate_lighting)
+        self.lighting_epoch = 0
         self.render_for_text = True
         self.event_log = deque(maxlen=100)
         self.default_locale = 'en'
@@ -273,6 +277,10 @@ class Session:
     def increment_game_time(self, seconds=6):
         self.game_time += seconds
 
+    def invalidate_lighting(self):
+        """Make every map re-check its light sources on the next light query."""
+        self.lighting_epoch += 1
+
     def load_characters(self):
         characters = []
         for char_path in self._iter_category_files('characters'):
@@ -576,6 +584,12 @@ class Session:
     def update_state(self, state):
         self.session_state.update(state)
 
+    def seed_rng(self, seed=None):
+        """Give this session (and the battles created from it) its own reproducible dice stream."""
+        from natural20.utils.rng_stream import RngStream
+        self.rng = RngStream(seed)
+        return self.rng
+
     def to_dict(self):
         return {
             'game_time': self.game_time,
@@ -583,7 +597,8 @@ class Session:
             'session_state': self.session_state,
             'event_log': list(self.event_log),
             'settings': self.settings,
-            'render_for_text': self.render_for_text
+            'render_for_text': self.render_for_text,
+            'rng': self.rng.to_dict() if self.rng is not None else None
         }
 
     def from_dict(data):
@@ -593,4 +608,7 @@ class Session:
         session.event_log = deque(data['event_log'])
         session.settings = data['settings']
         session.render_for_text = data['render_for_text']
+        if data.get('rng'):
+            from natural20.utils.rng_stream import RngStream
+            session.rng = RngStream.from_dict(data['rng'])
         return session
\ No newline at end of file
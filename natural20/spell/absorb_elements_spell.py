@@ -155,6 +155,8 @@ class AbsorbElementsSpell(Spell):
             base.append(damage_type)
         return base
 
+    RESULT_TYPES = ('absorb_elements',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item.get('type') != 'absorb_elements':
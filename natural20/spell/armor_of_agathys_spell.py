@@ -40,6 +40,8 @@ class ArmorOfAgathysSpell(Spell):
             cast_level = 1
         return 5 * cast_level
 
+    RESULT_TYPES = ('armor_of_agathys',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item['type'] != 'armor_of_agathys':
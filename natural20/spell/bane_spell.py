@@ -80,6 +80,8 @@ class BaneSpell(Spell):
 
         return results
 
+    RESULT_TYPES = ('bane',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if session is None:
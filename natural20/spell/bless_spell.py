@@ -56,6 +56,8 @@ class BlessSpell(Spell):
             })
         return results
 
+    RESULT_TYPES = ('bless',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if battle and session is None:
@@ -171,6 +171,8 @@ class BoomingBladeSpell(Spell):
     def _movement_thunder_dice(self, entity):
         return self._hit_thunder_dice(entity) + 1
 
+    RESULT_TYPES = ('booming_blade_rider',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item['type'] != 'booming_blade_rider':
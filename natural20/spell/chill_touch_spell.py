@@ -118,6 +118,8 @@ class ChillTouchSpell(AttackSpell):
         if opt['effect'].action.target:
             opt['effect'].action.target.dismiss_effect(opt['effect'])
 
+    RESULT_TYPES = ('chill_touch',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item['type'] == 'chill_touch':
@@ -134,6 +134,8 @@ class ColorSpraySpell(Spell):
 
         return results
 
+    RESULT_TYPES = ('color_spray', 'color_spray_cast')
+
     @staticmethod
     def apply(battle, item, session=None):
         if battle and session is None:
@@ -51,6 +51,8 @@ class CureWoundsSpell(Spell):
             "spell": self.properties
         }]
     
+    RESULT_TYPES = ('spell_heal',)
+
     def apply(battle, item, session=None):
         if session is None:
             session = battle.session
@@ -80,6 +80,8 @@ class DarknessSpell(Spell):
             'spell': self.properties,
         }]
 
+    RESULT_TYPES = ('darkness',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item.get('type') != 'darkness':
@@ -54,6 +54,8 @@ class DetectMagicSpell(Spell):
             'range_ft': self.properties.get('range', DETECT_MAGIC_RANGE_FT),
         }]
 
+    RESULT_TYPES = ('detect_magic',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item.get('type') != 'detect_magic':
@@ -47,6 +47,8 @@ class DivineFavorSpell(Spell):
             'effect': self,
         }]
 
+    RESULT_TYPES = ('divine_favor',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item['type'] != 'divine_favor':
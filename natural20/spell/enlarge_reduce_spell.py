@@ -137,6 +137,8 @@ class EnlargeReduceSpell(Spell):
                 condition=lambda _e, ctx: (ctx or {}).get('ability') == 'strength',
             )
 
+    RESULT_TYPES = ('enlarge_reduce',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if session is None:
@@ -6,6 +6,8 @@ class ExpeditiousRetreatSpell(Spell):
         action = action.clone()
         return action
 
+    RESULT_TYPES = ('expeditious_retreat',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if session is None:
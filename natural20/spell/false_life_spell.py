@@ -63,6 +63,8 @@ class FalseLifeSpell(Spell):
             'temp_hp': amount,
         }]
 
+    RESULT_TYPES = ('false_life',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item['type'] != 'false_life':
@@ -103,6 +103,8 @@ class FindFamiliarSpell(Spell):
         
         return len(self.errors) == 0
 
+    RESULT_TYPES = ('find_familiar',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if battle and session is None:
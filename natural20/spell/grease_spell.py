@@ -108,6 +108,8 @@ class GreaseSpell(Spell):
             'map': battle_map,
         }]
 
+    RESULT_TYPES = ('grease',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item.get('type') != 'grease':
@@ -55,6 +55,8 @@ class GuidanceSpell(Spell):
             })
         return results
 
+    RESULT_TYPES = ('guidance',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item['type'] != 'guidance':
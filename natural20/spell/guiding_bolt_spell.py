@@ -111,6 +111,8 @@ class GuidingBoltSpell(AttackSpell):
             'dim': max(opt['dim'], 1)
         }
 
+    RESULT_TYPES = ('guiding_bolt',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item['type'] == 'guiding_bolt':
@@ -73,6 +73,8 @@ class HasteSpell(Spell):
         target.register_event_hook('start_of_turn', HasteSpell, method_name='lethargy_start_of_turn')
         target.register_event_hook('end_of_turn', HasteSpell, method_name='lethargy_end_of_turn')
 
+    RESULT_TYPES = ('haste',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if session is None:
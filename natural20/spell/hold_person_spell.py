@@ -131,6 +131,8 @@ class HoldPersonSpell(Spell):
     if save.passed:
       entity.dismiss_effect(effect)
 
+  RESULT_TYPES = ('hold_person',)
+
   @staticmethod
   def apply(battle, item, session=None):
     if item.get('type') != 'hold_person':
@@ -67,6 +67,8 @@ class HuntersMarkSpell(Spell):
             'effect': self,
         }]
 
+    RESULT_TYPES = ('hunters_mark',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item['type'] != 'hunters_mark':
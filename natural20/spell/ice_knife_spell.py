@@ -85,6 +85,8 @@ class IceKnifeSpell(AttackSpell):
             })
         return results
 
+    RESULT_TYPES = ('ice_knife',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item['type'] == 'ice_knife':
@@ -77,6 +77,8 @@ class LeomundsTinyHutSpell(Spell):
             'spell': self.properties,
         }]
 
+    RESULT_TYPES = ('tiny_hut', 'tiny_hut_failed')
+
     @staticmethod
     def apply(battle, item, session=None):
         if item.get('type') == 'tiny_hut_failed':
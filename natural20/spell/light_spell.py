@@ -235,6 +235,8 @@ class LightSpell(Spell):
     # ------------------------------------------------------------------ #
     # Apply
     # ------------------------------------------------------------------ #
+    RESULT_TYPES = ('light',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item.get('type') != 'light':
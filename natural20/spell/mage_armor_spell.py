@@ -49,6 +49,8 @@ class MageArmorSpell(Spell):
         if target.wearing_armor():
             self.errors.append('wearing_armor')
 
+    RESULT_TYPES = ('mage_armor',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if battle and session is None:
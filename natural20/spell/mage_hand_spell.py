@@ -144,6 +144,8 @@ class MageHandSpell(Spell):
             'refresh_map': True
         }]
 
+    RESULT_TYPES = ('mage_hand',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if battle and session is None:
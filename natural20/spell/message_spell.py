@@ -87,6 +87,8 @@ class MessageSpell(Spell):
             'spell': self.properties,
         }]
 
+    RESULT_TYPES = ('message_spell', 'message_spell_failed')
+
     @staticmethod
     def apply(battle, item, session=None):
         if item.get('type') == 'message_spell_failed':
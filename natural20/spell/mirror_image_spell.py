@@ -106,6 +106,8 @@ class MirrorImageSpell(Spell):
       owner.dismiss_effect(self)
     return self.images_remaining
 
+  RESULT_TYPES = ('mirror_image',)
+
   @staticmethod
   def apply(battle, item, session=None):
     if item.get('type') != 'mirror_image':
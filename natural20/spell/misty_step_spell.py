@@ -78,6 +78,8 @@ class MistyStepSpell(Spell):
             'refresh_map': True
         }]
 
+    RESULT_TYPES = ('misty_step',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item.get('type') != 'misty_step':
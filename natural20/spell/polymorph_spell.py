@@ -51,6 +51,8 @@ class PolymorphSpell(Spell):
             'dc': dc,
         }]
 
+    RESULT_TYPES = ('polymorph',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if session is None:
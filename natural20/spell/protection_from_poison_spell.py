@@ -48,6 +48,8 @@ class ProtectionFromPoisonSpell(Spell):
 
         return resistances
 
+    RESULT_TYPES = ('protection_from_poison',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if battle and session is None:
@@ -101,6 +101,8 @@ class RayOfFrostSpell(AttackSpell):
             opt = {}
         return max(opt['value'] - 10, 0)
 
+    RESULT_TYPES = ('ray_of_frost',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item['type'] == 'ray_of_frost':
@@ -81,6 +81,8 @@ class ResistanceSpell(Spell):
                 pass
         return new_roll
 
+    RESULT_TYPES = ('resistance',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if session is None:
@@ -22,6 +22,8 @@ class ShieldOfFaithSpell(Spell):
         }
 
 
+    RESULT_TYPES = ('shield_of_faith',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if battle and session is None:
@@ -6,6 +6,8 @@ class ShieldSpell(Spell):
     def build_map(self, action):
         return action
 
+    RESULT_TYPES = ('shield',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item['type'] == 'shield':
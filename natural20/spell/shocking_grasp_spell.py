@@ -100,6 +100,8 @@ class ShockingGraspSpell(AttackSpell):
 
         return result
 
+    RESULT_TYPES = ('shocking_grasp',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item['type'] == 'shocking_grasp':
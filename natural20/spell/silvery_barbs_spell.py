@@ -186,6 +186,8 @@ class SilveryBarbsSpell(Spell):
                 if isinstance(effect, SilveryBarbsAdvantageEffect):
                     ally.dismiss_effect(effect)
 
+    RESULT_TYPES = ('silvery_barbs_advantage', 'silvery_barbs_reroll')
+
     @staticmethod
     def apply(battle, item, session=None):
         if item['type'] == 'silvery_barbs_advantage':
@@ -136,6 +136,8 @@ class SleepSpell(Spell):
         session = getattr(entity, 'session', None)
         SleepSpell.wake_sleeping_target(entity, session=session)
 
+    RESULT_TYPES = ('sleep', 'sleep_cast')
+
     @staticmethod
     def apply(battle, item, session=None):
         if battle and session is None:
@@ -91,6 +91,8 @@ class SlowSpell(Spell):
         if save_roll.result() >= dc:
             entity.dismiss_effect(effect)
 
+    RESULT_TYPES = ('slow',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if session is None:
@@ -62,6 +62,8 @@ class SpareTheDyingSpell(Spell):
         if not (isinstance(target, Npc) or isinstance(target, PlayerCharacter)):
             self.errors.append("target must be an entity")
 
+    RESULT_TYPES = ('spare_the_dying',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item['type'] == 'spare_the_dying':
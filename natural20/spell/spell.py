@@ -53,6 +53,14 @@ class AttackHook:
         pass
 
 class Spell:
+    # Bumped whenever a spell class is defined, so SpellAction can rebuild
+    # its result dispatch index when more spell modules get imported.
+    subclass_generation = 0
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        Spell.subclass_generation += 1
+
     def __init__(self, session, source, spell_name, details):
         self.session = session
         self.name = spell_name
@@ -121,6 +129,8 @@ class Spell:
             casting_class=casting_class
         )
 
+    RESULT_TYPES = ()
+
     @staticmethod
     def apply(battle, item, session=None):
         pass
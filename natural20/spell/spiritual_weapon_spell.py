@@ -65,6 +65,8 @@ class SpiritualWeaponSpell(Spell):
 
         return len(self.errors) == 0
 
+    RESULT_TYPES = ('spiritual_weapon',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if battle and session is None:
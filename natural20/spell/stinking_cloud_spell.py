@@ -173,6 +173,8 @@ class StinkingCloudSpell(Spell):
             'duration_rounds': _wind_duration_rounds(battle_map),
         }]
 
+    RESULT_TYPES = ('stinking_cloud',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item.get('type') != 'stinking_cloud':
@@ -124,6 +124,8 @@ class ThunderwaveSpell(DamageScalingMixin, SaveForHalfMixin, Spell):
             on_failure=push_on_failure,
         )
 
+    RESULT_TYPES = ('thunderwave_push',)
+
     @staticmethod
     def apply(battle, item, session=None):
         # Handle push movement and emit a simple log event
@@ -35,6 +35,8 @@ class TonguesSpell(Spell):
             'spell': self.properties,
         }]
 
+    RESULT_TYPES = ('wizard_spell_effect',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item.get('type') != 'wizard_spell_effect':
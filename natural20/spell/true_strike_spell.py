@@ -69,6 +69,8 @@ class TrueStrikeSpell(Spell):
             ]
         return []
 
+    RESULT_TYPES = ('true_strike',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item['type'] == 'true_strike':
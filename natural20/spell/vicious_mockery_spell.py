@@ -123,6 +123,8 @@ class ViciousMockerySpell(Spell):
             'cover_ac': None,
         }]
 
+    RESULT_TYPES = ('vicious_mockery',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item['type'] != 'vicious_mockery':
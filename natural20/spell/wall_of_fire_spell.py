@@ -110,6 +110,8 @@ class WallOfFireSpell(Spell):
 
         return wall_squares
 
+    RESULT_TYPES = ('wall_of_fire_zone',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item.get('type') != 'wall_of_fire_zone':
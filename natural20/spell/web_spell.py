@@ -135,6 +135,8 @@ class WebSpell(Spell):
       'map': battle_map,
     }]
 
+  RESULT_TYPES = ('web',)
+
   @staticmethod
   def apply(battle, item, session=None):
     if item.get('type') != 'web':
@@ -189,6 +189,8 @@ class WitchBoltSpell(AttackSpell):
 
         return result
 
+    RESULT_TYPES = ('witch_bolt',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item.get('type') != 'witch_bolt':
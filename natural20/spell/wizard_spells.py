@@ -60,6 +60,8 @@ class UtilityWizardSpell(Spell):
             'spell': self.properties,
         }]
 
+    RESULT_TYPES = ('wizard_spell_effect',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item.get('type') != 'wizard_spell_effect':
@@ -118,6 +120,8 @@ class ProtectionFromEnergySpell(UtilityWizardSpell):
         return {'param': [{'type': 'select_choice', 'choices': choices, 'num': 1}],
                 'next': set_damage_type}
 
+    RESULT_TYPES = ('protection_from_energy',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item.get('type') != 'protection_from_energy':
@@ -448,6 +452,8 @@ class CounterspellSpell(UtilityWizardSpell):
             'target_spell_level': target_spell_level,
         }]
 
+    RESULT_TYPES = ('abjuration_check',)
+
     @staticmethod
     def apply(battle, item, session=None):
         if item.get('type') != 'abjuration_check':
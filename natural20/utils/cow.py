@@ -51,6 +51,13 @@ class CopyOnWriteDict(MutableMapping):
         self._detach()
         self._data.update(other, **kwds)
 
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, CopyOnWriteDict):
+            other = other._data
+        return self._data == other
+
+    __hash__ = None  # type: ignore[assignment]
+
     # Introspection helpers
     @property
     def data(self) -> Dict[Any, Any]:
@@ -119,6 +126,13 @@ class CopyOnWriteList(MutableSequence):
         self._detach()
         self._data.sort(*args, **kwargs)
 
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, CopyOnWriteList):
+            other = other._data
+        return self._data == other
+
+    __hash__ = None  # type: ignore[assignment]
+
     # Introspection helpers
     @property
     def data(self) -> List[Any]:
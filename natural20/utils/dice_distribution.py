@@ -0,0 +1,186 @@
+"""Exact probability distributions for dice rolls.
+
+AI scoring asks the same questions over and over ("what does 2d6+3
+average?", "how likely is 1d20+5 to reach AC 15?", "can 2d8+2 drop a
+creature with 9 hp?"). ``distribution`` answers them from the exact
+probability mass function of a roll, built once with NumPy convolution
+and kept in an LRU cache keyed by the normalized roll (dice count and
+sides, modifiers, advantage/disadvantage, crit doubling and halving), so
+``"1d20 + 5"`` and ``"1d20+5"`` share a table.
+
+Modifiers are applied the way ``DieRoll.result`` applies them: the flat
+modifier is added to the dice total, then ``*``/``/`` operands (``/``
+truncates), then halving (floor). Advantage and disadvantage apply per
+die, as ``Roller`` rolls a pair for every die.
+"""
+from functools import lru_cache
+import numpy as np
+
+
+class DiceDistribution:
+    """Distribution of a roll total: ``weights[i]`` is the relative weight of ``low + i``.
+
+    Weights are kept unnormalized (outcome counts for small rolls). Sums of
+    dice plus a flat modifier also carry their closed-form ``mean``, which
+    ``expected`` reports as is.
+    """
+
+    __slots__ = ('low', 'weights', 'total', 'mean', '_at_least')
+
+    def __init__(self, low, weights, mean=None):
+        weights = np.asarray(weights, dtype=np.float64)
+        weights.setflags(write=False)
+        self.low = int(low)
+        self.weights = weights
+        self.total = float(weights.sum())
+        # closed-form expectation when known (sums of dice plus a flat modifier)
+        self.mean = mean
+        # _at_least[i] = weight of totals >= low + i
+        self._at_least = np.cumsum(weights[::-1])[::-1]
+
+    def __repr__(self):
+        return f"DiceDistribution(low={self.low}, high={self.high()})"
+
+    def high(self):
+        return self.low + len(self.weights) - 1
+
+    def values(self):
+        return np.arange(self.low, self.high() + 1)
+
+    def pmf(self):
+        """``(values, probabilities)`` arrays."""
+        return self.values(), self.weights / self.total
+
+    def expected(self):
+        if self.mean is not None:
+            return self.mean
+        return float(np.dot(self.values(), self.weights)) / self.total
+
+    def prob(self, x):
+        """Probability that the total is at least ``x``."""
+        index = int(np.ceil(x)) - self.low
+        if index <= 0:
+            return 1.0
+        if index >= len(self.weights):
+            return 0.0
+        return float(self._at_least[index]) / self.total
+
+    def percentile(self, q):
+        """Smallest total ``t`` with ``P(total <= t) >= q`` (``q`` in [0, 1])."""
+        cdf = np.cumsum(self.weights) / self.total
+        index = int(np.searchsorted(cdf, min(max(q, 0.0), 1.0) - 1e-12))
+        return self.low + min(index, len(self.weights) - 1)
+
+    def shift(self, amount):
+        mean = self.mean + amount if self.mean is not None else None
+        return DiceDistribution(self.low + int(amount), self.weights, mean)
+
+    def map(self, fn):
+        """Distribution of ``fn(total)`` for an integer function ``fn``."""
+        mapped = np.array([fn(int(v)) for v in self.values()], dtype=np.int64)
+        low = int(mapped.min())
+        return DiceDistribution(low, np.bincount(mapped - low, weights=self.weights))
+
+    def __add__(self, other):
+        if isinstance(other, DiceDistribution):
+            mean = self.mean + other.mean if self.mean is not None and other.mean is not None else None
+            return DiceDistribution(self.low + other.low, np.convolve(self.weights, other.weights), mean)
+        return self.shift(other)
+
+    __radd__ = __add__
+
+
+def _die_weights(sides, advantage=False, disadvantage=False):
+    faces = np.arange(1, sides + 1, dtype=np.float64)
+    if advantage and not disadvantage:
+        # P(max of two = k) is proportional to 2k - 1
+        return 2 * faces - 1
+    if disadvantage and not advantage:
+        return 2 * (sides - faces) + 1
+    return np.ones(sides)
+
+
+def _die_mean(sides, advantage=False, disadvantage=False):
+    p = 1.0 / sides
+    if advantage and not disadvantage:
+        return sum(i * ((p * (i * p)) + ((i - 1) * p * p)) for i in range(1, sides + 1))
+    if disadvantage and not advantage:
+        return sum(i * ((p * ((sides - i + 1) * p)) + ((sides - i) * p * p)) for i in range(1, sides + 1))
+    return sum(i * p for i in range(1, sides + 1))
+
+
+def _convolve_power(weights, count):
+    result = np.ones(1)
+    base = weights
+    while count:
+        if count & 1:
+            result = np.convolve(result, base)
+        count >>= 1
+        if count:
+            base = np.convolve(base, base)
+    return result
+
+
+@lru_cache(maxsize=1024)
+def _cached(count, sides, modifier, modifier_op, modifier_val, advantage, disadvantage, halved):
+    if sides <= 0:
+        dist = DiceDistribution(count, [1.0], mean=count)
+    else:
+        dist = DiceDistribution(count, _convolve_power(_die_weights(sides, advantage, disadvantage), count),
+                                mean=count * _die_mean(sides, advantage, disadvantage))
+    dist = dist.shift(modifier)
+
+    if modifier_op and modifier_val is not None:
+        if modifier_op == '+':
+            dist = dist.shift(modifier_val)
+        elif modifier_op == '-':
+            dist = dist.shift(-modifier_val)
+        elif modifier_op == '*':
+            dist = dist.map(lambda v: v * modifier_val)
+        elif modifier_op == '/':
+            dist = dist.map(lambda v: int(v / modifier_val))
+
+    if halved:
+        dist = dist.map(lambda v: v // 2)
+    return dist
+
+
+def distribution_for(count, sides, modifier=0, modifier_op=None, modifier_val=None,
+                     advantage=False, disadvantage=False, halved=False):
+    """Cached distribution for an already parsed roll (see ``DieRoll.expected``)."""
+    if advantage and disadvantage:
+        advantage = disadvantage = False
+    if modifier_op not in ('*', '/') and modifier_val is not None:
+        # fold +/- operands into the flat modifier so equivalent rolls share a table
+        modifier += modifier_val if modifier_op != '-' else -modifier_val
+        modifier_op, modifier_val = None, None
+    return _cached(int(count), int(sides), int(modifier), modifier_op or None, modifier_val,
+                   bool(advantage), bool(disadvantage), bool(halved))
+
+
+def distribution(roll_str, crit=False, advantage=False, disadvantage=False, halved=False):
+    """Distribution of ``DieRoll.roll(roll_str, crit=..., advantage=..., disadvantage=...)``."""
+    from natural20.die_roll import DieRoll
+
+    detail = DieRoll.parse(roll_str)
+    modifier_op = detail.modifier_op or None
+    modifier_val = int(detail.modifier) if detail.modifier else None
+    if not detail.die_type:
+        modifier = int(f"{modifier_op or '+'}{modifier_val}") if modifier_val is not None else 0
+        return distribution_for(detail.die_count, 0, modifier)
+
+    count = detail.die_count * 2 if crit else detail.die_count
+    if modifier_op in ('*', '/'):
+        return distribution_for(count, int(detail.die_type), 0, modifier_op, modifier_val,
+                                advantage=advantage, disadvantage=disadvantage, halved=halved)
+    modifier = int(f"{modifier_op or '+'}{modifier_val}") if modifier_val is not None else 0
+    return distribution_for(count, int(detail.die_type), modifier,
+                            advantage=advantage, disadvantage=disadvantage, halved=halved)
+
+
+def cache_info():
+    return _cached.cache_info()
+
+
+def cache_clear():
+    _cached.cache_clear()
@@ -0,0 +1,105 @@
+"""Expiry-aware store behind ``Entity.effects``.
+
+``Entity.effects`` maps an effect type to the list of effect descriptors
+registered for it (``{'handler', 'method', 'effect', 'source'}`` plus an
+optional ``'expiration'`` in game time). ``EffectStore`` is that same
+mapping (a ``dict`` subclass, so serialization through
+``effect_registry.serialize_effects_dict`` and the entity ``to_dict``
+helpers is unchanged) with an index on top:
+
+* a per-type list of the descriptors that have not expired yet, in
+  registration order;
+* a min-heap of expiration times, so advancing ``game_time`` only drops
+  the descriptors that actually expired (lazily, on the next query).
+
+Expired descriptors stay in the mapping itself until
+``Entity._cleanup_effects`` dismisses them, exactly as before; the index
+only answers "what is active now". Descriptors are added with ``add``;
+lists replaced or edited any other way are noticed (by identity and
+length) and re-indexed on the next query.
+"""
+import heapq
+
+
+def _active_at(descriptor, now):
+    expiration = descriptor.get('expiration')
+    return not expiration or expiration > now
+
+
+class EffectStore(dict):
+    def __init__(self, effects=None):
+        super().__init__(effects or {})
+        self._active = {}
+        self._heap = []  # (expiration, seq, effect_type, descriptor)
+        self._seq = 0
+        self._synced = None  # effect_type -> (id(list), len(list)) when the index was built
+        self._now = None
+
+    def add(self, effect_type, descriptor, now):
+        """Register ``descriptor`` under ``effect_type`` (``now`` is the current game time)."""
+        descriptors = self.setdefault(effect_type, [])
+        in_sync = self._synced is not None and self._in_sync()
+        descriptors.append(descriptor)
+        if not in_sync:
+            return
+        self._synced[effect_type] = (id(descriptors), len(descriptors))
+        if self._now is not None and now >= self._now and _active_at(descriptor, now):
+            self._active.setdefault(effect_type, []).append(descriptor)
+            if descriptor.get('expiration'):
+                self._seq += 1
+                heapq.heappush(self._heap, (descriptor['expiration'], self._seq, effect_type, descriptor))
+        else:
+            self._synced = None
+
+    def active(self, effect_type, now):
+        """Descriptors of ``effect_type`` that have not expired at ``now``."""
+        self._refresh(now)
+        return self._active.get(effect_type, ())
+
+    def all_active(self, now):
+        """Every unexpired descriptor, grouped by type in registration order."""
+        self._refresh(now)
+        active = self._active
+        return [descriptor for effect_type in self for descriptor in active.get(effect_type, ())]
+
+    def _in_sync(self):
+        synced = self._synced
+        if len(synced) != len(self):
+            return False
+        for effect_type, descriptors in self.items():
+            if synced.get(effect_type) != (id(descriptors), len(descriptors)):
+                return False
+        return True
+
+    def _rebuild(self, now):
+        self._active = {}
+        self._heap = []
+        for effect_type, descriptors in self.items():
+            active = [descriptor for descriptor in descriptors if _active_at(descriptor, now)]
+            if active:
+                self._active[effect_type] = active
+            for descriptor in active:
+                if descriptor.get('expiration'):
+                    self._seq += 1
+                    self._heap.append((descriptor['expiration'], self._seq, effect_type, descriptor))
+        heapq.heapify(self._heap)
+        self._synced = {effect_type: (id(descriptors), len(descriptors)) for effect_type, descriptors in self.items()}
+        self._now = now
+
+    def _refresh(self, now):
+        if self._synced is None or self._now is None or now < self._now or not self._in_sync():
+            self._rebuild(now)
+            return
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            _expiration, _seq, effect_type, descriptor = heapq.heappop(heap)
+            active = self._active.get(effect_type)
+            if active is None:
+                continue
+            for index, candidate in enumerate(active):
+                if candidate is descriptor:
+                    del active[index]
+                    break
+            if not active:
+                del self._active[effect_type]
+        self._now = now
@@ -246,6 +246,17 @@ def retrieve_opportunity_attacks(entity, move_list, battle):
 
 def opportunity_attack_list(entity, current_moves, battle, map):
     opponents = battle.opponents_of(entity)
+    if current_moves and map.feet_per_grid > 0:
+        # only opponents whose reach can touch the path need the per-step checks
+        reaches = [reach for reach in (enemy.melee_distance() for enemy in opponents) if reach]
+        if not reaches:
+            return []
+        xs = [pos[0] for pos in current_moves]
+        ys = [pos[1] for pos in current_moves]
+        extent = entity.token_size() - 1
+        radius = int((max(reaches) + 3.5) // map.feet_per_grid)
+        nearby = set(map.spatial_index.near_box(min(xs), min(ys), max(xs) + extent, max(ys) + extent, radius))
+        opponents = [enemy for enemy in opponents if enemy in nearby]
     entered_melee_range = set()
     left_melee_range = []
     for index, path in enumerate(current_moves):
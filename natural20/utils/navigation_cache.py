@@ -0,0 +1,126 @@
+"""Per-map cache of movement passability between neighbouring tiles.
+
+``PathCompute`` asks ``Map.bidirectionally_passable`` up to three times per
+neighbour it expands (the step itself plus the two orthogonal tiles of a
+diagonal), and used to forget every answer after each query.  The part of
+those answers that only depends on the terrain (walls, closed doors,
+directional walls and other impassable objects, for a creature of a given
+footprint) is memoized here, in the same per-direction bit encoding
+``build_pathfinding_snapshot`` ships to the browser: bit ``i`` of a tile's
+mask is set when the step ``DIR_OFFSETS[i]`` out of that tile is passable.
+
+Layers are keyed by the footprint the passability rules use (``token_size``,
+one less when squeezing), so every creature of the same size class shares
+them.  Creatures standing in the way and the ``ignore_opposing`` rule are not
+part of the layers; ``PathCompute`` applies them on top from ``Map.tokens``,
+so entity movement never invalidates anything.  A tile change (door toggle,
+object placed or removed) only forgets the masks of the tiles whose steps
+touch it, and tiles near objects that can change without notifying the map
+(see ``terrain_grid.VOLATILE``) are never cached.
+"""
+import numpy as np
+
+from natural20.utils.terrain_grid import VOLATILE
+
+# Step directions in the order PathCompute expands neighbours (bit i of a mask)
+DIR_OFFSETS = (
+    (-1, -1), (-1, 0), (-1, 1),
+    (0, -1), (0, 1),
+    (1, -1), (1, 0), (1, 1),
+)
+DIR_BITS = {offset: 1 << index for index, offset in enumerate(DIR_OFFSETS)}
+
+KNOWN = 1 << 8  # the mask of the tile has been computed
+
+
+def footprint_for(entity, squeeze):
+    """Side of the square of tiles ``Map.passable`` checks for ``entity``."""
+    token_size = entity.token_size()
+    return token_size - 1 if squeeze and token_size > 1 else token_size
+
+
+class NavigationLayer:
+    """Passability masks of every tile for one creature footprint."""
+
+    def __init__(self, battle_map, footprint):
+        self.map = battle_map
+        self.footprint = footprint
+        width, height = battle_map.size
+        self.width = width
+        self.height = height
+        self.masks = np.zeros((width, height), dtype=np.uint16)
+        # hierarchical_path.ClusterGraph built over these masks, if any
+        self.clusters = None
+
+    def mask(self, entity, squeeze, pos_x, pos_y):
+        """Bits of the passable steps out of (pos_x, pos_y) for a creature of this footprint."""
+        value = self.masks.item(pos_x, pos_y)
+        if value & KNOWN:
+            return value & 0xff
+        value = self._compute(entity, squeeze, pos_x, pos_y)
+        if not self._volatile_near(pos_x, pos_y):
+            self.masks[pos_x, pos_y] = value | KNOWN
+        return value
+
+    def _compute(self, entity, squeeze, pos_x, pos_y):
+        value = 0
+        passable = self.map.bidirectionally_passable
+        for dx, dy in DIR_OFFSETS:
+            dest_x = pos_x + dx
+            dest_y = pos_y + dy
+            if not (0 <= dest_x < self.width and 0 <= dest_y < self.height):
+                continue
+            # no battle: creature occupancy is applied by the caller
+            if passable(entity, dest_x, dest_y, (pos_x, pos_y), None, squeeze):
+                value |= DIR_BITS[(dx, dy)]
+        return value
+
+    def _volatile_near(self, pos_x, pos_y):
+        # every tile some step out of (pos_x, pos_y) looks at
+        flags = self.map.terrain_grid.flags
+        reach = self.footprint + 1
+        return bool((flags[max(pos_x - 1, 0):pos_x + reach, max(pos_y - 1, 0):pos_y + reach] & VOLATILE).any())
+
+    def invalidate(self, pos_x, pos_y):
+        """Forget the masks of every tile with a step whose footprints cover (pos_x, pos_y)."""
+        min_x = max(pos_x - self.footprint, 0)
+        min_y = max(pos_y - self.footprint, 0)
+        self.masks[min_x:pos_x + 2, min_y:pos_y + 2] = 0
+        if self.clusters is not None:
+            self.clusters.invalidate(min_x, min_y, pos_x + 1, pos_y + 1)
+
+    def clear(self):
+        self.masks[:, :] = 0
+        self.clusters = None
+
+
+class NavigationCache:
+    """Navigation layers of one map, created on first use per footprint."""
+
+    def __init__(self, battle_map):
+        self.map = battle_map
+        self._layers = {}
+        # navigation_components.ComponentLabels by footprints and door handling
+        self.components = {}
+
+    def layer(self, entity, squeeze):
+        footprint = footprint_for(entity, squeeze)
+        layer = self._layers.get(footprint)
+        if layer is None or (layer.width, layer.height) != tuple(self.map.size):
+            layer = NavigationLayer(self.map, footprint)
+            self._layers[footprint] = layer
+        return layer
+
+    def usable(self):
+        """Tiny hut domes block movement per creature, so no mask is shared while one is up."""
+        return not self.map.visibility.domes()
+
+    def invalidate(self, pos_x, pos_y):
+        for layer in self._layers.values():
+            layer.invalidate(pos_x, pos_y)
+        for labels in self.components.values():
+            labels.invalidate(pos_x - labels.footprint, pos_y - labels.footprint, pos_x + 1, pos_y + 1)
+
+    def clear(self):
+        self._layers.clear()
+        self.components.clear()
@@ -0,0 +1,140 @@
+"""Connected components of the walkable tiles of a map.
+
+Two tiles get the same label when some chain of steps joins them under the
+terrain passability of ``NavigationCache`` (for one creature footprint,
+squeezing included). Creatures and hazards only ever remove steps, so
+tiles with different labels can never be joined by ``PathCompute``:
+such a query is answered as unreachable without searching.
+
+The door-aware variant treats every tile holding a door as a soft edge,
+open towards all its neighbours, which is how door-navigation queries
+plan through closed doors. Tiles next to objects that change without
+telling the map (``terrain_grid.VOLATILE``) are treated the same way, so
+the labels never claim more than the map can guarantee.
+
+Labels are computed once per map and footprint. A tile change only
+relabels the components around the changed tiles.
+"""
+from collections import deque
+
+import numpy as np
+
+from natural20.item_library.door_object import DoorObject, DoorObjectWall
+from natural20.utils.navigation_cache import DIR_BITS, DIR_OFFSETS, footprint_for
+from natural20.utils.terrain_grid import HAS_OBJECTS
+
+_ALL_STEPS = 0xff
+
+
+class ComponentLabels:
+    """Component label of every tile for one footprint (0 until labelled)."""
+
+    def __init__(self, navigation, entity, door_soft=False):
+        self.navigation = navigation
+        self.map = navigation.map
+        self.footprint = footprint_for(entity, False)
+        self.door_soft = door_soft
+        width, height = self.map.size
+        self.width = width
+        self.height = height
+        self.labels = np.zeros((width, height), dtype=np.int32)
+        self._next_label = 1
+        self._dirty = []  # (min_x, min_y, max_x, max_y) boxes to relabel
+        self._labelled = False
+
+    def invalidate(self, min_x, min_y, max_x, max_y):
+        if self._labelled:
+            self._dirty.append((max(min_x, 0), max(min_y, 0),
+                                min(max_x, self.width - 1), min(max_y, self.height - 1)))
+
+    def label(self, entity, pos_x, pos_y):
+        self._refresh(entity)
+        return self.labels.item(pos_x, pos_y)
+
+    def connected(self, entity, source, destination):
+        """False only when no walk at all joins the two tiles."""
+        self._refresh(entity)
+        return self.labels.item(*source) == self.labels.item(*destination)
+
+    def _refresh(self, entity):
+        if not self._labelled:
+            self._labelled = True
+            self._relabel(entity, np.ones((self.width, self.height), dtype=bool))
+            return
+        if not self._dirty:
+            return
+        labels = self.labels
+        affected = set()
+        for min_x, min_y, max_x, max_y in self._dirty:
+            box = labels[max(min_x - 1, 0):max_x + 2, max(min_y - 1, 0):max_y + 2]
+            affected.update(np.unique(box).tolist())
+        self._dirty = []
+        # the changed steps all start or end in the boxes, so whole
+        # components touching them are the only ones that can split or merge
+        self._relabel(entity, np.isin(labels, list(affected)))
+
+    def _steps(self, entity, pos_x, pos_y):
+        """Step bits out of a tile: the union of the normal and squeezing masks."""
+        flags = self.map.terrain_grid.flags
+        if self.door_soft and flags[pos_x, pos_y] & HAS_OBJECTS and self._is_door_tile(pos_x, pos_y):
+            return _ALL_STEPS
+        navigation = self.navigation
+        steps = 0
+        for squeeze in (False, True):
+            layer = navigation.layer(entity, squeeze)
+            if layer._volatile_near(pos_x, pos_y):
+                return _ALL_STEPS
+            steps |= layer.mask(entity, squeeze, pos_x, pos_y)
+        return steps
+
+    def _is_door_tile(self, pos_x, pos_y):
+        for obj in self.map.objects_at(pos_x, pos_y):
+            if isinstance(obj, (DoorObject, DoorObjectWall)):
+                return True
+            if hasattr(obj, 'kind_of_door') and obj.kind_of_door():
+                return True
+        return False
+
+    def _relabel(self, entity, region):
+        """Flood-fill fresh labels over the tiles of ``region``."""
+        labels = self.labels
+        labels[region] = 0
+        width, height = self.width, self.height
+        steps_of = {}
+
+        def steps(tile):
+            value = steps_of.get(tile)
+            if value is None:
+                value = self._steps(entity, *tile)
+                steps_of[tile] = value
+            return value
+
+        for start in zip(*np.nonzero(region)):
+            start = (int(start[0]), int(start[1]))
+            if labels.item(start):
+                continue
+            label = self._next_label
+            self._next_label += 1
+            labels[start] = label
+            queue = deque([start])
+            while queue:
+                pos_x, pos_y = tile = queue.popleft()
+                out = steps(tile)
+                for dx, dy in DIR_OFFSETS:
+                    nx, ny = pos_x + dx, pos_y + dy
+                    if not (0 <= nx < width and 0 <= ny < height) or labels.item(nx, ny):
+                        continue
+                    # soft tiles open in both directions
+                    if out & DIR_BITS[(dx, dy)] or steps((nx, ny)) & DIR_BITS[(-dx, -dy)]:
+                        labels[nx, ny] = label
+                        queue.append((nx, ny))
+
+
+def component_labels(navigation, entity, door_soft=False):
+    """The ``ComponentLabels`` of a navigation cache for ``entity``'s footprint, created on first use."""
+    key = (footprint_for(entity, False), footprint_for(entity, True), door_soft)
+    labels = navigation.components.get(key)
+    if labels is None or (labels.width, labels.height) != tuple(navigation.map.size):
+        labels = ComponentLabels(navigation, entity, door_soft)
+        navigation.components[key] = labels
+    return labels
@@ -0,0 +1,171 @@
+"""Seedable random number streams for dice rolls.
+
+By default every roll draws from the module-global ``random`` generator
+and ``DieRoll.fudge`` writes to the global ``FUDGE_HASH``, which is what
+the test suite and interactive play rely on (``random.seed`` keeps
+working). A seeded ``RngStream`` scopes both to a session instead:
+
+    session.seed_rng(1234)          # session stream
+    battle = Battle(session, map)   # battle stream, derived from the session's
+    battle.rng_for(entity)          # per-creature child stream
+
+Child streams are derived from their parent's seed and a key, not from
+the parent's state, so the dice a creature rolls do not depend on how
+many rolls other creatures made before it. A stream's state (including
+its children and pending fudges) round-trips through ``to_dict`` /
+``RngStream.from_dict`` and ``Session.to_dict``, so a battle can be
+replayed exactly. Streams are independent objects, so simulations in
+different threads or processes never share randomness or fudge state;
+``use_stream`` sets the stream used by rolls that have no battle or
+session to resolve one from, for the current thread only.
+"""
+import hashlib
+import random
+import threading
+from contextlib import contextmanager
+
+
+def derive_seed(seed, key):
+    """Deterministic 64-bit seed for the child ``key`` of a stream seeded with ``seed``."""
+    digest = hashlib.sha256(f"{seed}/{key}".encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+
+class RngStream:
+    def __init__(self, seed=None, key=None):
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        self.seed = seed
+        self.key = key
+        self.random = random.Random(seed)
+        self.fudges = {}
+        self.children = {}
+        self._spawned = {}
+
+    def __repr__(self):
+        return f"RngStream(seed={self.seed!r}, key={self.key!r})"
+
+    def child(self, key):
+        """The child stream for ``key`` (created on first use, then reused)."""
+        key = str(key)
+        stream = self.children.get(key)
+        if stream is None:
+            stream = RngStream(derive_seed(self.seed, key), key=key)
+            self.children[key] = stream
+        return stream
+
+    def spawn(self, prefix):
+        """A new child stream ``<prefix>-<n>``, numbered in creation order."""
+        index = self._spawned.get(prefix, 0)
+        self._spawned[prefix] = index + 1
+        return self.child(f"{prefix}-{index}")
+
+    def fudge(self, fixed_roll, die_sides=20):
+        self.fudges[die_sides] = fixed_roll
+
+    def unfudge(self, die_sides=20):
+        self.fudges.pop(die_sides, None)
+
+    def randint(self, low, high):
+        return self.random.randint(low, high)
+
+    def generate_number(self, die_sides, advantage=False, disadvantage=False):
+        if die_sides in self.fudges:
+            fudge_val = self.fudges.pop(die_sides)
+            if advantage or disadvantage:
+                return [fudge_val, fudge_val]
+            return fudge_val
+
+        if advantage or disadvantage:
+            return self.random.sample(range(1, die_sides + 1), 2)
+        return self.random.randint(1, die_sides)
+
+    def to_dict(self):
+        version, internal, gauss_next = self.random.getstate()
+        return {
+            'seed': self.seed,
+            'key': self.key,
+            'state': [version, list(internal), gauss_next],
+            'fudges': {str(k): v for k, v in self.fudges.items()},
+            'spawned': dict(self._spawned),
+            'children': {key: child.to_dict() for key, child in self.children.items()},
+        }
+
+    @staticmethod
+    def from_dict(data):
+        stream = RngStream(data['seed'], key=data.get('key'))
+        version, internal, gauss_next = data['state']
+        stream.random.setstate((version, tuple(internal), gauss_next))
+        stream.fudges = {int(k): v for k, v in (data.get('fudges') or {}).items()}
+        stream._spawned = dict(data.get('spawned') or {})
+        stream.children = {key: RngStream.from_dict(child) for key, child in (data.get('children') or {}).items()}
+        return stream
+
+
+class GlobalRngStream:
+    """The unseeded default: module ``random`` and ``die_roll.FUDGE_HASH``."""
+
+    seed = None
+    key = None
+
+    def child(self, key):
+        return self
+
+    def spawn(self, prefix):
+        return self
+
+    @property
+    def fudges(self):
+        from natural20.die_roll import FUDGE_HASH
+        return FUDGE_HASH
+
+    def fudge(self, fixed_roll, die_sides=20):
+        self.fudges[die_sides] = fixed_roll
+
+    def unfudge(self, die_sides=20):
+        self.fudges.pop(die_sides, None)
+
+    def randint(self, low, high):
+        return random.randint(low, high)
+
+    def generate_number(self, die_sides, advantage=False, disadvantage=False):
+        fudges = self.fudges
+        if die_sides in fudges:
+            fudge_val = fudges.pop(die_sides)
+            if advantage or disadvantage:
+                return [fudge_val, fudge_val]
+            return fudge_val
+
+        if advantage or disadvantage:
+            return random.sample(range(1, die_sides + 1), 2)
+        return random.randint(1, die_sides)
+
+
+GLOBAL_STREAM = GlobalRngStream()
+
+_active = threading.local()
+
+
+def active_stream():
+    """The stream set by ``use_stream`` on this thread, or the global one."""
+    return getattr(_active, 'stream', None) or GLOBAL_STREAM
+
+
+@contextmanager
+def use_stream(stream):
+    previous = getattr(_active, 'stream', None)
+    _active.stream = stream
+    try:
+        yield stream
+    finally:
+        _active.stream = previous
+
+
+def stream_for(battle=None, entity=None):
+    """The stream a roll by ``entity`` (in ``battle``) draws from."""
+    if battle is not None and getattr(battle, 'rng', None) is not None:
+        return battle.rng_for(entity)
+    session = getattr(entity, 'session', None) if entity is not None else None
+    if session is not None and getattr(session, 'rng', None) is not None:
+        return session.rng
+    return active_stream()
@@ -0,0 +1,129 @@
+"""Bucket grid of the creature tokens on a map, for range queries.
+
+``Map.distance`` is the truncated euclidean distance between the closest
+squares of two tokens, so two tokens within ``n`` squares of each other
+never have a gap of more than ``n`` squares on either axis. The index
+answers "which tokens come within ``n`` squares of this box" by looking
+only at the buckets around the box; callers still apply their exact
+distance (and line of sight) to the few candidates it returns.
+
+``Map.place``, ``Map.move_to`` and ``Map.remove`` keep it current.
+"""
+import os
+
+BUCKET_SIZE = 8
+_BUCKET_SIZE_ENV = os.environ.get('N20_SPATIAL_BUCKET_SIZE')
+if _BUCKET_SIZE_ENV:
+    try:
+        BUCKET_SIZE = max(1, int(_BUCKET_SIZE_ENV))
+    except ValueError:
+        pass
+
+# Largest token (gargantuan). Sizes can change in place (enlarge/reduce),
+# so buckets are searched as if every token could be this big.
+MAX_TOKEN_SIZE = 4
+
+
+def _token_size(entity):
+    return entity.token_size() if hasattr(entity, 'token_size') else 1
+
+
+class SpatialIndex:
+    """Token anchors bucketed by ``BUCKET_SIZE`` squares, in placement order.
+
+    Tokens are stored under ``key_of(entity)`` (the map stores them by uid,
+    like ``EntitiesUIDMap``) and handed back through ``resolve(key)``.
+    """
+
+    def __init__(self, entities=None, bucket_size=None, key_of=None, resolve=None):
+        self.bucket_size = bucket_size or BUCKET_SIZE
+        self.key_of = key_of or (lambda entity: entity)
+        self.resolve = resolve or (lambda key: key)
+        self.buckets = {}
+        self.positions = {}  # key -> (pos_x, pos_y, order)
+        self._next_order = 0
+        self.source = entities
+        if entities is not None:
+            for entity, (pos_x, pos_y) in entities.items():
+                self.insert(entity, pos_x, pos_y)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, entity):
+        return self.key_of(entity) in self.positions
+
+    def _bucket_of(self, pos_x, pos_y):
+        return (pos_x // self.bucket_size, pos_y // self.bucket_size)
+
+    def insert(self, entity, pos_x, pos_y):
+        key = self.key_of(entity)
+        entry = self.positions.get(key)
+        order = self._next_order if entry is None else entry[2]
+        if entry is None:
+            self._next_order += 1
+        else:
+            self._discard_from(self._bucket_of(entry[0], entry[1]), key)
+        self.positions[key] = (pos_x, pos_y, order)
+        self.buckets.setdefault(self._bucket_of(pos_x, pos_y), set()).add(key)
+
+    move = insert
+
+    def remove(self, entity):
+        key = self.key_of(entity)
+        entry = self.positions.pop(key, None)
+        if entry is not None:
+            self._discard_from(self._bucket_of(entry[0], entry[1]), key)
+
+    def _discard_from(self, bucket, key):
+        members = self.buckets.get(bucket)
+        if members is not None:
+            members.discard(key)
+            if not members:
+                del self.buckets[bucket]
+
+    def near_box(self, min_x, min_y, max_x, max_y, radius):
+        """Tokens with a square at most ``radius`` squares (per axis) from the box, in placement order."""
+        size = self.bucket_size
+        low_x = min_x - radius - (MAX_TOKEN_SIZE - 1)
+        low_y = min_y - radius - (MAX_TOKEN_SIZE - 1)
+        high_x = max_x + radius
+        high_y = max_y + radius
+        found = []
+        positions = self.positions
+        buckets = self.buckets
+        range_x = range(low_x // size, high_x // size + 1)
+        range_y = range(low_y // size, high_y // size + 1)
+        if len(range_x) * len(range_y) > len(buckets):
+            # long ranges: cheaper to visit the occupied buckets
+            candidates = [bucket for bucket in buckets if bucket[0] in range_x and bucket[1] in range_y]
+        else:
+            candidates = [(bucket_x, bucket_y) for bucket_x in range_x for bucket_y in range_y]
+        resolve = self.resolve
+        for bucket in candidates:
+            for key in buckets.get(bucket, ()):
+                pos_x, pos_y, order = positions[key]
+                if pos_x > high_x or pos_y > high_y:
+                    continue
+                entity = resolve(key)
+                if entity is None:
+                    continue
+                extent = _token_size(entity) - 1
+                if pos_x + extent < min_x - radius or pos_y + extent < min_y - radius:
+                    continue
+                found.append((order, entity))
+        found.sort(key=lambda item: item[0])
+        return [entity for _order, entity in found]
+
+    def near(self, entity, radius, entity_pos=None):
+        """Tokens other than ``entity`` that may come within ``radius`` squares of it."""
+        if entity_pos is None:
+            entry = self.positions.get(self.key_of(entity))
+            if entry is None:
+                return []
+            entity_pos = entry[:2]
+        pos_x, pos_y = entity_pos
+        extent = _token_size(entity) - 1
+        key = self.key_of(entity)
+        return [other for other in self.near_box(pos_x, pos_y, pos_x + extent, pos_y + extent, radius)
+                if self.key_of(other) != key]
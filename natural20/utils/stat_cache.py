@@ -0,0 +1,110 @@
+"""Memoized derived stats for ``Entity`` and its subclasses.
+
+Armor class, speed, passive perception, the equipped item list and weapon
+proficiency are recomputed from properties, equipment tables and effects
+on every call, and renderers, AI scoring and targeting call them in tight
+loops. Methods decorated with ``derived_stat`` remember their answer
+until the entity's stat stamp (``Entity._stat_stamp``) changes.
+
+The stamp combines an explicit version counter, bumped through
+``Entity.invalidate_stats`` by the hooks that change stats (equip and
+unequip, effect registration and dismissal, modifiers, level-up, wild
+shape, shell defense), with cheap guards for state that many callers
+mutate directly: the status list (conditions), the equipped list, game
+time (effect expiry), flying, and the effect and ability score tables
+themselves.
+
+``N20_STAT_CACHE=0`` disables the cache. ``N20_VERIFY_STAT_CACHE=1``
+(on for the test suite, see ``conftest.py``) recomputes every cached
+answer and raises ``StatCacheMismatch`` when it went stale, which means a
+mutation is missing its ``invalidate_stats`` hook.
+"""
+import functools
+import os
+
+
+def _env_flag(name, default):
+    return os.environ.get(name, default).strip().lower() not in ('0', 'false', 'no', 'off', '')
+
+
+ENABLED = _env_flag('N20_STAT_CACHE', '1')
+VERIFY = _env_flag('N20_VERIFY_STAT_CACHE', '0')
+
+
+class StatCacheMismatch(AssertionError):
+    pass
+
+
+def set_verify(enabled=True):
+    global VERIFY
+    VERIFY = bool(enabled)
+
+
+def set_enabled(enabled=True):
+    global ENABLED
+    ENABLED = bool(enabled)
+
+
+def _copy(value):
+    # list results (equipped_items) are handed out as fresh containers so
+    # callers that edit them cannot corrupt the cached answer
+    if isinstance(value, list):
+        return [dict(item) if isinstance(item, dict) else item for item in value]
+    return value
+
+
+def derived_stat(method=None, *, key=None):
+    """Memoize ``method`` per entity until its stat stamp changes.
+
+    ``key`` maps the call arguments to a hashable cache key; without it the
+    positional arguments are used as is (and calls with unhashable
+    arguments are not cached).
+    """
+    def decorate(method):
+        name = method.__qualname__
+
+        @functools.wraps(method)
+        def wrapper(self, *args):
+            if not ENABLED:
+                return method(self, *args)
+            try:
+                cache_key = (name, key(*args) if key is not None else args)
+                hash(cache_key)
+            except TypeError:
+                return method(self, *args)
+
+            stamp = self._stat_stamp()
+            cached = self.__dict__.get('_stat_cache')
+            if cached is None or cached[0] != stamp:
+                cached = (stamp, {})
+                self._stat_cache = cached
+            values = cached[1]
+            if cache_key not in values:
+                value = method(self, *args)
+                values[cache_key] = value
+                return _copy(value)
+
+            value = values[cache_key]
+            if VERIFY:
+                fresh = method(self, *args)
+                if fresh != value:
+                    raise StatCacheMismatch(
+                        f"{name}{args} of {self} is stale: cached {value!r}, recomputed {fresh!r}")
+            return _copy(value)
+
+        wrapper.uncached = method
+        return wrapper
+
+    if method is not None:
+        return decorate(method)
+    return decorate
+
+
+def weapon_key(weapon):
+    """Cache key for ``proficient_with_weapon`` (weapon name or loaded weapon dict)."""
+    if isinstance(weapon, dict):
+        proficiency_type = weapon.get('proficiency_type') or ()
+        if isinstance(proficiency_type, list):
+            proficiency_type = tuple(proficiency_type)
+        return (weapon.get('name'), proficiency_type)
+    return weapon
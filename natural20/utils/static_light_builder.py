@@ -1,4 +1,7 @@
+import math
 import numpy as np
+
+
 class StaticLightBuilder:
     def __init__(self, battlemap):
         self.map = battlemap
@@ -10,9 +13,25 @@ class StaticLightBuilder:
         self.outdoor_ambient_illumination = self.base_illumination
         manual_light_map = self.properties.get('map', {}).get('light_map',[])
         self.outside_grid = self._build_outside_grid()
+        self.outside_mask = np.array(self.outside_grid, dtype=bool).reshape(tuple(self.size))
         self.lights = []
         self.fixed_lights = []
 
+        # Dynamic light grid: per-tile sum of the light carried by entities and
+        # objects, plus separate magical darkness / obscuring gas masks. Sources
+        # are re-scanned lazily once something changed (see invalidate) and only
+        # the footprints of sources that moved, toggled or lost line of sight
+        # are recomputed.
+        self.dynamic_lights = np.zeros(tuple(self.size), dtype=np.float64)
+        self.darkness_mask = np.zeros(tuple(self.size), dtype=bool)
+        self.gas_mask = np.zeros(tuple(self.size), dtype=bool)
+        self._light_sources = {}
+        self._dirty_sources = set()
+        self._darkness_sources = []
+        self._gas_sources = []
+        self._domes = []
+        self._stamp = None
+
         for _ in range(self.size[0]):
             row = []
             for _ in range(self.size[1]):
@@ -27,6 +46,8 @@ class StaticLightBuilder:
                             self.fixed_lights[cur_x][cur_y] = 0.5
                         elif c=='h':
                             self.fixed_lights[cur_x][cur_y] = 1.0
+        self.fixed_light_map = np.array(self.fixed_lights, dtype=np.float64).reshape(tuple(self.size))
+        self.static_lights = np.zeros(tuple(self.size), dtype=np.float64)
 
         if self.light_map and self.light_properties:
             for cur_y, row in enumerate(self.light_map):
@@ -61,116 +82,208 @@ class StaticLightBuilder:
             return False
 
     def build_map(self):
-        max_x, max_y = self.map.size
-
-        light_map = np.full((max_x, max_y), self.base_illumination)
-        for x in range(max_x):
-            for index_2 in range(max_y):
-                y = max_y - index_2 - 1
-                tile_base = (
-                    self.outdoor_ambient_illumination
-                    if self.is_outside(x, y)
-                    else self.base_illumination
-                )
-                intensity = tile_base
-                for light in self.lights:
-                    light_pos_x, light_pos_y = light['position']
-                    bright_light = light.get('bright', 10) / self.map.feet_per_grid
-                    dim_light = light.get('dim', 5) / self.map.feet_per_grid
-
-                    in_bright, in_dim = self.map.light_in_sight(x, y, light_pos_x, light_pos_y, min_distance=bright_light,
-                                                                distance=bright_light + dim_light,
-                                                                inclusive=True)
-                    intensity += 1.0 if in_bright else (0.5 if in_dim else 0.0)
-
-                light_map[x][y] = intensity + self.fixed_lights[x][y]
+        """Ambient + static light + manual light map, as a ``(width, height)`` array.
 
+        Each light from the map's ``lights`` legend contributes its footprint
+        (see ``light_footprint``); their sum is kept in ``static_lights`` so
+        ``apply_outdoor_ambient`` can later update outdoor tiles in place.
+        """
+        feet_per_grid = self.map.feet_per_grid
+        self.static_lights = np.zeros(tuple(self.size), dtype=np.float64)
+        for light in self.lights:
+            light_pos_x, light_pos_y = light['position']
+            bright_light = light.get('bright', 10) / feet_per_grid
+            dim_light = light.get('dim', 5) / feet_per_grid
+            origin_x, origin_y, patch = self.light_footprint(light_pos_x, light_pos_y, bright_light, dim_light)
+            self.static_lights[origin_x:origin_x + patch.shape[0], origin_y:origin_y + patch.shape[1]] += patch
+
+        ambient = np.where(self.outside_mask, self.outdoor_ambient_illumination, self.base_illumination)
+        return ambient + self.static_lights + self.fixed_light_map
+
+    def apply_outdoor_ambient(self, light_map, illumination):
+        """Switch the outdoor tiles of ``light_map`` (from ``build_map``) to a new ambient level."""
+        self.outdoor_ambient_illumination = float(illumination)
+        mask = self.outside_mask
+        light_map[mask] = self.outdoor_ambient_illumination + self.static_lights[mask] + self.fixed_light_map[mask]
         return light_map
 
-    def light_at(self, pos_x, pos_y):
-        intensity = 0.0
+    def invalidate(self, footprints=False):
+        """Re-scan light, darkness and gas sources on the next query.
+
+        Called by the map when entities or objects are added, moved or
+        removed. ``footprints=True`` also recomputes every light footprint
+        (e.g. after the whole terrain was rebuilt).
+        """
+        if footprints:
+            self._dirty_sources.update(self._light_sources)
+        self._stamp = None
+
+    def opacity_changed(self, pos_x, pos_y):
+        """Recompute the footprints of the lights that reach (pos_x, pos_y)."""
+        for source, (_, origin_x, origin_y, patch) in self._light_sources.items():
+            if origin_x <= pos_x < origin_x + patch.shape[0] and origin_y <= pos_y < origin_y + patch.shape[1]:
+                self._dirty_sources.add(source)
+                self._stamp = None
+
+    def _current_stamp(self):
+        session = self.map.session
+        # effects carrying light may expire as game time passes
+        return (getattr(session, 'lighting_epoch', 0), getattr(session, 'game_time', 0))
+
+    def _ensure_current(self):
+        stamp = self._current_stamp()
+        if stamp != self._stamp:
+            self._sync_sources()
+            self._stamp = stamp
+
+    def _sync_sources(self):
         feet_per_grid = self.map.feet_per_grid
-        light_in_sight = self.map.light_in_sight
         entity_or_object_pos = self.map.entity_or_object_pos
+        from natural20.spell.objects.tiny_hut import TinyHutDome
 
-        # Iterate entities + objects directly without building an intermediate
-        # list (the previous '+=' on .keys() views triggered MutableMapping
-        # abc iteration that dominated /update CPU time).
+        lights = {}
+        darkness = []
+        gas = []
+        domes = []
         for source in (self.map.entities, self.map.interactable_objects):
             for entity in source:
                 light = entity.light_properties()
-                if light is None:
-                    continue
+                if light is not None:
+                    bright_light = light.get('bright', 0.0) / feet_per_grid
+                    dim_light = light.get('dim', 0.0) / feet_per_grid
+                    if (bright_light + dim_light) > 0.0:
+                        light_pos_x, light_pos_y = entity_or_object_pos(entity)
+                        lights[entity] = (light_pos_x, light_pos_y, bright_light, dim_light)
+
+                if hasattr(entity, 'dark_properties'):
+                    dark = entity.dark_properties()
+                    if dark:
+                        radius_squares = dark.get('radius', 0) / feet_per_grid
+                        if radius_squares > 0:
+                            darkness.append((*entity_or_object_pos(entity), radius_squares))
 
-                bright_light = light.get('bright', 0.0) / feet_per_grid
-                dim_light = light.get('dim', 0.0) / feet_per_grid
+        for obj in (self.map.interactable_objects or {}):
+            if isinstance(obj, TinyHutDome):
+                domes.append(obj)
+            props = getattr(obj, 'properties', None) or {}
+            if not (props.get('stinking_cloud_gas') or props.get('obscuring_gas')):
+                continue
+            try:
+                gas.append(tuple(self.map.entity_or_object_pos(obj)))
+            except Exception:
+                continue
+
+        for source in list(self._light_sources):
+            if source not in lights:
+                self._remove_light(source)
+        for source, signature in lights.items():
+            entry = self._light_sources.get(source)
+            if entry is not None and entry[0] == signature and source not in self._dirty_sources:
+                continue
+            if entry is not None:
+                self._remove_light(source)
+            self._add_light(source, signature)
+        self._dirty_sources.clear()
+
+        if darkness != self._darkness_sources:
+            self._darkness_sources = darkness
+            self.darkness_mask[:, :] = False
+            for src_x, src_y, radius_squares in darkness:
+                # Chebyshev/grid distance — Darkness "spreads around corners",
+                # so ignore line-of-sight blocking inside the radius.
+                reach = int(math.floor(radius_squares))
+                self.darkness_mask[max(src_x - reach, 0):max(src_x + reach + 1, 0),
+                                   max(src_y - reach, 0):max(src_y + reach + 1, 0)] = True
 
-                if (bright_light + dim_light) <= 0.0:
-                    continue
+        if gas != self._gas_sources:
+            self._gas_sources = gas
+            self.gas_mask[:, :] = False
+            for gas_x, gas_y in gas:
+                if 0 <= gas_x < self.size[0] and 0 <= gas_y < self.size[1]:
+                    self.gas_mask[gas_x, gas_y] = True
 
-                light_pos_x, light_pos_y = entity_or_object_pos(entity)
+        self._domes = domes
 
-                in_bright, in_dim = light_in_sight(
-                    pos_x, pos_y, light_pos_x, light_pos_y,
-                    min_distance=bright_light,
-                    distance=bright_light + dim_light,
-                    inclusive=True,
-                )
+    def _add_light(self, source, signature):
+        light_pos_x, light_pos_y, bright_light, dim_light = signature
+        origin_x, origin_y, patch = self.light_footprint(light_pos_x, light_pos_y, bright_light, dim_light)
+        self.dynamic_lights[origin_x:origin_x + patch.shape[0], origin_y:origin_y + patch.shape[1]] += patch
+        self._light_sources[source] = (signature, origin_x, origin_y, patch)
 
-                intensity += 1.0 if in_bright else (0.5 if in_dim else 0.0)
+    def _remove_light(self, source):
+        _, origin_x, origin_y, patch = self._light_sources.pop(source)
+        self.dynamic_lights[origin_x:origin_x + patch.shape[0], origin_y:origin_y + patch.shape[1]] -= patch
+
+    def light_footprint(self, light_pos_x, light_pos_y, bright_light, dim_light):
+        """Light a single source adds around it, as ``(origin_x, origin_y, patch)``.
+
+        ``patch`` holds 1.0 for bright light, 0.5 for dim light and 0.0 for
+        squares out of reach or out of sight of the source, matching
+        ``Map.light_in_sight``. Squares further than ``bright_light +
+        dim_light`` steps are always dark, so the patch only spans that
+        window (clipped to the map) and the squares in sight come from a
+        single shadowcast over it.
+        """
+        max_x, max_y = self.size
+        distance = bright_light + dim_light
+        if distance:
+            reach = int(math.floor(distance))
+            origin_x = min(max(light_pos_x - reach, 0), max_x)
+            origin_y = min(max(light_pos_y - reach, 0), max_y)
+            end_x = max(min(light_pos_x + reach + 1, max_x), origin_x)
+            end_y = max(min(light_pos_y + reach + 1, max_y), origin_y)
+        else:
+            # light_in_sight treats a zero distance as unbounded
+            reach = None
+            origin_x, origin_y, end_x, end_y = 0, 0, max_x, max_y
+        patch = np.zeros((end_x - origin_x, end_y - origin_y), dtype=np.float64)
+
+        squares = self.map.visibility.light_sweep((light_pos_x, light_pos_y), reach)
+        if squares:
+            pos_x, pos_y = np.array(list(squares), dtype=np.int64).T
+            steps = np.maximum(np.abs(pos_x - light_pos_x), np.abs(pos_y - light_pos_y))
+            values = np.where(steps <= bright_light, 1.0, 0.5) if bright_light else 1.0
+            patch[pos_x - origin_x, pos_y - origin_y] = values
+        return origin_x, origin_y, patch
+
+    def light_at(self, pos_x, pos_y):
+        """Light from entities and objects at a square (an array read once sources are synced)."""
+        if pos_x < 0 or pos_y < 0 or pos_x >= self.size[0] or pos_y >= self.size[1]:
+            return 0.0
+        self._ensure_current()
 
         # Magical darkness sources zero out non-magical light in their area.
-        if self.magical_darkness_at(pos_x, pos_y):
+        if self.darkness_mask[pos_x, pos_y]:
             return 0.0
 
-        if self.obscuring_gas_at(pos_x, pos_y):
+        intensity = float(self.dynamic_lights[pos_x, pos_y])
+        if self.gas_mask[pos_x, pos_y]:
             intensity = min(intensity, 0.2)
 
-        try:
-            from natural20.spell.objects.tiny_hut import iter_tiny_hut_domes
-            for dome in iter_tiny_hut_domes(self.map):
-                if dome.contains((pos_x, pos_y)):
-                    override = dome.interior_light_value()
-                    if override is not None:
-                        return override
-        except Exception:
-            pass
+        override = self.interior_light_override(pos_x, pos_y)
+        if override is not None:
+            return override
 
         return intensity
 
+    def interior_light_override(self, pos_x, pos_y):
+        """Light level forced by a tiny hut dome covering the square, if any."""
+        self._ensure_current()
+        for dome in self._domes:
+            if dome.contains((pos_x, pos_y)):
+                return dome.interior_light_value()
+        return None
+
     def magical_darkness_at(self, pos_x, pos_y):
         """Return True if any magical-darkness source covers this square."""
-        feet_per_grid = self.map.feet_per_grid
-        entity_or_object_pos = self.map.entity_or_object_pos
-        for source in (self.map.entities, self.map.interactable_objects):
-            for entity in source:
-                if not hasattr(entity, 'dark_properties'):
-                    continue
-                dark = entity.dark_properties()
-                if not dark:
-                    continue
-                radius_squares = dark.get('radius', 0) / feet_per_grid
-                if radius_squares <= 0:
-                    continue
-                src_x, src_y = entity_or_object_pos(entity)
-                dx = pos_x - src_x
-                dy = pos_y - src_y
-                # Chebyshev/grid distance — Darkness "spreads around corners",
-                # so ignore line-of-sight blocking inside the radius.
-                if max(abs(dx), abs(dy)) <= radius_squares:
-                    return True
-        return False
+        if pos_x < 0 or pos_y < 0 or pos_x >= self.size[0] or pos_y >= self.size[1]:
+            return False
+        self._ensure_current()
+        return bool(self.darkness_mask[pos_x, pos_y])
 
     def obscuring_gas_at(self, pos_x, pos_y):
         """True when a square is inside a heavily obscuring gas cloud."""
-        for obj in (self.map.interactable_objects or {}):
-            props = getattr(obj, 'properties', None) or {}
-            if not (props.get('stinking_cloud_gas') or props.get('obscuring_gas')):
-                continue
-            try:
-                ox, oy = self.map.entity_or_object_pos(obj)
-            except Exception:
-                continue
-            if ox == pos_x and oy == pos_y:
-                return True
-        return False
+        if pos_x < 0 or pos_y < 0 or pos_x >= self.size[0] or pos_y >= self.size[1]:
+            return False
+        self._ensure_current()
+        return bool(self.gas_mask[pos_x, pos_y])
@@ -0,0 +1,184 @@
+"""Array-backed terrain layers for :class:`natural20.map.Map`.
+
+``Map`` keeps its list-of-lists ``base_map`` layers for the editor and for
+serialization, but the hot tile queries (``opaque``, ``wall``, ``passable``,
+``difficult_terrain`` and ``cover_at``) read the per-tile facts from the
+NumPy arrays held here instead of walking the UID-backed objects grid.
+
+Facts are derived once when the map is built and then refreshed one tile at
+a time when an object is placed/removed or changes state (doors opening,
+walls being destroyed, concealed objects being revealed).
+
+Objects whose answers depend on the querying origin (directional walls,
+door-walls) or on state this grid cannot observe (traps, teleporters, force
+domes, creatures dropped on the object layer) mark their tile ``LIVE``; the
+``Map`` then falls back to asking the objects directly for that tile.  Those
+whose changes the map is never told about are additionally ``VOLATILE`` so
+that derived caches skip them as well.
+"""
+import numpy as np
+
+from natural20.item_library.object import Object
+from natural20.item_library.common import StoneWall, StoneWallDirectional, Ground
+from natural20.item_library.door_object import DoorObject, DoorObjectWall
+from natural20.item_library.chest import Chest
+from natural20.item_library.fireplace import Fireplace
+
+# Bits stored in TerrainGrid.flags
+BLOCKED = 1 << 0      # base layer is a solid '#' tile
+WALL = 1 << 1         # first visible object reports wall()
+OPAQUE = 1 << 2       # some object on the tile blocks line of sight
+IMPASSABLE = 1 << 3   # some object on the tile blocks movement
+DIFFICULT = 1 << 4    # highest object movement cost is above 1
+SWIMMABLE = 1 << 5    # a swimmable object makes the tile normal terrain for swimmers
+HAS_OBJECTS = 1 << 6  # at least one object sits on the tile
+LIVE = 1 << 7         # cached facts are not authoritative; ask the objects
+VOLATILE = 1 << 8     # objects may change without notifying the map; never memoize
+
+COVER_NONE = 0
+COVER_HALF = 1
+COVER_THREE_QUARTER = 2
+COVER_TOTAL = 3
+COVER_NAMES = ('none', 'half', 'three_quarter', 'total')
+
+# Object classes whose opacity/passability/cover ignore the querying origin
+# and only change through the hooks that call Map.refresh_terrain_at.
+# Matched on the exact type so that subclasses with their own rules fall back
+# to the live path.
+_CACHEABLE_TYPES = frozenset([Object, Ground, StoneWall, DoorObject, Chest, Fireplace])
+
+# Origin-dependent classes: their answers cannot be stored per tile, but they
+# still report every state change, so answers for a given origin can be
+# memoized (see natural20.utils.visibility_cache).
+_DIRECTIONAL_TYPES = frozenset([StoneWallDirectional, DoorObjectWall])
+
+
+def _cover_code(obj):
+    if obj.half_cover():
+        return COVER_HALF
+    if obj.three_quarter_cover():
+        return COVER_THREE_QUARTER
+    if obj.total_cover():
+        return COVER_TOTAL
+    return COVER_NONE
+
+
+def tile_facts(objects):
+    """Return ``(flags, cover)`` for the given objects on a single tile.
+
+    Mirrors the rules of the original per-query ``Map`` methods: opacity and
+    passability consider every object (concealed included, although opacity
+    only applies once some object on the tile is visible) while wall and
+    cover come from the first non-concealed object only.
+    """
+    flags = 0
+    cover = COVER_NONE
+    if not objects:
+        return flags, cover
+
+    flags |= HAS_OBJECTS
+    for obj in objects:
+        obj_type = type(obj)
+        if obj_type not in _CACHEABLE_TYPES:
+            flags |= LIVE
+            if obj_type not in _DIRECTIONAL_TYPES:
+                return flags | VOLATILE, cover
+    if flags & LIVE:
+        return flags, cover
+
+    first_visible = None
+    any_opaque = False
+    max_cost = 1
+    for obj in objects:
+        if first_visible is None and not obj.concealed():
+            first_visible = obj
+        if obj.opaque(None):
+            any_opaque = True
+        if not obj.passable(None):
+            flags |= IMPASSABLE
+        cost = obj.movement_cost()
+        if cost > max_cost:
+            max_cost = cost
+        if obj.swimmable() and obj.swim_movement_cost() <= 1:
+            flags |= SWIMMABLE
+
+    if max_cost > 1:
+        flags |= DIFFICULT
+    if first_visible is not None:
+        # Map.opaque only consults the objects when one of them is visible
+        if any_opaque:
+            flags |= OPAQUE
+        if first_visible.wall():
+            flags |= WALL
+        cover = _cover_code(first_visible)
+    return flags, cover
+
+
+class TerrainGrid:
+    """Per-map layers: terrain symbol codes, flag bits and cover."""
+
+    def __init__(self, battle_map):
+        self.map = battle_map
+        width, height = battle_map.size
+        self.width = width
+        self.height = height
+        # terrain symbol table; code 0 means "no base tile"
+        self.symbols = [None]
+        self._symbol_codes = {None: 0}
+        self.terrain = np.zeros((width, height), dtype=np.uint8)
+        self.flags = np.zeros((width, height), dtype=np.uint16)
+        self.cover = np.zeros((width, height), dtype=np.uint8)
+        # bumped on every refresh; tile_revision holds the revision that last touched each tile
+        self.revision = 0
+        self.tile_revision = np.zeros((width, height), dtype=np.int64)
+
+    def symbol_code(self, symbol):
+        code = self._symbol_codes.get(symbol)
+        if code is None:
+            code = len(self.symbols)
+            if code > 255:
+                raise ValueError(f"too many distinct terrain symbols on map ({code})")
+            self.symbols.append(symbol)
+            self._symbol_codes[symbol] = code
+        return code
+
+    def rebuild(self):
+        """Recompute every layer from the map's base layer and objects grid."""
+        base_map = self.map.base_map
+        symbol_code = self.symbol_code
+        self.terrain[:, :] = [[symbol_code(c) for c in column] for column in base_map]
+        self.flags[:, :] = 0
+        self.cover[:, :] = 0
+        self.flags[self.terrain == symbol_code('#')] |= BLOCKED
+        self.revision += 1
+        self.tile_revision[:, :] = self.revision
+        objects = self.map.objects
+        for x in range(self.width):
+            for y in range(self.height):
+                if objects.cell_uids(x, y):
+                    self._refresh_objects(x, y)
+
+    def refresh(self, pos_x, pos_y):
+        """Recompute the cached facts of a single tile."""
+        if pos_x < 0 or pos_y < 0 or pos_x >= self.width or pos_y >= self.height:
+            return
+        code = self.symbol_code(self.map.base_map[pos_x][pos_y])
+        self.terrain[pos_x, pos_y] = code
+        self.flags[pos_x, pos_y] = BLOCKED if self.symbols[code] == '#' else 0
+        self.cover[pos_x, pos_y] = COVER_NONE
+        self._refresh_objects(pos_x, pos_y)
+        self.revision += 1
+        self.tile_revision[pos_x, pos_y] = self.revision
+
+    def _refresh_objects(self, pos_x, pos_y):
+        flags, cover = tile_facts(list(self.map.objects[pos_x][pos_y]))
+        self.flags[pos_x, pos_y] |= flags
+        self.cover[pos_x, pos_y] = cover
+
+    def changed_since(self, revision):
+        """``(xs, ys)`` of the tiles refreshed after ``revision``."""
+        return np.nonzero(self.tile_revision > revision)
+
+    def mask(self, bits):
+        """Boolean ``(width, height)`` array of tiles having any of ``bits`` set."""
+        return (self.flags & bits) != 0
@@ -0,0 +1,263 @@
+"""Per-map cache of the line-of-sight step answers.
+
+``Map.line_of_sight`` and ``Map.light_in_sight`` walk a Bresenham path and,
+for every step ``prev -> square``, ask whether sight is blocked between the
+two squares: either tile is opaque as seen from the other (directional walls
+and doors), the square gives total cover, or (for creature sight) a tiny hut
+dome blocks vision from outside.  Those answers only depend on the terrain,
+so they are memoized here per (square, step direction) and dropped only for
+the tiles touched by a door toggle, an object being placed or removed, or a
+spell object such as a tiny hut dome appearing.
+
+Tiles holding objects that can change without notifying the map (see
+``terrain_grid.VOLATILE``) are never cached.
+
+``VisibilityCache.sweep`` answers line of sight from one square to every
+square of the map at once: the Bresenham rays from the origin to every
+offset are merged into a prefix tree (``RayTable``) so a blocked step prunes
+every ray passing through it, which keeps the work proportional to the
+visible area instead of tiles x path length.  ``light_sweep`` does the same
+for a light source (bounded by its radius), which is how static and dynamic
+light footprints are built.
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+from natural20.utils.list_utils import bresenham_line_of_sight
+from natural20.utils.terrain_grid import BLOCKED, OPAQUE, VOLATILE, LIVE, COVER_NAMES
+
+KNOWN = 1 << 0          # the entry has been computed
+SIGHT_BLOCKED = 1 << 1  # opaque in either direction or total cover
+DOME_BLOCKED = 1 << 2   # a tiny hut dome blocks vision from outside
+
+# step (dx, dy) -> slot in the third axis of VisibilityCache.steps
+_STEP_SLOT = {(dx, dy): (dx + 1) * 3 + (dy + 1) for dx in (-1, 0, 1) for dy in (-1, 0, 1)}
+
+_QUADRANTS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+class RayTable:
+    """Bresenham rays from (0, 0) to every offset of one quadrant, as a flat prefix tree.
+
+    Nodes are stored in depth-first order: ``dx``/``dy`` is the square a node
+    steps onto, ``parent`` the node it steps from (node 0 is the origin),
+    ``skip`` the index just past its subtree and ``terminal`` whether the ray
+    of ``(dx, dy)`` itself ends there (``Map.squares_in_path`` with
+    ``inclusive=True``).  Bresenham only depends on the absolute deltas, so
+    the other quadrants are sign flips of this one.
+    """
+
+    def __init__(self, max_dx, max_dy):
+        self.max_dx = max_dx
+        self.max_dy = max_dy
+        root = ({}, False)
+        for ray_x in range(max_dx + 1):
+            for ray_y in range(max_dy + 1):
+                if ray_x == 0 and ray_y == 0:
+                    continue
+                node = root
+                for square in bresenham_line_of_sight(0, 0, ray_x, ray_y)[1:]:
+                    node = node[0].setdefault(square, ({}, False))
+                children = node[0]
+                children[(ray_x, ray_y)] = (children.get((ray_x, ray_y), ({}, False))[0], True)
+
+        self.dx = [0]
+        self.dy = [0]
+        self.parent = [-1]
+        self.terminal = [False]
+        stack = [(square, child, 0) for square, child in reversed(list(root[0].items()))]
+        while stack:
+            square, (children, terminal), parent = stack.pop()
+            index = len(self.dx)
+            self.dx.append(square[0])
+            self.dy.append(square[1])
+            self.parent.append(parent)
+            self.terminal.append(terminal)
+            for child_square, child in reversed(list(children.items())):
+                stack.append((child_square, child, index))
+
+        sizes = [1] * len(self.dx)
+        for index in range(len(self.dx) - 1, 0, -1):
+            sizes[self.parent[index]] += sizes[index]
+        self.skip = [index + size for index, size in enumerate(sizes)]
+
+    def __len__(self):
+        return len(self.dx)
+
+
+# most recently used tables; a whole-map table of a large map holds hundreds
+# of thousands of nodes, so only a few are kept
+RAY_TABLE_CACHE_SIZE = 8
+_RAY_TABLES = OrderedDict()
+
+
+def ray_table(max_dx, max_dy):
+    """Shared ``RayTable`` covering offsets up to (max_dx, max_dy)."""
+    key = (max_dx, max_dy)
+    table = _RAY_TABLES.get(key)
+    if table is None:
+        table = RayTable(max_dx, max_dy)
+        _RAY_TABLES[key] = table
+        while len(_RAY_TABLES) > RAY_TABLE_CACHE_SIZE:
+            _RAY_TABLES.popitem(last=False)
+    else:
+        _RAY_TABLES.move_to_end(key)
+    return table
+
+
+class VisibilityCache:
+    """Memoized ``(prev, square)`` sight-blocking bits for a single map.
+
+    ``steps[x, y, slot]`` describes the step *from* ``(x, y)`` towards its
+    neighbour identified by ``slot`` (the zero step included, which is how
+    paths start).
+    """
+
+    def __init__(self, battle_map):
+        self.map = battle_map
+        width, height = battle_map.size
+        self.width = width
+        self.height = height
+        self.steps = np.zeros((width, height, 9), dtype=np.uint8)
+        self._domes = None
+
+    def clear(self):
+        self.steps[:, :, :] = 0
+        self._domes = None
+
+    def domes_changed(self, interior_squares):
+        """A tiny hut dome covering ``interior_squares`` was raised or dismissed."""
+        self._domes = None
+        self.invalidate_squares(interior_squares)
+
+    def domes(self):
+        """Tiny hut domes on the map (scanning interactable objects only after a change)."""
+        if self._domes is None:
+            from natural20.spell.objects.tiny_hut import iter_tiny_hut_domes
+            self._domes = list(iter_tiny_hut_domes(self.map))
+        return self._domes
+
+    def invalidate(self, pos_x, pos_y):
+        """Forget every step that starts or ends on (pos_x, pos_y)."""
+        self.steps[max(pos_x - 1, 0):pos_x + 2, max(pos_y - 1, 0):pos_y + 2, :] = 0
+
+    def invalidate_squares(self, squares):
+        for pos_x, pos_y in squares:
+            self.invalidate(pos_x, pos_y)
+
+    def opaque_mask(self):
+        """Boolean ``(width, height)`` array of tiles that block sight from every side."""
+        return self.map.terrain_grid.mask(BLOCKED | OPAQUE)
+
+    def step(self, prev, square):
+        """Blocking bits (``SIGHT_BLOCKED``/``DOME_BLOCKED``) for moving sight from ``prev`` to ``square``."""
+        prev_x, prev_y = prev[0], prev[1]
+        pos_x, pos_y = square[0], square[1]
+        slot = _STEP_SLOT.get((pos_x - prev_x, pos_y - prev_y))
+        if slot is None or not (0 <= prev_x < self.width and 0 <= prev_y < self.height
+                                and 0 <= pos_x < self.width and 0 <= pos_y < self.height):
+            return self._compute(prev, square)
+
+        bits = self.steps[prev_x, prev_y, slot]
+        if bits:
+            return int(bits) & ~KNOWN
+        bits = self._compute(prev, square)
+        flags = self.map.terrain_grid.flags
+        if not (flags[prev_x, prev_y] | flags[pos_x, pos_y]) & VOLATILE:
+            self.steps[prev_x, prev_y, slot] = bits | KNOWN
+        return bits
+
+    def sweep(self, origin, inclusive=True, reach=None):
+        """Line of sight from ``origin`` to every square of the map in one pass.
+
+        Returns ``{(x, y): cover}`` for each square ``line_of_sight(*origin, x, y,
+        inclusive=inclusive)`` would not block (``origin`` itself included),
+        where ``cover`` is the highest cover code along the sight line after
+        the origin, following the same end-tile rules. ``reach`` limits the
+        sweep to squares at most that many steps (Chebyshev) away.
+        """
+        origin_x, origin_y = origin[0], origin[1]
+        if not (0 <= origin_x < self.width and 0 <= origin_y < self.height):
+            return {}
+        if self.step((origin_x, origin_y), (origin_x, origin_y)):
+            return {(origin_x, origin_y): 0}
+        return self._walk(origin_x, origin_y, inclusive, SIGHT_BLOCKED | DOME_BLOCKED, reach, self._cover_code)
+
+    def light_sweep(self, origin, reach=None):
+        """Squares a light at ``origin`` shines on, within ``reach`` steps.
+
+        Follows ``Map.light_in_sight`` (only ``SIGHT_BLOCKED`` stops light, the
+        light's own square included) and returns the reached squares as
+        ``{(x, y): 0}``; ``reach=None`` does not limit the distance.
+        """
+        origin_x, origin_y = origin[0], origin[1]
+        if not (0 <= origin_x < self.width and 0 <= origin_y < self.height):
+            return {}
+        if self.step((origin_x, origin_y), (origin_x, origin_y)) & SIGHT_BLOCKED:
+            return {}
+        return self._walk(origin_x, origin_y, True, SIGHT_BLOCKED, reach, None)
+
+    def _walk(self, origin_x, origin_y, inclusive, blocking, reach, cover_code):
+        """Depth-first walk of the ray table from an unblocked origin (see ``sweep``)."""
+        width, height = self.width, self.height
+        visible = {(origin_x, origin_y): 0}
+        step = self.step
+        if reach is None:
+            table = ray_table(width - 1, height - 1)
+        else:
+            # rays to farther offsets are pruned below anyway
+            table = ray_table(min(width - 1, int(reach)), min(height - 1, int(reach)))
+        table_dx, table_dy, parents = table.dx, table.dy, table.parent
+        skips, terminals = table.skip, table.terminal
+        size = len(table)
+        for sign_x, sign_y in _QUADRANTS:
+            covers = {0: 0}
+            index = 1
+            while index < size:
+                pos_x = origin_x + sign_x * table_dx[index]
+                pos_y = origin_y + sign_y * table_dy[index]
+                if not (0 <= pos_x < width and 0 <= pos_y < height):
+                    index = skips[index]
+                    continue
+                # every step along a ray moves one square further (Chebyshev)
+                if reach is not None and max(table_dx[index], table_dy[index]) > reach:
+                    index = skips[index]
+                    continue
+                parent = parents[index]
+                prev = (origin_x + sign_x * table_dx[parent], origin_y + sign_y * table_dy[parent])
+                clear = not step(prev, (pos_x, pos_y)) & blocking
+                parent_cover = covers[parent]
+                cover = max(parent_cover, cover_code(pos_x, pos_y)) if cover_code else 0
+                if terminals[index]:
+                    if not inclusive:
+                        visible[(pos_x, pos_y)] = parent_cover
+                    elif clear:
+                        visible[(pos_x, pos_y)] = cover
+                if clear:
+                    covers[index] = cover
+                    index += 1
+                else:
+                    index = skips[index]
+        return visible
+
+    def _cover_code(self, pos_x, pos_y):
+        grid = self.map.terrain_grid
+        if not grid.flags[pos_x, pos_y] & LIVE:
+            return int(grid.cover[pos_x, pos_y])
+        return COVER_NAMES.index(self.map.cover_at(pos_x, pos_y))
+
+    def _compute(self, prev, square):
+        battle_map = self.map
+        bits = 0
+        if battle_map.opaque(*square, origin=prev) or battle_map.opaque(*prev, origin=square):
+            bits |= SIGHT_BLOCKED
+        elif battle_map.cover_at(*square) == 'total':
+            bits |= SIGHT_BLOCKED
+        try:
+            pos1, pos2 = tuple(prev), tuple(square)
+            if any(dome.blocks_outside_vision(pos1, pos2) for dome in self.domes()):
+                bits |= DOME_BLOCKED
+        except Exception:
+            pass
+        return bits
@@ -0,0 +1,81 @@
+"""Battle-scoped memo of creature-to-creature ``Map.can_see`` answers.
+
+Within one turn the same viewer/target pair is asked about over and over
+(targeting, ``Map.look``, the AI controllers' enemy scans, LLM tool
+handlers, the web renderer). ``Map.can_see`` consults the matrix of the
+battle the map belongs to, so all of them share one answer per pair.
+
+An entry is keyed on both uids, both positions, the viewer's active
+perception and darkvision switch, and the sight-relevant state of both
+creatures (statuses such as hidden/invisible/squeezed, stealth roll and
+concealment). The whole matrix of a map is dropped when
+
+* the map's sight epoch moves: a creature or object was placed, moved or
+  removed, a tile's terrain changed (doors, walls, tiny hut domes) or the
+  ambient light changed;
+* the session lighting epoch or game time moves (light spells, expiring
+  light effects);
+* the battle epoch moves: every turn start and every committed action,
+  which is where effects and conditions are applied.
+
+Only plain creature pairs are cached: objects (doors and their secret
+door bookkeeping), admin viewers and calls with extra LOS options always
+go straight to the map. ``N20_VISIBILITY_MATRIX=0`` disables the cache.
+"""
+import os
+
+ENABLED = os.environ.get('N20_VISIBILITY_MATRIX', '1') not in ('0', 'false', 'no', 'off')
+
+
+def _sight_state(entity):
+    return (frozenset(getattr(entity, 'statuses', ()) or ()),
+            getattr(entity, 'hidden_stealth', None),
+            getattr(entity, 'is_concealed', None))
+
+
+class VisibilityMatrix:
+    def __init__(self, battle):
+        self.battle = battle
+        self.epoch = 0
+        self.enabled = ENABLED
+        self._tables = {}  # id(map) -> (stamp, {key: bool})
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self):
+        """Conditions or effects may have changed: forget every answer."""
+        self.epoch += 1
+
+    def clear(self):
+        self._tables.clear()
+
+    def _stamp(self, battle_map):
+        session = battle_map.session
+        return (self.epoch, battle_map.sight_epoch,
+                getattr(session, 'lighting_epoch', 0), getattr(session, 'game_time', 0))
+
+    def can_see(self, battle_map, entity, entity2, entity_1_pos, entity_2_pos, allow_dark_vision,
+                active_perception, compute):
+        """``compute()`` (the uncached ``Map.can_see``) memoized for one creature pair."""
+        entities = battle_map.entities
+        pos1 = entity_1_pos if entity_1_pos is not None else entities.get(entity)
+        pos2 = entity_2_pos if entity_2_pos is not None else entities.get(entity2)
+        if pos1 is None or pos2 is None:
+            return compute()
+        key = (entity.entity_uid, entity2.entity_uid, tuple(pos1), tuple(pos2),
+               active_perception, allow_dark_vision, _sight_state(entity), _sight_state(entity2))
+        stamp = self._stamp(battle_map)
+        table_key = id(battle_map)
+        entry = self._tables.get(table_key)
+        if entry is None or entry[0] != stamp:
+            entry = (stamp, {})
+            self._tables[table_key] = entry
+        table = entry[1]
+        answer = table.get(key)
+        if answer is None:
+            self.misses += 1
+            answer = bool(compute())
+            table[key] = answer
+        else:
+            self.hits += 1
+        return answer
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Benchmark static light map construction on the sample maps.
+
+Compares the per-tile ``light_in_sight`` loop ``StaticLightBuilder.build_map``
+used to run ("before") with the footprint based implementation ("after"),
+checks both produce the same light map, and reports full map load time.
+
+Example:
+  python scripts/benchmark_light_map.py --repeat 5
+  python scripts/benchmark_light_map.py tests/fixtures/maps/complex_map.yml
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+# (campaign root, map file) pairs shipped with the repository
+SAMPLE_MAPS = [
+    ("tests/fixtures", "tests/fixtures/maps/complex_map.yml"),
+    ("tests/fixtures", "tests/fixtures/maps/game_map.yml"),
+    ("tests/fixtures", "tests/fixtures/maps/thinwall_map_doors.yml"),
+    ("tests/fixtures", "tests/fixtures/battle_sim.yml"),
+    ("tests/fixtures", "tests/fixtures/entryway.yml"),
+    ("tests/fixtures", "tests/fixtures/thin_walls.yml"),
+    ("samples/map_with_obstacles", "samples/map_with_obstacles/maps/complex_map.yml"),
+    ("samples/map_with_obstacles", "samples/map_with_obstacles/maps/walled_map.yml"),
+]
+
+
+def lit_town_properties(size, spacing):
+    """A square map with wall blocks and a street light every ``spacing`` tiles."""
+    base = []
+    light = []
+    for y in range(size):
+        base_row = []
+        light_row = []
+        for x in range(size):
+            wall = x % spacing in (2, 3) and y % spacing in (2, 3)
+            base_row.append('#' if wall else '.')
+            light_row.append('A' if x % spacing == 0 and y % spacing == 0 else '.')
+        base.append(''.join(base_row))
+        light.append(''.join(light_row))
+    return {
+        'name': f'Lit town {size}x{size}',
+        'map': {'size': [size, size], 'illumination': 0.0, 'base': base, 'light': light},
+        'lights': {'A': {'bright': 20, 'dim': 20}},
+    }
+
+
+def legacy_build_map(builder):
+    """The original tile-by-tile static light pass."""
+    battle_map = builder.map
+    max_x, max_y = battle_map.size
+    light_map = np.full((max_x, max_y), builder.base_illumination)
+    for x in range(max_x):
+        for y in range(max_y):
+            intensity = (
+                builder.outdoor_ambient_illumination
+                if builder.is_outside(x, y)
+                else builder.base_illumination
+            )
+            for light in builder.lights:
+                light_pos_x, light_pos_y = light['position']
+                bright_light = light.get('bright', 10) / battle_map.feet_per_grid
+                dim_light = light.get('dim', 5) / battle_map.feet_per_grid
+                in_bright, in_dim = battle_map.light_in_sight(x, y, light_pos_x, light_pos_y,
+                                                              min_distance=bright_light,
+                                                              distance=bright_light + dim_light,
+                                                              inclusive=True)
+                intensity += 1.0 if in_bright else (0.5 if in_dim else 0.0)
+            light_map[x][y] = intensity + builder.fixed_lights[x][y]
+    return light_map
+
+
+def _best_of(repeat, fn):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def benchmark(root, map_file, repeat):
+    from natural20.map import Map
+    from natural20.session import Session
+
+    session = Session(root_path=str(REPO_ROOT / root))
+    if isinstance(map_file, dict):
+        properties = map_file
+        map_file = properties['name']
+        load_time, battle_map = _best_of(
+            repeat, lambda: Map(session, None, name=map_file, properties=properties))
+    else:
+        load_time, battle_map = _best_of(repeat, lambda: Map(session, str(REPO_ROOT / map_file)))
+    builder = battle_map._light_builder
+
+    def before():
+        battle_map.visibility.clear()
+        return legacy_build_map(builder)
+
+    def after():
+        battle_map.visibility.clear()
+        return builder.build_map()
+
+    before_time, expected = _best_of(repeat, before)
+    after_time, actual = _best_of(repeat, after)
+    return {
+        'map': map_file,
+        'size': 'x'.join(str(dim) for dim in battle_map.size),
+        'lights': len(builder.lights),
+        'before': before_time,
+        'after': after_time,
+        'load_before': load_time - after_time + before_time,
+        'load_after': load_time,
+        'match': bool(np.allclose(expected, actual)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('maps', nargs='*', help='map files to benchmark (defaults to the bundled samples)')
+    parser.add_argument('--root', default=None, help='campaign root used for the maps given on the command line')
+    parser.add_argument('--repeat', type=int, default=3, help='best-of repetitions per measurement')
+    parser.add_argument('--town', type=int, default=48,
+                        help='side of the synthetic lit town added to the samples (0 to skip)')
+    args = parser.parse_args(argv)
+
+    if args.maps:
+        targets = [(args.root or str(Path(path).resolve().parent.parent), path) for path in args.maps]
+    else:
+        targets = list(SAMPLE_MAPS)
+        if args.town:
+            targets.append(("tests/fixtures", lit_town_properties(args.town, 8)))
+
+    print(f"{'map':<52} {'size':>7} {'lights':>6} {'build before':>13} {'build after':>12} "
+          f"{'load before':>12} {'load after':>11} match")
+    for root, map_file in targets:
+        row = benchmark(root, map_file, args.repeat)
+        print(f"{row['map']:<52} {row['size']:>7} {row['lights']:>6} {row['before'] * 1000:>11.2f}ms "
+              f"{row['after'] * 1000:>10.2f}ms {row['load_before'] * 1000:>10.2f}ms "
+              f"{row['load_after'] * 1000:>9.2f}ms {'yes' if row['match'] else 'NO'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
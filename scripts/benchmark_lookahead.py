@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Benchmark the lookahead controller against the heuristic one on the sample maps.
+
+Plays the same seeded encounters twice with ``natural20.encounter_simulator``:
+once with the party on plain ``GenericController`` heuristics and once with
+``LookaheadSearch`` re-ranking their choices (monsters always play the
+heuristic). Reports the party's win rate, average rounds, hit points lost
+and decisions per second for both.
+
+Example:
+  python scripts/benchmark_lookahead.py --runs 20
+  python scripts/benchmark_lookahead.py --runs 50 --budget 1.0 --rollouts 4 --replies 1 --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+# the sample maps; creatures, items and spells come from the test campaign
+# (the sample campaign's own spell list does not load)
+SAMPLE_MAPS = "samples/map_with_obstacles"
+CAMPAIGN_ROOT = "tests/fixtures"
+
+# (map file, party, monsters)
+SAMPLE_ENCOUNTERS = [
+    ("maps/simple_map.yml", ["characters/high_elf_fighter@0,0"], ["ogre@5,4"]),
+    ("maps/walled_map.yml", ["characters/high_elf_fighter@0,0", "characters/high_elf_mage@1,0"],
+     ["owlbear@5,4"]),
+    ("maps/complex_map.yml", ["characters/dwarf_cleric@0,0", "characters/halfling_rogue@1,0"],
+     ["hobgoblin@6,7", "goblin@5,7", "goblin@4,7"]),
+    ("maps/game_map.yml", ["characters/high_elf_fighter@0,0"], ["wolf@6,5", "wolf@6,4", "goblin@5,5"]),
+]
+
+
+def benchmark(map_file, party, monsters, runs, workers, seed, search):
+    from natural20.encounter_simulator import EncounterSpec, simulate_encounter
+
+    rows = []
+    for mode, party_search in (("heuristic", None), ("lookahead", search)):
+        spec = EncounterSpec(str(REPO_ROOT / CAMPAIGN_ROOT), str(REPO_ROOT / SAMPLE_MAPS / map_file),
+                             party=party, monsters=monsters, max_rounds=20, party_search=party_search)
+        report = simulate_encounter(spec, runs=runs, workers=workers, seed=seed)
+        summary = report.summary()
+        rows.append({
+            'map': map_file,
+            'mode': mode,
+            'win_rate': summary['win_rate'],
+            'rounds': summary['average_rounds'],
+            'hp_lost': summary['party_hp_lost'],
+            'decisions_per_second': report.timing()['party_decisions_per_second'],
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20, help='battles per encounter and controller')
+    parser.add_argument('--workers', type=int, default=0, help='worker processes (0 plays in this process)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first battle')
+    parser.add_argument('--budget', type=float, default=0.5, help='lookahead seconds per turn')
+    parser.add_argument('--top-k', type=int, default=4, help='heuristic candidates the lookahead simulates')
+    parser.add_argument('--rollouts', type=int, default=3, help='rollouts per candidate')
+    parser.add_argument('--replies', type=int, default=0, help='turns of the next creatures played in each rollout')
+    args = parser.parse_args(argv)
+
+    search = {'budget': args.budget, 'top_k': args.top_k, 'rollouts': args.rollouts, 'replies': args.replies}
+    print(f"{'map':<24} {'controller':<10} {'win rate':>8} {'rounds':>7} {'hp lost':>8} {'decisions/s':>12}")
+    for map_file, party, monsters in SAMPLE_ENCOUNTERS:
+        # character and map loading print progress; keep the table readable
+        with open(os.devnull, 'w') as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                rows = benchmark(map_file, party, monsters, args.runs, args.workers, args.seed, search)
+            finally:
+                sys.stdout = stdout
+        for row in rows:
+            print(f"{row['map']:<24} {row['mode']:<10} {row['win_rate']:>8.2f} {row['rounds']:>7.2f} "
+                  f"{row['hp_lost']:>8.3f} {row['decisions_per_second']:>12.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
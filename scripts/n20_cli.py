@@ -7,6 +7,7 @@ and issuing basic commands (list entities, take actions, end turn).
 Usage:
   python scripts/n20_cli.py --scenario death_house
   python scripts/n20_cli.py --path /abs/path/to/scenario
+  python scripts/n20_cli.py --scenario death_house --simulate "maps/crypt --party characters/fighter@spawn_a --monster zombie@spawn_b --runs 1000"
 """
 
 from __future__ import annotations
@@ -21,6 +22,7 @@ from pathlib import Path
 from typing import Iterable, Optional
 
 from natural20.battle import Battle
+from natural20.encounter_simulator import EncounterSpec, simulate_encounter
 from natural20.event_manager import EventManager
 from natural20.generic_controller import GenericController
 from natural20.map_renderer import MapRenderer
@@ -74,6 +76,48 @@ def _entity_label(entity) -> str:
 		return getattr(entity, "name", None) or str(entity)
 
 
+def _simulation_parser() -> argparse.ArgumentParser:
+	parser = argparse.ArgumentParser(
+		prog="simulate",
+		description="Run seeded headless AI battles of a party against monsters and report the outcome statistics.",
+	)
+	parser.add_argument("map", help="Map path relative to the scenario root")
+	parser.add_argument("--party", action="append", default=[], help="Character sheet[@spawn_point|@x,y] (repeatable)")
+	parser.add_argument("--monster", action="append", default=[], help="NPC type[@spawn_point|@x,y] (repeatable)")
+	parser.add_argument("--runs", type=int, default=100)
+	parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count, 0: in-process)")
+	parser.add_argument("--seed", type=int, default=0)
+	parser.add_argument("--max-rounds", type=int, default=50)
+	return parser
+
+
+def run_simulation(scenario_root: Path, argv: list[str]) -> int:
+	parser = _simulation_parser()
+	try:
+		args = parser.parse_args(argv)
+	except SystemExit:
+		return 2
+	if not args.party or not args.monster:
+		print("simulate needs at least one --party and one --monster entry")
+		return 2
+
+	spec = EncounterSpec(
+		root_path=str(scenario_root),
+		map_path=args.map,
+		party=args.party,
+		monsters=args.monster,
+		max_rounds=args.max_rounds,
+	)
+
+	def progress(report):
+		print(f"\r{report.battles}/{args.runs} battles, party win rate {report.win_rate():.1%}", end="", flush=True)
+
+	report = simulate_encounter(spec, runs=args.runs, workers=args.workers, seed=args.seed, progress=progress)
+	print()
+	print(json.dumps(report.summary(), indent=2))
+	return 0
+
+
 @dataclass
 class TurnState:
 	started: bool = False
@@ -604,6 +648,12 @@ class Natural20Cli(cmd.Cmd):
 			if not self.battle:
 				break
 
+	# ---------- simulation ----------
+
+	def do_simulate(self, arg: str):
+		"""Monte Carlo encounter simulation: simulate <map> --party SHEET[@pos] --monster NPC[@pos] [--runs N] [--workers K] [--seed S]"""
+		run_simulation(self.scenario_root, shlex.split(arg))
+
 	# ---------- quitting ----------
 
 	def do_quit(self, arg: str):
@@ -630,9 +680,16 @@ def main(argv: Optional[list[str]] = None) -> int:
 		default="ai",
 		help="NPC controller (default: ai)",
 	)
+	parser.add_argument(
+		"--simulate",
+		metavar="ARGS",
+		help="Run 'simulate ARGS' (see 'help simulate') without starting the REPL",
+	)
 	args = parser.parse_args(argv)
 
 	scenario_root = _resolve_scenario_path(args.scenario, args.path)
+	if args.simulate:
+		return run_simulation(scenario_root, shlex.split(args.simulate))
 	index_data = _load_index_json(scenario_root)
 
 	event_manager = EventManager(movement_consolidation=True)
@@ -24,10 +24,11 @@ WEIGHTS_FOLDER = "model_weights_all"
 TRAJECTORY_POLICY = "e-greedy"
 NUM_UPDATES = 2  # number of training steps to update the Q-network
 TEMP_DECAY = 0.90
-BUFFER_CAPACITY = 3000
+BUFFER_CAPACITY = 50000  # transitions
 FRAMES_TO_STORE = 2
 MAX_STEPS = 3000
-BATCH_SIZE = 64
+BATCH_SIZE = 256  # transitions per update
+MAX_STORED_MOVES = 64  # next-state moves kept for max-over-moves targets
 TARGET_UPDATE_FREQ = 1  # how often to update the target network
 T_HORIZON = 512
 EPSILON_START = 1.0
@@ -75,6 +76,7 @@ device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 parser = argparse.ArgumentParser(description='Train a DQN agent for the DnD environment.')
 parser.add_argument('--weights', type=str, default=None, help='Path to the weights file to load')
 parser.add_argument('--checkpoint', type=str, default=None, help='Path to a checkpoint file to resume training')
+parser.add_argument('--replay-buffer', type=str, default=None, help='Directory for a memory-mapped replay buffer kept between runs')
 args = parser.parse_args()
 
 model_policy = ModelPolicy(session, weights_file=args.weights, device=device)
@@ -176,11 +178,13 @@ def train(env, gamma, learning_rate, max_steps=MAX_STEPS, use_td_target=True,
           reward_per_episode=None,
           n_rollout=8,
           seed=1337,
-          checkpoint_path=None):
+          checkpoint_path=None,
+          replay_buffer_path=None):
     print(f"Training with gamma {gamma} and learning rate {learning_rate}")
     env.seed(seed)
 
-    replay_buffer = ReplayBuffer(BUFFER_CAPACITY, device)
+    replay_buffer = ReplayBuffer(BUFFER_CAPACITY, device, storage_path=replay_buffer_path,
+                                 max_moves=0 if use_td_target else MAX_STORED_MOVES)
     model = QNetwork(device).to(device)
     target_model = QNetwork(device).to(device)
     target_model.load_state_dict(model.state_dict())
@@ -225,6 +229,8 @@ def train(env, gamma, learning_rate, max_steps=MAX_STEPS, use_td_target=True,
             # 'replay_buffer' removed to prevent pickling errors
         }
         torch.save(checkpoint_data, path)
+        # keep a disk-backed replay buffer in step with the checkpoint
+        replay_buffer.flush()
         print(f"Checkpoint saved to {path}")
 
     # Use tqdm to show progress and update dynamic training metrics.
@@ -233,58 +239,37 @@ def train(env, gamma, learning_rate, max_steps=MAX_STEPS, use_td_target=True,
             generate_batch_trajectories(env, model, n_rollout, replay_buffer, temperature=temperature,
                                         epsilon=epsilon, policy=trajectory_policy, horizon=T_HORIZON)
 
-            states, actions, rewards, infos, is_terminals = replay_buffer.sample(BATCH_SIZE)
+            batch = replay_buffer.sample(BATCH_SIZE)
             rewards_collected = 0
             total_loss = 0.0
 
             for _ in range(NUM_UPDATES):
-                rewards_collected = 0
-                for i in range(len(states)):
-                    s = states[i]
-                    a = actions[i]
-                    env_info = infos[i]
-                    r = torch.tensor(rewards[i]).to(device).unsqueeze(1)
-                    is_terminal = torch.tensor(is_terminals[i]).float().to(device).unsqueeze(1)
+                r = batch.rewards
+                is_terminal = batch.dones
 
+                with torch.no_grad():
                     if use_td_target:
-                        with torch.no_grad():
-                            s_next = s[1:]
-                            a_next = a[1:]
-                            q_targets = target_model.forward(s_next, a_next, pre_converted=True, pre_converted_action=True).detach()
+                        q_targets = target_model.forward_batch(batch.next_states, batch.next_actions).detach()
                     else:
-                        with torch.no_grad():
-                            s_next = s[1:]
-                            s_info = env_info[1:]
-                            q_targets = torch.zeros(len(s_next)).to(device)
-                            for index in range(len(s_info)):
-                                info = s_info[index]
-                                state_val = s_next[index]
-                                if len(state_val) == 0:
-                                    q_targets[index] = 0
-                                    continue
-                                total_available_moves = len(info["available_moves"])
-                                states_t = [state_val] * total_available_moves
-                                avail_actions = info["available_moves"]
-                                q_values = target_model.forward(states_t, avail_actions, pre_converted=True).detach().squeeze(1)
-                                if len(q_values) == 0:
-                                    q_targets[index] = 0
-                                else:
-                                    q_targets[index] = torch.max(q_values).item()
-                            q_targets = q_targets.unsqueeze(1)
-                            assert q_targets.shape == r.shape, f"q_targets shape {q_targets.shape} != r shape {r.shape}"
-
-                    targets = r + gamma * q_targets * (1 - is_terminal)
-                    s_input = s[0:-1]
-                    a_input = a[0:-1]
-                    output = model.forward(s_input, a_input, pre_converted=True, pre_converted_action=True)
-                    q_sa = output
-
-                    value_loss = nn.MSELoss()(q_sa, targets)
-                    optimizer.zero_grad()
-                    value_loss.backward()
-                    total_loss += value_loss.item()
-                    rewards_collected += r.sum().item()
-                    optimizer.step()
+                        q_targets = torch.zeros_like(r)
+                        for index, avail_actions in enumerate(batch.next_moves):
+                            if not avail_actions:
+                                continue
+                            states_t = {name: column[index].expand(len(avail_actions), *column.shape[1:])
+                                        for name, column in batch.next_states.items()}
+                            q_values = target_model.forward_batch(states_t, replay_buffer.action_tensors(avail_actions)).detach()
+                            q_targets[index] = torch.max(q_values).item()
+                    assert q_targets.shape == r.shape, f"q_targets shape {q_targets.shape} != r shape {r.shape}"
+
+                targets = r + gamma * q_targets * (1 - is_terminal)
+                q_sa = model.forward_batch(batch.states, batch.actions)
+
+                value_loss = nn.MSELoss()(q_sa, targets)
+                optimizer.zero_grad()
+                value_loss.backward()
+                total_loss += value_loss.item()
+                rewards_collected = r.sum().item()
+                optimizer.step()
 
             writer.add_scalar('Loss/Value Loss', total_loss, step)
             writer.add_scalar('Rewards/Collected', rewards_collected, step)
@@ -360,6 +345,7 @@ def train(env, gamma, learning_rate, max_steps=MAX_STEPS, use_td_target=True,
                 'avg_reward': f"{current_avg_reward:.2f}" if current_avg_reward is not None else "N/A"
             })
 
+    replay_buffer.flush()
     writer.close()
     env.close()
     return reward_per_episode
@@ -396,5 +382,6 @@ for lr in learning_rates:
         seed += 1
         reward_per_episode = train(env, gamma, lr, max_steps=MAX_STEPS, seed=seed,
                                      use_td_target=True, eval_env=eval_env,
-                                     checkpoint_path=args.checkpoint)
+                                     checkpoint_path=args.checkpoint,
+                                     replay_buffer_path=args.replay_buffer)
         results[lr][gamma] = reward_per_episode
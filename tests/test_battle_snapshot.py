@@ -0,0 +1,99 @@
+import random
+import unittest
+import numpy as np
+from natural20.actions.interact_action import InteractAction
+from natural20.battle import Battle
+from natural20.die_roll import DieRoll
+from natural20.map import Map
+from natural20.player_character import PlayerCharacter
+from natural20.session import Session
+
+
+class TestBattleSnapshot(unittest.TestCase):
+    def setUp(self):
+        random.seed(7000)
+        self.session = Session(root_path='tests/fixtures')
+        self.session.seed_rng(11)
+        self.map = Map(self.session, 'battle_sim_objects')
+        self.battle = Battle(self.session, self.map)
+        self.fighter = PlayerCharacter.load(self.session, 'high_elf_fighter.yml')
+        self.goblin = self.session.npc('goblin')
+        self.battle.add(self.fighter, 'a', position=[1, 5], token='G')
+        self.battle.add(self.goblin, 'b', position=[3, 5], token='g')
+        self.battle.start()
+        self.fighter.reset_turn(self.battle)
+        self.door = self.map.object_at(1, 4)
+
+    def open_door(self):
+        action = InteractAction.build(self.session, self.fighter)['next'](self.door)['next']('open')
+        action.resolve(self.session)
+        InteractAction.apply(self.battle, action.result[0], session=self.session)
+
+    def observe(self):
+        return {
+            'hp': (self.fighter.hp(), self.goblin.hp()),
+            'prone': self.goblin.prone(),
+            'positions': (self.map.position_of(self.fighter), self.map.position_of(self.goblin)),
+            'order': list(self.battle.combat_order),
+            'turn': (self.battle.round, self.battle.current_turn()),
+            'door': self.door.opened(),
+            'passable': self.map.passable(self.fighter, 1, 4),
+            'opaque': self.map.opaque(1, 4),
+            'flags': self.map.terrain_grid.flags.copy(),
+        }
+
+    def assert_observed(self, expected):
+        actual = self.observe()
+        np.testing.assert_array_equal(actual.pop('flags'), expected['flags'])
+        self.assertEqual(actual, {key: value for key, value in expected.items() if key != 'flags'})
+
+    def test_restore_rewinds_creatures_map_and_dice(self):
+        before = self.observe()
+        snapshot = self.battle.snapshot()
+        rolls = [DieRoll.roll('1d20', battle=self.battle).result() for _ in range(3)]
+
+        for _ in range(2):
+            DieRoll.roll('1d20', battle=self.battle)
+            self.goblin.take_damage(3, battle=self.battle)
+            self.goblin.do_prone()
+            self.map.move_to(self.fighter, 2, 5, self.battle)
+            self.map.move_to(self.fighter, 1, 5, self.battle)
+            self.open_door()
+            self.battle.next_turn()
+            self.map.move_to(self.goblin, 3, 6, self.battle)
+            self.assertTrue(self.door.opened())
+
+            snapshot.restore()
+            self.assert_observed(before)
+            self.assertEqual([DieRoll.roll('1d20', battle=self.battle).result() for _ in range(3)], rolls)
+            snapshot.restore()
+
+    def test_fork_discards_what_if_play(self):
+        before = self.observe()
+        with self.battle.fork():
+            self.goblin.take_damage(100, battle=self.battle)
+            self.battle.remove(self.goblin, from_map=True)
+            self.open_door()
+            self.assertNotIn(self.goblin, self.battle.combat_order)
+        self.assert_observed(before)
+        self.assertFalse(self.goblin.dead())
+        self.assertIn(self.goblin, self.battle.entities)
+
+        # later snapshots still see later changes
+        self.goblin.take_damage(2, battle=self.battle)
+        hp = self.goblin.hp()
+        with self.battle.fork():
+            self.goblin.take_damage(1, battle=self.battle)
+        self.assertEqual(self.goblin.hp(), hp)
+
+    def test_restore_rewinds_light_sources_that_did_not_move(self):
+        light = self.map.light_at(2, 5)
+        snapshot = self.battle.snapshot()
+        self.fighter.equip('torch', ignore_inventory=True)
+        self.assertGreater(self.map.light_at(2, 5), light)
+        snapshot.restore()
+        self.assertEqual(self.map.light_at(2, 5), light)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from itertools import product
+from natural20.die_roll import DieRoll
+from natural20.utils import dice_distribution
+from natural20.utils.dice_distribution import distribution
+
+
+def brute_force(count, sides, fn=lambda total: total):
+    outcomes = [fn(sum(faces)) for faces in product(range(1, sides + 1), repeat=count)]
+    return outcomes
+
+
+class TestDiceDistribution(unittest.TestCase):
+    def test_multiple_dice_match_enumeration(self):
+        outcomes = brute_force(2, 6, lambda total: total + 3)
+        dist = distribution('2d6+3')
+        self.assertAlmostEqual(dist.expected(), sum(outcomes) / len(outcomes))
+        self.assertAlmostEqual(dist.prob(10), sum(1 for o in outcomes if o >= 10) / len(outcomes))
+        self.assertEqual(dist.prob(5), 1.0)
+        self.assertEqual(dist.prob(16), 0.0)
+        self.assertEqual((dist.low, dist.high()), (5, 15))
+        self.assertEqual(dist.percentile(0.5), 10)
+        self.assertEqual(dist.percentile(0.0), 5)
+        self.assertEqual(dist.percentile(1.0), 15)
+
+    def test_advantage_applies_per_die(self):
+        outcomes = [max(a, b) + max(c, d) for a, b, c, d in product(range(1, 7), repeat=4)]
+        dist = distribution('2d6', advantage=True)
+        self.assertAlmostEqual(dist.expected(), sum(outcomes) / len(outcomes))
+        self.assertAlmostEqual(dist.prob(11), sum(1 for o in outcomes if o >= 11) / len(outcomes))
+        self.assertAlmostEqual(distribution('1d20', disadvantage=True).expected(), 7.175)
+
+    def test_crit_halving_and_operators(self):
+        self.assertAlmostEqual(distribution('1d8+2', crit=True).expected(), 11.0)
+        halved = brute_force(2, 6, lambda total: total // 2)
+        self.assertAlmostEqual(distribution('2d6', halved=True).expected(), sum(halved) / len(halved))
+        self.assertAlmostEqual(distribution('1d20/2').expected(), 5.0)
+        self.assertAlmostEqual(distribution('1d6*2').prob(12), 1 / 6)
+        self.assertEqual(distribution('5').expected(), 5.0)
+
+    def test_die_roll_queries_use_the_rolled_shape(self):
+        roll = DieRoll.roll('3d6+1')
+        self.assertAlmostEqual(roll.expected(), 11.5)
+        self.assertAlmostEqual(roll.prob(17), distribution('3d6+1').prob(17))
+        self.assertAlmostEqual(roll.half().expected(), distribution('3d6+1', halved=True).expected())
+        combined = DieRoll.roll('2d8') + DieRoll.roll('1d6')
+        self.assertAlmostEqual(combined.expected(), 12.5)
+        self.assertAlmostEqual(combined.prob(3), 1.0)
+        self.assertAlmostEqual(combined.prob(22), 1 / 384)
+
+    def test_tables_are_cached_by_normalized_roll(self):
+        dice_distribution.cache_clear()
+        first = distribution('1d20 + 5')
+        self.assertIs(distribution('1d20+5'), first)
+        self.assertIs(DieRoll.roll('1d20+5').distribution(), first)
+        self.assertEqual(dice_distribution.cache_info().misses, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from natural20.map import Map
+from natural20.session import Session
+from natural20.player_character import PlayerCharacter
+from natural20.spell.objects.darkness import Darkness
+
+
+def reference_light_at(battle_map, pos_x, pos_y):
+    """Per-source scan used before the light grid existed (no darkness/gas)."""
+    intensity = 0.0
+    for source in (battle_map.entities, battle_map.interactable_objects):
+        for entity in source:
+            light = entity.light_properties()
+            if light is None:
+                continue
+            bright_light = light.get('bright', 0.0) / battle_map.feet_per_grid
+            dim_light = light.get('dim', 0.0) / battle_map.feet_per_grid
+            if (bright_light + dim_light) <= 0.0:
+                continue
+            light_pos_x, light_pos_y = battle_map.entity_or_object_pos(entity)
+            in_bright, in_dim = battle_map.light_in_sight(
+                pos_x, pos_y, light_pos_x, light_pos_y,
+                min_distance=bright_light, distance=bright_light + dim_light, inclusive=True,
+            )
+            intensity += 1.0 if in_bright else (0.5 if in_dim else 0.0)
+    return intensity
+
+
+class TestDynamicLightGrid(unittest.TestCase):
+    def setUp(self):
+        self.session = Session(root_path='tests/fixtures')
+        self.map = Map(self.session, 'tests/fixtures/maps/thinwall_map_doors.yml')
+        self.builder = self.map._light_builder
+        self.character = PlayerCharacter.load(self.session, 'characters/high_elf_fighter.yml')
+
+    def assertMatchesReference(self):
+        width, height = self.map.size
+        for x in range(width):
+            for y in range(height):
+                self.assertEqual(self.builder.light_at(x, y), reference_light_at(self.map, x, y), (x, y))
+
+    def test_follows_moving_and_toggling_light_sources(self):
+        self.character.equip('torch', ignore_inventory=True)
+        self.map.place((0, 0), self.character)
+        self.assertMatchesReference()
+        self.assertEqual(self.builder.light_at(0, 0), 1.0)
+
+        self.map.move_to(self.character, 0, 5)
+        self.assertMatchesReference()
+
+        self.map.object_at(1, 3).open()
+        self.assertMatchesReference()
+
+        lamp = self.map.place_object({'name': 'lamp', 'light': {'bright': 5, 'dim': 5}, 'passable': True}, 4, 1)
+        self.assertMatchesReference()
+
+        self.map.remove(lamp)
+        self.character.unequip('torch', transfer_inventory=False)
+        self.assertMatchesReference()
+        self.assertEqual(self.builder.light_at(0, 5), 0.0)
+        self.assertFalse(self.builder.dynamic_lights.any())
+
+    def test_recomputes_only_changed_sources(self):
+        self.character.equip('torch', ignore_inventory=True)
+        self.map.place((0, 0), self.character)
+        self.builder.light_at(0, 0)
+        footprint = self.builder._light_sources[self.character][3]
+
+        self.session.invalidate_lighting()
+        self.builder.light_at(0, 0)
+        self.assertIs(self.builder._light_sources[self.character][3], footprint)
+
+        self.map.move_to(self.character, 0, 1)
+        self.builder.light_at(0, 0)
+        self.assertIsNot(self.builder._light_sources[self.character][3], footprint)
+
+    def test_darkness_and_gas_masks(self):
+        self.character.equip('torch', ignore_inventory=True)
+        self.map.place((0, 0), self.character)
+        dark = Darkness(self.session, self.character, radius_feet=5)
+        self.map.place((4, 4), dark)
+        self.assertTrue(self.map.magical_darkness_at(3, 3))
+        self.assertTrue(self.map.magical_darkness_at(5, 5))
+        self.assertFalse(self.map.magical_darkness_at(2, 2))
+        self.assertEqual(self.builder.light_at(3, 3), 0.0)
+
+        self.map.place_object({'name': 'cloud', 'obscuring_gas': True, 'passable': True}, 0, 1)
+        self.assertTrue(self.builder.obscuring_gas_at(0, 1))
+        self.assertFalse(self.builder.obscuring_gas_at(0, 2))
+        self.assertLessEqual(self.builder.light_at(0, 1), 0.2)
+
+        self.map.remove(dark)
+        self.assertFalse(self.map.magical_darkness_at(3, 3))
+        self.assertFalse(self.builder.darkness_mask.any())
+
+
+if __name__ == '__main__':
+    unittest.main()
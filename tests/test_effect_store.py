@@ -0,0 +1,96 @@
+import unittest
+from natural20.session import Session
+from natural20.player_character import PlayerCharacter
+from natural20.utils.effect_store import EffectStore
+from natural20.utils.effect_registry import (
+    register_effect, serialize_effects_dict, deserialize_effects_dict,
+)
+
+
+class _BonusEffect:
+    """Adds ``bonus`` to the value of the effect type it is registered for."""
+
+    def __init__(self, bonus=1):
+        self.id = f'bonus_{bonus}'
+        self.bonus = bonus
+        self.source = None
+
+    def ac_bonus(self, entity, opts):
+        return (opts.get('value') or 0) + self.bonus
+
+    def to_dict(self):
+        return {'bonus': self.bonus}
+
+    @staticmethod
+    def from_dict(data):
+        return _BonusEffect(data['bonus'])
+
+
+register_effect('_store_bonus', _BonusEffect)
+
+
+def brute_force_active(entity):
+    now = entity.session.game_time
+    return [effect for effects in entity.effects.values() for effect in effects
+            if not effect.get('expiration') or effect['expiration'] > now]
+
+
+class TestEffectStore(unittest.TestCase):
+    def setUp(self):
+        self.session = Session(root_path='tests/fixtures')
+        self.session.game_time = 0
+        self.fighter = PlayerCharacter.load(self.session, 'characters/high_elf_fighter.yml')
+
+    def register(self, bonus, duration=None, effect_type='ac_bonus'):
+        effect = _BonusEffect(bonus)
+        self.fighter.register_effect(effect_type, effect, effect_type, effect=effect, duration=duration)
+        return effect
+
+    def test_expiry_follows_game_time(self):
+        self.register(1)
+        self.register(2, duration=6)
+        self.register(3, duration=60)
+        self.register(4, duration=12, effect_type='speed_override')
+        self.assertIsInstance(self.fighter.effects, EffectStore)
+
+        for game_time in (0, 5, 6, 11, 12, 59, 60, 61, 6, 0):
+            self.session.game_time = game_time
+            self.assertEqual(self.fighter.current_effects(), brute_force_active(self.fighter), game_time)
+            self.assertEqual(self.fighter.has_effect('speed_override'), game_time < 12)
+        self.session.game_time = 7
+        # last registered active effect wins when not stacked
+        self.assertEqual(self.fighter.eval_effect('ac_bonus', {'value': 10}), 13)
+        self.assertEqual(self.fighter.eval_effect('ac_bonus', {'value': 10, 'stacked': True}), 14)
+
+    def test_dismissed_and_reassigned_effects_are_reindexed(self):
+        kept = self.register(1)
+        dropped = self.register(2, duration=6)
+        self.assertEqual(len(self.fighter.current_effects()), 2)
+        self.fighter.remove_effect(dropped)
+        self.assertEqual([e['effect'] for e in self.fighter.current_effects()], [kept])
+
+        # loaders assign plain dicts
+        self.fighter.effects = {'ac_bonus': list(self.fighter.effects['ac_bonus'])}
+        self.register(5)
+        self.assertEqual([e['effect'].bonus for e in self.fighter.current_effects()], [1, 5])
+
+    def test_round_trips_through_effect_registry(self):
+        self.register(1)
+        self.register(2, duration=6)
+        payload = serialize_effects_dict(self.fighter.effects)
+        self.fighter.effects = deserialize_effects_dict(payload, session=self.session)
+        self.assertEqual(self.fighter.eval_effect('ac_bonus', {'value': 10, 'stacked': True}), 13)
+        self.session.game_time = 6
+        self.assertEqual(self.fighter.eval_effect('ac_bonus', {'value': 10, 'stacked': True}), 11)
+
+    def test_equipment_effects_follow_equip_and_unequip(self):
+        self.assertFalse(self.fighter.has_effect('saving_throw_override'))
+        self.fighter.equip('cloak_of_protection', ignore_inventory=True)
+        self.assertTrue(self.fighter.has_effect('saving_throw_override'))
+        # the cloak only protects saving throws
+        self.assertFalse(self.fighter.has_effect('ac_bonus'))
+        self.fighter.unequip('cloak_of_protection', transfer_inventory=False)
+        self.assertFalse(self.fighter.has_effect('saving_throw_override'))
+
+if __name__ == '__main__':
+    unittest.main()
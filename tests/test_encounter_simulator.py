@@ -0,0 +1,41 @@
+import unittest
+from natural20.encounter_simulator import EncounterSpec, simulate_encounter
+from natural20.progression import empirical_encounter_difficulty
+
+
+class TestEncounterSimulator(unittest.TestCase):
+    def setUp(self):
+        self.spec = EncounterSpec('tests/fixtures', 'tests/fixtures/battle_sim.yml',
+                                  party=['characters/high_elf_fighter@spawn_point_1'],
+                                  monsters=['goblin@spawn_point_2'],
+                                  max_rounds=20)
+
+    def test_reports_outcomes_and_predicted_difficulty(self):
+        seen = []
+        report = simulate_encounter(self.spec, runs=2, workers=0, seed=5, progress=lambda r: seen.append(r.battles))
+        summary = report.summary()
+        self.assertEqual(seen, [1, 2])
+        self.assertEqual(summary['battles'], 2)
+        self.assertEqual(sum(report.wins.values()), 2)
+        self.assertGreater(summary['average_rounds'], 0)
+        self.assertGreater(summary['average_damage_dealt']['party'], 0)
+        self.assertEqual(summary['adjusted_xp'], 75)
+        self.assertEqual(summary['predicted_difficulty'], 'hard')
+        self.assertIn(summary['empirical_difficulty'], ('trivial', 'easy', 'medium', 'hard', 'deadly'))
+
+    def test_worker_processes_replay_the_same_seeds(self):
+        in_process = simulate_encounter(self.spec, runs=2, workers=0, seed=11)
+        pooled = simulate_encounter(self.spec, runs=2, workers=2, seed=11, chunk_size=1)
+        self.assertEqual(pooled.summary(), in_process.summary())
+
+    def test_empirical_difficulty_labels(self):
+        self.assertEqual(empirical_encounter_difficulty(0.5), 'deadly')
+        self.assertEqual(empirical_encounter_difficulty(1.0, party_death_rate=0.2), 'deadly')
+        self.assertEqual(empirical_encounter_difficulty(0.95, party_hp_lost=0.3, party_downed_rate=0.6), 'hard')
+        self.assertEqual(empirical_encounter_difficulty(1.0, party_hp_lost=0.3), 'medium')
+        self.assertEqual(empirical_encounter_difficulty(1.0, party_hp_lost=0.1), 'easy')
+        self.assertEqual(empirical_encounter_difficulty(1.0), 'trivial')
+
+
+if __name__ == '__main__':
+    unittest.main()
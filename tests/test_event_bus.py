@@ -0,0 +1,130 @@
+import threading
+import unittest
+from natural20.session import Session
+from natural20.map import Map
+from natural20.battle import Battle
+from natural20.player_character import PlayerCharacter
+from natural20.actions.dodge_action import DodgeAction
+from natural20.event_manager import EventManager, AsyncEventSink
+
+
+class CapturingLogger:
+    def __init__(self):
+        self.lines = []
+
+    def set_event_context(self, event):
+        return None
+
+    def clear_event_context(self):
+        return None
+
+    def log(self, event_msg, event=None, visibility=None):
+        self.lines.append(event_msg)
+
+
+class TestEventBus(unittest.TestCase):
+    def setUp(self):
+        self.event_manager = EventManager(output_logger=CapturingLogger())
+        self.received = []
+
+    def listener(self, tag):
+        def handler(event):
+            self.received.append((tag, event['event']))
+        return handler
+
+    def test_prefix_and_wildcard_subscriptions(self):
+        em = self.event_manager
+        em.register_event_listener('spell_damage', self.listener('exact'))
+        em.register_event_listener('spell_*', self.listener('prefix'))
+        em.register_event_listener('*', self.listener('all'))
+        em.received_event({'event': 'spell_damage'})
+        em.received_event({'event': 'spellbook'})
+        em.received_event({'event': 'dodge'})
+        self.assertEqual(self.received, [('exact', 'spell_damage'), ('prefix', 'spell_damage'), ('all', 'spell_damage'),
+                                         ('all', 'spellbook'), ('all', 'dodge')])
+
+        # subscriptions added later are picked up
+        late = self.listener('late')
+        em.register_event_listener('dodge', late)
+        em.received_event({'event': 'dodge'})
+        em.unregister_event_listener('dodge', late)
+        em.received_event({'event': 'dodge'})
+        self.assertEqual(self.received[-3:], [('late', 'dodge'), ('all', 'dodge'), ('all', 'dodge')])
+
+    def test_deferred_listeners_wait_for_the_batch(self):
+        em = self.event_manager
+        em.register_event_listener('*', self.listener('log'), deferred=True)
+        em.register_event_listener('died', self.listener('game'))
+        with em.batch():
+            em.received_event({'event': 'damage'})
+            with em.batch():
+                em.received_event({'event': 'died'})
+            self.assertEqual(self.received, [('game', 'died')])
+        self.assertEqual(self.received, [('game', 'died'), ('log', 'damage'), ('log', 'died')])
+
+    def test_move_consolidation_is_kept(self):
+        em = EventManager(output_logger=CapturingLogger(), movement_consolidation=True)
+        em.register_event_listener('*', self.listener('all'))
+        source, other = object(), object()
+        em.received_event({'event': 'move', 'source': source, 'path': [[0, 0]], 'position': [1, 0], 'move_cost': 5})
+        em.received_event({'event': 'move', 'source': source, 'path': [[1, 0]], 'position': [2, 0], 'move_cost': 5})
+        self.assertEqual(self.received, [])
+        em.received_event({'event': 'move', 'source': other, 'path': [[5, 5]], 'position': [5, 6], 'move_cost': 5})
+        em.received_event({'event': 'dodge'})
+        self.assertEqual(self.received, [('all', 'move'), ('all', 'move'), ('all', 'dodge')])
+        merged = em.event_buffer[0]
+        self.assertEqual(merged['position'], [[0, 0], [2, 0]])
+        self.assertEqual(merged['move_cost'], 10)
+
+    def test_listener_profiling(self):
+        em = self.event_manager
+        em.enable_profiling()
+        handler = self.listener('profiled')
+        em.register_event_listener('dodge', handler)
+        for _ in range(3):
+            em.received_event({'event': 'dodge'})
+        (name, calls, seconds), = em.listener_stats()
+        self.assertIn('handler', name)
+        self.assertEqual(calls, 3)
+        self.assertGreaterEqual(seconds, 0.0)
+
+    def test_async_sink_consumes_off_the_game_thread(self):
+        em = self.event_manager
+        consumed = []
+
+        def consumer(line):
+            consumed.append((line, threading.current_thread() is threading.main_thread()))
+
+        sink = em.add_sink(AsyncEventSink(consumer, transform=lambda event: event['event'].upper()), events='spell_*')
+        em.received_event({'event': 'spell_damage'})
+        em.received_event({'event': 'dodge'})
+        em.flush_sinks()
+        self.assertEqual(consumed, [('SPELL_DAMAGE', False)])
+        em.close_sinks()
+        em.received_event({'event': 'spell_damage'})
+        self.assertEqual(len(consumed), 1)
+        self.assertEqual(sink.dropped, 0)
+
+    def test_battle_commit_flushes_log_output_once_applied(self):
+        logger = CapturingLogger()
+        session = Session(root_path='tests/fixtures', event_manager=EventManager(output_logger=logger))
+        session.event_manager.standard_cli()
+        battle_map = Map(session, 'tests/fixtures/battle_sim.yml')
+        battle = Battle(session, battle_map)
+        fighter = PlayerCharacter.load(session, 'characters/high_elf_fighter.yml')
+        battle.add(fighter, 'a', position='spawn_point_1', token='G')
+        battle.start()
+        logger.lines.clear()
+        seen_by_game_listener = []
+        session.event_manager.register_event_listener(
+            'dodge', lambda event: seen_by_game_listener.append(list(logger.lines)))
+
+        action = DodgeAction(session, fighter, 'dodge')
+        action.resolve(session, battle_map, {'battle': battle})
+        battle.commit(action)
+        self.assertEqual(seen_by_game_listener, [[]])
+        self.assertTrue(any('dodges' in line for line in logger.lines))
+
+
+if __name__ == '__main__':
+    unittest.main()
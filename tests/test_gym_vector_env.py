@@ -0,0 +1,53 @@
+import random
+import unittest
+import numpy as np
+from natural20.entity import Entity
+from natural20.gym.vector_env import make_vector_env, batch_moves, unbatch_move
+
+
+class TestGymVectorEnv(unittest.TestCase):
+    def play(self, envs, steps, seed=42):
+        obs, infos = envs.reset(seed=seed)
+        rng = random.Random(seed)
+        for _ in range(steps):
+            moves = [rng.choice(infos['available_moves'][i]) for i in range(envs.num_envs)]
+            obs, rewards, dones, truncateds, infos = envs.step(batch_moves(moves))
+            self.assertEqual(rewards.shape, (envs.num_envs,))
+        return obs, infos
+
+    def test_batch_moves_round_trip(self):
+        moves = [(-1, (0, 0), (0, 0), 0, 0), (0, (0, 0), (1, -1), 3, 1)]
+        batched = batch_moves(moves)
+        self.assertEqual(batched[0].shape, (2, 1))
+        self.assertEqual(batched[2].shape, (2, 2))
+        self.assertEqual([unbatch_move(tuple(part[i] for part in batched)) for i in range(2)], moves)
+
+    def test_sync_envs_write_into_preallocated_buffers(self):
+        envs = make_vector_env(2, root_path='tests/fixtures', max_rounds=5, copy=False)
+        self.addCleanup(envs.close)
+        obs, infos = envs.reset(seed=42)
+        map_buffer = obs['map']
+        self.assertEqual(map_buffer.shape, (2, 12, 12, 5))
+        self.assertEqual(map_buffer.dtype, envs.single_observation_space['map'].dtype)
+        self.assertEqual(len(infos['available_moves']), 2)
+
+        sessions = [env.unwrapped.session for env in envs.envs]
+        obs, _ = self.play(envs, 6)
+        self.assertIs(obs['map'], map_buffer)
+        # each environment keeps its own session across episode resets
+        envs.reset(seed=7)
+        self.assertEqual([env.unwrapped.session for env in envs.envs], sessions)
+        self.assertIsNot(sessions[0], sessions[1])
+
+    def test_async_envs_step_in_subprocesses(self):
+        envs = make_vector_env(2, asynchronous=True, root_path='tests/fixtures', max_rounds=5)
+        self.addCleanup(envs.close)
+        obs, infos = self.play(envs, 4)
+        self.assertEqual(obs['health_pct'].shape, (2, 1))
+        self.assertTrue(np.all((obs['health_pct'] >= 0) & (obs['health_pct'] <= 1)))
+        # infos cross the worker pipes with entities replaced by their uids
+        self.assertFalse(any(isinstance(uid, Entity) for uid in infos['players'][0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+from unittest import mock
+from natural20.session import Session
+from natural20.map import Map
+from natural20.battle import Battle
+from natural20.ai import path_compute
+from natural20.ai.path_compute import PathCompute
+from natural20.ai.hierarchical_path import cluster_graph
+
+
+def serpentine_properties(width, height):
+    """Rows of walls every 6 tiles, with the gap alternating between the two ends."""
+    base = []
+    for y in range(height):
+        row = []
+        for x in range(width):
+            band = y // 6
+            wall = y % 6 == 5 and (x < width - 2 if band % 2 == 0 else x >= 2)
+            row.append('#' if wall else '.')
+        base.append(''.join(row))
+    return {'name': 'serpentine', 'map': {'size': [width, height], 'base': base}}
+
+
+class TestHierarchicalPath(unittest.TestCase):
+    def setUp(self):
+        self.session = Session(root_path='tests/fixtures')
+        self.map = Map(self.session, None, name='serpentine', properties=serpentine_properties(30, 16))
+        self.battle = Battle(self.session, self.map)
+        self.goblin = self.session.npc('goblin')
+        self.battle.add(self.goblin, 'b', position=(0, 0))
+
+    def compute(self, destination, hpa_distance=8, max_nodes=100000):
+        with mock.patch.object(path_compute, 'HPA_DISTANCE', hpa_distance), \
+                mock.patch.object(path_compute, 'MAX_NODES', max_nodes):
+            pc = PathCompute(self.battle, self.map, self.goblin)
+            return pc.compute_path(0, 0, *destination), pc
+
+    def assertWalkable(self, path, destination):
+        self.assertEqual(path[0], (0, 0))
+        self.assertEqual(path[-1], destination)
+        for (x1, y1), (x2, y2) in zip(path, path[1:]):
+            self.assertLessEqual(max(abs(x2 - x1), abs(y2 - y1)), 1)
+            self.assertTrue(self.map.bidirectionally_passable(self.goblin, x2, y2, (x1, y1), self.battle))
+
+    def test_long_path_is_walkable_and_near_optimal(self):
+        path, _ = self.compute((0, 15))
+        flat, _ = self.compute((0, 15), hpa_distance=0)
+        self.assertWalkable(path, (0, 15))
+        self.assertLessEqual(len(path), len(flat) * 1.1)
+
+    def test_succeeds_where_flat_search_hits_node_cap(self):
+        flat, pc = self.compute((0, 15), hpa_distance=0, max_nodes=150)
+        self.assertIsNone(flat)
+        self.assertTrue(pc._last_interrupted)
+
+        path, pc = self.compute((0, 15), max_nodes=150)
+        self.assertWalkable(path, (0, 15))
+        self.assertFalse(pc._last_interrupted)
+
+    def test_object_change_rebuilds_only_its_cluster(self):
+        self.compute((0, 15))
+        graph = cluster_graph(self.map.navigation.layer(self.goblin, False))
+        self.assertEqual(graph.dirty, frozenset())
+
+        crate = self.map.place_object({'name': 'crate', 'passable': False}, 15, 2)
+        self.assertEqual(graph.dirty, frozenset({(1, 0)}))
+        self.map.remove(crate)
+        self.compute((0, 15))
+        self.assertEqual(graph.dirty, frozenset())
+
+        # closing the gap of the first wall cuts the map in two
+        crates = [self.map.place_object({'name': 'crate', 'passable': False}, x, 5) for x in (28, 29)]
+        self.assertEqual(graph.dirty, frozenset({(2, 0)}))
+        self.assertIsNone(graph.route(self.goblin, False, (0, 0), (0, 15)))
+        for crate in crates:
+            self.map.remove(crate)
+        path, _ = self.compute((0, 15))
+        self.assertWalkable(path, (0, 15))
+
+
+if __name__ == '__main__':
+    unittest.main()
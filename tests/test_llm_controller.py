@@ -595,4 +595,44 @@ def test_llm_controller_pathfinding_tool_via_tool_calls():
         assert result['tool'] == 'compute_path_to'
         assert 'result' in result
         inner_result = result['result']
-        assert 'path' in inner_result or 'error' in inner_result or 'reachable' in inner_result
\ No newline at end of file
+        assert 'path' in inner_result or 'error' in inner_result or 'reachable' in inner_result
+
+def test_llm_controller_reachability_shared_across_tool_calls():
+    """Reachable-position tools in one batch share a single Dijkstra field."""
+    session = Session('tests/fixtures')
+    controller = LlmMcpController(session)
+    any_map = next(iter(session.maps.values()))
+    battle = Battle(session, any_map)
+
+    goblin = session.npc('goblin', {"group": "b"})
+    hero = session.npc('goblin', {"group": "a"})
+    hero.name = "TargetHero"
+    battle.add(goblin, 'b', position=(1, 1))
+    battle.add(hero, 'a', position=(4, 3))
+    battle.start(combat_order=[goblin, hero])
+    battle.entity_state_for(goblin)['movement'] = 30
+
+    built = []
+    original = controller._reachability
+
+    def counting_reachability(*args, **kwargs):
+        field = original(*args, **kwargs)
+        if all(field is not other for other in built):
+            built.append(field)
+        return field
+
+    controller._reachability = counting_reachability
+    tool_calls = [
+        {'function': {'name': 'get_reachable_positions', 'arguments': '{"max_positions": 50}'}},
+        {'function': {'name': 'get_optimal_ranged_position', 'arguments': '{"target_name": "TargetHero"}'}},
+    ]
+    results = controller._process_goal_tool_calls(goblin, battle, tool_calls)
+
+    assert len(built) == 1
+    assert controller._reachability_cache is None
+    reachable = results[0]['result']
+    costs = [pos['movement_cost_ft'] for pos in reachable['reachable_positions']]
+    assert costs and costs == sorted(costs)
+    assert max(costs) <= reachable['movement_available_ft']
+    assert [1, 1] not in [pos['position'] for pos in reachable['reachable_positions']]
+    assert 'recommended_positions' in results[1]['result']
@@ -0,0 +1,139 @@
+import threading
+import time
+
+from natural20.session import Session
+from natural20.battle import Battle
+from natural20.llm_controller import LlmMcpController
+
+
+class StubProvider:
+    """Local provider that always picks the first action, slowly, and records how it was called."""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.threads = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        # cleared to hold replies back
+        self.release = threading.Event()
+        self.release.set()
+
+    def send_message(self, messages):
+        with self.lock:
+            self.threads.append(threading.current_thread().name)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            self.release.wait()
+            return "0"
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def blocking_calls(self):
+        return [name for name in self.threads if not name.startswith('n20-llm-prefetch')]
+
+
+def _setup():
+    session = Session('tests/fixtures')
+    any_map = next(iter(session.maps.values()))
+    battle = Battle(session, any_map)
+    provider = StubProvider()
+
+    goblins = []
+    for index in range(3):
+        goblin = session.npc('goblin', {"group": "b"})
+        controller = LlmMcpController(session, llm_provider=provider, prefetch_depth=2, prefetch_concurrency=2)
+        battle.add(goblin, 'b', controller=controller, position=(index, 0))
+        goblins.append(goblin)
+    hero = session.npc('goblin', {"group": "a"})
+    battle.add(hero, 'a', position=(1, 1))
+    battle.start(combat_order=goblins + [hero])
+    return battle, provider, goblins, hero
+
+
+def _select(battle, entity):
+    controller = battle.controller_for(entity)
+    entity.reset_turn(battle)
+    actions = controller._compute_available_moves(entity, battle)
+    return controller, actions, controller.select_action(battle, entity, actions)
+
+
+def _wait_for_prefetches(battle, entities):
+    for entity in entities:
+        decision = battle.controller_for(entity)._prefetched.get(entity.entity_uid)
+        if decision is not None:
+            decision.future.result()
+
+
+def test_prefetches_upcoming_turns_concurrently():
+    battle, provider, goblins, hero = _setup()
+    first, second, third = goblins
+
+    _, actions, choice = _select(battle, first)
+    assert choice in actions
+    _wait_for_prefetches(battle, [second, third])
+
+    # the two goblins acting next were asked while the first goblin's own request was pending
+    assert battle.controller_for(second).prefetch_stats['requested'] == 1
+    assert battle.controller_for(third).prefetch_stats['requested'] == 1
+    assert len(provider.blocking_calls()) == 1
+    assert provider.max_in_flight >= 2
+    # nothing is kept for the creature whose turn it is
+    assert first.entity_uid not in battle.controller_for(first)._prefetched
+
+
+def test_prefetched_decision_reused_when_state_unchanged():
+    battle, provider, goblins, hero = _setup()
+    first, second, third = goblins
+
+    _select(battle, first)
+    _wait_for_prefetches(battle, [second, third])
+
+    battle.next_turn()
+    blocking = len(provider.blocking_calls())
+    controller, actions, choice = _select(battle, second)
+    assert controller.prefetch_stats['reused'] == 1
+    assert controller._action_signature(choice) == controller._action_signature(actions[0])
+    assert len(provider.blocking_calls()) == blocking
+
+
+def test_prefetched_decision_discarded_when_state_changes():
+    battle, provider, goblins, hero = _setup()
+    first, second, third = goblins
+
+    _select(battle, first)
+    _wait_for_prefetches(battle, [second, third])
+
+    # the second goblin gets hurt before its turn comes up
+    second.take_damage(1, battle=battle)
+    battle.next_turn()
+    blocking = len(provider.blocking_calls())
+    controller, actions, choice = _select(battle, second)
+    assert controller.prefetch_stats['reused'] == 0
+    assert controller.prefetch_stats['discarded'] == 1
+    assert choice in actions
+    assert len(provider.blocking_calls()) == blocking + 1
+    # the third goblin sees the second one, so its decision was asked again too
+    third_stats = battle.controller_for(third).prefetch_stats
+    assert (third_stats['discarded'], third_stats['requested']) == (1, 2)
+
+    # an unchanged state keeps the decision, a creature moving in sight replaces it
+    _wait_for_prefetches(battle, [third])
+    controller.prefetch_upcoming(battle, second)
+    assert (third_stats['discarded'], third_stats['requested']) == (1, 2)
+    provider.release.clear()
+    battle.map_for(hero).move_to(hero, 2, 1, battle)
+    controller.prefetch_upcoming(battle, second)
+    assert (third_stats['discarded'], third_stats['requested']) == (2, 3)
+
+    # no new request while the last one is still in flight, even though the state moved on
+    battle.map_for(hero).move_to(hero, 1, 1, battle)
+    controller.prefetch_upcoming(battle, second)
+    assert (third_stats['discarded'], third_stats['requested']) == (2, 3)
+    provider.release.set()
+    _wait_for_prefetches(battle, [third])
+    controller.prefetch_upcoming(battle, second)
+    assert (third_stats['discarded'], third_stats['requested']) == (3, 4)
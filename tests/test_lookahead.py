@@ -0,0 +1,75 @@
+import random
+import unittest
+from natural20.actions.attack_action import AttackAction
+from natural20.ai.lookahead import LookaheadSearch, evaluate
+from natural20.battle import Battle
+from natural20.generic_controller import GenericController
+from natural20.map import Map
+from natural20.player_character import PlayerCharacter
+from natural20.session import Session
+
+
+class TestLookahead(unittest.TestCase):
+    def setUp(self):
+        random.seed(7000)
+        self.session = Session(root_path='tests/fixtures')
+        self.session.seed_rng(3)
+        self.map = Map(self.session, 'tests/fixtures/battle_sim.yml')
+        self.battle = Battle(self.session, self.map)
+        self.fighter = PlayerCharacter.load(self.session, 'characters/high_elf_fighter.yml')
+        self.goblin = self.session.npc('goblin')
+        self.controller = GenericController(self.session)
+        self.battle.add(self.fighter, 'a', controller=self.controller, position=[2, 2], token='G')
+        self.battle.add(self.goblin, 'b', controller=GenericController(self.session), position=[3, 3], token='g')
+        self.battle.start()
+        self.battle.current_turn_index = self.battle.combat_order.index(self.fighter)
+        self.fighter.reset_turn(self.battle)
+
+    def candidates(self):
+        available = self.controller._compute_available_moves(self.fighter, self.battle)
+        return self.controller._sort_actions_with_scores(self.fighter, self.battle, available)
+
+    def test_reranks_by_simulated_outcome_and_leaves_the_battle_alone(self):
+        scored = self.candidates()
+        self.assertIsInstance(scored[0][0], AttackAction)
+        goblin_hp, position = self.goblin.hp(), self.map.position_of(self.fighter)
+        next_roll = self.battle.rng_for(self.fighter).random.getstate()
+
+        # an evaluator that wants the goblin unharmed ranks the attacks last
+        search = LookaheadSearch(budget=60, top_k=len(scored), rollouts=3, follow_up=0,
+                                 evaluator=lambda battle, entity: self.goblin.hp())
+        reranked = search.rerank(self.controller, self.fighter, self.battle, scored)
+        self.assertEqual(sorted(map(id, reranked)), sorted(map(id, scored)))
+        self.assertNotIsInstance(reranked[0][0], AttackAction)
+        self.assertEqual(search.stats['searches'], 1)
+        self.assertEqual(search.stats['rollouts'], 3 * len(scored))
+
+        self.assertEqual(self.goblin.hp(), goblin_hp)
+        self.assertEqual(self.map.position_of(self.fighter), position)
+        self.assertEqual(self.battle.rng_for(self.fighter).random.getstate(), next_roll)
+        self.assertFalse(any(action.committed for action, _ in scored))
+        self.assertEqual(self.controller._battle_data(self.battle, self.fighter)['visited_location'], {})
+
+    def test_spent_budget_falls_back_to_the_heuristic(self):
+        scored = self.candidates()
+        search = LookaheadSearch(budget=0, top_k=4, rollouts=2)
+        self.assertEqual(search.rerank(self.controller, self.fighter, self.battle, scored), scored)
+        self.assertEqual(search.stats['fallbacks'], 1)
+
+        # the budget is per turn: a search in progress stops at the deadline
+        search = LookaheadSearch(budget=1e-9, top_k=4, rollouts=2)
+        self.assertEqual(search.rerank(self.controller, self.fighter, self.battle, scored), scored)
+        self.assertEqual(search.stats['rollouts'], 0)
+
+    def test_controller_plays_a_turn_with_search(self):
+        self.controller.search = LookaheadSearch(budget=60, top_k=3, rollouts=1)
+        action = self.battle.move_for(self.fighter)
+        self.assertIsNotNone(action)
+        self.battle.action(action)
+        self.battle.commit(action)
+        self.assertTrue(action.committed)
+        self.assertGreater(evaluate(self.battle, self.fighter), -2)
+
+
+if __name__ == '__main__':
+    unittest.main()
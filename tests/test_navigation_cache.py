@@ -0,0 +1,78 @@
+import unittest
+from natural20.session import Session
+from natural20.map import Map
+from natural20.battle import Battle
+from natural20.player_character import PlayerCharacter
+from natural20.ai.path_compute import PathCompute
+from natural20.item_library.door_object import DoorObject, DoorObjectWall
+from natural20.utils.navigation_cache import DIR_OFFSETS, KNOWN
+
+
+class TestNavigationCache(unittest.TestCase):
+    def setUp(self):
+        self.session = Session(root_path='tests/fixtures')
+        self.map = Map(self.session, 'tests/fixtures/maps/thinwall_map_doors.yml')
+        self.battle = Battle(self.session, self.map)
+        self.fighter = PlayerCharacter.load(self.session, 'characters/high_elf_fighter.yml')
+        self.goblin = self.session.npc('goblin')
+        self.ogre = self.session.npc('ogre')
+        self.battle.add(self.fighter, 'a', position=(0, 6))
+        self.battle.add(self.goblin, 'b', position=(5, 3))
+        self.battle.add(self.ogre, 'b', position=(4, 0))
+
+    def assertMatchesMap(self):
+        width, height = self.map.size
+        for entity in (self.fighter, self.ogre):
+            for ignore_opposing in (False, True):
+                path_compute = PathCompute(self.battle, self.map, entity, ignore_opposing=ignore_opposing)
+                self.assertIsNotNone(path_compute._navigation)
+                for x in range(width):
+                    for y in range(height):
+                        for dx, dy in DIR_OFFSETS:
+                            for squeeze in (False, True):
+                                expected = bool(self.map.bidirectionally_passable(
+                                    entity, x + dx, y + dy, (x, y), self.battle, squeeze,
+                                    ignore_opposing=ignore_opposing))
+                                actual = bool(path_compute._cached_passable(x + dx, y + dy, (x, y), squeeze))
+                                self.assertEqual(actual, expected,
+                                                 (entity.name, ignore_opposing, (x, y), (dx, dy), squeeze))
+
+    def test_matches_map_passable(self):
+        self.assertMatchesMap()
+        # one layer per footprint: 1 (medium, squeezing ogre) and 2 (ogre)
+        self.assertEqual(sorted(self.map.navigation._layers), [1, 2])
+
+    def test_door_toggle_invalidates_nearby_tiles_only(self):
+        self.assertMatchesMap()
+        layer = self.map.navigation._layers[1]
+        self.assertTrue(layer.masks[5, 2] & KNOWN)
+        self.assertTrue(layer.masks[2, 5] & KNOWN)
+
+        door = next(o for o in self.map.objects_at(2, 5) if isinstance(o, (DoorObject, DoorObjectWall)))
+        door.open()
+        self.assertFalse(layer.masks[2, 5] & KNOWN)
+        self.assertTrue(layer.masks[5, 2] & KNOWN)
+        self.assertMatchesMap()
+
+        door.close()
+        self.assertMatchesMap()
+
+    def test_follows_objects_and_creatures(self):
+        self.assertMatchesMap()
+        wall = self.map.place_object({'name': 'crate', 'passable': False}, 2, 3)
+        self.assertMatchesMap()
+        self.map.remove(wall)
+        self.map.move_to(self.goblin, 0, 4, self.battle)
+        self.assertMatchesMap()
+
+    def test_paths_unchanged_with_cache(self):
+        with_cache = PathCompute(self.battle, self.map, self.fighter)
+        without_cache = PathCompute(self.battle, self.map, self.fighter)
+        without_cache._navigation_cache = lambda: None
+        for destination in [(3, 0), (5, 2), (2, 3), (5, 6)]:
+            self.assertEqual(with_cache.compute_path(0, 6, *destination),
+                             without_cache.compute_path(0, 6, *destination))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import numpy as np
+from natural20.session import Session
+from natural20.map import Map
+from natural20.battle import Battle
+from natural20.player_character import PlayerCharacter
+from natural20.ai.path_compute import PathCompute
+from natural20.item_library.door_object import DoorObject, DoorObjectWall
+from natural20.utils.navigation_components import ComponentLabels, component_labels
+
+
+class TestNavigationComponents(unittest.TestCase):
+    def setUp(self):
+        self.session = Session(root_path='tests/fixtures')
+        self.map = Map(self.session, 'tests/fixtures/maps/thinwall_map_doors.yml')
+        self.battle = Battle(self.session, self.map)
+        self.fighter = PlayerCharacter.load(self.session, 'characters/high_elf_fighter.yml')
+        self.battle.add(self.fighter, 'a', position=(0, 6))
+        self.door = next(o for o in self.map.objects_at(2, 5) if isinstance(o, (DoorObject, DoorObjectWall)))
+
+    def labels(self, door_soft=False):
+        return component_labels(self.map.navigation, self.fighter, door_soft)
+
+    def assertPartitionMatchesFreshLabels(self, door_soft=False):
+        labels = self.labels(door_soft)
+        labels._refresh(self.fighter)
+        fresh = ComponentLabels(self.map.navigation, self.fighter, door_soft)
+        fresh._refresh(self.fighter)
+        # same partition, whatever the label numbers
+        pairs = set(zip(labels.labels.ravel().tolist(), fresh.labels.ravel().tolist()))
+        self.assertEqual(len(pairs), len(np.unique(labels.labels)))
+        self.assertEqual(len(pairs), len(np.unique(fresh.labels)))
+
+    def test_labels_never_reject_a_reachable_tile(self):
+        width, height = self.map.size
+        labels = self.labels()
+        for x in range(width):
+            for y in range(height):
+                path_compute = PathCompute(self.battle, self.map, self.fighter)
+                path_compute._navigation_cache = lambda: None
+                if path_compute.compute_path(0, 6, x, y):
+                    self.assertTrue(labels.connected(self.fighter, (0, 6), (x, y)), (x, y))
+        self.assertFalse(labels.connected(self.fighter, (0, 6), (2, 3)))
+        self.assertTrue(self.labels(door_soft=True).connected(self.fighter, (0, 6), (2, 3)))
+
+    def test_closed_room_is_unreachable_without_searching(self):
+        path_compute = PathCompute(self.battle, self.map, self.fighter)
+        path_compute._search = None  # any search would fail loudly
+        self.assertIsNone(path_compute.compute_path(0, 6, 2, 3))
+        self.assertTrue(path_compute._last_unreachable)
+        self.assertFalse(path_compute._last_interrupted)
+
+        paths = PathCompute(self.battle, self.map, self.fighter).compute_paths_to_multiple_destinations(
+            0, 6, [(2, 3), (5, 0)])
+        self.assertIsNone(paths[(2, 3)])
+        self.assertEqual(paths[(5, 0)][-1], (5, 0))
+
+    def test_door_toggle_relabels(self):
+        self.assertFalse(self.labels().connected(self.fighter, (0, 6), (2, 3)))
+        self.door.open()
+        self.assertTrue(self.labels().connected(self.fighter, (0, 6), (2, 3)))
+        self.assertPartitionMatchesFreshLabels()
+        path_compute = PathCompute(self.battle, self.map, self.fighter)
+        self.assertEqual(path_compute.compute_path(0, 6, 2, 3)[-1], (2, 3))
+
+        self.door.close()
+        self.assertFalse(self.labels().connected(self.fighter, (0, 6), (2, 3)))
+        self.assertPartitionMatchesFreshLabels()
+        self.assertPartitionMatchesFreshLabels(door_soft=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
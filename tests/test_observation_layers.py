@@ -0,0 +1,76 @@
+import random
+import unittest
+import numpy as np
+from natural20.battle import Battle
+from natural20.gym.dndenv import dndenv
+from natural20.gym.observation_layers import layers_for
+from natural20.gym.tools import render_terrain, render_terrain_tiles
+from natural20.map import Map
+from natural20.player_character import PlayerCharacter
+from natural20.session import Session
+
+
+class TestObservationLayers(unittest.TestCase):
+    """render_terrain must encode the same viewport as the tile-by-tile encoder."""
+
+    def setUp(self):
+        self.session = Session(root_path='tests/fixtures')
+        self.map = Map(self.session, 'tests/fixtures/battle_sim.yml')
+        self.battle = Battle(self.session, self.map)
+        self.fighter = PlayerCharacter.load(self.session, 'characters/high_elf_fighter.yml')
+        self.goblin = self.session.npc('goblin')
+        self.battle.add(self.fighter, 'a', position=[2, 2], token='G')
+        self.battle.add(self.goblin, 'b', position=[3, 3], token='g')
+        self.battle.start()
+        self.mappings = {self.fighter.class_descriptor(): 7, self.goblin.class_descriptor(): 9}
+
+    def assert_matches_tiles(self, view_port_size=(12, 12)):
+        fast = render_terrain(self.battle, self.map, self.mappings, view_port_size)
+        reference = render_terrain_tiles(self.battle, self.map, self.mappings, view_port_size)
+        self.assertEqual(fast.shape, reference.shape)
+        np.testing.assert_array_equal(fast, reference)
+        return fast
+
+    def test_layers_follow_map_and_creature_changes(self):
+        self.battle.current_turn_index = self.battle.combat_order.index(self.fighter)
+        self.assert_matches_tiles()
+        self.assert_matches_tiles((7, 7))
+        layers = layers_for(self.map, self.mappings)
+
+        self.goblin.take_damage(2, battle=self.battle)
+        self.goblin.do_prone()
+        self.map.move_to(self.goblin, 4, 2, self.battle)
+        self.map.place_object({'name': 'boulder', 'token': 'o', 'passable': False}, 1, 3)
+        obs = self.assert_matches_tiles()
+
+        # the same layers were updated in place
+        self.assertIs(layers_for(self.map, self.mappings), layers)
+        # viewport rows are y and columns x, centered on the fighter at (2, 2)
+        entity_type, _, allegiance, health, status = obs[6 + 2 - 2, 6 + 4 - 2]
+        self.assertEqual((entity_type, allegiance), (9, 2))
+        self.assertLess(health, 255)
+        self.assertTrue(status & 1)
+
+    def test_reach_limits_visible_tiles(self):
+        everything = self.map.visible_tiles(self.fighter)
+        nearby = self.map.visible_tiles(self.fighter, reach=2)
+        expected = {pos: value for pos, value in everything.items() if max(abs(pos[0] - 2), abs(pos[1] - 2)) <= 2}
+        self.assertEqual(nearby, expected)
+
+    def test_matches_tiles_through_an_episode(self):
+        env = dndenv(root_path='tests/fixtures', max_rounds=8)
+        rng = random.Random(3)
+        for seed in range(3):
+            _, info = env.reset(seed=seed)
+            for _ in range(20):
+                battle, battle_map = env.battle, env.map
+                np.testing.assert_array_equal(
+                    render_terrain(battle, battle_map, env.entity_mappings, env.view_port_size),
+                    render_terrain_tiles(battle, battle_map, env.entity_mappings, env.view_port_size))
+                _, _, done, truncated, info = env.step(rng.choice(info['available_moves']))
+                if done or truncated:
+                    break
+
+
+if __name__ == '__main__':
+    unittest.main()
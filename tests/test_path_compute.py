@@ -4,7 +4,8 @@ from natural20.map import Map
 from natural20.player_character import PlayerCharacter
 from natural20.map_renderer import MapRenderer
 from natural20.map import Map
-from natural20.ai.path_compute import PathCompute
+from natural20.ai.path_compute import PathCompute, SearchWorkspace, acquire_workspace, release_workspace
+import heapq
 import pdb
 
 class TestPathCompute(unittest.TestCase):
@@ -168,6 +169,84 @@ class TestPathCompute(unittest.TestCase):
         res = map_render.render(path=path, path_char='+')
         if (2, 5) in path:
             self.assertNotEqual(path[-1], (2, 5))
+    def test_search_workspace_is_pooled_and_generation_stamped(self):
+        workspace = acquire_workspace(8, 7)
+        workspace.visit(9, 1.5, 0)
+        self.assertEqual(workspace.cost(9), 1.5)
+        release_workspace(workspace)
+
+        reused = acquire_workspace(8, 7)
+        self.assertIs(reused, workspace)
+        # the previous search's entries are stale after the generation bump
+        self.assertEqual(reused.cost(9), 4_000_000)
+        self.assertIsNot(acquire_workspace(8, 7), reused)
+        release_workspace(reused)
+
+        path_workspace = SearchWorkspace(3, 3)
+        path_workspace.reset()
+        path_workspace.visit(0, 0, -1)
+        path_workspace.visit(4, 1.1, 0)
+        path_workspace.visit(5, 2.1, 4)
+        self.assertEqual(path_workspace.path_to(5), [(0, 0), (1, 1), (1, 2)])
+
+    def test_repeated_queries_reuse_the_workspace(self):
+        expected_path = [(0, 0), (1, 1), (2, 2), (3, 3), (4, 4), (5, 4), (6, 4), (7, 5), (6, 6)]
+        for _ in range(3):
+            self.assertEqual(self.path_compute.compute_path(0, 0, 6, 6), expected_path)
+            self.assertEqual(self.path_compute.compute_path(1, 3, 7, 4),
+                             [(1, 3), (2, 3), (3, 4), (4, 4), (5, 4), (6, 4), (7, 4)])
+        self.assertEqual(self.path_compute.get_neighbors(0, 0), [((0, 1), 1), ((1, 0), 1), ((1, 1), 1.1)])
+
+    def _reference_costs(self, path_compute, source):
+        """Plain Dijkstra over get_neighbors."""
+        path_compute._clear_caches()
+        path_compute._allowed_hazard_tiles = {source}
+        costs = {source: 0}
+        pq = [(0, source)]
+        while pq:
+            g, node = heapq.heappop(pq)
+            if g > costs[node]:
+                continue
+            for neighbor, move_cost in path_compute.get_neighbors(*node):
+                if g + move_cost < costs.get(neighbor, float('inf')):
+                    costs[neighbor] = g + move_cost
+                    heapq.heappush(pq, (g + move_cost, neighbor))
+        return costs
+
+    def test_reachability_matches_dijkstra(self):
+        for map_name in ['path_finding_test', 'path_finding_test_2']:
+            battle_map = Map(self.session, map_name)
+            path_compute = PathCompute(self.session, battle_map, self.fighter)
+            expected = self._reference_costs(path_compute, (0, 0))
+            field = path_compute.reachability(0, 0)
+            width, height = battle_map.size
+            for x in range(width):
+                for y in range(height):
+                    if (x, y) not in expected:
+                        self.assertIsNone(field.path_to(x, y))
+                        continue
+                    self.assertAlmostEqual(field.cost(x, y), expected[(x, y)])
+                    path = field.path_to(x, y)
+                    self.assertEqual((path[0], path[-1]), ((0, 0), (x, y)))
+                    steps = sum(dict(path_compute.get_neighbors(*a))[b] for a, b in zip(path, path[1:]))
+                    self.assertAlmostEqual(steps, expected[(x, y)])
+            self.assertEqual(sorted(field.positions()), sorted(expected))
+
+    def test_reachability_budget_and_unreachable(self):
+        field = self.path_compute.reachability(0, 0, available_movement_cost=10)
+        self.assertEqual(sorted(field.positions()), [(0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (2, 0)])
+        self.assertEqual(field.movement_cost(1, 1), 5)
+        self.assertEqual(field.movement_cost(0, 2), 10)
+        self.assertIsNone(field.path_to(2, 2))
+        self.assertIsNone(field.path_to(-1, 0))
+        self.assertIsNone(self.path_compute.reachability(8, 0))
+
+        battle_map = Map(self.session, 'battle_sim_4')
+        ogre = self.session.npc('ogre')
+        battle_map.add(ogre, 0, 1)
+        field = PathCompute(self.session, battle_map, ogre).reachability(0, 1)
+        self.assertIsNone(field.path_to(0, 4))
+        self.assertEqual(field.path_to(1, 1), [(0, 1), (1, 1)])
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from natural20.gym.dqn.replay_buffer import ReplayBuffer, observation_columns
+
+
+def make_state(marker, view_port_size=(4, 4)):
+    """An observation whose health_pct field carries ``marker``."""
+    state = {name: np.zeros(shape, dtype=dtype) for name, (shape, dtype) in observation_columns(view_port_size).items()}
+    state['health_pct'] = np.array([marker], dtype=np.float32)
+    return state
+
+
+def make_trajectory(first, count):
+    """``count`` transitions with rewards first .. first + count - 1."""
+    states = [make_state(first + step) for step in range(count + 1)]
+    actions = [(0, (step, 0), (0, 0), 0, 0) for step in range(first, first + count + 1)]
+    rewards = [float(first + step) for step in range(count)]
+    dones = [False] * (count - 1) + [True]
+    return states, actions, rewards, None, dones
+
+
+class TestReplayBuffer(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.storage = tmp.name
+
+    def buffer(self, capacity=5, storage_path=None, **kwargs):
+        return ReplayBuffer(capacity, 'cpu', view_port_size=(4, 4), storage_path=storage_path, **kwargs)
+
+    def test_ring_wraps_around(self):
+        buffer = self.buffer()
+        buffer.push(*make_trajectory(0, 3))
+        buffer.push(*make_trajectory(3, 4))
+        self.assertEqual((len(buffer), buffer.position), (5, 2))
+        # slots 0 and 1 were overwritten by the last two transitions
+        self.assertEqual(buffer.columns['reward'].tolist(), [5.0, 6.0, 2.0, 3.0, 4.0])
+        self.assertEqual(buffer.columns['next_state.health_pct'][:, 0].tolist(), [6.0, 7.0, 3.0, 4.0, 5.0])
+        self.assertEqual(buffer.columns['next_action.1'][:, 0].tolist(), [6.0, 7.0, 3.0, 4.0, 5.0])
+        self.assertEqual(buffer.columns['done'].tolist(), [0.0, 1.0, 1.0, 0.0, 0.0])
+
+    def test_long_trajectory_keeps_its_tail(self):
+        buffer = self.buffer()
+        buffer.push(*make_trajectory(0, 8))
+        self.assertEqual(len(buffer), 5)
+        self.assertEqual(sorted(buffer.columns['reward'].tolist()), [3.0, 4.0, 5.0, 6.0, 7.0])
+        self.assertEqual(buffer.columns['done'].sum(), 1.0)
+
+    def test_reopens_from_storage(self):
+        buffer = self.buffer(storage_path=self.storage, flush_every=2)
+        buffer.push(*make_trajectory(0, 3))
+        self.assertFalse(os.path.exists(os.path.join(self.storage, 'meta.json')))
+        buffer.push(*make_trajectory(3, 1))
+        del buffer
+
+        reopened = self.buffer(storage_path=self.storage)
+        self.assertEqual((len(reopened), reopened.position), (4, 4))
+        self.assertEqual(reopened.columns['reward'][:4].tolist(), [0.0, 1.0, 2.0, 3.0])
+        self.assertEqual(reopened.columns['state.health_pct'][:4, 0].tolist(), [0.0, 1.0, 2.0, 3.0])
+
+    def test_mismatched_storage_is_rejected(self):
+        self.buffer(storage_path=self.storage).flush()
+        with self.assertRaisesRegex(ValueError, 'capacity 5'):
+            self.buffer(capacity=6, storage_path=self.storage)
+
+        np.save(os.path.join(self.storage, 'reward.npy'), np.zeros(5, dtype=np.float64))
+        with self.assertRaisesRegex(ValueError, 'reward.npy holds float64'):
+            self.buffer(storage_path=self.storage)
+
+
+if __name__ == '__main__':
+    unittest.main()
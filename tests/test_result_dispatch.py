@@ -0,0 +1,111 @@
+import ast
+import importlib
+import inspect
+import pkgutil
+import textwrap
+import unittest
+import natural20.spell
+from natural20.session import Session
+from natural20.map import Map
+from natural20.battle import Battle
+from natural20.player_character import PlayerCharacter
+from natural20.action import (Action, enable_result_timing, get_action_subclasses, get_result_handlers,
+                              reset_result_timing, result_timing_stats, result_types_of)
+from natural20.actions.attack_action import AttackAction
+from natural20.actions.dash import DashAction
+from natural20.actions.move_action import MoveAction
+from natural20.actions.spell_action import SpellAction
+
+
+def compared_result_types(klass):
+    """String literals ``apply`` compares the result ``type`` against."""
+    owner = next(c for c in klass.__mro__ if 'apply' in c.__dict__)
+    tree = ast.parse(textwrap.dedent(inspect.getsource(owner.__dict__['apply'])))
+
+    def is_type(node, names):
+        if isinstance(node, ast.Subscript):
+            return isinstance(node.slice, ast.Constant) and node.slice.value == 'type'
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == 'get':
+            return bool(node.args) and isinstance(node.args[0], ast.Constant) and node.args[0].value == 'type'
+        return isinstance(node, ast.Name) and node.id in names
+
+    names = {target.id for node in ast.walk(tree) if isinstance(node, ast.Assign) and is_type(node.value, ())
+             for target in node.targets if isinstance(target, ast.Name)}
+    found = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Compare) and is_type(node.left, names):
+            found.update(value.value for comparator in node.comparators for value in ast.walk(comparator)
+                         if isinstance(value, ast.Constant) and isinstance(value.value, str))
+    return found
+
+
+class TestResultDispatch(unittest.TestCase):
+    def setUp(self):
+        self.session = Session(root_path='tests/fixtures')
+        self.map = Map(self.session, 'tests/fixtures/maps/thinwall_map_doors.yml')
+        self.battle = Battle(self.session, self.map)
+        self.fighter = PlayerCharacter.load(self.session, 'characters/high_elf_fighter.yml')
+        self.battle.add(self.fighter, 'a', position=(0, 6))
+
+    def test_declared_types_cover_every_type_apply_checks(self):
+        for module in pkgutil.iter_modules(natural20.spell.__path__):
+            importlib.import_module(f'natural20.spell.{module.name}')
+        for klass in list(get_action_subclasses()) + list(SpellAction._all_spell_descendants()):
+            declared = result_types_of(klass)
+            if declared is not None:
+                self.assertLessEqual(compared_result_types(klass), set(declared), klass.__name__)
+
+    def test_handlers_by_type(self):
+        handlers = get_result_handlers('dash')
+        self.assertIn(DashAction, handlers)
+        self.assertNotIn(MoveAction, handlers)
+        # catch-alls still see every result, in subclass order
+        for klass in (AttackAction, SpellAction):
+            self.assertIn(klass, handlers)
+        order = get_action_subclasses()
+        self.assertEqual(list(handlers), sorted(handlers, key=order.index))
+        self.assertEqual(set(get_result_handlers('no_such_result')), {k for k in order if result_types_of(k) is None})
+
+    def test_undeclared_override_is_a_catch_all(self):
+        class Parent(Action):
+            RESULT_TYPES = ('parent',)
+
+            @staticmethod
+            def apply(battle, item, session=None):
+                pass
+
+        class Child(Parent):
+            @staticmethod
+            def apply(battle, item, session=None):
+                pass
+
+        class Inheriting(Parent):
+            pass
+
+        self.assertEqual(result_types_of(Parent), ('parent',))
+        self.assertIsNone(result_types_of(Child))
+        self.assertEqual(result_types_of(Inheriting), ('parent',))
+
+    def test_commit_timing(self):
+        self.battle.start()
+        self.battle.start_turn()
+        movement = self.battle.entity_state_for(self.fighter)['movement']
+        enable_result_timing()
+        try:
+            reset_result_timing()
+            action = DashAction(self.session, self.fighter, 'dash')
+            action.resolve(self.session, self.map, {'battle': self.battle})
+            self.battle.commit(action)
+            stats = {row[0]: row for row in result_timing_stats()}
+        finally:
+            enable_result_timing(False)
+            reset_result_timing()
+        self.assertEqual(self.battle.entity_state_for(self.fighter)['movement'], movement + self.fighter.speed())
+        result_type, count, seconds, handlers = stats['dash']
+        self.assertEqual(count, 1)
+        self.assertGreaterEqual(seconds, 0)
+        self.assertEqual(set(handlers), {klass.__name__ for klass in get_result_handlers('dash')})
+
+
+if __name__ == '__main__':
+    unittest.main()
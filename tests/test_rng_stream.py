@@ -0,0 +1,102 @@
+import random
+import threading
+import unittest
+from natural20.session import Session
+from natural20.map import Map
+from natural20.battle import Battle
+from natural20.die_roll import DieRoll, FUDGE_HASH
+from natural20.player_character import PlayerCharacter
+from natural20.utils.rng_stream import RngStream, use_stream
+
+
+class TestRngStream(unittest.TestCase):
+    def make_battle(self, seed):
+        session = Session(root_path='tests/fixtures')
+        if seed is not None:
+            session.seed_rng(seed)
+        battle_map = Map(session, 'tests/fixtures/battle_sim.yml')
+        battle = Battle(session, battle_map)
+        fighter = PlayerCharacter.load(session, 'characters/high_elf_fighter.yml')
+        goblin = session.npc('goblin')
+        battle.add(fighter, 'a', position='spawn_point_1', token='G')
+        battle.add(goblin, 'b', position='spawn_point_2', token='g')
+        return session, battle, fighter, goblin
+
+    def rolls(self, battle, entity, count=10):
+        return [DieRoll.roll('1d20+2', entity=entity, battle=battle).result() for _ in range(count)]
+
+    def test_seeded_battles_replay(self):
+        _, battle1, fighter1, goblin1 = self.make_battle(42)
+        _, battle2, fighter2, goblin2 = self.make_battle(42)
+        battle1.start()
+        battle2.start()
+        self.assertEqual([battle1.entities[e]['initiative'] for e in (fighter1, goblin1)],
+                         [battle2.entities[e]['initiative'] for e in (fighter2, goblin2)])
+        self.assertEqual(self.rolls(battle1, fighter1), self.rolls(battle2, fighter2))
+
+        _, battle3, fighter3, _ = self.make_battle(43)
+        self.assertNotEqual(self.rolls(battle1, fighter1, 20), self.rolls(battle3, fighter3, 20))
+
+    def test_creatures_roll_from_independent_streams(self):
+        _, battle1, fighter1, goblin1 = self.make_battle(7)
+        _, battle2, fighter2, goblin2 = self.make_battle(7)
+        self.rolls(battle1, goblin1, 5)
+        self.assertEqual(self.rolls(battle1, fighter1), self.rolls(battle2, fighter2))
+        self.assertIsNot(battle1.rng_for(fighter1), battle1.rng_for(goblin1))
+
+    def test_fudges_are_scoped_to_a_stream(self):
+        _, battle, fighter, goblin = self.make_battle(3)
+        DieRoll.fudge(20, stream=battle.rng_for(fighter))
+        self.assertEqual(FUDGE_HASH, {})
+        self.assertEqual(DieRoll.roll('1d20', entity=fighter, battle=battle).result(), 20)
+
+        stream = RngStream(5)
+        with use_stream(stream):
+            DieRoll.fudge(1)
+            self.assertEqual(DieRoll.roll('1d20').result(), 1)
+        self.assertEqual(FUDGE_HASH, {})
+
+    def test_stream_state_round_trips_through_the_session(self):
+        session, battle, fighter, goblin = self.make_battle(11)
+        self.rolls(battle, fighter, 3)
+        DieRoll.fudge(17, stream=battle.rng_for(goblin))
+        saved = session.to_dict()
+        expected = (self.rolls(battle, fighter), self.rolls(battle, goblin))
+
+        restored = Session.from_dict(saved)
+        replay = Battle.from_dict({**battle.to_dict(), 'session': restored})
+        self.assertEqual(replay.rng.key, battle.rng.key)
+        fighter_stream, goblin_stream = (restored.rng.child(replay.rng.key).child(battle.entities[e]['rng_key'])
+                                         for e in (fighter, goblin))
+        replayed = ([DieRoll.roll('1d20+2', stream=fighter_stream).result() for _ in range(10)],
+                    [DieRoll.roll('1d20+2', stream=goblin_stream).result() for _ in range(10)])
+        self.assertEqual(replayed, expected)
+        self.assertEqual(expected[1][0], 19)
+        # restoring does not use up a stream: the next battle gets the one the original run would
+        self.assertEqual(restored.rng.spawn('battle').key, session.rng.spawn('battle').key)
+
+    def test_unseeded_sessions_keep_using_global_random(self):
+        _, battle, fighter, _ = self.make_battle(None)
+        self.assertIsNone(battle.rng)
+        random.seed(99)
+        first = self.rolls(battle, fighter)
+        random.seed(99)
+        self.assertEqual(self.rolls(battle, fighter), first)
+
+    def test_threads_draw_from_their_own_streams(self):
+        results = {}
+
+        def simulate(name, seed):
+            with use_stream(RngStream(seed)):
+                results[name] = [DieRoll.roll('3d6').result() for _ in range(200)]
+
+        threads = [threading.Thread(target=simulate, args=(name, 1)) for name in ('a', 'b')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results['a'], results['b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
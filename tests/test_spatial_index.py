@@ -0,0 +1,104 @@
+import random
+import unittest
+from unittest import mock
+from natural20.session import Session
+from natural20.map import Map
+from natural20.battle import Battle
+from natural20.player_character import PlayerCharacter
+from natural20.actions.attack_action import AttackAction
+from natural20.utils.movement import opportunity_attack_list
+
+
+def open_field(width, height):
+    return {'name': 'field', 'map': {'size': [width, height], 'base': ['.' * width] * height}}
+
+
+class TestSpatialIndex(unittest.TestCase):
+    def setUp(self):
+        random.seed(7)
+        self.session = Session(root_path='tests/fixtures')
+        self.map = Map(self.session, None, name='field', properties=open_field(40, 40))
+        self.battle = Battle(self.session, self.map)
+        self.fighter = PlayerCharacter.load(self.session, 'characters/high_elf_fighter.yml')
+        self.battle.add(self.fighter, 'a', position=(20, 20))
+        self.ogre = self.session.npc('ogre')
+        self.battle.add(self.ogre, 'b', position=(21, 20))
+        taken = {(20, 20), (21, 20), (22, 20), (21, 21), (22, 21), (23, 22)}
+        self.goblins = []
+        while len(self.goblins) < 40:
+            pos = (random.randrange(40), random.randrange(40))
+            if pos in taken:
+                continue
+            taken.add(pos)
+            goblin = self.session.npc('goblin', {'name': f'goblin {len(self.goblins)}'})
+            self.battle.add(goblin, 'b', position=pos)
+            self.goblins.append(goblin)
+
+    def brute_force_in_range(self, entity, range_ft):
+        return [k for k in self.map.entities if k != entity and
+                self.map.distance(entity, k) * self.map.feet_per_grid <= range_ft]
+
+    def test_entities_in_range_matches_full_scan(self):
+        for range_ft in (0, 5, 10, 30, 60, 600):
+            for entity in (self.fighter, self.ogre, self.goblins[0]):
+                self.assertEqual(self.map.entities_in_range(entity, range_ft),
+                                 self.brute_force_in_range(entity, range_ft), (entity, range_ft))
+
+    def test_index_follows_move_and_remove(self):
+        goblin = self.goblins[1]
+        self.map.move_to(goblin, 21, 21, self.battle)
+        self.assertIn(goblin, self.map.entities_in_range(self.fighter, 5))
+        self.map.move_to(goblin, 39, 0, self.battle)
+        self.assertNotIn(goblin, self.map.entities_in_range(self.fighter, 5))
+        self.map.remove(goblin, battle=self.battle)
+        self.assertNotIn(goblin, self.map.spatial_index)
+        self.assertEqual(len(self.map.spatial_index), len(self.map.entities))
+        # a large token is found from its far squares too
+        self.map.move_to(self.goblins[2], 23, 22, self.battle)
+        self.assertIn(self.ogre, self.map.entities_in_range(self.goblins[2], 5))
+
+    def test_targeting_only_checks_sight_in_range(self):
+        action = AttackAction(self.session, self.fighter, 'attack')
+        action.using = 'vicious_rapier'
+        expected = [k for k in self.brute_force_in_range(self.fighter, 5)
+                    if self.battle.can_see(self.fighter, k)]
+        with mock.patch.object(self.battle, 'can_see', wraps=self.battle.can_see) as can_see:
+            targets = self.battle.valid_targets_for(self.fighter, action)
+        self.assertEqual(targets, [k for k in self.battle.entities if k in expected])
+        self.assertLessEqual(can_see.call_count, len(self.brute_force_in_range(self.fighter, 5)))
+
+    def test_melee_checks_match_full_scan(self):
+        def reach_of(k):
+            return k.melee_distance() / self.map.feet_per_grid
+
+        for entity in [self.fighter] + self.goblins[:10]:
+            expected = any(self.battle.opposing(entity, k) and k.conscious() and
+                           self.map.distance(entity, k) <= reach_of(k) and self.map.can_see(entity, k)
+                           for k in self.map.entities if k != entity)
+            self.assertEqual(self.battle.enemy_in_melee_range(entity), expected, entity)
+
+        self.assertEqual(self.battle.ally_within_enemy_melee_range(self.goblins[0], self.fighter),
+                         any(k != self.goblins[0] and self.battle.allies(self.goblins[0], k) and
+                             self.map.distance(self.fighter, k) <= reach_of(k) and self.map.can_see(self.fighter, k)
+                             for k in self.map.entities))
+
+    def test_opportunity_attacks_only_near_the_path(self):
+        for goblin in self.goblins:
+            self.battle.entity_state_for(goblin)['reaction'] = 1
+        self.battle.entity_state_for(self.ogre)['reaction'] = 1
+        path = [[20, 20], [19, 20], [18, 20], [17, 20]]
+        result = opportunity_attack_list(self.fighter, path, self.battle, self.map)
+        expected = []
+        entered = set()
+        for index, pos in enumerate(path):
+            for enemy in self.battle.opponents_of(self.fighter):
+                if enemy.entered_melee(self.map, self.fighter, *pos):
+                    entered.add(enemy)
+                elif enemy in entered:
+                    expected.append({'source': enemy, 'path': index})
+        self.assertCountEqual([(r['source'], r['path']) for r in result], [(r['source'], r['path']) for r in expected])
+        self.assertIn(self.ogre, [r['source'] for r in result])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+from unittest import mock
+from natural20.session import Session
+from natural20.player_character import PlayerCharacter
+from natural20.utils import stat_cache
+from natural20.utils.stat_cache import StatCacheMismatch
+
+
+class _AcBonus:
+    id = 'ac_bonus_test'
+    source = None
+
+    def ac_bonus(self, entity, opts):
+        return 2
+
+
+class TestStatCache(unittest.TestCase):
+    def setUp(self):
+        self.verify = stat_cache.VERIFY
+        stat_cache.set_verify(False)
+        self.session = Session(root_path='tests/fixtures')
+        self.session.game_time = 0
+        self.fighter = PlayerCharacter.load(self.session, 'characters/high_elf_fighter.yml')
+
+    def tearDown(self):
+        stat_cache.set_verify(self.verify)
+
+    def test_armor_class_is_computed_once(self):
+        with mock.patch.object(self.fighter, 'equipped_ac', wraps=self.fighter.equipped_ac) as equipped_ac:
+            for _ in range(5):
+                self.assertEqual(self.fighter.armor_class(), 18)
+        self.assertEqual(equipped_ac.call_count, 1)
+
+    def test_equip_and_effects_invalidate(self):
+        self.assertEqual(self.fighter.armor_class(), 18)
+        self.fighter.unequip('shield', transfer_inventory=False)
+        self.assertEqual(self.fighter.armor_class(), 16)
+        self.fighter.equip('shield', ignore_inventory=True)
+        self.assertEqual(self.fighter.armor_class(), 18)
+
+        effect = _AcBonus()
+        self.fighter.register_effect('ac_bonus', effect, effect=effect, duration=6)
+        self.assertEqual(self.fighter.armor_class(), 20)
+        self.session.game_time = 6
+        self.assertEqual(self.fighter.armor_class(), 18)
+        self.session.game_time = 0
+        self.fighter.remove_effect(effect)
+        self.assertEqual(self.fighter.armor_class(), 18)
+
+    def test_conditions_invalidate(self):
+        goblin = self.session.npc('goblin')
+        self.assertEqual(goblin.speed(), 30)
+        goblin.statuses.append('restrained')
+        self.assertEqual(goblin.speed(), 0)
+        goblin.statuses.remove('restrained')
+        self.assertEqual(goblin.speed(), 30)
+
+    def test_equipped_items_are_handed_out_as_copies(self):
+        items = self.fighter.equipped_items()
+        items[0]['name'] = 'club'
+        items.pop()
+        self.assertEqual([item['name'] for item in self.fighter.equipped_items()],
+                         ['rapier', 'longbow', 'leather_armor', 'shield'])
+
+    def test_modifiers_are_indexed_by_kind(self):
+        self.fighter.add_modifier('attack_roll', 'bless', '1d4')
+        self.fighter.add_modifier('save_roll', 'bless', '1d4')
+        self.fighter.add_modifier('attack_roll', 'inspiration', lambda entity, context: context.get('bonus'))
+        self.assertEqual([m['value'] for m in self.fighter.collect_modifiers('attack_roll', {'bonus': 3})], ['1d4', 3])
+        self.fighter.remove_modifier('bless')
+        self.assertEqual(self.fighter.collect_modifiers('save_roll'), [])
+        self.assertEqual([m['source'] for m in self.fighter.collect_modifiers('attack_roll', {'bonus': 1})],
+                         ['inspiration'])
+
+    def test_verify_mode_reports_missing_invalidation(self):
+        self.assertEqual(self.fighter.passive_perception(), 13)
+        stat_cache.set_verify(True)
+        self.assertEqual(self.fighter.passive_perception(), 13)
+        # a mutation that skips invalidate_stats
+        self.fighter.ability_scores['wis'] = 20
+        with self.assertRaises(StatCacheMismatch):
+            self.fighter.passive_perception()
+        self.fighter.invalidate_stats()
+        self.assertEqual(self.fighter.passive_perception(), 17)
+
+
+if __name__ == '__main__':
+    unittest.main()
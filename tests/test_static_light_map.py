@@ -0,0 +1,67 @@
+import unittest
+import numpy as np
+from natural20.map import Map
+from natural20.session import Session
+
+
+def reference_build_map(builder):
+    """Tile-by-tile static light pass used before footprints."""
+    battle_map = builder.map
+    max_x, max_y = battle_map.size
+    light_map = np.zeros((max_x, max_y))
+    for x in range(max_x):
+        for y in range(max_y):
+            intensity = builder.outdoor_ambient_illumination if builder.is_outside(x, y) else builder.base_illumination
+            for light in builder.lights:
+                bright_light = light.get('bright', 10) / battle_map.feet_per_grid
+                dim_light = light.get('dim', 5) / battle_map.feet_per_grid
+                in_bright, in_dim = battle_map.light_in_sight(x, y, *light['position'], min_distance=bright_light,
+                                                              distance=bright_light + dim_light, inclusive=True)
+                intensity += 1.0 if in_bright else (0.5 if in_dim else 0.0)
+            light_map[x][y] = intensity + builder.fixed_lights[x][y]
+    return light_map
+
+
+class TestStaticLightMap(unittest.TestCase):
+    def setUp(self):
+        self.session = Session(root_path='tests/fixtures')
+
+    def _lit_map(self):
+        return Map(self.session, None, name='lit_yard', properties={
+            'name': 'Lit Yard',
+            'map': {
+                'size': [7, 6],
+                'illumination': 0.0,
+                'base': ['.......', '.#.....', '.#..#..', '....#..', '.......', '.......'],
+                'light': ['A......', '.......', '.......', '.......', '.....B.', '.......'],
+                'light_map': ['......h', '.......', '.......', '.......', '.......', '.......'],
+                'outside': ['ooo....', 'ooo....', '.......', '.......', '.......', '.......'],
+            },
+            'lights': {'A': {'bright': 10, 'dim': 10}, 'B': {'bright': 5, 'dim': 5}},
+        })
+
+    def test_footprints_match_per_tile_light_in_sight(self):
+        for battle_map in [self._lit_map(),
+                           Map(self.session, 'tests/fixtures/battle_sim.yml'),
+                           Map(self.session, 'tests/fixtures/thin_walls.yml')]:
+            builder = battle_map._light_builder
+            self.assertTrue(builder.lights)
+            np.testing.assert_array_equal(battle_map._light_map, reference_build_map(builder))
+
+    def test_outdoor_ambient_updates_outside_tiles_only(self):
+        battle_map = self._lit_map()
+        builder = battle_map._light_builder
+        before = battle_map._light_map.copy()
+
+        battle_map.apply_outdoor_ambient_illumination(0.5)
+        np.testing.assert_array_equal(battle_map._light_map, reference_build_map(builder))
+        changed = battle_map._light_map != before
+        self.assertTrue(changed[0:3, 0:2].all())
+        self.assertFalse(changed[~builder.outside_mask].any())
+
+        battle_map.apply_outdoor_ambient_illumination(0.0)
+        np.testing.assert_array_equal(battle_map._light_map, before)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+from natural20.map import Map
+from natural20.session import Session
+from natural20.player_character import PlayerCharacter
+from natural20.utils.terrain_grid import LIVE, OPAQUE, IMPASSABLE, BLOCKED
+
+
+def _door_map(session):
+    return Map(
+        session,
+        None,
+        name='terrain_grid_door',
+        properties={
+            'name': 'Terrain Grid Door',
+            'map': {
+                'size': [5, 3],
+                'base': ['.....', '##D##', '.....'],
+            },
+            'legend': {
+                'D': {'name': 'door', 'type': 'wooden_door'},
+            },
+        },
+    )
+
+
+class TestTerrainGrid(unittest.TestCase):
+    def setUp(self):
+        self.session = Session(root_path='tests/fixtures')
+        self.character = PlayerCharacter.load(self.session, 'characters/high_elf_fighter.yml')
+
+    def _answers(self, battle_map):
+        width, height = battle_map.size
+        result = []
+        for x in range(width):
+            for y in range(height):
+                result.append((
+                    battle_map.opaque(x, y, (1, 1)),
+                    battle_map.opaque(x, y, (2, 3)),
+                    battle_map.wall(x, y),
+                    battle_map.passable(self.character, x, y),
+                    battle_map.passable(self.character, x, y, origin=(1, 1)),
+                    battle_map.difficult_terrain(self.character, x, y),
+                    battle_map.cover_at(x, y),
+                ))
+        return result
+
+    def test_cached_answers_match_live_object_queries(self):
+        for map_name in ['game_map', 'complex_map', 'object_map', 'thinwall_map_doors']:
+            battle_map = Map(self.session, f'tests/fixtures/maps/{map_name}.yml')
+            cached = self._answers(battle_map)
+            # force every tile through the per-object code path
+            battle_map.terrain_grid.flags |= LIVE
+            live = self._answers(battle_map)
+            battle_map.terrain_grid.rebuild()
+            self.assertEqual(cached, live, map_name)
+
+    def test_base_walls_are_blocked(self):
+        battle_map = _door_map(self.session)
+        mask = battle_map.terrain_grid.mask(BLOCKED)
+        self.assertTrue(mask[0, 1])
+        self.assertFalse(mask[2, 1])
+        self.assertFalse(mask[0, 0])
+
+    def test_door_state_changes_refresh_tile(self):
+        battle_map = _door_map(self.session)
+        door = battle_map.object_at(2, 1)
+        grid = battle_map.terrain_grid
+        self.assertFalse(grid.flags[2, 1] & LIVE)
+
+        door.close()
+        self.assertTrue(grid.flags[2, 1] & OPAQUE)
+        self.assertTrue(battle_map.opaque(2, 1))
+        self.assertFalse(battle_map.passable(self.character, 2, 1))
+
+        door.open()
+        self.assertFalse(grid.flags[2, 1] & (OPAQUE | IMPASSABLE))
+        self.assertFalse(battle_map.opaque(2, 1))
+        self.assertTrue(battle_map.passable(self.character, 2, 1))
+        self.assertTrue(battle_map.line_of_sight(2, 0, 2, 2))
+
+    def test_removing_object_clears_tile(self):
+        battle_map = _door_map(self.session)
+        door = battle_map.object_at(2, 1)
+        door.close()
+        battle_map.remove(door)
+        self.assertEqual(battle_map.terrain_grid.flags[2, 1], 0)
+        self.assertTrue(battle_map.passable(self.character, 2, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from natural20.map import Map
+from natural20.session import Session
+from natural20.utils.visibility_cache import KNOWN, SIGHT_BLOCKED
+
+
+class TestVisibilityCache(unittest.TestCase):
+    def setUp(self):
+        self.session = Session(root_path='tests/fixtures')
+
+    def _sight_table(self, battle_map):
+        width, height = battle_map.size
+        squares = [(x, y) for x in range(width) for y in range(height)]
+        return [
+            (battle_map.line_of_sight(x1, y1, x2, y2, inclusive=True) is not None,
+             battle_map.light_in_sight(x1, y1, x2, y2)[1])
+            for x1, y1 in squares for x2, y2 in squares
+        ]
+
+    def _fresh_sight_table(self, battle_map):
+        battle_map.visibility.clear()
+        return self._sight_table(battle_map)
+
+    def test_warm_cache_matches_fresh_answers_after_door_toggles(self):
+        battle_map = Map(self.session, 'tests/fixtures/maps/thinwall_map_doors.yml')
+        warm = self._sight_table(battle_map)
+        self.assertEqual(warm, self._fresh_sight_table(battle_map))
+
+        door = battle_map.object_at(1, 3)
+        door.open()
+        warm = self._sight_table(battle_map)
+        self.assertEqual(warm, self._fresh_sight_table(battle_map))
+
+        door.close()
+        battle_map.object_at(2, 5).open()
+        warm = self._sight_table(battle_map)
+        self.assertEqual(warm, self._fresh_sight_table(battle_map))
+
+    def test_steps_are_memoized_and_invalidated_locally(self):
+        battle_map = Map(self.session, 'tests/fixtures/maps/game_map.yml')
+        steps = battle_map.visibility.steps
+        self.assertFalse(steps.any())
+
+        battle_map.line_of_sight(0, 0, 3, 0)
+        self.assertTrue(steps[0, 0].any())
+
+        battle_map.refresh_terrain_at(0, 0)
+        self.assertFalse(steps[0:2, 0:2].any())
+
+    def test_wall_step_is_blocked(self):
+        battle_map = Map(
+            self.session,
+            None,
+            name='visibility_wall',
+            properties={
+                'name': 'Visibility Wall',
+                'map': {'size': [3, 3], 'base': ['...', '.#.', '...']},
+            },
+        )
+        bits = battle_map.visibility.step((1, 0), (1, 1))
+        self.assertTrue(bits & SIGHT_BLOCKED)
+        self.assertFalse(bits & KNOWN)
+        self.assertTrue(battle_map.visibility.steps[1, 0].any())
+        self.assertIsNone(battle_map.line_of_sight(1, 0, 1, 2))
+        self.assertTrue(battle_map.line_of_sight(0, 0, 0, 2) is not None)
+
+
+if __name__ == '__main__':
+    unittest.main()
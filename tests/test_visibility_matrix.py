@@ -0,0 +1,74 @@
+import unittest
+from unittest import mock
+from natural20.session import Session
+from natural20.map import Map
+from natural20.battle import Battle
+from natural20.player_character import PlayerCharacter
+from natural20.item_library.door_object import DoorObject, DoorObjectWall
+
+
+class TestVisibilityMatrix(unittest.TestCase):
+    def setUp(self):
+        self.session = Session(root_path='tests/fixtures')
+        self.map = Map(self.session, 'tests/fixtures/maps/thinwall_map_doors.yml')
+        self.battle = Battle(self.session, self.map)
+        self.fighter = PlayerCharacter.load(self.session, 'characters/high_elf_fighter.yml')
+        self.battle.add(self.fighter, 'a', position=(2, 6))
+        self.goblin = self.session.npc('goblin')
+        self.battle.add(self.goblin, 'b', position=(2, 3))
+        self.orc = self.session.npc('goblin', {'name': 'lookout'})
+        self.battle.add(self.orc, 'b', position=(0, 6))
+        self.door = next(o for o in self.map.objects_at(2, 5) if isinstance(o, (DoorObject, DoorObjectWall)))
+        self.matrix = self.battle.visibility_matrix
+
+    def test_repeated_questions_are_answered_once(self):
+        with mock.patch.object(self.map, '_can_see', wraps=self.map._can_see) as uncached:
+            for _ in range(5):
+                self.battle.can_see(self.fighter, self.orc)
+                self.map.look(self.fighter)
+        # one computation per pair, shared by Battle.can_see and Map.look
+        self.assertEqual(uncached.call_count, 2)
+        self.assertEqual(self.matrix.misses, 2)
+
+    def test_answers_match_the_uncached_map(self):
+        creatures = [self.fighter, self.goblin, self.orc]
+        for _ in range(2):
+            for viewer in creatures:
+                for target in creatures:
+                    for active_perception in (0, 20):
+                        self.assertEqual(
+                            self.map.can_see(viewer, target, active_perception=active_perception),
+                            self.map._can_see(viewer, target, active_perception=active_perception),
+                            (viewer, target, active_perception))
+
+    def test_door_toggle_and_movement_invalidate(self):
+        self.assertFalse(self.battle.can_see(self.fighter, self.goblin))
+        self.door.open()
+        self.assertTrue(self.battle.can_see(self.fighter, self.goblin))
+        self.door.close()
+        self.assertFalse(self.battle.can_see(self.fighter, self.goblin))
+
+        self.assertTrue(self.battle.can_see(self.fighter, self.orc))
+        self.map.move_to(self.orc, 4, 3, self.battle)
+        self.assertEqual(self.battle.can_see(self.fighter, self.orc), self.map._can_see(self.fighter, self.orc))
+
+    def test_hiding_and_turns_invalidate(self):
+        self.assertTrue(self.battle.can_see(self.fighter, self.orc))
+        self.orc.do_hide(30)
+        self.assertFalse(self.battle.can_see(self.fighter, self.orc))
+        self.assertTrue(self.battle.can_see(self.fighter, self.orc, active_perception=30))
+
+        epoch = self.matrix.epoch
+        self.battle.start()
+        self.battle.start_turn()
+        self.assertGreater(self.matrix.epoch, epoch)
+
+    def test_disabled_matrix_goes_to_the_map(self):
+        self.matrix.enabled = False
+        self.battle.can_see(self.fighter, self.orc)
+        self.battle.can_see(self.fighter, self.orc)
+        self.assertEqual(self.matrix.hits + self.matrix.misses, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
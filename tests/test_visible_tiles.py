@@ -0,0 +1,94 @@
+import unittest
+from natural20.map import Map
+from natural20.session import Session
+from natural20.player_character import PlayerCharacter
+from natural20.utils.terrain_grid import COVER_NAMES
+
+
+class TestVisibleTiles(unittest.TestCase):
+    """visible_tiles/sweep must agree with the per-square Bresenham walk."""
+
+    def setUp(self):
+        self.session = Session(root_path='tests/fixtures')
+
+    def _squares(self, battle_map):
+        width, height = battle_map.size
+        return [(x, y) for x in range(width) for y in range(height)]
+
+    def _assert_sweep_matches_line_of_sight(self, battle_map, label):
+        squares = self._squares(battle_map)
+        for inclusive in (True, False):
+            for origin in squares:
+                swept = battle_map.visibility.sweep(origin, inclusive=inclusive)
+                for target in squares:
+                    if target == origin:
+                        self.assertIn(target, swept)
+                        continue
+                    path = battle_map.line_of_sight(*origin, *target, inclusive=inclusive)
+                    context = (label, inclusive, origin, target)
+                    if path is None:
+                        self.assertNotIn(target, swept, context)
+                        continue
+                    self.assertIn(target, swept, context)
+                    # cover along the path, the origin square excluded
+                    expected = max([COVER_NAMES.index(cover) for cover, _ in path[1:]], default=0)
+                    self.assertEqual(swept[target], expected, context)
+
+    def test_sweep_matches_line_of_sight(self):
+        for map_file in ['maps/game_map', 'maps/complex_map', 'maps/thinwall_map', 'battle_sim_objects']:
+            battle_map = Map(self.session, f'tests/fixtures/{map_file}.yml')
+            self._assert_sweep_matches_line_of_sight(battle_map, map_file)
+
+    def test_sweep_follows_directional_doors(self):
+        battle_map = Map(self.session, 'tests/fixtures/maps/thinwall_map_doors.yml')
+        self._assert_sweep_matches_line_of_sight(battle_map, 'closed')
+        battle_map.object_at(1, 3).open()
+        battle_map.object_at(3, 4).open()
+        self._assert_sweep_matches_line_of_sight(battle_map, 'opened')
+
+    def test_bounded_sweep_is_the_unbounded_one_within_reach(self):
+        from natural20.utils import visibility_cache
+        battle_map = Map(self.session, 'tests/fixtures/maps/complex_map.yml')
+        for origin in self._squares(battle_map):
+            for reach in (0, 2, 5):
+                full = battle_map.visibility.sweep(origin)
+                expected = {square: cover for square, cover in full.items()
+                            if max(abs(square[0] - origin[0]), abs(square[1] - origin[1])) <= reach}
+                self.assertEqual(battle_map.visibility.sweep(origin, reach=reach), expected, (origin, reach))
+        # only the reached offsets are tabled, and old tables are dropped
+        self.assertIn((5, 5), visibility_cache._RAY_TABLES)
+        self.assertLessEqual(len(visibility_cache._RAY_TABLES), visibility_cache.RAY_TABLE_CACHE_SIZE)
+
+    def test_visible_tiles_matches_can_see_square(self):
+        character = PlayerCharacter.load(self.session, 'characters/high_elf_fighter.yml')
+        for map_name, positions in [('game_map', [(0, 0), (2, 3)]), ('complex_map', [(1, 1), (6, 6)])]:
+            battle_map = Map(self.session, f'tests/fixtures/maps/{map_name}.yml')
+            for position in positions:
+                if not battle_map.placeable(character, *position):
+                    continue
+                battle_map.place(position, character)
+                for inclusive in (True, False):
+                    for force_dark_vision in (False, True):
+                        visible = battle_map.visible_tiles(character, force_dark_vision=force_dark_vision,
+                                                           inclusive=inclusive)
+                        for target in self._squares(battle_map):
+                            expected = battle_map.can_see_square(character, target,
+                                                                 force_dark_vision=force_dark_vision,
+                                                                 inclusive=inclusive)
+                            self.assertEqual(target in visible, bool(expected),
+                                             (map_name, position, target, inclusive, force_dark_vision))
+                battle_map.remove(character)
+
+    def test_visible_tiles_reports_distance_and_cover(self):
+        character = PlayerCharacter.load(self.session, 'characters/high_elf_fighter.yml')
+        battle_map = Map(self.session, 'tests/fixtures/maps/game_map.yml')
+        battle_map.place((0, 0), character)
+        visible = battle_map.visible_tiles(character)
+        self.assertEqual(visible[(0, 0)], (0, 'none'))
+        for (x, y), (distance, cover) in visible.items():
+            self.assertIn(cover, COVER_NAMES)
+            self.assertEqual(distance, int((x ** 2 + y ** 2) ** 0.5))
+
+
+if __name__ == '__main__':
+    unittest.main()